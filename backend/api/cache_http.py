@@ -0,0 +1,86 @@
+"""
+SISTEMA ERP PRIMOTEX - GET CONDICIONAL (ETag / 304)
+==================================================
+
+Dependência para endpoints GET cujo resultado depende só de algumas
+tabelas. O ETag é derivado das versões dessas tabelas
+(backend.database.versoes_tabelas), do caminho e dos parâmetros da
+requisição e do perfil do usuário. Se o cliente enviar If-None-Match
+com o ETag atual, a resposta é 304 Not Modified, sem executar o handler
+nem as consultas dele (só a leitura das versões, pela chave primária).
+
+A dependência é resolvida antes do handler; por isso ela mesma exige a
+autenticação da rota (get_current_active_user, salvo autenticado=False
+nos endpoints públicos) para que um 304 nunca responda a quem receberia
+401. If-None-Match: * não confere em GET.
+
+Uso:
+    @router.get("/", dependencies=[Depends(etag_tabelas("clientes"))])
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import hashlib
+from datetime import date
+from typing import Callable
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from backend.auth.dependencies import get_current_active_user, get_current_user_optional
+from backend.database.config import get_read_db
+from backend.database.versoes_tabelas import ler_versoes
+
+
+def calcular_etag(versoes: dict, request: Request, perfil: str, extra: str = "") -> str:
+    """ETag forte para as versões, a requisição e o perfil"""
+    parametros = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    partes = [
+        ",".join(f"{tabela}:{versao}" for tabela, versao in sorted(versoes.items())),
+        request.url.path,
+        parametros,
+        perfil,
+        extra,
+    ]
+    return '"' + hashlib.sha1("|".join(partes).encode()).hexdigest() + '"'
+
+
+def _etag_confere(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = [valor.strip() for valor in if_none_match.split(",")]
+    return etag in candidatos or f"W/{etag}" in candidatos
+
+
+def etag_tabelas(*tabelas: str, diario: bool = False, autenticado: bool = True) -> Callable:
+    """
+    Criar a dependência de GET condicional para as tabelas informadas.
+
+    Args:
+        tabelas: Tabelas lidas pelo endpoint
+        diario: True se a resposta depende da data atual (ex.: resumo do mês)
+        autenticado: False só para endpoints públicos (sem usuário na rota)
+
+    Returns:
+        Dependência FastAPI que responde 304 ou define o cabeçalho ETag
+    """
+    dependencia_usuario = get_current_active_user if autenticado else get_current_user_optional
+
+    def dependencia(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_read_db),
+        usuario=Depends(dependencia_usuario)
+    ):
+        versoes = ler_versoes(db, tabelas)
+        perfil = usuario.perfil if usuario is not None else ""
+        etag = calcular_etag(versoes, request, perfil, date.today().isoformat() if diario else "")
+
+        if _etag_confere(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+    return dependencia
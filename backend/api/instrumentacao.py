@@ -0,0 +1,112 @@
+"""
+SISTEMA ERP PRIMOTEX - CONSULTAS SQL POR REQUISIÇÃO
+==================================================
+
+Middleware ASGI que abre uma medição de consultas
+(backend.database.instrumentacao) para cada requisição HTTP: número de
+instruções, tempo total no banco e formatos repetidos. Requisições em
+que o mesmo formato roda mais de SQL_N_MAIS_1_LIMITE vezes (padrão
+típico de N+1) são registradas em log e guardadas em
+ocorrencias_n_mais_1 (as mais recentes).
+
+Com SQL_SERVER_TIMING=true a resposta leva o cabeçalho
+Server-Timing: db;dur=<ms>;desc="<n> consultas" (útil no desktop e no
+navegador; desligado por padrão para não expor detalhes do banco).
+
+Configuração:
+- SQL_INSTRUMENTACAO: liga/desliga o middleware (padrão: true)
+- SQL_N_MAIS_1_LIMITE: ver backend.database.instrumentacao
+- SQL_SERVER_TIMING: cabeçalho Server-Timing nas respostas (padrão: false)
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import logging
+import os
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from backend.database.instrumentacao import SQL_N_MAIS_1_LIMITE, medir_consultas
+
+logger = logging.getLogger(__name__)
+
+SQL_INSTRUMENTACAO = os.getenv("SQL_INSTRUMENTACAO", "true").lower() in ("1", "true", "yes")
+SQL_SERVER_TIMING = os.getenv("SQL_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+# Últimas requisições sinalizadas como N+1
+MAX_OCORRENCIAS = 100
+ocorrencias_n_mais_1: Deque[Dict] = deque(maxlen=MAX_OCORRENCIAS)
+
+
+def rota_da_requisicao(scope) -> str:
+    """
+    Caminho com parâmetros da rota atendida (ex.: /api/v1/clientes/{cliente_id}),
+    ou o caminho literal se nenhuma rota casou. Válido depois do roteamento.
+    """
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return scope["path"]
+    rotas = getattr(app.state, "_rotas_por_endpoint", None)
+    if rotas is None:
+        rotas = {}
+        for rota in app.router.routes:
+            rotas.setdefault(getattr(rota, "endpoint", None), getattr(rota, "path", None))
+        app.state._rotas_por_endpoint = rotas
+    return rotas.get(endpoint) or scope["path"]
+
+
+class InstrumentacaoSQLMiddleware:
+    """Medição das consultas SQL de cada requisição e detecção de N+1"""
+
+    def __init__(self, app, limite_repeticoes: int = SQL_N_MAIS_1_LIMITE,
+                 server_timing: bool = SQL_SERVER_TIMING):
+        self.app = app
+        self.limite_repeticoes = limite_repeticoes
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with medir_consultas() as consultas:
+            if self.server_timing:
+                async def enviar(mensagem):
+                    if mensagem["type"] == "http.response.start" and consultas.total:
+                        cabecalho = 'db;dur={:.1f};desc="{} consultas"'.format(
+                            consultas.tempo * 1000, consultas.total
+                        )
+                        mensagem["headers"] = list(mensagem.get("headers", [])) + [
+                            (b"server-timing", cabecalho.encode("latin-1"))
+                        ]
+                    await send(mensagem)
+            else:
+                enviar = send
+
+            try:
+                await self.app(scope, receive, enviar)
+            finally:
+                self._verificar(scope, consultas)
+
+    def _verificar(self, scope, consultas) -> Optional[Dict]:
+        repetidas = consultas.repetidas(self.limite_repeticoes)
+        if not repetidas:
+            return None
+        formato, vezes = repetidas[0]
+        ocorrencia = {
+            "metodo": scope["method"],
+            "rota": rota_da_requisicao(scope),
+            "consultas": consultas.total,
+            "tempo_ms": round(consultas.tempo * 1000, 2),
+            "repeticoes": vezes,
+            "sql": formato[:500],
+        }
+        ocorrencias_n_mais_1.append(ocorrencia)
+        logger.warning(
+            "Possível N+1 em %s %s: %d execuções de %r (%d consultas, %.1f ms no banco)",
+            ocorrencia["metodo"], ocorrencia["rota"], vezes, formato[:200],
+            consultas.total, ocorrencia["tempo_ms"]
+        )
+        return ocorrencia
@@ -15,6 +15,8 @@ from fastapi.security import HTTPBearer
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
+from fastapi import Request, Response
+from datetime import datetime, timezone
 import logging
 import logging
 
@@ -56,7 +58,9 @@ async def startup_event():
     logger.info("🚀 Iniciando Sistema ERP Primotex...")
     logger.info("📊 Conectando ao banco de dados...")
     try:
-        from backend.database.config import engine
+        from backend.database.config import engine, configure_threadpool
+        threads = configure_threadpool()
+        logger.info(f"🧵 Threadpool de handlers síncronos: {threads} threads")
         from backend.models import create_all_tables
         success = create_all_tables(engine)
         if success:
@@ -65,6 +69,44 @@ async def startup_event():
             logger.error("❌ Erro ao inicializar banco de dados")
     except Exception as e:
         logger.error(f"❌ Erro crítico no banco de dados: {e}")
+    try:
+        from backend.database.config import ReadSessionLocal, SessionLocal
+        from backend.auth.revogacao import lista_revogacao
+        db = SessionLocal()
+        try:
+            revogados = lista_revogacao.carregar(db)
+        finally:
+            db.close()
+        # Só leitura: não ocupa a conexão única do escritor a cada 5 s
+        lista_revogacao.iniciar_sincronizacao(ReadSessionLocal)
+        logger.info(f"🔒 Tokens revogados carregados: {revogados}")
+    except Exception as e:
+        logger.error(f"❌ Erro ao carregar tokens revogados: {e}")
+    try:
+        from backend.auth.hash_senhas import servico_hash
+        rounds = servico_hash.calibrar()
+        logger.info(f"🔑 Hash de senhas: bcrypt com {rounds} rounds, {servico_hash.workers} threads")
+    except Exception as e:
+        logger.error(f"❌ Erro ao calibrar o hash de senhas: {e}")
+
+# Consultas SQL por requisição e detecção de N+1 (mais interno: mede só o handler)
+from backend.api.instrumentacao import SQL_INSTRUMENTACAO, InstrumentacaoSQLMiddleware
+if SQL_INSTRUMENTACAO:
+    app.add_middleware(InstrumentacaoSQLMiddleware)
+
+# Métricas por rota (contagens, erros, latência) servidas em /metrics
+from backend.api.metricas import (
+    CONTENT_TYPE as METRICAS_CONTENT_TYPE, METRICAS_ENABLED,
+    MetricasMiddleware, autorizacao_valida as autorizacao_metricas_valida, renderizar_metricas
+)
+if METRICAS_ENABLED:
+    app.add_middleware(MetricasMiddleware)
+
+# Limite de requisições por usuário/IP (antes do CORS para que o 429
+# também receba os cabeçalhos CORS)
+from backend.api.rate_limit import RATE_LIMIT_ENABLED, RateLimitMiddleware
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 
 # Configurar CORS para permitir acesso do frontend
 app.add_middleware(
@@ -73,6 +115,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count", "Retry-After", "ETag"],
 )
 
 # =======================================
@@ -114,7 +157,7 @@ async def health_check():
     try:
         return {
             "status": "healthy",
-            "timestamp": "2025-10-29T00:00:00Z",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "database": "connected",  # Será implementado
             "services": {
                 "auth": "active",
@@ -127,6 +170,15 @@ async def health_check():
     except Exception as e:
         return {"status": "error", "detail": str(e)}
 
+@app.get("/metrics", tags=["Sistema"], include_in_schema=False)
+async def metrics(request: Request):
+    """Métricas no formato texto do Prometheus"""
+    if not METRICAS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not autorizacao_metricas_valida(request.headers.get("authorization")):
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return Response(content=renderizar_metricas(), media_type=METRICAS_CONTENT_TYPE)
+
 # =======================================
 # MIDDLEWARE DE AUTENTICAÇÃO (FUTURO)
 # =======================================
@@ -192,6 +244,18 @@ app.include_router(comunicacao_router, prefix="/api/v1", tags=["Comunicação"])
 from backend.api.routers.whatsapp_router import router as whatsapp_router
 app.include_router(whatsapp_router, prefix="/api/v1", tags=["WhatsApp"])
 
+# Incluir router de busca global (FTS)
+from backend.api.routers.busca_router import router as busca_router
+app.include_router(busca_router, prefix="/api/v1", tags=["Busca"])
+
+# Incluir router de importação em massa
+from backend.api.routers.importacao_router import router as importacao_router
+app.include_router(importacao_router, prefix="/api/v1", tags=["Importação"])
+
+# Incluir router de diagnóstico (consultas lentas, só administradores)
+from backend.api.routers.diagnostico_router import router as diagnostico_router
+app.include_router(diagnostico_router, prefix="/api/v1", tags=["Diagnóstico"])
+
 # =======================================
 # ENDPOINTS MOCK PARA DESENVOLVIMENTO
 # =======================================
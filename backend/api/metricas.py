@@ -0,0 +1,516 @@
+"""
+SISTEMA ERP PRIMOTEX - MÉTRICAS HTTP (PROMETHEUS)
+================================================
+
+Middleware ASGI que registra, por rota (método + caminho com
+parâmetros, ex.: GET /api/v1/clientes/{cliente_id}):
+
+- requisições por código de status
+- erros (status 5xx ou exceção no handler)
+- histograma de latência em baldes fixos (BALDES_LATENCIA)
+
+além do número de requisições em andamento. renderizar_metricas()
+devolve tudo no formato texto do Prometheus, junto com o uso dos pools
+de conexão do banco, a taxa de acerto do erp_cache e o total de
+consultas lentas (servido em GET /metrics).
+
+Todas as atualizações acontecem no event loop do worker (uma thread),
+então os contadores não precisam de lock: uma requisição custa uma
+busca binária em 11 baldes e alguns incrementos (ver
+benchmarks/bench_metricas_http.py: ~3,4 µs por requisição medidos
+sobre uma aplicação ASGI vazia; ~7,7 µs somando a instrumentação SQL).
+
+Requisições que não casam com nenhuma rota (404 de caminhos
+inexistentes) ficam sob a rota "<nao_roteada>" para não multiplicar
+séries; as recusadas pelo rate limit (mais externo) não chegam aqui.
+
+Com vários workers (uvicorn --workers), cada processo tem os próprios
+contadores e um scrape cai em qualquer um deles. Com METRICAS_SQLITE_PATH
+definido, cada worker publica seu instantâneo (JSON) em um arquivo
+SQLite compartilhado a cada METRICAS_SYNC_SEGUNDOS e o /metrics devolve
+a soma de todos (MetricasSQLite): contadores de workers encerrados
+continuam na soma, para que os totais nunca diminuam; medidores (em
+andamento, pools, entradas do cache) só contam os workers ativos. Sem
+o arquivo, ou com ele indisponível, o /metrics mostra só o worker que
+atendeu.
+
+Configuração:
+- METRICAS_ENABLED: liga/desliga o middleware e o /metrics (padrão: true)
+- METRICAS_TOKEN: se definido, GET /metrics exige "Authorization: Bearer <token>"
+- METRICAS_SQLITE_PATH: arquivo compartilhado pelos workers (vazio = por processo)
+- METRICAS_SYNC_SEGUNDOS: intervalo de publicação de cada worker (padrão: 5)
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.api.instrumentacao import rota_da_requisicao
+
+logger = logging.getLogger(__name__)
+
+METRICAS_ENABLED = os.getenv("METRICAS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+METRICAS_SQLITE_PATH = os.getenv("METRICAS_SQLITE_PATH", "")
+METRICAS_SYNC_SEGUNDOS = float(os.getenv("METRICAS_SYNC_SEGUNDOS", "5"))
+
+# Limites superiores dos baldes de latência (segundos); o último balde é +Inf
+BALDES_LATENCIA: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ROTA_NAO_ROTEADA = "<nao_roteada>"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class SerieRota:
+    """Contadores de uma rota"""
+
+    __slots__ = ("baldes", "soma", "total", "erros", "por_status")
+
+    def __init__(self):
+        self.baldes = [0] * (len(BALDES_LATENCIA) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self.erros = 0
+        self.por_status: Dict[int, int] = {}
+
+
+class MetricasHTTP:
+    """Registro das métricas HTTP do worker"""
+
+    def __init__(self):
+        self.inicio = time.time()
+        self.em_andamento = 0
+        self.series: Dict[Tuple[str, str], SerieRota] = {}
+
+    def observar(self, metodo: str, rota: str, status: int, duracao: float) -> None:
+        serie = self.series.get((metodo, rota))
+        if serie is None:
+            serie = self.series[(metodo, rota)] = SerieRota()
+        serie.baldes[bisect_left(BALDES_LATENCIA, duracao)] += 1
+        serie.soma += duracao
+        serie.total += 1
+        serie.por_status[status] = serie.por_status.get(status, 0) + 1
+        if status >= 500:
+            serie.erros += 1
+
+    def resumo(self) -> Dict[str, float]:
+        """Totais do worker (requisições, erros, latência média)"""
+        total = sum(serie.total for serie in self.series.values())
+        soma = sum(serie.soma for serie in self.series.values())
+        return {
+            "requisicoes": total,
+            "erros": sum(serie.erros for serie in self.series.values()),
+            "em_andamento": self.em_andamento,
+            "latencia_media": soma / total if total else 0.0,
+            "uptime_segundos": time.time() - self.inicio,
+        }
+
+    def limpar(self) -> None:
+        self.series.clear()
+
+
+metricas_http = MetricasHTTP()
+
+
+class MetricasMiddleware:
+    """
+    Contagem, erros e latência por rota. Com o arquivo compartilhado,
+    publica o instantâneo do worker a cada intervalo a partir da primeira
+    chamada (o lifespan, na inicialização).
+    """
+
+    def __init__(self, app, metricas: Optional[MetricasHTTP] = None,
+                 compartilhadas: Optional["MetricasSQLite"] = None):
+        self.app = app
+        self.metricas = metricas or metricas_http
+        self.compartilhadas = compartilhadas or metricas_compartilhadas
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _publicar(self) -> None:
+        """Publicar o instantâneo e reagendar (no event loop do worker)"""
+        try:
+            self.compartilhadas.publicar(instantaneo(self.metricas))
+        finally:
+            self._loop.call_later(self.compartilhadas.intervalo, self._publicar)
+
+    async def __call__(self, scope, receive, send):
+        if self.compartilhadas is not None and self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop.call_later(self.compartilhadas.intervalo, self._publicar)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_resposta = [500]
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status_resposta[0] = mensagem["status"]
+            await send(mensagem)
+
+        metricas = self.metricas
+        metricas.em_andamento += 1
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        except Exception:
+            status_resposta[0] = 500
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            metricas.em_andamento -= 1
+            rota = rota_da_requisicao(scope) if "endpoint" in scope else ROTA_NAO_ROTEADA
+            metricas.observar(scope["method"], rota, status_resposta[0], duracao)
+
+
+def autorizacao_valida(autorizacao: Optional[str]) -> bool:
+    """Cabeçalho Authorization do GET /metrics (comparado em tempo constante)"""
+    if not METRICAS_TOKEN:
+        return True
+    return hmac.compare_digest((autorizacao or "").encode(), f"Bearer {METRICAS_TOKEN}".encode())
+
+
+# =======================================
+# FORMATO TEXTO DO PROMETHEUS
+# =======================================
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _rotulos(**rotulos) -> str:
+    return "{" + ",".join(f'{nome}="{_escapar(str(valor))}"' for nome, valor in rotulos.items()) + "}"
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _familia(linhas: List[str], nome: str, tipo: str, ajuda: str,
+             amostras: Iterable[Tuple[str, float]]) -> None:
+    linhas.append(f"# HELP {nome} {ajuda}")
+    linhas.append(f"# TYPE {nome} {tipo}")
+    for sufixo_rotulos, valor in amostras:
+        linhas.append(f"{nome}{sufixo_rotulos} {_numero(valor)}")
+
+
+def _metricas_pools(engines: Dict[str, object]) -> Dict[str, Dict[str, int]]:
+    """Uso dos pools (QueuePool): tamanho, em uso e overflow por engine"""
+    pools = {}
+    vistos = set()
+    for nome, engine in engines.items():
+        pool = getattr(engine, "pool", None)
+        if pool is None or id(pool) in vistos or not hasattr(pool, "checkedout"):
+            continue
+        vistos.add(id(pool))
+        pools[nome] = {
+            "tamanho": pool.size(),
+            "em_uso": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        }
+    return pools
+
+
+def instantaneo(metricas: Optional[MetricasHTTP] = None,
+                engines: Optional[Dict[str, object]] = None) -> Dict[str, Any]:
+    """Contadores e medidores do worker, serializáveis em JSON"""
+    metricas = metricas or metricas_http
+    if engines is None:
+        from backend.database.config import engine, read_engine
+        engines = {"escrita": engine, "leitura": read_engine}
+    from backend.database.instrumentacao import consultas_lentas
+    from shared.cache_system import erp_cache
+    cache = erp_cache.cache.get_stats()
+    return {
+        "inicio": metricas.inicio,
+        "em_andamento": metricas.em_andamento,
+        "series": [
+            [metodo, rota, list(serie.baldes), serie.soma, serie.total, serie.erros,
+             {str(status): vezes for status, vezes in serie.por_status.items()}]
+            for (metodo, rota), serie in metricas.series.items()
+        ],
+        "pools": _metricas_pools(engines),
+        "consultas_lentas": consultas_lentas.total,
+        "cache": {"hits": cache["hits"], "misses": cache["misses"], "entradas": cache["entries"]},
+    }
+
+
+def somar_instantaneos(ativos: Sequence[Dict[str, Any]],
+                       encerrados: Sequence[Dict[str, Any]] = ()) -> Dict[str, Any]:
+    """
+    Somar instantâneos de workers: contadores de todos, medidores (em
+    andamento, pools, entradas do cache, início) só dos ativos.
+    """
+    series: Dict[Tuple[str, str], list] = {}
+    soma = {
+        "inicio": min((dados["inicio"] for dados in ativos), default=time.time()),
+        "em_andamento": sum(dados["em_andamento"] for dados in ativos),
+        "pools": {},
+        "consultas_lentas": 0,
+        "cache": {"hits": 0, "misses": 0, "entradas": sum(dados["cache"]["entradas"] for dados in ativos)},
+        "workers": len(ativos),
+    }
+    for dados in list(ativos) + list(encerrados):
+        soma["consultas_lentas"] += dados["consultas_lentas"]
+        soma["cache"]["hits"] += dados["cache"]["hits"]
+        soma["cache"]["misses"] += dados["cache"]["misses"]
+        for metodo, rota, baldes, total_segundos, total, erros, por_status in dados["series"]:
+            serie = series.get((metodo, rota))
+            if serie is None:
+                serie = series[(metodo, rota)] = [metodo, rota, [0] * len(baldes), 0.0, 0, 0, {}]
+            serie[2] = [a + b for a, b in zip(serie[2], baldes)]
+            serie[3] += total_segundos
+            serie[4] += total
+            serie[5] += erros
+            for status, vezes in por_status.items():
+                serie[6][status] = serie[6].get(status, 0) + vezes
+    for dados in ativos:
+        for nome, pool in dados["pools"].items():
+            acumulado = soma["pools"].setdefault(nome, {"tamanho": 0, "em_uso": 0, "overflow": 0})
+            for campo, valor in pool.items():
+                acumulado[campo] += valor
+    soma["series"] = list(series.values())
+    return soma
+
+
+def renderizar_metricas(metricas: Optional[MetricasHTTP] = None,
+                        engines: Optional[Dict[str, object]] = None,
+                        compartilhadas: Optional["MetricasSQLite"] = None) -> str:
+    """
+    Todas as métricas no formato texto do Prometheus: a soma dos workers
+    com o arquivo compartilhado, senão só as deste worker
+    """
+    dados = instantaneo(metricas, engines)
+    compartilhadas = compartilhadas or metricas_compartilhadas
+    lidos = None
+    if compartilhadas is not None and compartilhadas.publicar(dados):
+        lidos = compartilhadas.ler()
+    return _renderizar(somar_instantaneos(*lidos) if lidos is not None else somar_instantaneos([dados]))
+
+
+def _renderizar(dados: Dict[str, Any]) -> str:
+    series = sorted(dados["series"], key=lambda serie: (serie[0], serie[1]))
+    linhas: List[str] = []
+
+    _familia(linhas, "erp_http_requests_total", "counter", "Requisições HTTP por rota e status", (
+        (_rotulos(method=metodo, route=rota, status=status), vezes)
+        for metodo, rota, _baldes, _soma, _total, _erros, por_status in series
+        for status, vezes in sorted(por_status.items(), key=lambda item: int(item[0]))
+    ))
+    _familia(linhas, "erp_http_request_errors_total", "counter",
+             "Requisições com status 5xx ou exceção", (
+                 (_rotulos(method=metodo, route=rota), erros)
+                 for metodo, rota, _baldes, _soma, _total, erros, _por_status in series
+             ))
+    _familia(linhas, "erp_http_requests_in_flight", "gauge", "Requisições em andamento",
+             [("", dados["em_andamento"])])
+
+    nome = "erp_http_request_duration_seconds"
+    linhas.append(f"# HELP {nome} Latência das requisições HTTP")
+    linhas.append(f"# TYPE {nome} histogram")
+    for metodo, rota, baldes, soma, total, _erros, _por_status in series:
+        acumulado = 0
+        for limite, vezes in zip(BALDES_LATENCIA + (float("inf"),), baldes):
+            acumulado += vezes
+            rotulos = _rotulos(method=metodo, route=rota, le=_numero(limite))
+            linhas.append(f"{nome}_bucket{rotulos} {acumulado}")
+        rotulos = _rotulos(method=metodo, route=rota)
+        linhas.append(f"{nome}_sum{rotulos} {_numero(float(soma))}")
+        linhas.append(f"{nome}_count{rotulos} {total}")
+
+    pools = dados["pools"]
+    _familia(linhas, "erp_db_pool_size", "gauge", "Conexões do pool", (
+        (_rotulos(engine=nome), pool["tamanho"]) for nome, pool in pools.items()
+    ))
+    _familia(linhas, "erp_db_pool_checked_out", "gauge", "Conexões do pool em uso", (
+        (_rotulos(engine=nome), pool["em_uso"]) for nome, pool in pools.items()
+    ))
+    _familia(linhas, "erp_db_pool_overflow", "gauge", "Conexões além do tamanho do pool", (
+        (_rotulos(engine=nome), pool["overflow"]) for nome, pool in pools.items()
+    ))
+
+    _familia(linhas, "erp_db_slow_queries_total", "counter", "Consultas acima de SQL_LENTA_MS",
+             [("", dados["consultas_lentas"])])
+
+    cache = dados["cache"]
+    consultas = cache["hits"] + cache["misses"]
+    _familia(linhas, "erp_cache_hits_total", "counter", "Acertos do erp_cache", [("", cache["hits"])])
+    _familia(linhas, "erp_cache_misses_total", "counter", "Faltas do erp_cache", [("", cache["misses"])])
+    _familia(linhas, "erp_cache_hit_ratio", "gauge", "Taxa de acerto do erp_cache (0 a 1)",
+             [("", round(cache["hits"] / consultas, 4) if consultas else 0.0)])
+    _familia(linhas, "erp_cache_entries", "gauge", "Entradas no erp_cache", [("", cache["entradas"])])
+
+    _familia(linhas, "erp_workers", "gauge", "Workers somados nestas métricas", [("", dados["workers"])])
+    _familia(linhas, "erp_uptime_seconds", "gauge", "Tempo desde o início do worker ativo mais antigo",
+             [("", round(time.time() - dados["inicio"], 1))])
+    return "\n".join(linhas) + "\n"
+
+
+# =======================================
+# SOMA ENTRE WORKERS (SQLITE COMPARTILHADO)
+# =======================================
+
+# Worker sem publicar há mais que isto tem os contadores consolidados
+# (linha ORIGEM_ENCERRADOS) e a própria linha vira lápide
+CONSOLIDAR_APOS = 3600.0
+ORIGEM_ENCERRADOS = "<encerrados>"
+
+
+class MetricasSQLite:
+    """
+    Instantâneos dos workers em um arquivo SQLite compartilhado, uma
+    linha por worker (pid + sufixo aleatório, para não confundir pids
+    reaproveitados).
+
+    Ativo é o worker que publicou nos últimos 3 intervalos; os demais
+    entram só com os contadores. Depois de CONSOLIDAR_APOS segundos sem
+    publicar, os contadores do worker são somados à linha
+    ORIGEM_ENCERRADOS e os dados da linha dele são apagados; a lápide
+    impede que uma publicação atrasada o conte duas vezes.
+
+    Roda no event loop, então o busy timeout é curto. Qualquer erro do
+    SQLite desativa o arquivo por retry_interval segundos (um aviso no
+    log por queda) e o /metrics mostra só o worker que atendeu, como o
+    rate limit e o L2 do cache.
+    """
+
+    def __init__(self, caminho: str = METRICAS_SQLITE_PATH,
+                 intervalo: float = METRICAS_SYNC_SEGUNDOS,
+                 retry_interval: float = 5.0,
+                 busy_timeout: float = 0.05,
+                 relogio=time.time):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.retry_interval = retry_interval
+        self.busy_timeout = busy_timeout
+        self.origem = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._indisponivel_ate = 0.0
+        self._proxima_consolidacao = 0.0
+        self.erros = 0
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS workers ("
+                    "origem TEXT PRIMARY KEY, atualizado REAL NOT NULL, dados TEXT"
+                    ") WITHOUT ROWID"
+                )
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def _executar(self, operacao, padrao=None):
+        """Executar operacao(conn, agora) sob o lock, desativando o arquivo em caso de erro"""
+        agora = self._relogio()
+        if agora < self._indisponivel_ate:
+            return padrao
+        with self._lock:
+            try:
+                return operacao(self._conectar(), agora)
+            except sqlite3.Error as e:
+                self._desativar(agora, e)
+                return padrao
+
+    def _desativar(self, agora: float, erro: Exception) -> None:
+        self.erros += 1
+        self._indisponivel_ate = agora + self.retry_interval
+        logger.warning(
+            f"Métricas: {self.caminho} indisponível ({erro}); "
+            f"mostrando só este worker por {self.retry_interval:.0f}s"
+        )
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def publicar(self, dados: Dict[str, Any]) -> bool:
+        """Gravar o instantâneo deste worker; False se o arquivo está indisponível"""
+        def operacao(conn, agora):
+            conn.execute(
+                "INSERT INTO workers (origem, atualizado, dados) VALUES (?, ?, ?) "
+                "ON CONFLICT(origem) DO UPDATE SET atualizado = excluded.atualizado, "
+                "dados = excluded.dados WHERE workers.dados IS NOT NULL",
+                (self.origem, agora, json.dumps(dados, separators=(",", ":")))
+            )
+            return True
+        return self._executar(operacao, padrao=False)
+
+    def ler(self) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """(instantâneos dos ativos, dos encerrados), ou None se indisponível"""
+        def operacao(conn, agora):
+            if agora >= self._proxima_consolidacao:
+                self._consolidar(conn, agora)
+            ativos, encerrados = [], []
+            for origem, atualizado, dados in conn.execute(
+                "SELECT origem, atualizado, dados FROM workers WHERE dados IS NOT NULL"
+            ):
+                ativo = origem != ORIGEM_ENCERRADOS and atualizado >= agora - 3 * self.intervalo
+                (ativos if ativo else encerrados).append(json.loads(dados))
+            return ativos, encerrados
+        return self._executar(operacao)
+
+    def _consolidar(self, conn: sqlite3.Connection, agora: float) -> None:
+        """Somar os contadores dos workers parados há muito à linha dos encerrados"""
+        self._proxima_consolidacao = agora + 60
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            linhas = conn.execute(
+                "SELECT origem, dados FROM workers WHERE dados IS NOT NULL AND atualizado < ?",
+                (agora - CONSOLIDAR_APOS,)
+            ).fetchall()
+            parados = [origem for origem, _dados in linhas if origem != ORIGEM_ENCERRADOS]
+            if parados:
+                anterior = conn.execute(
+                    "SELECT dados FROM workers WHERE origem = ?", (ORIGEM_ENCERRADOS,)
+                ).fetchone()
+                contadores = [json.loads(dados) for origem, dados in linhas if origem != ORIGEM_ENCERRADOS]
+                if anterior is not None:
+                    contadores.append(json.loads(anterior[0]))
+                conn.execute(
+                    "INSERT OR REPLACE INTO workers (origem, atualizado, dados) VALUES (?, ?, ?)",
+                    (ORIGEM_ENCERRADOS, agora, json.dumps(somar_instantaneos([], contadores)))
+                )
+                conn.executemany("UPDATE workers SET dados = NULL WHERE origem = ?",
+                                 [(origem,) for origem in parados])
+            # Lápides antigas: nenhum worker fica uma semana sem publicar
+            conn.execute("DELETE FROM workers WHERE dados IS NULL AND atualizado < ?",
+                         (agora - 7 * 86400,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+metricas_compartilhadas = MetricasSQLite() if METRICAS_SQLITE_PATH else None
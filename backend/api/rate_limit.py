@@ -0,0 +1,341 @@
+"""
+SISTEMA ERP PRIMOTEX - LIMITE DE REQUISIÇÕES (RATE LIMITING)
+===========================================================
+
+Middleware ASGI com token bucket por (grupo de rotas, usuário ou IP).
+Cada balde ocupa tamanho fixo (tokens, último acesso) e é reabastecido
+de forma preguiçosa na própria consulta; baldes ociosos (que já estariam
+cheios) são removidos periodicamente. Ao esgotar, responde 429 com
+Retry-After.
+
+O usuário é identificado pelo token Bearer (assinatura validada uma vez
+e mantida em um mapa limitado); sem token válido, vale o IP do cliente.
+
+Backends:
+- memória (padrão): por processo, poucos µs por requisição
+- sqlite: baldes compartilhados entre os workers do uvicorn em um
+  arquivo local (RATE_LIMIT_SQLITE_PATH). Se o arquivo falhar (bloqueado,
+  diretório ausente, disco cheio), o worker segue com baldes em memória
+  por alguns segundos em vez de responder 500
+
+Configuração:
+- RATE_LIMIT_ENABLED: liga/desliga o middleware (padrão: true)
+- RATE_LIMIT_BACKEND: "memoria" ou "sqlite"
+- RATE_LIMIT_SQLITE_PATH: arquivo dos baldes compartilhados
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.auth.jwt_handler import decode_access_token
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memoria").lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv(
+    "RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "primotex_rate_limit.db")
+)
+
+# Intervalo entre varreduras de baldes ociosos (segundos)
+INTERVALO_LIMPEZA = 60.0
+
+# Tokens Bearer já validados mantidos para identificar o usuário
+MAX_TOKENS_CONHECIDOS = 4096
+
+
+@dataclass(frozen=True)
+class GrupoLimite:
+    """Grupo de rotas com o mesmo limite"""
+
+    nome: str
+    prefixos: Tuple[str, ...]
+    capacidade: float       # rajada máxima
+    por_segundo: float      # reabastecimento
+    por_usuario: bool = True  # False: sempre por IP (ex.: login)
+
+
+# Primeiro grupo cujo prefixo casar com o caminho; rotas fora dos
+# prefixos (/, /health, /docs) não são limitadas
+GRUPOS_PADRAO: List[GrupoLimite] = [
+    GrupoLimite("login", ("/api/v1/auth/login", "/api/v1/auth/forgot-password"),
+                capacidade=10, por_segundo=0.2, por_usuario=False),
+    GrupoLimite("importacao", ("/api/v1/importacao",), capacidade=5, por_segundo=0.1),
+    GrupoLimite("api", ("/api/v1/",), capacidade=300, por_segundo=50),
+]
+
+
+# =======================================
+# BACKENDS DOS BALDES
+# =======================================
+
+class BaldesMemoria:
+    """
+    Baldes em um dict do processo: chave -> [tokens, último acesso].
+
+    O middleware roda no event loop (uma thread), mas o lock mantém o
+    backend correto se usado de outras threads.
+    """
+
+    def __init__(self, relogio: Callable[[], float] = time.monotonic):
+        self._relogio = relogio
+        self._baldes: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self._proxima_limpeza = relogio() + INTERVALO_LIMPEZA
+
+    def consumir(self, chave: tuple, grupo: GrupoLimite) -> float:
+        """
+        Retirar um token do balde.
+
+        Returns:
+            0 se permitido, senão segundos até haver um token
+        """
+        agora = self._relogio()
+        with self._lock:
+            if agora >= self._proxima_limpeza:
+                self._limpar(agora)
+            balde = self._baldes.get(chave)
+            if balde is None:
+                self._baldes[chave] = [grupo.capacidade - 1, agora]
+                return 0.0
+            tokens = balde[0] + (agora - balde[1]) * grupo.por_segundo
+            if tokens > grupo.capacidade:
+                tokens = grupo.capacidade
+            balde[1] = agora
+            if tokens >= 1:
+                balde[0] = tokens - 1
+                return 0.0
+            balde[0] = tokens
+            return (1 - tokens) / grupo.por_segundo
+
+    def _limpar(self, agora: float) -> None:
+        """Remover baldes que já estariam cheios (ociosos)"""
+        ociosos = [
+            chave for chave, (tokens, ultimo) in self._baldes.items()
+            if tokens + (agora - ultimo) * chave[1] >= chave[2]
+        ]
+        for chave in ociosos:
+            del self._baldes[chave]
+        self._proxima_limpeza = agora + INTERVALO_LIMPEZA
+
+    def __len__(self) -> int:
+        return len(self._baldes)
+
+
+class BaldesSQLite:
+    """
+    Baldes em um arquivo SQLite compartilhado pelos workers da máquina.
+
+    Cada consulta é um único UPSERT atômico; o relógio é time.time()
+    porque precisa ser comum entre processos.
+
+    A consulta roda no event loop, então o busy timeout é curto. Qualquer
+    erro do SQLite desativa o arquivo por retry_interval segundos (um
+    aviso no log por queda) e os baldes passam a ser os da memória do
+    processo, como o L2 do cache.
+    """
+
+    _SQL_CONSUMIR = (
+        "INSERT INTO baldes (chave, tokens, atualizado) VALUES (?1, ?2 - 1, ?4) "
+        "ON CONFLICT(chave) DO UPDATE SET "
+        "tokens = min(?2, tokens + (?4 - atualizado) * ?3) - 1, atualizado = ?4 "
+        "WHERE min(?2, tokens + (?4 - atualizado) * ?3) >= 1 "
+        "RETURNING tokens"
+    )
+
+    def __init__(self, caminho: str = RATE_LIMIT_SQLITE_PATH,
+                 relogio: Callable[[], float] = time.time,
+                 retry_interval: float = 5.0,
+                 busy_timeout: float = 0.05):
+        self.caminho = caminho
+        self.retry_interval = retry_interval
+        self.busy_timeout = busy_timeout
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._indisponivel_ate = 0.0
+        self._reserva = BaldesMemoria(relogio=relogio)
+        self._proxima_limpeza = relogio() + INTERVALO_LIMPEZA
+        self.erros = 0
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS baldes ("
+                    "chave TEXT PRIMARY KEY, tokens REAL NOT NULL, atualizado REAL NOT NULL"
+                    ") WITHOUT ROWID"
+                )
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def consumir(self, chave: tuple, grupo: GrupoLimite) -> float:
+        """Retirar um token do balde (ver BaldesMemoria.consumir)"""
+        agora = self._relogio()
+        if agora < self._indisponivel_ate:
+            return self._reserva.consumir(chave, grupo)
+
+        chave_texto = f"{chave[0]}|{chave[3]}"
+        with self._lock:
+            try:
+                conn = self._conectar()
+                if agora >= self._proxima_limpeza:
+                    self._limpar(conn, agora)
+                linha = conn.execute(
+                    self._SQL_CONSUMIR, (chave_texto, grupo.capacidade, grupo.por_segundo, agora)
+                ).fetchone()
+                if linha is not None:
+                    return 0.0
+                linha = conn.execute(
+                    "SELECT tokens, atualizado FROM baldes WHERE chave = ?", (chave_texto,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._desativar(agora, e)
+                linha = None
+            else:
+                if linha is None:
+                    # Removido por outro worker entre as duas consultas
+                    return 0.0
+                tokens, atualizado = linha
+                tokens = min(grupo.capacidade, tokens + (agora - atualizado) * grupo.por_segundo)
+                return (1 - tokens) / grupo.por_segundo
+        return self._reserva.consumir(chave, grupo)
+
+    def _desativar(self, agora: float, erro: Exception) -> None:
+        """Passar para os baldes em memória por retry_interval segundos"""
+        self.erros += 1
+        self._indisponivel_ate = agora + self.retry_interval
+        logger.warning(
+            f"Rate limit: {self.caminho} indisponível ({erro}); "
+            f"usando baldes em memória por {self.retry_interval:.0f}s"
+        )
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def _limpar(self, conn: sqlite3.Connection, agora: float) -> None:
+        """Remover baldes sem uso há mais de um intervalo de limpeza"""
+        self._proxima_limpeza = agora + INTERVALO_LIMPEZA
+        conn.execute("DELETE FROM baldes WHERE atualizado < ?", (agora - INTERVALO_LIMPEZA,))
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def criar_baldes(backend: str = RATE_LIMIT_BACKEND):
+    """Instanciar o backend configurado"""
+    if backend == "sqlite":
+        return BaldesSQLite()
+    return BaldesMemoria()
+
+
+# =======================================
+# MIDDLEWARE
+# =======================================
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware, que custa uma task por
+    requisição).
+
+    Example:
+        app.add_middleware(RateLimitMiddleware)
+    """
+
+    def __init__(self, app, grupos: Optional[List[GrupoLimite]] = None, baldes=None):
+        self.app = app
+        self.grupos = grupos if grupos is not None else GRUPOS_PADRAO
+        self.baldes = baldes if baldes is not None else criar_baldes()
+        self._usuarios_por_token: Dict[bytes, Optional[str]] = {}
+
+    def _grupo(self, caminho: str) -> Optional[GrupoLimite]:
+        for grupo in self.grupos:
+            if caminho.startswith(grupo.prefixos):
+                return grupo
+        return None
+
+    def _usuario(self, scope) -> Optional[str]:
+        """ID do usuário do token Bearer, ou None se ausente/inválido"""
+        for nome, valor in scope["headers"]:
+            if nome == b"authorization":
+                break
+        else:
+            return None
+
+        if valor in self._usuarios_por_token:
+            return self._usuarios_por_token[valor]
+
+        usuario = None
+        partes = valor.split()
+        if len(partes) == 2 and partes[0].lower() == b"bearer":
+            payload = decode_access_token(partes[1].decode("latin-1"))
+            if payload and payload.get("user_id") is not None:
+                usuario = str(payload["user_id"])
+
+        if len(self._usuarios_por_token) >= MAX_TOKENS_CONHECIDOS:
+            self._usuarios_por_token.clear()
+        self._usuarios_por_token[valor] = usuario
+        return usuario
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        grupo = self._grupo(scope["path"])
+        if grupo is None:
+            await self.app(scope, receive, send)
+            return
+
+        usuario = self._usuario(scope) if grupo.por_usuario else None
+        if usuario is not None:
+            identidade = "u:" + usuario
+        else:
+            cliente = scope.get("client")
+            identidade = "ip:" + (cliente[0] if cliente else "desconhecido")
+
+        # A chave leva capacidade e taxa para a limpeza não precisar do grupo
+        chave = (grupo.nome, grupo.por_segundo, grupo.capacidade, identidade)
+        espera = self.baldes.consumir(chave, grupo)
+        if espera <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = max(1, math.ceil(espera))
+        corpo = json.dumps({
+            "detail": f"Muitas requisições. Tente novamente em {retry_after} s."
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(corpo)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": corpo})
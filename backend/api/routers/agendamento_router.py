@@ -17,9 +17,15 @@ import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, extract
-
-from backend.database.config import get_db
+from sqlalchemy import and_, or_, func
+
+from backend.database.agregacao import agregar
+from backend.api.cache_http import etag_tabelas
+from backend.database.config import get_db, get_read_db
+from backend.database.paginacao import (
+    CURSOR_DESC, TOTAL_DESC, TOTAL_MODOS_REGEX, CursorInvalido,
+    contar_total, paginar, resolver_modo_total
+)
 from backend.models.agendamento_model import (
     Agendamento, ConfiguracaoAgenda, DisponibilidadeUsuario, BloqueioAgenda
 )
@@ -182,7 +188,7 @@ def _verificar_bloqueios_agenda(
 # ================================
 
 @router.get("/", response_model=AgendamentoListResponse)
-async def listar_agendamentos(
+def listar_agendamentos(
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
     data_inicio: Optional[date] = Query(None, description="Data de início do filtro"),
@@ -191,9 +197,16 @@ async def listar_agendamentos(
     cliente_id: Optional[int] = Query(None, description="ID do cliente"),
     status: Optional[List[StatusAgendamento]] = Query(None, description="Status do agendamento"),
     tipo: Optional[List[TipoAgendamento]] = Query(None, description="Tipo do agendamento"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESC),
+    total: Optional[str] = Query(None, pattern=TOTAL_MODOS_REGEX, description=TOTAL_DESC),
+    db: Session = Depends(get_read_db)
 ):
-    """Lista agendamentos com filtros opcionais"""
+    """
+    Lista agendamentos com filtros opcionais.
+
+    Paginação por skip/limit ou pelo cursor next_cursor/prev_cursor da
+    resposta (ordem decrescente de data de início).
+    """
     try:
         # Criar filtros
         filters = AgendamentoFilter(
@@ -212,25 +225,31 @@ async def listar_agendamentos(
         query = _apply_agendamento_filters(query, filters)
 
         # Contar total
-        total = query.count()
+        total_registros = contar_total(query, resolver_modo_total(total, cursor))
 
-        # Aplicar paginação e ordenação
-        agendamentos = query.order_by(Agendamento.data_agendamento.desc())\
-                           .offset(skip)\
-                           .limit(limit)\
-                           .all()
+        # Aplicar ordenação e paginação
+        pagina = paginar(
+            query, Agendamento.data_inicio, Agendamento.id, limit,
+            cursor=cursor, skip=skip, descendente=True
+        )
 
         # Calcular páginas
-        pages = (total + limit - 1) // limit
+        pages = None
+        if total_registros is not None:
+            pages = (total_registros + limit - 1) // limit
 
         return AgendamentoListResponse(
-            items=agendamentos,
-            total=total,
+            items=pagina.itens,
+            total=total_registros,
             page=(skip // limit) + 1,
             size=limit,
-            pages=pages
+            pages=pages,
+            next_cursor=pagina.next_cursor,
+            prev_cursor=pagina.prev_cursor
         )
 
+    except CursorInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Erro ao listar agendamentos: {e}")
         raise HTTPException(status_code=500, detail=ERRO_INTERNO_MSG)
@@ -241,8 +260,8 @@ async def listar_agendamentos(
 # ================================
 
 @router.get("/dashboard")
-async def obter_dashboard_agendamento(
-    db: Session = Depends(get_db),
+def obter_dashboard_agendamento(
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """
@@ -296,9 +315,9 @@ async def obter_dashboard_agendamento(
 
 
 @router.get("/{agendamento_id}", response_model=AgendamentoResponse)
-async def obter_agendamento(
+def obter_agendamento(
     agendamento_id: int = Path(..., description=ID_AGENDAMENTO_DESC),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtém um agendamento específico"""
     agendamento = db.query(Agendamento).filter(Agendamento.id == agendamento_id).first()
@@ -310,7 +329,7 @@ async def obter_agendamento(
 
 
 @router.post("/", response_model=AgendamentoResponse, status_code=201)
-async def criar_agendamento(
+def criar_agendamento(
     agendamento_data: AgendamentoCreate,
     db: Session = Depends(get_db)
 ):
@@ -390,7 +409,7 @@ async def criar_agendamento(
 
 
 @router.put("/{agendamento_id}", response_model=AgendamentoResponse)
-async def atualizar_agendamento(
+def atualizar_agendamento(
     agendamento_id: int = Path(..., description="ID do agendamento"),
     agendamento_data: AgendamentoUpdate = None,
     db: Session = Depends(get_db)
@@ -441,7 +460,7 @@ async def atualizar_agendamento(
 
 
 @router.delete("/{agendamento_id}")
-async def deletar_agendamento(
+def deletar_agendamento(
     agendamento_id: int = Path(..., description="ID do agendamento"),
     db: Session = Depends(get_db)
 ):
@@ -471,7 +490,7 @@ async def deletar_agendamento(
 # ================================
 
 @router.patch("/{agendamento_id}/status")
-async def alterar_status_agendamento(
+def alterar_status_agendamento(
     agendamento_id: int = Path(..., description="ID do agendamento"),
     novo_status: StatusAgendamento = Query(..., description="Novo status"),
     observacoes: Optional[str] = Query(None, description="Observações da mudança"),
@@ -510,10 +529,10 @@ async def alterar_status_agendamento(
 # ================================
 
 @router.get("/configuracao/", response_model=List[ConfiguracaoAgendaResponse])
-async def listar_configuracoes_agenda(
+def listar_configuracoes_agenda(
     usuario_id: Optional[int] = Query(None, description="ID do usuário"),
     ativo: bool = Query(True, description="Apenas configurações ativas"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Lista configurações de agenda"""
     query = db.query(ConfiguracaoAgenda)
@@ -528,7 +547,7 @@ async def listar_configuracoes_agenda(
 
 
 @router.post("/configuracao/", response_model=ConfiguracaoAgendaResponse, status_code=201)
-async def criar_configuracao_agenda(
+def criar_configuracao_agenda(
     config_data: ConfiguracaoAgendaCreate,
     db: Session = Depends(get_db)
 ):
@@ -562,7 +581,7 @@ async def criar_configuracao_agenda(
 
 
 @router.put("/configuracao/{config_id}", response_model=ConfiguracaoAgendaResponse)
-async def atualizar_configuracao_agenda(
+def atualizar_configuracao_agenda(
     config_id: int = Path(..., description="ID da configuração"),
     config_data: ConfiguracaoAgendaUpdate = None,
     db: Session = Depends(get_db)
@@ -664,7 +683,7 @@ def _verifica_slot_disponivel(
 
 
 @router.post("/disponibilidade/consultar", response_model=List[HorarioDisponivel])
-async def consultar_disponibilidade(
+def consultar_disponibilidade(
     consulta: DisponibilidadeConsulta,
     db: Session = Depends(get_db)
 ):
@@ -697,7 +716,7 @@ async def consultar_disponibilidade(
 
 
 @router.post("/disponibilidade/", response_model=DisponibilidadeUsuarioResponse, status_code=201)
-async def criar_disponibilidade(
+def criar_disponibilidade(
     disponibilidade_data: DisponibilidadeUsuarioCreate,
     db: Session = Depends(get_db)
 ):
@@ -723,11 +742,11 @@ async def criar_disponibilidade(
 # ================================
 
 @router.get("/bloqueios/", response_model=List[BloqueioAgendaResponse])
-async def listar_bloqueios(
+def listar_bloqueios(
     ativo: bool = Query(True, description="Apenas bloqueios ativos"),
     data_inicio: Optional[date] = Query(None, description="Data de início do filtro"),
     data_fim: Optional[date] = Query(None, description="Data de fim do filtro"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Lista bloqueios de agenda"""
     query = db.query(BloqueioAgenda)
@@ -745,7 +764,7 @@ async def listar_bloqueios(
 
 
 @router.post("/bloqueios/", response_model=BloqueioAgendaResponse, status_code=201)
-async def criar_bloqueio(
+def criar_bloqueio(
     bloqueio_data: BloqueioAgendaCreate,
     db: Session = Depends(get_db)
 ):
@@ -771,10 +790,10 @@ async def criar_bloqueio(
 # ================================
 
 @router.get("/calendario/{data}", response_model=CalendarioResponse)
-async def obter_calendario_dia(
+def obter_calendario_dia(
     data: date = Path(..., description="Data do calendário (YYYY-MM-DD)"),
     usuario_id: Optional[int] = Query(None, description="ID do usuário"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtém o calendário de um dia específico"""
     try:
@@ -826,12 +845,16 @@ async def obter_calendario_dia(
 # ENDPOINTS DE ESTATÍSTICAS
 # ================================
 
-@router.get("/estatisticas/", response_model=EstatisticasAgendamento)
-async def obter_estatisticas(
+@router.get(
+    "/estatisticas/",
+    response_model=EstatisticasAgendamento,
+    dependencies=[Depends(etag_tabelas("agendamentos", diario=True, autenticado=False))]
+)
+def obter_estatisticas(
     data_inicio: Optional[date] = Query(None, description="Data de início"),
     data_fim: Optional[date] = Query(None, description="Data de fim"),
     usuario_id: Optional[int] = Query(None, description="ID do usuário"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtém estatísticas de agendamentos"""
     try:
@@ -839,63 +862,61 @@ async def obter_estatisticas(
         query = db.query(Agendamento)
 
         if data_inicio:
-            query = query.filter(func.date(Agendamento.data_agendamento) >= data_inicio)
+            query = query.filter(Agendamento.data_inicio >= data_inicio)
 
         if data_fim:
-            query = query.filter(func.date(Agendamento.data_agendamento) <= data_fim)
+            query = query.filter(Agendamento.data_inicio < data_fim + timedelta(days=1))
 
         if usuario_id:
             query = query.filter(Agendamento.usuario_responsavel_id == usuario_id)
 
-        # Total de agendamentos
-        total_agendamentos = query.count()
-
-        # Agendamentos hoje
-        hoje = date.today()
-        agendamentos_hoje = query.filter(
-            func.date(Agendamento.data_agendamento) == hoje
-        ).count()
-
-        # Agendamentos esta semana
+        # Janelas de hoje, da semana e do mês (intervalos, para usar o índice)
+        hoje = datetime.combine(date.today(), time.min)
         inicio_semana = hoje - timedelta(days=hoje.weekday())
-        fim_semana = inicio_semana + timedelta(days=6)
-        agendamentos_semana = query.filter(
-            func.date(Agendamento.data_agendamento).between(inicio_semana, fim_semana)
-        ).count()
-
-        # Agendamentos este mês
-        agendamentos_mes = query.filter(
-            extract('month', Agendamento.data_agendamento) == hoje.month,
-            extract('year', Agendamento.data_agendamento) == hoje.year
-        ).count()
-
-        # Por status
-        por_status = {}
-        for status in StatusAgendamento:
-            count = query.filter(Agendamento.status == status).count()
-            por_status[status.value] = count
+        inicio_mes = hoje.replace(day=1)
+        if inicio_mes.month == 12:
+            inicio_proximo_mes = inicio_mes.replace(year=inicio_mes.year + 1, month=1)
+        else:
+            inicio_proximo_mes = inicio_mes.replace(month=inicio_mes.month + 1)
+
+        # Status, tipo e janelas de data em um único GROUP BY
+        resultado = agregar(
+            query,
+            dimensoes={"status": Agendamento.status, "tipo": Agendamento.tipo_evento},
+            contagens={
+                "hoje": and_(
+                    Agendamento.data_inicio >= hoje,
+                    Agendamento.data_inicio < hoje + timedelta(days=1)
+                ),
+                "semana": and_(
+                    Agendamento.data_inicio >= inicio_semana,
+                    Agendamento.data_inicio < inicio_semana + timedelta(days=7)
+                ),
+                "mes": and_(
+                    Agendamento.data_inicio >= inicio_mes,
+                    Agendamento.data_inicio < inicio_proximo_mes
+                ),
+            }
+        )
 
-        # Por tipo
-        por_tipo = {}
-        for tipo in TipoAgendamento:
-            count = query.filter(Agendamento.tipo == tipo).count()
-            por_tipo[tipo.value] = count
+        total_agendamentos = resultado.total()
+        por_status = resultado.distribuicao("status", [s.value for s in StatusAgendamento])
+        por_tipo = resultado.distribuicao("tipo", [t.value for t in TipoAgendamento])
 
         # Taxa de confirmação
-        total_nao_cancelados = query.filter(
-            Agendamento.status != StatusAgendamento.CANCELADO
-        ).count()
-        confirmados = query.filter(
-            Agendamento.status.in_([StatusAgendamento.CONFIRMADO, StatusAgendamento.CONCLUIDO])
-        ).count()
+        total_nao_cancelados = total_agendamentos - por_status[StatusAgendamento.CANCELADO.value]
+        confirmados = (
+            por_status[StatusAgendamento.CONFIRMADO.value]
+            + por_status[StatusAgendamento.CONCLUIDO.value]
+        )
 
         taxa_confirmacao = (confirmados / total_nao_cancelados * 100) if total_nao_cancelados > 0 else 0
 
         return EstatisticasAgendamento(
             total_agendamentos=total_agendamentos,
-            agendamentos_hoje=agendamentos_hoje,
-            agendamentos_semana=agendamentos_semana,
-            agendamentos_mes=agendamentos_mes,
+            agendamentos_hoje=resultado.contagem("hoje"),
+            agendamentos_semana=resultado.contagem("semana"),
+            agendamentos_mes=resultado.contagem("mes"),
             por_status=por_status,
             por_tipo=por_tipo,
             taxa_confirmacao=round(taxa_confirmacao, 2)
@@ -911,7 +932,7 @@ async def obter_estatisticas(
 # ================================
 
 @router.post("/integração/ordem-servico/", response_model=AgendamentoResponse, status_code=201)
-async def criar_agendamento_para_os(
+def criar_agendamento_para_os(
     integracao_data: AgendamentoIntegracaoOS,
     db: Session = Depends(get_db)
 ):
@@ -936,7 +957,7 @@ async def criar_agendamento_para_os(
         )
 
         # Usar o endpoint de criação normal
-        return await criar_agendamento(agendamento_data, db)
+        return criar_agendamento(agendamento_data, db)
 
     except HTTPException:
         raise
@@ -15,7 +15,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import List
 
-from backend.database.config import get_database, get_db
+from backend.database.config import get_database, get_db, get_read_db
 from backend.models.user_model import Usuario, PERFIS_SISTEMA
 from backend.schemas.auth_schemas import (
     LoginRequest, LoginResponse, UserCreate, UserUpdate, 
@@ -24,13 +24,15 @@ from backend.schemas.auth_schemas import (
     ForgotPasswordRequest, PasswordRecoveryResponse
 )
 from backend.auth.jwt_handler import (
-    generate_user_token, verify_password, hash_password,
+    decode_access_token, generate_user_token, verify_password, verify_and_update_password, hash_password,
     ACCESS_TOKEN_EXPIRE_MINUTES, validate_password_strength
 )
 from backend.auth.dependencies import (
     get_current_user, get_current_active_user, 
-    require_admin, require_manager
+    require_admin, require_manager, security
 )
+from backend.auth.cache_usuarios import UsuarioAutenticado, cache_usuarios
+from backend.auth.revogacao import lista_revogacao
 
 # =======================================
 # CONFIGURAÇÃO DO ROUTER
@@ -56,7 +58,7 @@ log_manager = LogManager()
 logger = log_manager.get_logger("login")
 
 @router.post("/login", response_model=LoginResponse, summary="Fazer login")
-async def login(
+def login(
     login_data: LoginRequest,
     db: Session = Depends(get_db)
 ):
@@ -85,8 +87,11 @@ async def login(
                 detail="Credenciais inválidas"
             )
 
-        # Verificar senha
-        if not verify_password(login_data.password, user.senha_hash):
+        # Verificar senha (hash antigo ou com custo menor é refeito abaixo)
+        senha_valida, novo_hash = verify_and_update_password(
+            login_data.password, user.senha_hash
+        )
+        if not senha_valida:
             logger.warning(f"Senha inválida para usuário: {login_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -101,8 +106,11 @@ async def login(
                 detail="Usuário inativo"
             )
 
-        # Atualizar última atividade
+        # Atualizar última atividade e, se preciso, o hash da senha
         user.ultima_atividade = datetime.now()
+        if novo_hash:
+            user.senha_hash = novo_hash
+            logger.info(f"Hash de senha atualizado: {login_data.username}")
         db.commit()
 
         # Gerar token
@@ -133,13 +141,20 @@ async def login(
         )
 
 @router.post("/logout", response_model=SuccessResponse, summary="Fazer logout")
-async def logout(current_user: Usuario = Depends(get_current_active_user)):
+def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_active_user)
+):
     """
     Fazer logout do usuário atual.
 
-    Na implementação atual, apenas confirma o logout.
-    Em produção, poderia adicionar token blacklist.
+    Revoga o token usado na requisição até a expiração dele.
     """
+    payload = decode_access_token(credentials.credentials)
+    if payload and payload.get("jti"):
+        lista_revogacao.revogar(db, payload["jti"], payload["exp"], current_user.id)
+
     return SuccessResponse(
         message=f"Logout realizado com sucesso para {current_user.username}"
     )
@@ -149,19 +164,22 @@ async def logout(current_user: Usuario = Depends(get_current_active_user)):
 # =======================================
 
 @router.get("/me", response_model=UserResponse, summary="Obter perfil atual")
-async def get_current_user_profile(
-    current_user: Usuario = Depends(get_current_active_user)
+def get_current_user_profile(
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioAutenticado = Depends(get_current_active_user)
 ):
     """
     Obter informações do usuário logado atual.
     """
-    return UserResponse.model_validate(current_user)
+    # A dependência traz só a projeção em cache; o perfil completo vem do banco
+    user = db.query(Usuario).filter(Usuario.id == current_user.id).first()
+    return UserResponse.model_validate(user)
 
 @router.put("/me", response_model=UserResponse, summary="Atualizar perfil")
-async def update_current_user_profile(
+def update_current_user_profile(
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_active_user)
+    current_user: UsuarioAutenticado = Depends(get_current_active_user)
 ):
     """
     Atualizar dados do próprio perfil.
@@ -169,6 +187,9 @@ async def update_current_user_profile(
     Usuários podem atualizar apenas seus próprios dados básicos.
     Perfil e status só podem ser alterados por administradores.
     """
+    # O usuário autenticado é a projeção em cache; carregar na sessão de escrita
+    current_user = db.query(Usuario).filter(Usuario.id == current_user.id).first()
+
     # Campos que usuário comum pode alterar
     if user_update.email is not None:
         # Verificar se email já existe
@@ -198,6 +219,7 @@ async def update_current_user_profile(
             )
 
     db.commit()
+    cache_usuarios.invalidar(current_user.id)
     db.refresh(current_user)
 
     return UserResponse.model_validate(current_user)
@@ -207,9 +229,9 @@ async def update_current_user_profile(
 # =======================================
 
 @router.post("/change-password", response_model=SuccessResponse, summary="Trocar senha")
-async def change_password(
+def change_password(
     password_data: PasswordChangeRequest,
-    current_user: Usuario = Depends(get_current_active_user),
+    current_user: UsuarioAutenticado = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -219,8 +241,11 @@ async def change_password(
     - **new_password**: Nova senha
     - **confirm_password**: Confirmação da nova senha
     """
+    # O hash da senha não faz parte da projeção em cache (sessão de escrita)
+    usuario = db.query(Usuario).filter(Usuario.id == current_user.id).first()
+
     # Validar senha atual
-    if not verify_password(password_data.current_password, current_user.senha_hash):
+    if not verify_password(password_data.current_password, usuario.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Senha atual incorreta"
@@ -244,15 +269,16 @@ async def change_password(
         )
 
     # Atualizar senha
-    current_user.senha_hash = hash_password(password_data.new_password)
+    usuario.senha_hash = hash_password(password_data.new_password)
     db.commit()
+    cache_usuarios.invalidar(usuario.id)
 
     return SuccessResponse(
         message="Senha alterada com sucesso"
     )
 
 @router.post("/forgot-password", response_model=PasswordRecoveryResponse, summary="Recuperar senha")
-async def forgot_password(
+def forgot_password(
     recovery_data: ForgotPasswordRequest,
     db: Session = Depends(get_db)
 ):
@@ -293,6 +319,7 @@ async def forgot_password(
     user.senha_hash = hash_password(temporary_password)
     user.ultima_atividade = datetime.now()
     db.commit()
+    cache_usuarios.invalidar(user.id)
 
     logger.info(f"Senha recuperada para usuário: {user.username}")
 
@@ -307,9 +334,9 @@ async def forgot_password(
 # =======================================
 
 @router.get("/users", response_model=List[UserResponse], summary="Listar usuários")
-async def list_users(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(require_manager)
+def list_users(
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioAutenticado = Depends(require_manager)
 ):
     """
     Listar todos os usuários do sistema.
@@ -320,10 +347,10 @@ async def list_users(
     return [UserResponse.model_validate(user) for user in users]
 
 @router.post("/users", response_model=UserResponse, summary="Criar usuário")
-async def create_user(
+def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(require_admin)
+    current_user: UsuarioAutenticado = Depends(require_admin)
 ):
     """
     Criar novo usuário no sistema.
@@ -383,10 +410,10 @@ async def create_user(
     return UserResponse.model_validate(new_user)
 
 @router.get("/users/{user_id}", response_model=UserResponse, summary="Obter usuário")
-async def get_user(
+def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(require_manager)
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioAutenticado = Depends(require_manager)
 ):
     """
     Obter dados de usuário específico.
@@ -403,11 +430,11 @@ async def get_user(
     return UserResponse.model_validate(user)
 
 @router.put("/users/{user_id}", response_model=UserResponse, summary="Atualizar usuário")
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(require_admin)
+    current_user: UsuarioAutenticado = Depends(require_admin)
 ):
     """
     Atualizar dados de usuário específico.
@@ -453,15 +480,16 @@ async def update_user(
         user.observacoes = user_update.observacoes
 
     db.commit()
+    cache_usuarios.invalidar(user.id)
     db.refresh(user)
 
     return UserResponse.model_validate(user)
 
 @router.post("/reset-password", response_model=SuccessResponse, summary="Resetar senha")
-async def reset_user_password(
+def reset_user_password(
     password_data: PasswordResetRequest,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(require_admin)
+    current_user: UsuarioAutenticado = Depends(require_admin)
 ):
     """
     Resetar senha de usuário específico.
@@ -495,6 +523,7 @@ async def reset_user_password(
     # Atualizar senha
     user.senha_hash = hash_password(password_data.new_password)
     db.commit()
+    cache_usuarios.invalidar(user.id)
 
     return SuccessResponse(
         message=f"Senha resetada com sucesso para {user.username}"
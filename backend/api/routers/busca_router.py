@@ -0,0 +1,131 @@
+"""
+ROUTER DE BUSCA GLOBAL - ERP PRIMOTEX
+=====================================
+
+Busca federada: um único termo pesquisado ao mesmo tempo em clientes,
+fornecedores, produtos e ordens de serviço, devolvendo os melhores
+resultados de cada entidade.
+
+Funcionalidades:
+- Sem diferença de acentos ("joao" encontra "João")
+- Cada palavra casa como prefixo ("constr" encontra "Construtora")
+- Documentos e telefones com ou sem pontuação
+- Ranking por relevância (bm25) em cada entidade
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from backend.auth.dependencies import get_current_user
+from backend.database.busca_fts import buscar, filtro_busca, fts_disponivel
+from backend.database.config import get_read_db
+from backend.models.cliente_model import Cliente
+from backend.models.fornecedor_model import Fornecedor
+from backend.models.ordem_servico_model import OrdemServico
+from backend.models.produto_model import Produto
+import logging
+
+router = APIRouter(prefix="/busca", tags=["Busca"])
+
+logger = logging.getLogger(__name__)
+
+# Entidade -> (modelo, coluna de título, coluna de subtítulo, colunas do fallback ilike)
+ENTIDADES_BUSCA = {
+    "clientes": (
+        Cliente, Cliente.nome, Cliente.cpf_cnpj,
+        (Cliente.nome, Cliente.cpf_cnpj, Cliente.email_principal)
+    ),
+    "fornecedores": (
+        Fornecedor, Fornecedor.razao_social, Fornecedor.cnpj_cpf,
+        (Fornecedor.razao_social, Fornecedor.nome_fantasia, Fornecedor.cnpj_cpf)
+    ),
+    "produtos": (
+        Produto, Produto.descricao, Produto.codigo,
+        (Produto.descricao, Produto.codigo, Produto.codigo_barras)
+    ),
+    "ordens_servico": (
+        OrdemServico, OrdemServico.numero_os, OrdemServico.tipo_servico,
+        (OrdemServico.numero_os, OrdemServico.tipo_servico)
+    ),
+}
+
+
+class ResultadoBusca(BaseModel):
+    """Item de resultado da busca global"""
+    id: int
+    titulo: Optional[str] = None
+    subtitulo: Optional[str] = None
+    rank: Optional[float] = None
+
+
+class RespostaBusca(BaseModel):
+    """Resultados agrupados por entidade"""
+    termo: str
+    resultados: Dict[str, List[ResultadoBusca]]
+
+
+def _buscar_sem_fts(db: Session, entidade: str, termo: str, limite: int) -> List[dict]:
+    """Fallback para bancos sem FTS5: ilike, sem ranking"""
+    modelo, titulo, subtitulo, colunas = ENTIDADES_BUSCA[entidade]
+    linhas = (
+        db.query(modelo.id, titulo, subtitulo)
+        .filter(filtro_busca(db, entidade, modelo, termo, *colunas))
+        .order_by(titulo)
+        .limit(limite)
+        .all()
+    )
+    return [
+        {"id": linha[0], "titulo": linha[1], "subtitulo": linha[2], "rank": None}
+        for linha in linhas
+    ]
+
+
+@router.get("/", response_model=RespostaBusca)
+def busca_global(
+    q: str = Query(..., min_length=2, description="Termo de busca"),
+    limite: int = Query(5, ge=1, le=50, description="Resultados por entidade"),
+    entidades: Optional[str] = Query(
+        None, description="Entidades separadas por vírgula (padrão: todas)"
+    ),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Buscar o termo em clientes, fornecedores, produtos e ordens de serviço.
+
+    - **q**: Termo (mínimo 2 caracteres)
+    - **limite**: Melhores resultados por entidade
+    - **entidades**: Restringir a busca, ex.: clientes,produtos
+    """
+    selecionadas = list(ENTIDADES_BUSCA)
+    if entidades:
+        selecionadas = [e.strip() for e in entidades.split(",") if e.strip()]
+        invalidas = [e for e in selecionadas if e not in ENTIDADES_BUSCA]
+        if invalidas:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Entidades inválidas: {', '.join(invalidas)}"
+            )
+
+    try:
+        resultados = {}
+        for entidade in selecionadas:
+            if fts_disponivel(db, entidade):
+                resultados[entidade] = buscar(db, entidade, q, limite)
+            else:
+                resultados[entidade] = _buscar_sem_fts(db, entidade, q, limite)
+
+        return RespostaBusca(termo=q, resultados=resultados)
+
+    except Exception as e:
+        logger.error(f"Erro na busca global: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro interno: {str(e)}"
+        )
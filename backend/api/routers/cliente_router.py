@@ -19,9 +19,19 @@ Data: 01/11/2025
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 
-from backend.database.config import get_db
+from backend.database.busca_fts import filtro_busca
+from backend.api.cache_http import etag_tabelas
+from backend.database.config import get_db, get_read_db
+from backend.database.exportacao import (
+    FORMATO_CSV, FORMATO_EXPORTACAO_DESC, FORMATOS_EXPORTACAO_REGEX, exportar
+)
+from backend.database.group_commit import executar_escrita
+from backend.database.paginacao import (
+    CURSOR_DESC, TOTAL_DESC, TOTAL_MODOS_REGEX, CursorInvalido,
+    contar_total, paginar, resolver_modo_total
+)
 from backend.auth.dependencies import get_current_user, require_operator
 from backend.models.cliente_model import Cliente
 from backend.schemas.cliente_schemas import (
@@ -38,6 +48,17 @@ import logging
 
 CLIENTE_NAO_ENCONTRADO = "Cliente não encontrado"
 
+# Colunas do arquivo de exportação (na ordem das colunas)
+COLUNAS_EXPORTACAO = (
+    Cliente.id, Cliente.codigo, Cliente.nome, Cliente.tipo_pessoa, Cliente.cpf_cnpj,
+    Cliente.rg_ie, Cliente.status, Cliente.origem, Cliente.tipo_cliente,
+    Cliente.endereco_cep, Cliente.endereco_logradouro, Cliente.endereco_numero,
+    Cliente.endereco_complemento, Cliente.endereco_bairro, Cliente.endereco_cidade,
+    Cliente.endereco_estado, Cliente.telefone_fixo, Cliente.telefone_celular,
+    Cliente.telefone_whatsapp, Cliente.email_principal, Cliente.email_secundario,
+    Cliente.limite_credito, Cliente.observacoes_gerais, Cliente.data_criacao
+)
+
 router = APIRouter(prefix="/clientes", tags=["Clientes"])
 
 # Configurar logging
@@ -45,16 +66,18 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/", response_model=ClienteResponse, status_code=status.HTTP_201_CREATED)
-async def criar_cliente(
+def criar_cliente(
     cliente_data: ClienteCreate,
     db: Session = Depends(get_db),
     current_user = Depends(require_operator)
 ):
     """Criar novo cliente"""
-    try:
+    usuario_id = current_user.id
+
+    def gravar_cliente(sessao: Session) -> Cliente:
         # Verificar se CPF/CNPJ já existe
         if cliente_data.cpf_cnpj:
-            cliente_existente = db.query(Cliente).filter(
+            cliente_existente = sessao.query(Cliente).filter(
                 Cliente.cpf_cnpj == cliente_data.cpf_cnpj
             ).first()
 
@@ -65,20 +88,24 @@ async def criar_cliente(
                 )
 
         # Gerar código único do cliente
-        ultimo_cliente = db.query(Cliente).order_by(Cliente.id.desc()).first()
+        ultimo_cliente = sessao.query(Cliente).order_by(Cliente.id.desc()).first()
         proximo_numero = (ultimo_cliente.id + 1) if ultimo_cliente else 1
         codigo_cliente = f"CLI{proximo_numero:05d}"  # Ex: CLI00001, CLI00002
 
         # Criar cliente
         db_cliente = Cliente(**cliente_data.dict())
         setattr(db_cliente, "codigo", codigo_cliente)
-        db_cliente.usuario_criacao_id = current_user.id
+        db_cliente.usuario_criacao_id = usuario_id
 
-        db.add(db_cliente)
-        db.commit()
-        db.refresh(db_cliente)
+        sessao.add(db_cliente)
+        sessao.flush()
+        sessao.refresh(db_cliente)
+        return db_cliente
 
-        logger.info(f"Cliente {db_cliente.nome} ({codigo_cliente}) criado por {current_user.username}")
+    try:
+        db_cliente = executar_escrita(db, gravar_cliente)
+
+        logger.info(f"Cliente {db_cliente.nome} ({db_cliente.codigo}) criado por {current_user.username}")
         return db_cliente
 
     except HTTPException:
@@ -92,59 +119,86 @@ async def criar_cliente(
         )
 
 
-@router.get("/", response_model=ListagemClientes)
-async def listar_clientes(
+def _filtrar_clientes(db: Session, filtros: FiltrosCliente):
+    """Query de clientes com os filtros da listagem (também usada na exportação)"""
+    query = db.query(Cliente)
+
+    if filtros.nome:
+        query = query.filter(Cliente.nome.ilike(f"%{filtros.nome}%"))
+
+    if filtros.tipo_pessoa:
+        query = query.filter(Cliente.tipo_pessoa == filtros.tipo_pessoa)
+
+    if filtros.status:
+        query = query.filter(Cliente.status == filtros.status)
+
+    if filtros.ativo is not None:
+        if filtros.ativo:
+            query = query.filter(Cliente.status == "Ativo")
+        else:
+            query = query.filter(Cliente.status != "Ativo")
+
+    if filtros.origem:
+        query = query.filter(Cliente.origem == filtros.origem)
+
+    if filtros.tipo_cliente:
+        query = query.filter(Cliente.tipo_cliente == filtros.tipo_cliente)
+
+    if filtros.cidade:
+        query = query.filter(Cliente.endereco_cidade.ilike(f"%{filtros.cidade}%"))
+
+    # Busca geral
+    if filtros.busca:
+        query = query.filter(filtro_busca(
+            db, "clientes", Cliente, filtros.busca,
+            Cliente.nome,
+            Cliente.cpf_cnpj,
+            Cliente.email_principal,
+            Cliente.telefone_celular
+        ))
+
+    return query
+
+
+@router.get("/", response_model=ListagemClientes, dependencies=[Depends(etag_tabelas("clientes"))])
+def listar_clientes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESC),
+    total: Optional[str] = Query(None, pattern=TOTAL_MODOS_REGEX, description=TOTAL_DESC),
     filtros: FiltrosCliente = Depends(),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    """Listar clientes com filtros e paginação"""
+    """
+    Listar clientes com filtros e paginação.
+
+    Paginação por skip/limit (legado) ou por cursor: cada resposta traz
+    next_cursor/prev_cursor. Com cursor o total não é contado, a menos
+    que total=exato ou total=estimado seja informado.
+    """
     try:
-        query = db.query(Cliente)
-
-        # Aplicar filtros
-        if filtros.nome:
-            query = query.filter(Cliente.nome.ilike(f"%{filtros.nome}%"))
-
-        if filtros.tipo_pessoa:
-            query = query.filter(Cliente.tipo_pessoa == filtros.tipo_pessoa)
-
-        if filtros.cidade:
-            query = query.filter(Cliente.cidade.ilike(f"%{filtros.cidade}%"))
-
-        if filtros.ativo is not None:
-            query = query.filter(Cliente.ativo == filtros.ativo)
-
-        # Busca geral
-        if filtros.busca:
-            busca_term = f"%{filtros.busca}%"
-            query = query.filter(
-                or_(
-                    Cliente.nome.ilike(busca_term),
-                    Cliente.cpf_cnpj.ilike(busca_term),
-                    Cliente.email.ilike(busca_term),
-                    Cliente.telefone.ilike(busca_term)
-                )
-            )
+        query = _filtrar_clientes(db, filtros)
 
         # Total de registros
-        total = query.count()
-
-        # Ordenação
-        query = query.order_by(Cliente.nome)
+        total_registros = contar_total(query, resolver_modo_total(total, cursor))
 
-        # Paginação
-        clientes = query.offset(skip).limit(limit).all()
+        # Ordenação por nome e paginação
+        pagina = paginar(
+            query, Cliente.nome, Cliente.id, limit, cursor=cursor, skip=skip
+        )
 
         return ListagemClientes(
-            itens=[ClienteResponse.from_orm(c) for c in clientes],
-            total=total,
+            itens=[ClienteResponse.from_orm(c) for c in pagina.itens],
+            total=total_registros,
             skip=skip,
-            limit=limit
+            limit=limit,
+            next_cursor=pagina.next_cursor,
+            prev_cursor=pagina.prev_cursor
         )
 
+    except CursorInvalido as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Erro ao listar clientes: {e}")
         raise HTTPException(
@@ -153,10 +207,26 @@ async def listar_clientes(
         )
 
 
+@router.get("/exportar")
+def exportar_clientes(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    filtros: FiltrosCliente = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Exportar clientes (mesmos filtros da listagem) em CSV, NDJSON ou XLSX.
+
+    As linhas são enviadas em fluxo, em lotes, sem carregar a lista inteira.
+    """
+    query = _filtrar_clientes(db, filtros).order_by(Cliente.nome, Cliente.id)
+    return exportar(query, COLUNAS_EXPORTACAO, formato, "clientes")
+
+
 @router.get("/{cliente_id}", response_model=ClienteResponse)
-async def obter_cliente(
+def obter_cliente(
     cliente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Obter detalhes de um cliente"""
@@ -182,7 +252,7 @@ async def obter_cliente(
 
 
 @router.put("/{cliente_id}", response_model=ClienteResponse)
-async def atualizar_cliente(
+def atualizar_cliente(
     cliente_id: int,
     cliente_update: ClienteUpdate,
     db: Session = Depends(get_db),
@@ -237,7 +307,7 @@ async def atualizar_cliente(
 
 
 @router.delete("/{cliente_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def deletar_cliente(
+def deletar_cliente(
     cliente_id: int,
     db: Session = Depends(get_db),
     current_user = Depends(require_operator)
@@ -277,9 +347,9 @@ async def deletar_cliente(
 
 
 @router.get("/{cliente_id}/historico")
-async def obter_historico_cliente(
+def obter_historico_cliente(
     cliente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """Obter histórico de relacionamento com cliente"""
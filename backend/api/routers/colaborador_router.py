@@ -32,12 +32,13 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, or_
 from typing import List, Optional
 from datetime import datetime, date, timedelta
-import aiofiles  # Para operações assíncronas de arquivo
 import base64
 from pathlib import Path
 
 # Imports do projeto
-from backend.database.config import get_db
+from backend.database.agregacao import ResultadoAgregacao, agregar
+from backend.api.cache_http import etag_tabelas
+from backend.database.config import get_db, get_read_db
 from backend.models.colaborador_model import (
     Colaborador, Departamento, Cargo, StatusColaborador
 )
@@ -70,10 +71,10 @@ FORMATO_DATA_BR = "%d/%m/%Y"
 # =======================================
 
 @router.get("/", response_model=ColaboradorListagem)
-async def listar_colaboradores(
+def listar_colaboradores(
     filtros: ColaboradorFiltros = Depends(),
     paginacao: PaginationParams = Depends(),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """
@@ -181,7 +182,7 @@ async def listar_colaboradores(
 @router.post("/",
              response_model=ColaboradorResponse,
              status_code=status.HTTP_201_CREATED)
-async def criar_colaborador(
+def criar_colaborador(
     colaborador_data: ColaboradorCreate,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user)
@@ -271,9 +272,9 @@ async def criar_colaborador(
 
 
 @router.get("/{colaborador_id}", response_model=ColaboradorDetalhado)
-async def buscar_colaborador(
+def buscar_colaborador(
     colaborador_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Buscar colaborador por ID com todos os detalhes"""
@@ -295,7 +296,7 @@ async def buscar_colaborador(
 
 
 @router.put("/{colaborador_id}", response_model=ColaboradorResponse)
-async def atualizar_colaborador(
+def atualizar_colaborador(
     colaborador_id: int,
     colaborador_data: ColaboradorUpdate,
     db: Session = Depends(get_db),
@@ -359,7 +360,7 @@ async def atualizar_colaborador(
 
 
 @router.patch("/{colaborador_id}/status")
-async def alterar_status_colaborador(
+def alterar_status_colaborador(
     colaborador_id: int,
     novo_status: StatusColaborador,
     motivo: Optional[str] = Query(None, description="Motivo da alteração"),
@@ -408,7 +409,7 @@ async def alterar_status_colaborador(
 
 
 @router.delete("/{colaborador_id}")
-async def inativar_colaborador(
+def inativar_colaborador(
     colaborador_id: int,
     motivo: Optional[str] = Query(None, description="Motivo da inativação"),
     db: Session = Depends(get_db),
@@ -460,9 +461,9 @@ async def inativar_colaborador(
 
 
 @router.get("/matricula/{matricula}", response_model=ColaboradorResponse)
-async def buscar_por_matricula(
+def buscar_por_matricula(
     matricula: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Buscar colaborador por matrícula"""
@@ -485,22 +486,26 @@ async def buscar_por_matricula(
 # FUNÇÕES AUXILIARES PARA ESTATÍSTICAS (reduzir Cognitive Complexity)
 # ============================================================================
 
-def _calcular_contadores_gerais(db: Session) -> dict:
+def _agregar_colaboradores(db: Session) -> ResultadoAgregacao:
+    """Ativo, status e tipo de contrato em um único GROUP BY"""
+    return agregar(
+        db.query(Colaborador),
+        dimensoes={
+            "ativo": Colaborador.ativo,
+            "status": Colaborador.status,
+            "tipo_contrato": Colaborador.tipo_contrato,
+        }
+    )
+
+
+def _calcular_contadores_gerais(agregado: ResultadoAgregacao) -> dict:
     """Calcula contadores gerais de colaboradores"""
     return {
-        'total': db.query(Colaborador).count(),
-        'ativos': db.query(Colaborador).filter(
-            Colaborador.ativo.is_(True)
-        ).count(),
-        'inativos': db.query(Colaborador).filter(
-            Colaborador.ativo.is_(False)
-        ).count(),
-        'ferias': db.query(Colaborador).filter(
-            Colaborador.status == StatusColaborador.FERIAS
-        ).count(),
-        'afastados': db.query(Colaborador).filter(
-            Colaborador.status == StatusColaborador.AFASTADO
-        ).count()
+        'total': agregado.total(),
+        'ativos': agregado.total(onde={"ativo": [True]}),
+        'inativos': agregado.total(onde={"ativo": [False]}),
+        'ferias': agregado.total(onde={"status": [StatusColaborador.FERIAS]}),
+        'afastados': agregado.total(onde={"status": [StatusColaborador.AFASTADO]})
     }
 
 
@@ -527,15 +532,12 @@ def _calcular_por_cargo(db: Session) -> dict:
     return {cargo: total for cargo, total in stats}
 
 
-def _calcular_por_tipo_contrato(db: Session) -> dict:
+def _calcular_por_tipo_contrato(agregado: ResultadoAgregacao) -> dict:
     """Calcula estatísticas por tipo de contrato"""
-    stats = db.query(
-        Colaborador.tipo_contrato,
-        func.count(Colaborador.id).label('total')
-    ).group_by(Colaborador.tipo_contrato).all()
-    
-    return {contrato.value if contrato else 'Não informado': total
-            for contrato, total in stats}
+    return agregado.distribuicao(
+        "tipo_contrato",
+        rotulo=lambda contrato: contrato.value if contrato else 'Não informado'
+    )
 
 
 def _calcular_metricas_colaboradores(db: Session) -> dict:
@@ -583,18 +585,19 @@ def _calcular_metricas_colaboradores(db: Session) -> dict:
 
 
 @router.get("/stats/resumo", response_model=EstatisticasColaboradores)
-async def estatisticas_colaboradores(
-    db: Session = Depends(get_db),
+def estatisticas_colaboradores(
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Obter estatísticas gerais dos colaboradores"""
 
     try:
         # Usar funções auxiliares para reduzir complexidade
-        contadores = _calcular_contadores_gerais(db)
+        agregado = _agregar_colaboradores(db)
+        contadores = _calcular_contadores_gerais(agregado)
         por_departamento = _calcular_por_departamento(db)
         por_cargo = _calcular_por_cargo(db)
-        por_tipo_contrato = _calcular_por_tipo_contrato(db)
+        por_tipo_contrato = _calcular_por_tipo_contrato(agregado)
         metricas = _calcular_metricas_colaboradores(db)
 
         return EstatisticasColaboradores(
@@ -631,10 +634,14 @@ async def estatisticas_colaboradores(
 # ENDPOINTS DE DEPARTAMENTOS
 # =======================================
 
-@router.get("/departamentos/", response_model=List[DepartamentoResponse])
-async def listar_departamentos(
+@router.get(
+    "/departamentos/",
+    response_model=List[DepartamentoResponse],
+    dependencies=[Depends(etag_tabelas("departamentos", "colaboradores"))]
+)
+def listar_departamentos(
     ativo: Optional[bool] = Query(None, description="Filtrar por ativo"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Listar departamentos"""
@@ -657,7 +664,7 @@ async def listar_departamentos(
 
 
 @router.post("/departamentos/", response_model=DepartamentoResponse, status_code=status.HTTP_201_CREATED)
-async def criar_departamento(
+def criar_departamento(
     departamento_data: DepartamentoCreate,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user)
@@ -691,11 +698,15 @@ async def criar_departamento(
 # ENDPOINTS DE CARGOS
 # =======================================
 
-@router.get("/cargos/", response_model=List[CargoResponse])
-async def listar_cargos(
+@router.get(
+    "/cargos/",
+    response_model=List[CargoResponse],
+    dependencies=[Depends(etag_tabelas("cargos", "colaboradores"))]
+)
+def listar_cargos(
     ativo: Optional[bool] = Query(None, description="Filtrar por ativo"),
     nivel_hierarquico: Optional[int] = Query(None, ge=1, le=5, description="Filtrar por nível"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Listar cargos"""
@@ -721,7 +732,7 @@ async def listar_cargos(
 
 
 @router.post("/cargos/", response_model=CargoResponse, status_code=status.HTTP_201_CREATED)
-async def criar_cargo(
+def criar_cargo(
     cargo_data: CargoCreate,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user)
@@ -756,9 +767,9 @@ async def criar_cargo(
 # =======================================
 
 @router.get("/validate/matricula/{matricula}")
-async def validar_matricula(
+def validar_matricula(
     matricula: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Validar se matrícula está disponível"""
@@ -773,9 +784,9 @@ async def validar_matricula(
 
 
 @router.get("/validate/cpf/{cpf}")
-async def validar_cpf_unico(
+def validar_cpf_unico(
     cpf: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Validar se CPF está disponível"""
@@ -797,7 +808,7 @@ async def validar_cpf_unico(
 @router.post("/{colaborador_id}/documentos",
              response_model=ColaboradorDocumentoResponse,
              status_code=status.HTTP_201_CREATED)
-async def upload_documento_colaborador(
+def upload_documento_colaborador(
     colaborador_id: int,
     documento_data: ColaboradorDocumentoCreate,
     db: Session = Depends(get_db),
@@ -846,10 +857,9 @@ async def upload_documento_colaborador(
     nome_arquivo_limpo = documento_data.nome_arquivo.replace(" ", "_")
     arquivo_path = upload_dir / f"{timestamp}_{nome_arquivo_limpo}"
 
-    # Salvar arquivo de forma assíncrona
+    # Salvar arquivo (handler roda no threadpool, fora do event loop)
     try:
-        async with aiofiles.open(arquivo_path, "wb") as f:
-            await f.write(arquivo_bytes)
+        arquivo_path.write_bytes(arquivo_bytes)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -904,9 +914,9 @@ async def upload_documento_colaborador(
 
 @router.get("/{colaborador_id}/documentos",
             response_model=ColaboradorDocumentoListagem)
-async def listar_documentos_colaborador(
+def listar_documentos_colaborador(
     colaborador_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Listar todos os documentos de um colaborador com alertas de validade"""
@@ -969,10 +979,10 @@ async def listar_documentos_colaborador(
 
 
 @router.get("/{colaborador_id}/documentos/{documento_id}/download")
-async def download_documento(
+def download_documento(
     colaborador_id: int,
     documento_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Download de documento específico"""
@@ -1007,7 +1017,7 @@ async def download_documento(
 
 
 @router.delete("/{colaborador_id}/documentos/{documento_id}")
-async def excluir_documento(
+def excluir_documento(
     colaborador_id: int,
     documento_id: int,
     db: Session = Depends(get_db),
@@ -1053,9 +1063,9 @@ async def excluir_documento(
 
 
 @router.get("/alertas/documentos-vencidos")
-async def listar_alertas_documentos_vencidos(
+def listar_alertas_documentos_vencidos(
     dias_alerta: int = Query(default=30, ge=1, le=90, description="Dias antes do vencimento para alertar"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """
@@ -19,11 +19,17 @@ Data: 29/10/2025
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 
-from backend.database.config import get_db
+from backend.database.agregacao import agregar, contar_varios
+from backend.api.cache_http import etag_tabelas
+from backend.database.config import get_db, get_read_db
+from backend.database.exportacao import (
+    FORMATO_CSV, FORMATO_EXPORTACAO_DESC, FORMATOS_EXPORTACAO_REGEX, exportar
+)
 from backend.models.comunicacao import (
     ComunicacaoTemplate, ComunicacaoHistorico, ComunicacaoConfig, 
     ComunicacaoFila, TipoComunicacao, StatusComunicacao, TipoTemplate
@@ -43,18 +49,30 @@ from backend.services.comunicacao_service import ComunicacaoService, TemplateSer
 
 router = APIRouter(prefix="/comunicacao", tags=["comunicacao"])
 
+# Colunas do arquivo de exportação do histórico (sem o HTML e a resposta do provedor)
+COLUNAS_EXPORTACAO = (
+    ComunicacaoHistorico.id, ComunicacaoHistorico.tipo, ComunicacaoHistorico.canal_usado,
+    ComunicacaoHistorico.destinatario_nome, ComunicacaoHistorico.destinatario_contato,
+    ComunicacaoHistorico.cliente_id, ComunicacaoHistorico.assunto,
+    ComunicacaoHistorico.conteudo_texto, ComunicacaoHistorico.status,
+    ComunicacaoHistorico.tentativas_envio, ComunicacaoHistorico.enviado_em,
+    ComunicacaoHistorico.entregue_em, ComunicacaoHistorico.lido_em,
+    ComunicacaoHistorico.origem_modulo, ComunicacaoHistorico.origem_id,
+    ComunicacaoHistorico.erro_detalhes, ComunicacaoHistorico.criado_em
+)
+
 # ============================================================================
 # ENDPOINTS DE TEMPLATES
 # ============================================================================
 
 @router.get("/templates", response_model=ListaTemplates)
-async def listar_templates(
+def listar_templates(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     tipo: Optional[TipoTemplate] = None,
     canal: Optional[TipoComunicacao] = None,
     ativo: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Listar templates de comunicação com filtros"""
     query = db.query(ComunicacaoTemplate)
@@ -78,7 +96,7 @@ async def listar_templates(
     )
 
 @router.get("/templates/{template_id}", response_model=ComunicacaoTemplateSchema)
-async def obter_template(template_id: int, db: Session = Depends(get_db)):
+def obter_template(template_id: int, db: Session = Depends(get_read_db)):
     """Obter template específico"""
     template = db.query(ComunicacaoTemplate).filter(
         ComunicacaoTemplate.id == template_id
@@ -90,7 +108,7 @@ async def obter_template(template_id: int, db: Session = Depends(get_db)):
     return template
 
 @router.post("/templates", response_model=ComunicacaoTemplateSchema)
-async def criar_template(
+def criar_template(
     template: ComunicacaoTemplateCreate,
     db: Session = Depends(get_db)
 ):
@@ -111,7 +129,7 @@ async def criar_template(
     return db_template
 
 @router.put("/templates/{template_id}", response_model=ComunicacaoTemplateSchema)
-async def atualizar_template(
+def atualizar_template(
     template_id: int,
     template: ComunicacaoTemplateUpdate,
     db: Session = Depends(get_db)
@@ -144,7 +162,7 @@ async def atualizar_template(
     return db_template
 
 @router.delete("/templates/{template_id}")
-async def deletar_template(template_id: int, db: Session = Depends(get_db)):
+def deletar_template(template_id: int, db: Session = Depends(get_db)):
     """Deletar template"""
     template = db.query(ComunicacaoTemplate).filter(
         ComunicacaoTemplate.id == template_id
@@ -170,7 +188,7 @@ async def deletar_template(template_id: int, db: Session = Depends(get_db)):
     return {"mensagem": "Template deletado com sucesso"}
 
 @router.post("/templates/criar-padrao")
-async def criar_templates_padrao(db: Session = Depends(get_db)):
+def criar_templates_padrao(db: Session = Depends(get_db)):
     """Criar templates padrão do sistema"""
     service = TemplateService(db)
     service.criar_templates_padrao()
@@ -182,7 +200,7 @@ async def criar_templates_padrao(db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.post("/enviar", response_model=EnvioMensagemResponse)
-async def enviar_mensagem(
+def enviar_mensagem(
     request: EnvioMensagemRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -201,7 +219,7 @@ async def enviar_mensagem(
     return service.enviar_mensagem(request)
 
 @router.post("/enviar-lote", response_model=EnvioLoteResponse)
-async def enviar_lote(
+def enviar_lote(
     request: EnvioLoteRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -270,7 +288,7 @@ async def enviar_lote(
     )
 
 @router.post("/processar-fila")
-async def processar_fila_manual(db: Session = Depends(get_db)):
+def processar_fila_manual(db: Session = Depends(get_db)):
     """Processar fila de mensagens manualmente"""
     service = ComunicacaoService(db)
     resultado = service.processar_fila()
@@ -281,19 +299,16 @@ async def processar_fila_manual(db: Session = Depends(get_db)):
 # ENDPOINTS DE HISTÓRICO
 # ============================================================================
 
-@router.get("/historico", response_model=ListaComunicacoes)
-async def listar_historico(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100),
-    tipo: Optional[TipoComunicacao] = None,
-    status: Optional[StatusComunicacao] = None,
-    cliente_id: Optional[int] = None,
-    origem_modulo: Optional[str] = None,
-    data_inicio: Optional[datetime] = None,
-    data_fim: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+def _filtrar_historico(
+    db: Session,
+    tipo: Optional[TipoComunicacao],
+    status: Optional[StatusComunicacao],
+    cliente_id: Optional[int],
+    origem_modulo: Optional[str],
+    data_inicio: Optional[datetime],
+    data_fim: Optional[datetime]
 ):
-    """Listar histórico de comunicações com filtros"""
+    """Query do histórico com os filtros da listagem (também usada na exportação)"""
     query = db.query(ComunicacaoHistorico)
 
     if tipo:
@@ -308,6 +323,22 @@ async def listar_historico(
         query = query.filter(ComunicacaoHistorico.criado_em >= data_inicio)
     if data_fim:
         query = query.filter(ComunicacaoHistorico.criado_em <= data_fim)
+    return query
+
+@router.get("/historico", response_model=ListaComunicacoes)
+def listar_historico(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    tipo: Optional[TipoComunicacao] = None,
+    status: Optional[StatusComunicacao] = None,
+    cliente_id: Optional[int] = None,
+    origem_modulo: Optional[str] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Listar histórico de comunicações com filtros"""
+    query = _filtrar_historico(db, tipo, status, cliente_id, origem_modulo, data_inicio, data_fim)
 
     total = query.count()
     comunicacoes = query.order_by(ComunicacaoHistorico.criado_em.desc()).offset(skip).limit(limit).all()
@@ -320,8 +351,25 @@ async def listar_historico(
         total_paginas=(total + limit - 1) // limit
     )
 
+@router.get("/historico/exportar")
+def exportar_historico(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    tipo: Optional[TipoComunicacao] = None,
+    status: Optional[StatusComunicacao] = None,
+    cliente_id: Optional[int] = None,
+    origem_modulo: Optional[str] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Exportar histórico de comunicações (mesmos filtros) em CSV, NDJSON ou XLSX"""
+    query = _filtrar_historico(
+        db, tipo, status, cliente_id, origem_modulo, data_inicio, data_fim
+    ).order_by(ComunicacaoHistorico.criado_em.desc(), ComunicacaoHistorico.id.desc())
+    return exportar(query, COLUNAS_EXPORTACAO, formato, "comunicacoes")
+
 @router.get("/historico/{comunicacao_id}", response_model=ComunicacaoHistoricoSchema)
-async def obter_comunicacao(comunicacao_id: int, db: Session = Depends(get_db)):
+def obter_comunicacao(comunicacao_id: int, db: Session = Depends(get_read_db)):
     """Obter comunicação específica"""
     comunicacao = db.query(ComunicacaoHistorico).filter(
         ComunicacaoHistorico.id == comunicacao_id
@@ -333,7 +381,7 @@ async def obter_comunicacao(comunicacao_id: int, db: Session = Depends(get_db)):
     return comunicacao
 
 @router.put("/historico/{comunicacao_id}/status")
-async def atualizar_status_comunicacao(
+def atualizar_status_comunicacao(
     comunicacao_id: int,
     status: StatusComunicacao,
     detalhes: Optional[Dict[str, Any]] = None,
@@ -370,10 +418,10 @@ async def atualizar_status_comunicacao(
 # ============================================================================
 
 @router.get("/configuracoes", response_model=List[ComunicacaoConfigSchema])
-async def listar_configuracoes(
+def listar_configuracoes(
     tipo: Optional[TipoComunicacao] = None,
     ativo: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Listar configurações de comunicação"""
     query = db.query(ComunicacaoConfig)
@@ -386,7 +434,7 @@ async def listar_configuracoes(
     return query.all()
 
 @router.post("/configuracoes", response_model=ComunicacaoConfigSchema)
-async def criar_configuracao(
+def criar_configuracao(
     config: ComunicacaoConfigCreate,
     db: Session = Depends(get_db)
 ):
@@ -406,7 +454,7 @@ async def criar_configuracao(
     return db_config
 
 @router.put("/configuracoes/{config_id}", response_model=ComunicacaoConfigSchema)
-async def atualizar_configuracao(
+def atualizar_configuracao(
     config_id: int,
     config: ComunicacaoConfigUpdate,
     db: Session = Depends(get_db)
@@ -440,51 +488,53 @@ async def atualizar_configuracao(
 # ENDPOINTS DE ESTATÍSTICAS
 # ============================================================================
 
-@router.get("/dashboard", response_model=MetricasDashboard)
-async def obter_metricas_dashboard(db: Session = Depends(get_db)):
+@router.get(
+    "/dashboard",
+    response_model=MetricasDashboard,
+    dependencies=[Depends(etag_tabelas(
+        "comunicacao_historico", "comunicacao_templates", "comunicacao_config", "comunicacao_fila",
+        diario=True, autenticado=False
+    ))]
+)
+def obter_metricas_dashboard(db: Session = Depends(get_read_db)):
     """Obter métricas para dashboard"""
     agora = datetime.now()
     inicio_dia = agora.replace(hour=0, minute=0, second=0, microsecond=0)
     inicio_semana = inicio_dia - timedelta(days=agora.weekday())
     inicio_mes = agora.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    # Contar comunicações
-    comunicacoes_hoje = db.query(ComunicacaoHistorico).filter(
-        ComunicacaoHistorico.criado_em >= inicio_dia
-    ).count()
-
-    comunicacoes_semana = db.query(ComunicacaoHistorico).filter(
-        ComunicacaoHistorico.criado_em >= inicio_semana
-    ).count()
-
-    comunicacoes_mes = db.query(ComunicacaoHistorico).filter(
-        ComunicacaoHistorico.criado_em >= inicio_mes
-    ).count()
+    # Contadores do histórico em um único SELECT (a semana pode começar no mês anterior)
+    historico = agregar(
+        db.query(ComunicacaoHistorico).filter(
+            ComunicacaoHistorico.criado_em >= min(inicio_semana, inicio_mes)
+        ),
+        contagens={
+            "hoje": ComunicacaoHistorico.criado_em >= inicio_dia,
+            "semana": ComunicacaoHistorico.criado_em >= inicio_semana,
+            "mes": ComunicacaoHistorico.criado_em >= inicio_mes,
+            "entregues_mes": and_(
+                ComunicacaoHistorico.criado_em >= inicio_mes,
+                ComunicacaoHistorico.status.in_([StatusComunicacao.ENTREGUE, StatusComunicacao.LIDO])
+            ),
+        }
+    )
+    comunicacoes_hoje = historico.contagem("hoje")
+    comunicacoes_semana = historico.contagem("semana")
+    comunicacoes_mes = historico.contagem("mes")
 
     # Taxa de entrega média
-    total_enviados = db.query(ComunicacaoHistorico).filter(
-        ComunicacaoHistorico.criado_em >= inicio_mes
-    ).count()
-
-    total_entregues = db.query(ComunicacaoHistorico).filter(
-        ComunicacaoHistorico.criado_em >= inicio_mes,
-        ComunicacaoHistorico.status.in_([StatusComunicacao.ENTREGUE, StatusComunicacao.LIDO])
-    ).count()
+    total_enviados = comunicacoes_mes
+    total_entregues = historico.contagem("entregues_mes")
 
     taxa_entrega = (total_entregues / total_enviados) if total_enviados > 0 else 0
 
-    # Outros contadores
-    templates_ativos = db.query(ComunicacaoTemplate).filter(
-        ComunicacaoTemplate.ativo == True
-    ).count()
-
-    configuracoes_ativas = db.query(ComunicacaoConfig).filter(
-        ComunicacaoConfig.ativo == True
-    ).count()
-
-    fila_pendente = db.query(ComunicacaoFila).filter(
-        ComunicacaoFila.status == "PENDENTE"
-    ).count()
+    # Outros contadores (tabelas diferentes, um único SELECT)
+    contadores = contar_varios(
+        db,
+        templates_ativos=db.query(ComunicacaoTemplate).filter(ComunicacaoTemplate.ativo == True),
+        configuracoes_ativas=db.query(ComunicacaoConfig).filter(ComunicacaoConfig.ativo == True),
+        fila_pendente=db.query(ComunicacaoFila).filter(ComunicacaoFila.status == "PENDENTE")
+    )
 
     # Últimas comunicações
     ultimas_comunicacoes = db.query(ComunicacaoHistorico).order_by(
@@ -496,17 +546,17 @@ async def obter_metricas_dashboard(db: Session = Depends(get_db)):
         comunicacoes_semana=comunicacoes_semana,
         comunicacoes_mes=comunicacoes_mes,
         taxa_entrega_media=taxa_entrega,
-        templates_ativos=templates_ativos,
-        configuracoes_ativas=configuracoes_ativas,
-        fila_pendente=fila_pendente,
+        templates_ativos=contadores["templates_ativos"],
+        configuracoes_ativas=contadores["configuracoes_ativas"],
+        fila_pendente=contadores["fila_pendente"],
         ultimas_comunicacoes=ultimas_comunicacoes
     )
 
 @router.get("/estatisticas")
-async def obter_estatisticas(
+def obter_estatisticas(
     periodo_inicio: datetime,
     periodo_fim: datetime,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obter estatísticas detalhadas"""
     # Buscar comunicações do período
@@ -568,7 +618,7 @@ async def obter_estatisticas(
 # ============================================================================
 
 @router.post("/webhook/whatsapp")
-async def webhook_whatsapp(data: Dict[str, Any], db: Session = Depends(get_db)):
+def webhook_whatsapp(data: Dict[str, Any], db: Session = Depends(get_db)):
     """Webhook para receber status do WhatsApp"""
     try:
         # Processar webhook do WhatsApp Business API
@@ -578,7 +628,7 @@ async def webhook_whatsapp(data: Dict[str, Any], db: Session = Depends(get_db)):
         return {"status": "error", "message": str(e)}
 
 @router.post("/webhook/email")
-async def webhook_email(data: Dict[str, Any], db: Session = Depends(get_db)):
+def webhook_email(data: Dict[str, Any], db: Session = Depends(get_db)):
     """Webhook para receber status de email"""
     try:
         # Processar webhook de provedor de email
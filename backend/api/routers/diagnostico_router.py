@@ -0,0 +1,47 @@
+"""
+ROUTER DE DIAGNÓSTICO - ERP PRIMOTEX
+====================================
+
+Endpoints restritos a administradores para acompanhar o desempenho do
+banco em produção:
+
+- GET /diagnostico/consultas-lentas: formatos de instrução acima do
+  limite (SQL_LENTA_MS), do maior tempo total para o menor, com o plano
+  de execução e os parâmetros redigidos capturados na primeira
+  ocorrência, e as ocorrências mais recentes
+- DELETE /diagnostico/consultas-lentas: zerar o registro (ex.: depois
+  de criar um índice)
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Query, Response, status
+
+from backend.auth.dependencies import require_admin
+from backend.database.instrumentacao import consultas_lentas
+
+router = APIRouter(prefix="/diagnostico", tags=["Diagnóstico"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/consultas-lentas")
+async def listar_consultas_lentas(
+    limit: int = Query(20, ge=1, le=500, description="Quantidade de formatos"),
+    recentes: int = Query(20, ge=0, le=500, description="Quantidade de ocorrências recentes")
+) -> Dict[str, Any]:
+    """Piores consultas por tempo total acumulado"""
+    return {
+        "limite_ms": round(consultas_lentas.limite * 1000, 2),
+        "total_ocorrencias": consultas_lentas.total,
+        "consultas": consultas_lentas.piores(limit),
+        "recentes": consultas_lentas.recentes(recentes),
+    }
+
+
+@router.delete("/consultas-lentas", status_code=status.HTTP_204_NO_CONTENT)
+async def limpar_consultas_lentas() -> Response:
+    """Zerar o registro de consultas lentas"""
+    consultas_lentas.limpar()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -11,12 +11,13 @@ Este router implementa todos os endpoints para gestão financeira completa:
 - Relatórios Financeiros (análises avançadas)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, extract, desc, asc
 from typing import List, Optional, Dict, Any
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from decimal import Decimal
+from uuid import uuid4
 
 # Imports dos schemas Pydantic
 from backend.schemas.financeiro_schemas import (
@@ -34,8 +35,11 @@ from backend.schemas.financeiro_schemas import (
     CategoriaFinanceiraCreate, CategoriaFinanceiraUpdate,
     CategoriaFinanceiraResponse,
 
+    # Fluxo de caixa
+    FluxoCaixaItem, FluxoCaixaResponse,
+
     # Enums
-    TipoMovimentacao, StatusFinanceiro, FormaPagamento, TipoCategoria
+    TipoMovimentacao, StatusFinanceiro, FormaPagamento, TipoCategoria, PeriodoFluxo
 )
 
 # Imports dos models SQLAlchemy
@@ -50,7 +54,19 @@ from backend.models.user_model import Usuario
 # from backend.models.cliente_models import Cliente
 
 # Imports de dependências
-from backend.database.config import get_db
+from backend.api.cache_http import etag_tabelas
+from backend.database.config import get_db, get_read_db
+from backend.database.exportacao import (
+    FORMATO_CSV, FORMATO_EXPORTACAO_DESC, FORMATOS_EXPORTACAO_REGEX, exportar
+)
+from backend.database.group_commit import executar_escrita
+from backend.database.fluxo_caixa_diario import (
+    CATEGORIA_PADRAO, ler_periodo, resumo_periodo
+)
+from backend.database.paginacao import (
+    CURSOR_DESC, TOTAL_DESC, TOTAL_MODOS_REGEX, TOTAL_NENHUM, CursorInvalido,
+    contar_total, paginar, resolver_modo_total
+)
 from backend.auth.dependencies import get_current_user
 
 # Configuração do router
@@ -77,7 +93,97 @@ VALOR_INVALIDO = "Valor inválido fornecido"
 DATA_INICIO_DESC = "Data início do período"
 DATA_FIM_DESC = "Data fim do período"
 
+# tipo do schema -> tipo_movimentacao gravado no modelo
+TIPOS_MOVIMENTACAO = {
+    TipoMovimentacao.RECEITA: "Entrada",
+    TipoMovimentacao.DESPESA: "Saída",
+    TipoMovimentacao.TRANSFERENCIA: "Transferência",
+}
+TIPOS_MOVIMENTACAO_SCHEMA = {valor: tipo for tipo, valor in TIPOS_MOVIMENTACAO.items()}
+
+# Colunas dos arquivos de exportação
+COLUNAS_EXPORTACAO_RECEBER = (
+    ContaReceber.id, ContaReceber.numero_documento, ContaReceber.cliente_id,
+    ContaReceber.ordem_servico_id, ContaReceber.descricao, ContaReceber.valor_original,
+    ContaReceber.valor_desconto, ContaReceber.valor_juros, ContaReceber.valor_multa,
+    ContaReceber.valor_final, ContaReceber.valor_pago, ContaReceber.valor_saldo,
+    ContaReceber.data_emissao, ContaReceber.data_vencimento, ContaReceber.data_pagamento,
+    ContaReceber.status, ContaReceber.numero_parcela, ContaReceber.total_parcelas,
+    ContaReceber.forma_pagamento_prevista, ContaReceber.observacoes
+)
+COLUNAS_EXPORTACAO_PAGAR = (
+    ContaPagar.id, ContaPagar.numero_documento, ContaPagar.fornecedor_id,
+    ContaPagar.nome_favorecido, ContaPagar.tipo_conta, ContaPagar.categoria,
+    ContaPagar.centro_custo, ContaPagar.descricao, ContaPagar.valor_original,
+    ContaPagar.valor_desconto, ContaPagar.valor_juros, ContaPagar.valor_multa,
+    ContaPagar.valor_final, ContaPagar.valor_pago, ContaPagar.valor_saldo,
+    ContaPagar.data_emissao, ContaPagar.data_vencimento, ContaPagar.data_pagamento,
+    ContaPagar.status, ContaPagar.prioridade, ContaPagar.numero_parcela,
+    ContaPagar.total_parcelas, ContaPagar.observacoes
+)
+COLUNAS_EXPORTACAO_MOVIMENTACOES = (
+    MovimentacaoFinanceira.id, MovimentacaoFinanceira.numero_movimento,
+    MovimentacaoFinanceira.tipo_movimentacao, MovimentacaoFinanceira.categoria_movimentacao,
+    MovimentacaoFinanceira.descricao, MovimentacaoFinanceira.valor,
+    MovimentacaoFinanceira.data_movimentacao, MovimentacaoFinanceira.forma_pagamento,
+    MovimentacaoFinanceira.conta_bancaria, MovimentacaoFinanceira.pessoa_relacionada,
+    MovimentacaoFinanceira.documento_origem, MovimentacaoFinanceira.conta_receber_id,
+    MovimentacaoFinanceira.conta_pagar_id, MovimentacaoFinanceira.conciliado,
+    MovimentacaoFinanceira.usuario_responsavel
+)
+
 # Helper functions para validações e cálculos
+
+def _numero_movimento(prefixo: str) -> str:
+    """Gera número único de movimentação (ex.: REC-20261016143000-1A2B3C)"""
+    return f"{prefixo}-{datetime.now():%Y%m%d%H%M%S}-{uuid4().hex[:6].upper()}"
+
+def _nome_categoria(db: Session, categoria_id: Optional[int]) -> str:
+    """Nome da categoria financeira gravado na movimentação"""
+    if categoria_id:
+        nome = db.query(CategoriaFinanceira.nome).filter(
+            CategoriaFinanceira.id == categoria_id
+        ).scalar()
+        if nome:
+            return nome
+    return CATEGORIA_PADRAO
+
+def _colunas_movimentacao(db: Session, dados: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte campos do schema de movimentação nas colunas do modelo"""
+    colunas = {}
+    for campo, valor in dados.items():
+        if campo == "tipo":
+            colunas["tipo_movimentacao"] = TIPOS_MOVIMENTACAO[TipoMovimentacao(valor)]
+        elif campo == "data_movimento":
+            colunas["data_movimentacao"] = valor
+        elif campo == "forma_pagamento":
+            colunas["forma_pagamento"] = FormaPagamento(valor).value
+        elif campo == "categoria_id":
+            colunas["categoria_movimentacao"] = _nome_categoria(db, valor)
+        elif campo in ("valor", "descricao", "observacoes", "conta_receber_id", "conta_pagar_id"):
+            colunas[campo] = valor
+    return colunas
+
+def _movimentacao_resposta(movimentacao: MovimentacaoFinanceira) -> Dict[str, Any]:
+    """Monta a resposta (MovimentacaoFinanceiraResponse) a partir do modelo"""
+    forma = (movimentacao.forma_pagamento or "").lower()
+    return {
+        "id": movimentacao.id,
+        "tipo": TIPOS_MOVIMENTACAO_SCHEMA.get(
+            movimentacao.tipo_movimentacao, TipoMovimentacao.TRANSFERENCIA
+        ),
+        "valor": movimentacao.valor,
+        "descricao": movimentacao.descricao,
+        "data_movimento": movimentacao.data_movimentacao,
+        "forma_pagamento": forma if forma in FormaPagamento._value2member_map_ else FormaPagamento.OUTROS,
+        "categoria_id": None,
+        "categoria_nome": movimentacao.categoria_movimentacao,
+        "conta_receber_id": movimentacao.conta_receber_id,
+        "conta_pagar_id": movimentacao.conta_pagar_id,
+        "observacoes": movimentacao.observacoes,
+        "usuario_nome": movimentacao.usuario_responsavel,
+        "data_criacao": movimentacao.created_at or movimentacao.data_movimentacao,
+    }
 def _validar_periodo(data_inicio: date, data_fim: date) -> bool:
     """Valida se o período é válido"""
     return data_inicio <= data_fim and data_fim <= date.today() + timedelta(days=365)
@@ -120,49 +226,76 @@ def _calcular_total_contas_pagar(db: Session, filtros: Optional[Dict] = None) ->
 # ENDPOINTS - CONTAS A RECEBER
 # =============================================================================
 
+def _filtrar_contas_receber(
+    db: Session,
+    status_param: Optional[StatusFinanceiro],
+    cliente_id: Optional[int],
+    data_inicio: Optional[date],
+    data_fim: Optional[date],
+    vencidas: Optional[bool]
+):
+    """Query de contas a receber com os filtros da listagem (também usada na exportação)"""
+    query = db.query(ContaReceber).filter(ContaReceber.ativo == True)
+
+    if status_param:
+        query = query.filter(ContaReceber.status == status_param)
+
+    if cliente_id:
+        query = query.filter(ContaReceber.cliente_id == cliente_id)
+
+    if data_inicio:
+        query = query.filter(ContaReceber.data_vencimento >= data_inicio)
+
+    if data_fim:
+        query = query.filter(ContaReceber.data_vencimento <= data_fim)
+
+    if vencidas is True:
+        query = query.filter(
+            and_(
+                ContaReceber.data_vencimento < date.today(),
+                ContaReceber.status != StatusFinanceiro.PAGO
+            )
+        )
+
+    return query
+
+
 @router.get("/contas-receber", response_model=List[ContaReceberResponse])
-async def listar_contas_receber(
+def listar_contas_receber(
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESC),
+    total: Optional[str] = Query(None, pattern=TOTAL_MODOS_REGEX, description=TOTAL_DESC),
     status_param: Optional[StatusFinanceiro] = Query(None, description="Filtrar por status"),
     cliente_id: Optional[int] = Query(None, description="Filtrar por cliente"),
     data_inicio: Optional[date] = Query(None, description=DATA_INICIO_DESC),
     data_fim: Optional[date] = Query(None, description=DATA_FIM_DESC),
     vencidas: Optional[bool] = Query(None, description="Apenas contas vencidas"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista contas a receber com filtros avançados"""
     try:
-        query = db.query(ContaReceber).filter(ContaReceber.ativo == True)
-
-        # Aplicar filtros
-        if status_param:
-            query = query.filter(ContaReceber.status == status_param)
-
-        if cliente_id:
-            query = query.filter(ContaReceber.cliente_id == cliente_id)
-
-        if data_inicio:
-            query = query.filter(ContaReceber.data_vencimento >= data_inicio)
-
-        if data_fim:
-            query = query.filter(ContaReceber.data_vencimento <= data_fim)
+        query = _filtrar_contas_receber(
+            db, status_param, cliente_id, data_inicio, data_fim, vencidas
+        )
 
-        if vencidas is True:
-            query = query.filter(
-                and_(
-                    ContaReceber.data_vencimento < date.today(),
-                    ContaReceber.status != StatusFinanceiro.PAGO
-                )
-            )
+        total_registros = contar_total(
+            query, resolver_modo_total(total, cursor, padrao=TOTAL_NENHUM)
+        )
 
-        # Ordenação e paginação
-        query = query.order_by(desc(ContaReceber.data_vencimento))
-        contas = query.offset(skip).limit(limit).all()
+        # Ordenação e paginação (cursores em X-Next-Cursor/X-Prev-Cursor)
+        pagina = paginar(
+            query, ContaReceber.data_vencimento, ContaReceber.id, limit,
+            cursor=cursor, skip=skip, descendente=True
+        )
+        response.headers.update(pagina.headers(total_registros))
 
-        return contas
+        return pagina.itens
 
+    except CursorInvalido as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -170,7 +303,7 @@ async def listar_contas_receber(
         )
 
 @router.post("/contas-receber", response_model=ContaReceberResponse)
-async def criar_conta_receber(
+def criar_conta_receber(
     conta: ContaReceberCreate,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
@@ -212,10 +345,27 @@ async def criar_conta_receber(
             detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
         )
 
+@router.get("/contas-receber/exportar")
+def exportar_contas_receber(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    status_param: Optional[StatusFinanceiro] = Query(None, description="Filtrar por status"),
+    cliente_id: Optional[int] = Query(None, description="Filtrar por cliente"),
+    data_inicio: Optional[date] = Query(None, description=DATA_INICIO_DESC),
+    data_fim: Optional[date] = Query(None, description=DATA_FIM_DESC),
+    vencidas: Optional[bool] = Query(None, description="Apenas contas vencidas"),
+    db: Session = Depends(get_read_db)
+):
+    """Exporta contas a receber (mesmos filtros da listagem) em CSV, NDJSON ou XLSX"""
+    query = _filtrar_contas_receber(
+        db, status_param, cliente_id, data_inicio, data_fim, vencidas
+    ).order_by(desc(ContaReceber.data_vencimento), desc(ContaReceber.id))
+    return exportar(query, COLUNAS_EXPORTACAO_RECEBER, formato, "contas_receber")
+
+
 @router.get("/contas-receber/{conta_id}", response_model=ContaReceberResponse)
-async def obter_conta_receber(
+def obter_conta_receber(
     conta_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Obtém detalhes de uma conta a receber"""
@@ -233,7 +383,7 @@ async def obter_conta_receber(
     return conta
 
 @router.put("/contas-receber/{conta_id}", response_model=ContaReceberResponse)
-async def atualizar_conta_receber(
+def atualizar_conta_receber(
     conta_id: int,
     conta_update: ContaReceberUpdate,
     db: Session = Depends(get_db),
@@ -275,7 +425,7 @@ async def atualizar_conta_receber(
         )
 
 @router.delete("/contas-receber/{conta_id}")
-async def excluir_conta_receber(
+def excluir_conta_receber(
     conta_id: int,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
@@ -312,7 +462,7 @@ async def excluir_conta_receber(
         )
 
 @router.post("/contas-receber/{conta_id}/baixar")
-async def baixar_conta_receber(
+def baixar_conta_receber(
     conta_id: int,
     valor_pago: Decimal,
     data_pagamento: date,
@@ -322,8 +472,18 @@ async def baixar_conta_receber(
     current_user: Usuario = Depends(get_current_user)
 ):
     """Dá baixa em conta a receber"""
-    try:
-        db_conta = db.query(ContaReceber).filter(
+    if valor_pago <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=VALOR_INVALIDO
+        )
+
+    usuario_id = current_user.id
+    usuario_nome = current_user.username
+    momento_pagamento = datetime.combine(data_pagamento, time.min)
+
+    def gravar_baixa(sessao: Session):
+        db_conta = sessao.query(ContaReceber).filter(
             ContaReceber.id == conta_id,
             ContaReceber.ativo == True
         ).first()
@@ -334,41 +494,40 @@ async def baixar_conta_receber(
                 detail=CONTA_RECEBER_NAO_ENCONTRADA
             )
 
-        if valor_pago <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=VALOR_INVALIDO
-            )
-
         # Atualizar conta
         setattr(db_conta, 'valor_pago', valor_pago)
-        setattr(db_conta, 'data_pagamento', data_pagamento)
+        setattr(db_conta, 'data_pagamento', momento_pagamento)
         setattr(db_conta, 'forma_pagamento', forma_pagamento)
         setattr(db_conta, 'observacoes_pagamento', observacoes)
         setattr(db_conta, 'status', StatusFinanceiro.PAGO)
         setattr(db_conta, 'data_atualizacao', datetime.now())
-        setattr(db_conta, 'usuario_atualizacao_id', current_user.id)
+        setattr(db_conta, 'usuario_atualizacao_id', usuario_id)
+        setattr(db_conta, 'usuario_baixa', usuario_nome)
 
-        # Criar movimentação financeira
+        # Criar movimentação financeira (entra no fluxo de caixa do dia)
         movimentacao = MovimentacaoFinanceira(
-            tipo=TipoMovimentacao.RECEITA,
+            numero_movimento=_numero_movimento("REC"),
+            tipo_movimentacao=TIPOS_MOVIMENTACAO[TipoMovimentacao.RECEITA],
+            categoria_movimentacao="Recebimento de clientes",
             valor=valor_pago,
             descricao=f"Recebimento - {db_conta.descricao}",
-            data_movimentacao=data_pagamento,
-            categoria_id=db_conta.categoria_id,
+            data_movimentacao=momento_pagamento,
+            forma_pagamento=forma_pagamento,
+            documento_origem=db_conta.numero_documento,
             conta_receber_id=conta_id,
-            usuario_criacao_id=current_user.id
+            usuario_responsavel=usuario_nome
         )
 
-        db.add(movimentacao)
-        db.commit()
+        sessao.add(movimentacao)
+
+    try:
+        executar_escrita(db, gravar_baixa)
 
         return {"message": "Baixa realizada com sucesso"}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
@@ -378,49 +537,77 @@ async def baixar_conta_receber(
 # ENDPOINTS - CONTAS A PAGAR
 # =============================================================================
 
+def _filtrar_contas_pagar(
+    db: Session,
+    status_param: Optional[StatusFinanceiro],
+    fornecedor: Optional[str],
+    data_inicio: Optional[date],
+    data_fim: Optional[date],
+    vencidas: Optional[bool]
+):
+    """Query de contas a pagar com os filtros da listagem (também usada na exportação)"""
+    query = db.query(ContaPagar).filter(ContaPagar.ativo == True)
+
+    if status_param:
+        query = query.filter(ContaPagar.status == status_param)
+
+    # O fornecedor da conta é gravado como favorecido
+    if fornecedor:
+        query = query.filter(ContaPagar.nome_favorecido.ilike(f"%{fornecedor}%"))
+
+    if data_inicio:
+        query = query.filter(ContaPagar.data_vencimento >= data_inicio)
+
+    if data_fim:
+        query = query.filter(ContaPagar.data_vencimento <= data_fim)
+
+    if vencidas is True:
+        query = query.filter(
+            and_(
+                ContaPagar.data_vencimento < date.today(),
+                ContaPagar.status != StatusFinanceiro.PAGO
+            )
+        )
+
+    return query
+
+
 @router.get("/contas-pagar", response_model=List[ContaPagarResponse])
-async def listar_contas_pagar(
+def listar_contas_pagar(
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESC),
+    total: Optional[str] = Query(None, pattern=TOTAL_MODOS_REGEX, description=TOTAL_DESC),
     status_param: Optional[StatusFinanceiro] = Query(None, description="Filtrar por status"),
     fornecedor: Optional[str] = Query(None, description="Filtrar por fornecedor"),
     data_inicio: Optional[date] = Query(None, description=DATA_INICIO_DESC),
     data_fim: Optional[date] = Query(None, description=DATA_FIM_DESC),
     vencidas: Optional[bool] = Query(None, description="Apenas contas vencidas"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista contas a pagar com filtros avançados"""
     try:
-        query = db.query(ContaPagar).filter(ContaPagar.ativo == True)
-
-        # Aplicar filtros
-        if status_param:
-            query = query.filter(ContaPagar.status == status_param)
-
-        if fornecedor:
-            query = query.filter(ContaPagar.fornecedor.ilike(f"%{fornecedor}%"))
-
-        if data_inicio:
-            query = query.filter(ContaPagar.data_vencimento >= data_inicio)
-
-        if data_fim:
-            query = query.filter(ContaPagar.data_vencimento <= data_fim)
+        query = _filtrar_contas_pagar(
+            db, status_param, fornecedor, data_inicio, data_fim, vencidas
+        )
 
-        if vencidas is True:
-            query = query.filter(
-                and_(
-                    ContaPagar.data_vencimento < date.today(),
-                    ContaPagar.status != StatusFinanceiro.PAGO
-                )
-            )
+        total_registros = contar_total(
+            query, resolver_modo_total(total, cursor, padrao=TOTAL_NENHUM)
+        )
 
-        # Ordenação e paginação
-        query = query.order_by(desc(ContaPagar.data_vencimento))
-        contas = query.offset(skip).limit(limit).all()
+        # Ordenação e paginação (cursores em X-Next-Cursor/X-Prev-Cursor)
+        pagina = paginar(
+            query, ContaPagar.data_vencimento, ContaPagar.id, limit,
+            cursor=cursor, skip=skip, descendente=True
+        )
+        response.headers.update(pagina.headers(total_registros))
 
-        return contas
+        return pagina.itens
 
+    except CursorInvalido as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -428,7 +615,7 @@ async def listar_contas_pagar(
         )
 
 @router.post("/contas-pagar", response_model=ContaPagarResponse)
-async def criar_conta_pagar(
+def criar_conta_pagar(
     conta: ContaPagarCreate,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
@@ -461,10 +648,27 @@ async def criar_conta_pagar(
             detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
         )
 
+@router.get("/contas-pagar/exportar")
+def exportar_contas_pagar(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    status_param: Optional[StatusFinanceiro] = Query(None, description="Filtrar por status"),
+    fornecedor: Optional[str] = Query(None, description="Filtrar por fornecedor"),
+    data_inicio: Optional[date] = Query(None, description=DATA_INICIO_DESC),
+    data_fim: Optional[date] = Query(None, description=DATA_FIM_DESC),
+    vencidas: Optional[bool] = Query(None, description="Apenas contas vencidas"),
+    db: Session = Depends(get_read_db)
+):
+    """Exporta contas a pagar (mesmos filtros da listagem) em CSV, NDJSON ou XLSX"""
+    query = _filtrar_contas_pagar(
+        db, status_param, fornecedor, data_inicio, data_fim, vencidas
+    ).order_by(desc(ContaPagar.data_vencimento), desc(ContaPagar.id))
+    return exportar(query, COLUNAS_EXPORTACAO_PAGAR, formato, "contas_pagar")
+
+
 @router.get("/contas-pagar/{conta_id}", response_model=ContaPagarResponse)
-async def obter_conta_pagar(
+def obter_conta_pagar(
     conta_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Obtém detalhes de uma conta a pagar"""
@@ -482,7 +686,7 @@ async def obter_conta_pagar(
     return conta
 
 @router.put("/contas-pagar/{conta_id}", response_model=ContaPagarResponse)
-async def atualizar_conta_pagar(
+def atualizar_conta_pagar(
     conta_id: int,
     conta_update: ContaPagarUpdate,
     db: Session = Depends(get_db),
@@ -524,7 +728,7 @@ async def atualizar_conta_pagar(
         )
 
 @router.delete("/contas-pagar/{conta_id}")
-async def excluir_conta_pagar(
+def excluir_conta_pagar(
     conta_id: int,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
@@ -561,7 +765,7 @@ async def excluir_conta_pagar(
         )
 
 @router.post("/contas-pagar/{conta_id}/pagar")
-async def pagar_conta_pagar(
+def pagar_conta_pagar(
     conta_id: int,
     valor_pago: Decimal,
     data_pagamento: date,
@@ -590,23 +794,29 @@ async def pagar_conta_pagar(
             )
 
         # Atualizar conta
+        momento_pagamento = datetime.combine(data_pagamento, time.min)
         setattr(db_conta, 'valor_pago', valor_pago)
-        setattr(db_conta, 'data_pagamento', data_pagamento)
+        setattr(db_conta, 'data_pagamento', momento_pagamento)
         setattr(db_conta, 'forma_pagamento', forma_pagamento)
         setattr(db_conta, 'observacoes_pagamento', observacoes)
         setattr(db_conta, 'status', StatusFinanceiro.PAGO)
         setattr(db_conta, 'data_atualizacao', datetime.now())
         setattr(db_conta, 'usuario_atualizacao_id', current_user.id)
+        setattr(db_conta, 'usuario_pagamento', current_user.username)
 
-        # Criar movimentação financeira
+        # Criar movimentação financeira (entra no fluxo de caixa do dia)
         movimentacao = MovimentacaoFinanceira(
-            tipo=TipoMovimentacao.DESPESA,
+            numero_movimento=_numero_movimento("PAG"),
+            tipo_movimentacao=TIPOS_MOVIMENTACAO[TipoMovimentacao.DESPESA],
+            categoria_movimentacao=db_conta.categoria,
             valor=valor_pago,
             descricao=f"Pagamento - {db_conta.descricao}",
-            data_movimentacao=data_pagamento,
-            categoria_id=db_conta.categoria_id,
+            data_movimentacao=momento_pagamento,
+            forma_pagamento=forma_pagamento,
+            documento_origem=db_conta.numero_documento,
+            pessoa_relacionada=db_conta.nome_favorecido,
             conta_pagar_id=conta_id,
-            usuario_criacao_id=current_user.id
+            usuario_responsavel=current_user.username
         )
 
         db.add(movimentacao)
@@ -627,36 +837,51 @@ async def pagar_conta_pagar(
 # ENDPOINTS - MOVIMENTAÇÕES FINANCEIRAS
 # =============================================================================
 
+def _filtrar_movimentacoes(
+    db: Session,
+    tipo: Optional[TipoMovimentacao],
+    categoria_id: Optional[int],
+    data_inicio: Optional[date],
+    data_fim: Optional[date]
+):
+    """Query de movimentações com os filtros da listagem (também usada na exportação)"""
+    query = db.query(MovimentacaoFinanceira).filter(MovimentacaoFinanceira.ativo == True)
+
+    if tipo:
+        query = query.filter(MovimentacaoFinanceira.tipo_movimentacao == TIPOS_MOVIMENTACAO[tipo])
+
+    if categoria_id:
+        query = query.filter(
+            MovimentacaoFinanceira.categoria_movimentacao == _nome_categoria(db, categoria_id)
+        )
+
+    if data_inicio:
+        query = query.filter(MovimentacaoFinanceira.data_movimentacao >= data_inicio)
+
+    if data_fim:
+        query = query.filter(MovimentacaoFinanceira.data_movimentacao <= data_fim)
+
+    return query
+
+
 @router.get("/movimentacoes", response_model=List[MovimentacaoFinanceiraResponse])
-async def listar_movimentacoes(
+def listar_movimentacoes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     tipo: Optional[TipoMovimentacao] = Query(None),
     categoria_id: Optional[int] = Query(None),
     data_inicio: Optional[date] = Query(None, description=DATA_INICIO_DESC),
     data_fim: Optional[date] = Query(None, description=DATA_FIM_DESC),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista movimentações financeiras"""
     try:
-        query = db.query(MovimentacaoFinanceira).filter(MovimentacaoFinanceira.ativo == True)
-
-        if tipo:
-            query = query.filter(MovimentacaoFinanceira.tipo == tipo)
-
-        if categoria_id:
-            query = query.filter(MovimentacaoFinanceira.categoria_id == categoria_id)
-
-        if data_inicio:
-            query = query.filter(MovimentacaoFinanceira.data_movimentacao >= data_inicio)
-
-        if data_fim:
-            query = query.filter(MovimentacaoFinanceira.data_movimentacao <= data_fim)
+        query = _filtrar_movimentacoes(db, tipo, categoria_id, data_inicio, data_fim)
 
         movimentacoes = query.order_by(desc(MovimentacaoFinanceira.data_movimentacao)).offset(skip).limit(limit).all()
 
-        return movimentacoes
+        return [_movimentacao_resposta(m) for m in movimentacoes]
 
     except Exception as e:
         raise HTTPException(
@@ -664,22 +889,41 @@ async def listar_movimentacoes(
             detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
         )
 
+@router.get("/movimentacoes/exportar")
+def exportar_movimentacoes(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    tipo: Optional[TipoMovimentacao] = Query(None),
+    categoria_id: Optional[int] = Query(None),
+    data_inicio: Optional[date] = Query(None, description=DATA_INICIO_DESC),
+    data_fim: Optional[date] = Query(None, description=DATA_FIM_DESC),
+    db: Session = Depends(get_read_db)
+):
+    """Exporta movimentações (mesmos filtros da listagem) em CSV, NDJSON ou XLSX"""
+    query = _filtrar_movimentacoes(db, tipo, categoria_id, data_inicio, data_fim).order_by(
+        desc(MovimentacaoFinanceira.data_movimentacao), desc(MovimentacaoFinanceira.id)
+    )
+    return exportar(query, COLUNAS_EXPORTACAO_MOVIMENTACOES, formato, "movimentacoes")
+
+
 @router.post("/movimentacoes", response_model=MovimentacaoFinanceiraResponse)
-async def criar_movimentacao(
+def criar_movimentacao(
     movimentacao: MovimentacaoFinanceiraCreate,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Cria nova movimentação financeira"""
     try:
-        db_movimentacao = MovimentacaoFinanceira(**movimentacao.model_dump())
-        db_movimentacao.usuario_criacao_id = current_user.id
+        db_movimentacao = MovimentacaoFinanceira(
+            numero_movimento=_numero_movimento("MOV"),
+            usuario_responsavel=current_user.username,
+            **_colunas_movimentacao(db, movimentacao.model_dump())
+        )
 
         db.add(db_movimentacao)
         db.commit()
         db.refresh(db_movimentacao)
 
-        return db_movimentacao
+        return _movimentacao_resposta(db_movimentacao)
 
     except Exception as e:
         db.rollback()
@@ -688,14 +932,87 @@ async def criar_movimentacao(
             detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
         )
 
+@router.put("/movimentacoes/{movimentacao_id}", response_model=MovimentacaoFinanceiraResponse)
+def atualizar_movimentacao(
+    movimentacao_id: int,
+    movimentacao_update: MovimentacaoFinanceiraUpdate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Atualiza movimentação financeira (o fluxo de caixa diário é ajustado junto)"""
+    try:
+        db_movimentacao = db.query(MovimentacaoFinanceira).filter(
+            MovimentacaoFinanceira.id == movimentacao_id,
+            MovimentacaoFinanceira.ativo == True
+        ).first()
+
+        if not db_movimentacao:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=MOVIMENTACAO_NAO_ENCONTRADA
+            )
+
+        update_data = movimentacao_update.model_dump(exclude_unset=True)
+        for field, value in _colunas_movimentacao(db, update_data).items():
+            setattr(db_movimentacao, field, value)
+
+        db.commit()
+        db.refresh(db_movimentacao)
+
+        return _movimentacao_resposta(db_movimentacao)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
+        )
+
+@router.delete("/movimentacoes/{movimentacao_id}")
+def excluir_movimentacao(
+    movimentacao_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Exclui (desativa) movimentação financeira"""
+    try:
+        db_movimentacao = db.query(MovimentacaoFinanceira).filter(
+            MovimentacaoFinanceira.id == movimentacao_id,
+            MovimentacaoFinanceira.ativo == True
+        ).first()
+
+        if not db_movimentacao:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=MOVIMENTACAO_NAO_ENCONTRADA
+            )
+
+        # Soft delete
+        setattr(db_movimentacao, 'ativo', False)
+
+        db.commit()
+
+        return {"message": "Movimentação financeira excluída com sucesso"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
+        )
+
 # =============================================================================
 # ENDPOINTS - CATEGORIAS FINANCEIRAS
 # =============================================================================
 
 @router.get("/categorias", response_model=List[CategoriaFinanceiraResponse])
-async def listar_categorias(
+def listar_categorias(
     ativo: bool = Query(True, description="Filtrar por categorias ativas"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista categorias financeiras"""
@@ -706,7 +1023,7 @@ async def listar_categorias(
     return categorias
 
 @router.post("/categorias", response_model=CategoriaFinanceiraResponse)
-async def criar_categoria(
+def criar_categoria(
     categoria: CategoriaFinanceiraCreate,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
@@ -748,10 +1065,10 @@ async def criar_categoria(
 # =============================================================================
 
 @router.get("/fluxo-caixa/resumo")
-async def obter_resumo_fluxo_caixa(
+def obter_resumo_fluxo_caixa(
     data_inicio: date = Query(..., description=DATA_INICIO_DESC),
     data_fim: date = Query(..., description=DATA_FIM_DESC),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Obtém resumo do fluxo de caixa do período"""
@@ -762,30 +1079,19 @@ async def obter_resumo_fluxo_caixa(
                 detail=PERIODO_INVALIDO
             )
 
-        # Calcular entradas do período
-        entradas = db.query(func.sum(MovimentacaoFinanceira.valor)).filter(
-            MovimentacaoFinanceira.tipo == TipoMovimentacao.ENTRADA,
-            MovimentacaoFinanceira.data_movimentacao >= data_inicio,
-            MovimentacaoFinanceira.data_movimentacao <= data_fim,
-            MovimentacaoFinanceira.ativo == True
-        ).scalar() or Decimal('0.00')
-
-        # Calcular saídas do período
-        saidas = db.query(func.sum(MovimentacaoFinanceira.valor)).filter(
-            MovimentacaoFinanceira.tipo == TipoMovimentacao.SAIDA,
-            MovimentacaoFinanceira.data_movimentacao >= data_inicio,
-            MovimentacaoFinanceira.data_movimentacao <= data_fim,
-            MovimentacaoFinanceira.ativo == True
-        ).scalar() or Decimal('0.00')
-
-        saldo = entradas - saidas
+        # Leitura das linhas diárias do período (fluxo_caixa)
+        resumo = resumo_periodo(db, data_inicio, data_fim)
 
         return {
             "periodo_inicio": data_inicio,
             "periodo_fim": data_fim,
-            "total_entradas": float(entradas),
-            "total_saidas": float(saidas),
-            "saldo_periodo": float(saldo),
+            "total_entradas": float(resumo["total_entradas"]),
+            "total_saidas": float(resumo["total_saidas"]),
+            "saldo_periodo": float(resumo["saldo_periodo"]),
+            "saldo_inicial": float(resumo["saldo_inicial"]),
+            "saldo_final": float(resumo["saldo_final"]),
+            "entradas_por_categoria": resumo["entradas_por_categoria"],
+            "saidas_por_categoria": resumo["saidas_por_categoria"],
             "data_calculo": datetime.now()
         }
 
@@ -797,9 +1103,48 @@ async def obter_resumo_fluxo_caixa(
             detail=f"{ERRO_INTERNO_SERVIDOR}: {str(e)}"
         )
 
-@router.get("/dashboard/resumo")
-async def obter_dashboard_resumo(
-    db: Session = Depends(get_db),
+@router.get("/fluxo-caixa", response_model=FluxoCaixaResponse)
+def obter_fluxo_caixa_diario(
+    data_inicio: date = Query(..., description=DATA_INICIO_DESC),
+    data_fim: date = Query(..., description=DATA_FIM_DESC),
+    db: Session = Depends(get_read_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Fluxo de caixa dia a dia do período (dias sem movimentação são omitidos)"""
+    if not _validar_periodo(data_inicio, data_fim):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=PERIODO_INVALIDO
+        )
+
+    dias = ler_periodo(db, data_inicio, data_fim)
+    items = [
+        FluxoCaixaItem(
+            data=dia.data_referencia.date(),
+            receitas=dia.entradas_realizadas,
+            despesas=dia.saidas_realizadas,
+            saldo=dia.resultado_realizado,
+            saldo_acumulado=dia.saldo_final
+        )
+        for dia in dias
+    ]
+    return FluxoCaixaResponse(
+        periodo=PeriodoFluxo.DIARIO,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        items=items,
+        resumo={
+            "total_receitas": float(sum(item.receitas for item in items)),
+            "total_despesas": float(sum(item.despesas for item in items)),
+        }
+    )
+
+@router.get(
+    "/dashboard/resumo",
+    dependencies=[Depends(etag_tabelas("contas_receber", "contas_pagar", "fluxo_caixa", diario=True))]
+)
+def obter_dashboard_resumo(
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Obtém resumo do dashboard financeiro"""
@@ -819,18 +1164,10 @@ async def obter_dashboard_resumo(
             "data_inicio": inicio_mes
         })
 
-        # Movimentações do mês
-        entradas_mes = db.query(func.sum(MovimentacaoFinanceira.valor)).filter(
-            MovimentacaoFinanceira.tipo == TipoMovimentacao.ENTRADA,
-            MovimentacaoFinanceira.data_movimentacao >= inicio_mes,
-            MovimentacaoFinanceira.ativo == True
-        ).scalar() or Decimal('0.00')
-
-        saidas_mes = db.query(func.sum(MovimentacaoFinanceira.valor)).filter(
-            MovimentacaoFinanceira.tipo == TipoMovimentacao.SAIDA,
-            MovimentacaoFinanceira.data_movimentacao >= inicio_mes,
-            MovimentacaoFinanceira.ativo == True
-        ).scalar() or Decimal('0.00')
+        # Movimentações do mês (linhas diárias do fluxo de caixa)
+        resumo_mes = resumo_periodo(db, inicio_mes, hoje)
+        entradas_mes = resumo_mes["total_entradas"]
+        saidas_mes = resumo_mes["total_saidas"]
 
         return {
             "total_receber_mes": float(total_receber),
@@ -852,12 +1189,12 @@ async def obter_dashboard_resumo(
 # =============================================================================
 
 @router.get("/dashboard")
-async def obter_dashboard(
-    db: Session = Depends(get_db),
+def obter_dashboard(
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Alias para /dashboard/resumo - compatibilidade com dashboard principal"""
-    return await obter_dashboard_resumo(db, current_user)
+    return obter_dashboard_resumo(db, current_user)
 
 @router.get("/health")
 async def health_check_financeiro():
@@ -870,8 +1207,8 @@ async def health_check_financeiro():
     }
 
 @router.get("/estatisticas/resumo")
-async def obter_estatisticas_resumo(
-    db: Session = Depends(get_db),
+def obter_estatisticas_resumo(
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Obtém estatísticas simples do módulo financeiro"""
@@ -12,6 +12,7 @@ ENDPOINTS DISPONÍVEIS:
 - PUT /fornecedores/{id} - Atualiza fornecedor
 - DELETE /fornecedores/{id} - Remove fornecedor
 - GET /fornecedores/stats - Estatísticas
+- GET /fornecedores/exportar - Exporta em CSV, NDJSON ou XLSX
 
 Autor: GitHub Copilot
 Data: 01/11/2025
@@ -20,10 +21,18 @@ Data: 01/11/2025
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
+from sqlalchemy import and_, func
 
 # Imports do projeto
-from backend.database.config import get_db
+from backend.database.busca_fts import filtro_busca
+from backend.database.config import get_db, get_read_db
+from backend.database.exportacao import (
+    FORMATO_CSV, FORMATO_EXPORTACAO_DESC, FORMATOS_EXPORTACAO_REGEX, exportar
+)
+from backend.database.paginacao import (
+    CURSOR_DESC, TOTAL_DESC, TOTAL_MODOS_REGEX, CursorInvalido,
+    contar_total, paginar, resolver_modo_total
+)
 from backend.models.fornecedor_model import Fornecedor
 from backend.schemas.fornecedor_schemas import (
     FornecedorCreate,
@@ -47,13 +56,85 @@ FORNECEDOR_NOT_FOUND = "Fornecedor não encontrado"
 
 router = APIRouter(prefix="/fornecedores", tags=["Fornecedores"])
 
+# Campos aceitos em order_by (NOT NULL, exigido pela paginação por cursor)
+ORDENACOES_FORNECEDOR = {
+    "razao_social": Fornecedor.razao_social,
+    "cnpj_cpf": Fornecedor.cnpj_cpf,
+    "data_cadastro": Fornecedor.data_cadastro,
+    "id": Fornecedor.id,
+}
+
+# Colunas do arquivo de exportação
+COLUNAS_EXPORTACAO = (
+    Fornecedor.id, Fornecedor.cnpj_cpf, Fornecedor.razao_social, Fornecedor.nome_fantasia,
+    Fornecedor.tipo_pessoa, Fornecedor.inscricao_estadual, Fornecedor.categoria,
+    Fornecedor.contato_principal, Fornecedor.telefone, Fornecedor.email,
+    Fornecedor.cep, Fornecedor.logradouro, Fornecedor.numero, Fornecedor.bairro,
+    Fornecedor.cidade, Fornecedor.estado, Fornecedor.condicoes_pagamento,
+    Fornecedor.avaliacao, Fornecedor.status, Fornecedor.ativo, Fornecedor.data_cadastro
+)
+
 
 # =======================================
 # ENDPOINTS DE LISTAGEM
 # =======================================
 
+def _filtrar_fornecedores(
+    db: Session,
+    search: Optional[str],
+    categoria: Optional[CategoriaFornecedor],
+    tipo_pessoa: Optional[TipoFornecedor],
+    status: Optional[StatusFornecedor],
+    ativo: Optional[bool],
+    cidade: Optional[str],
+    estado: Optional[str],
+    avaliacao_minima: Optional[int]
+):
+    """Query de fornecedores com os filtros da listagem (também usada na exportação)"""
+    query = db.query(Fornecedor)
+    conditions = []
+
+    # Filtro de busca textual
+    if search:
+        conditions.append(filtro_busca(
+            db, "fornecedores", Fornecedor, search,
+            Fornecedor.razao_social,
+            Fornecedor.nome_fantasia,
+            Fornecedor.cnpj_cpf,
+            Fornecedor.email,
+            Fornecedor.contato_principal
+        ))
+
+    # Filtros específicos
+    if categoria:
+        conditions.append(Fornecedor.categoria == categoria.value)
+
+    if tipo_pessoa:
+        conditions.append(Fornecedor.tipo_pessoa == tipo_pessoa.value)
+
+    if status:
+        conditions.append(Fornecedor.status == status.value)
+
+    if ativo is not None:
+        conditions.append(Fornecedor.ativo == ativo)
+
+    if cidade:
+        conditions.append(Fornecedor.cidade.ilike(f"%{cidade}%"))
+
+    if estado:
+        conditions.append(Fornecedor.estado == estado.upper())
+
+    if avaliacao_minima:
+        conditions.append(Fornecedor.avaliacao >= avaliacao_minima)
+
+    # Aplicar condições
+    if conditions:
+        query = query.filter(and_(*conditions))
+    return query
+
+
 @router.get("", response_model=FornecedorListResponse)
-async def listar_fornecedores(
+def listar_fornecedores(
     # Filtros de busca
     search: Optional[str] = Query(
         None, 
@@ -70,79 +151,46 @@ async def listar_fornecedores(
     # Paginação
     page: int = Query(1, ge=1, description="Página"),
     size: int = Query(50, ge=1, le=200, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESC),
+    total: Optional[str] = Query(None, pattern=TOTAL_MODOS_REGEX, description=TOTAL_DESC),
 
     # Ordenação
     order_by: str = Query("razao_social", description="Campo para ordenação"),
     order_direction: str = Query("asc", description="Direção (asc/desc)"),
 
     # Dependências
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Lista fornecedores com filtros e paginação"""
-
-    try:
-        # Query base
-        query = db.query(Fornecedor)
-
-        # Aplicar filtros
-        conditions = []
-
-        # Filtro de busca textual
-        if search:
-            search_term = f"%{search}%"
-            conditions.append(
-                or_(
-                    Fornecedor.razao_social.ilike(search_term),
-                    Fornecedor.nome_fantasia.ilike(search_term),
-                    Fornecedor.cnpj_cpf.ilike(search_term),
-                    Fornecedor.email.ilike(search_term),
-                    Fornecedor.contato_principal.ilike(search_term)
-                )
-            )
-
-        # Filtros específicos
-        if categoria:
-            conditions.append(Fornecedor.categoria == categoria.value)
-
-        if tipo_pessoa:
-            conditions.append(Fornecedor.tipo_pessoa == tipo_pessoa.value)
-
-        if status:
-            conditions.append(Fornecedor.status == status.value)
+    """
+    Lista fornecedores com filtros e paginação.
 
-        if ativo is not None:
-            conditions.append(Fornecedor.ativo == ativo)
+    Aceita page/size (legado) ou cursor (next_cursor/prev_cursor da
+    resposta). Com cursor o total só é contado se total for informado.
+    """
 
-        if cidade:
-            conditions.append(Fornecedor.cidade.ilike(f"%{cidade}%"))
-
-        if estado:
-            conditions.append(Fornecedor.estado == estado.upper())
-
-        if avaliacao_minima:
-            conditions.append(Fornecedor.avaliacao >= avaliacao_minima)
-
-        # Aplicar condições
-        if conditions:
-            query = query.filter(and_(*conditions))
+    try:
+        query = _filtrar_fornecedores(
+            db, search, categoria, tipo_pessoa, status, ativo, cidade, estado, avaliacao_minima
+        )
 
         # Contar total
-        total = query.count()
-
-        # Aplicar ordenação
-        order_field = getattr(Fornecedor, order_by, Fornecedor.razao_social)
-        if order_direction.lower() == "desc":
-            query = query.order_by(desc(order_field))
-        else:
-            query = query.order_by(asc(order_field))
-
-        # Aplicar paginação
-        offset = (page - 1) * size
-        fornecedores = query.offset(offset).limit(size).all()
+        total_registros = contar_total(query, resolver_modo_total(total, cursor))
+
+        # Aplicar ordenação e paginação
+        order_field = ORDENACOES_FORNECEDOR.get(order_by, Fornecedor.razao_social)
+        pagina = paginar(
+            query, order_field, Fornecedor.id, size,
+            cursor=cursor,
+            skip=(page - 1) * size,
+            descendente=order_direction.lower() == "desc"
+        )
+        fornecedores = pagina.itens
 
         # Calcular número de páginas
-        pages = (total + size - 1) // size
+        pages = None
+        if total_registros is not None:
+            pages = (total_registros + size - 1) // size
 
         # Converter para formato de resposta
         items = []
@@ -167,12 +215,16 @@ async def listar_fornecedores(
 
         return FornecedorListResponse(
             items=items,
-            total=total,
+            total=total_registros,
             page=page,
             size=size,
-            pages=pages
+            pages=pages,
+            next_cursor=pagina.next_cursor,
+            prev_cursor=pagina.prev_cursor
         )
 
+    except CursorInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -181,10 +233,10 @@ async def listar_fornecedores(
 
 
 @router.get("/resumo", response_model=List[FornecedorResumo])
-async def listar_fornecedores_resumo(
+def listar_fornecedores_resumo(
     ativo: bool = Query(True, description="Apenas ativos"),
     categoria: Optional[CategoriaFornecedor] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista resumo de fornecedores para seleção"""
@@ -222,12 +274,43 @@ async def listar_fornecedores_resumo(
         )
 
 
+@router.get("/exportar")
+def exportar_fornecedores(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    search: Optional[str] = Query(None, description="Busca por nome, CNPJ, email"),
+    categoria: Optional[CategoriaFornecedor] = Query(None),
+    tipo_pessoa: Optional[TipoFornecedor] = Query(None),
+    status: Optional[StatusFornecedor] = Query(None),
+    ativo: Optional[bool] = Query(None),
+    cidade: Optional[str] = Query(None),
+    estado: Optional[str] = Query(None),
+    avaliacao_minima: Optional[int] = Query(None, ge=1, le=5),
+    order_by: str = Query("razao_social", description="Campo para ordenação"),
+    order_direction: str = Query("asc", description="Direção (asc/desc)"),
+    db: Session = Depends(get_read_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Exporta fornecedores (mesmos filtros e ordenação da listagem) em
+    CSV, NDJSON ou XLSX, enviados em fluxo.
+    """
+    query = _filtrar_fornecedores(
+        db, search, categoria, tipo_pessoa, status, ativo, cidade, estado, avaliacao_minima
+    )
+    order_field = ORDENACOES_FORNECEDOR.get(order_by, Fornecedor.razao_social)
+    if order_direction.lower() == "desc":
+        query = query.order_by(order_field.desc(), Fornecedor.id.desc())
+    else:
+        query = query.order_by(order_field, Fornecedor.id)
+    return exportar(query, COLUNAS_EXPORTACAO, formato, "fornecedores")
+
+
 # =======================================
 # ENDPOINTS CRUD
 # =======================================
 
 @router.post("", response_model=FornecedorResponse, status_code=status.HTTP_201_CREATED)
-async def criar_fornecedor(
+def criar_fornecedor(
     fornecedor_data: FornecedorCreate,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
@@ -268,9 +351,9 @@ async def criar_fornecedor(
 
 
 @router.get("/{fornecedor_id}", response_model=FornecedorResponse)
-async def buscar_fornecedor(
+def buscar_fornecedor(
     fornecedor_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Busca fornecedor por ID"""
@@ -298,7 +381,7 @@ async def buscar_fornecedor(
 
 
 @router.put("/{fornecedor_id}", response_model=FornecedorResponse)
-async def atualizar_fornecedor(
+def atualizar_fornecedor(
     fornecedor_id: int,
     fornecedor_data: FornecedorUpdate,
     db: Session = Depends(get_db),
@@ -343,7 +426,7 @@ async def atualizar_fornecedor(
 
 
 @router.delete("/{fornecedor_id}")
-async def remover_fornecedor(
+def remover_fornecedor(
     fornecedor_id: int,
     force: bool = Query(False, description="Forçar remoção"),
     db: Session = Depends(get_db),
@@ -393,8 +476,8 @@ async def remover_fornecedor(
 # =======================================
 
 @router.get("/stats/resumo", response_model=EstatisticasFornecedor)
-async def estatisticas_fornecedores(
-    db: Session = Depends(get_db),
+def estatisticas_fornecedores(
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Estatísticas dos fornecedores"""
@@ -459,9 +542,9 @@ async def estatisticas_fornecedores(
 # =======================================
 
 @router.get("/cnpj/{cnpj}", response_model=dict)
-async def validar_cnpj(
+def validar_cnpj(
     cnpj: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Valida se CNPJ já está cadastrado"""
@@ -490,7 +573,7 @@ async def validar_cnpj(
 
 
 @router.patch("/{fornecedor_id}/status")
-async def alterar_status_fornecedor(
+def alterar_status_fornecedor(
     fornecedor_id: int,
     novo_status: StatusFornecedor,
     motivo: Optional[str] = Query(None, description="Motivo da alteração"),
@@ -0,0 +1,89 @@
+"""
+ROUTER DE IMPORTAÇÃO EM MASSA - ERP PRIMOTEX
+============================================
+
+Upload de CSV ou JSON para cadastrar clientes, produtos e fornecedores
+em lote (ex.: implantação de uma nova filial), em vez de milhares de
+chamadas a POST /clientes.
+
+Funcionalidades:
+- Arquivo lido em fluxo e gravado em lotes (uma transação por lote)
+- CPF/CNPJ validados e duplicados detectados por lote
+- Códigos alocados em bloco
+- Relatório de erros por linha na resposta
+
+O upload não passa pelo group commit: cada lote já é uma transação
+grande, e os lotes liberam o escritor entre si.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import csv
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.orm import Session
+
+from backend.auth.dependencies import require_manager
+from backend.database.config import get_db
+from backend.database.importacao import (
+    ENTIDADES_IMPORTACAO, FORMATOS, TAMANHO_LOTE_PADRAO, abrir_registros,
+    formato_do_arquivo, importar
+)
+import logging
+
+router = APIRouter(prefix="/importacao", tags=["Importação"])
+
+logger = logging.getLogger(__name__)
+
+
+@router.post("/{entidade}")
+def importar_arquivo(
+    entidade: str,
+    arquivo: UploadFile = File(..., description="Arquivo .csv, .json ou .jsonl"),
+    formato: Optional[str] = Query(
+        None, description=f"Formato do arquivo ({', '.join(FORMATOS)}). Padrão: pela extensão"
+    ),
+    tamanho_lote: int = Query(TAMANHO_LOTE_PADRAO, ge=1, le=10000, description="Linhas por transação"),
+    limite_erros: int = Query(1000, ge=0, le=100000, description="Erros detalhados na resposta"),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_manager)
+):
+    """
+    Importar clientes, produtos ou fornecedores.
+
+    Linhas inválidas ou duplicadas não interrompem a importação e são
+    listadas em `erros` com o número da linha no arquivo.
+    """
+    if entidade not in ENTIDADES_IMPORTACAO:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Entidade inválida. Use: {', '.join(ENTIDADES_IMPORTACAO)}"
+        )
+
+    formato = formato or formato_do_arquivo(arquivo.filename)
+    if formato not in FORMATOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Formato inválido. Use: {', '.join(FORMATOS)}"
+        )
+
+    try:
+        relatorio = importar(
+            db, entidade, abrir_registros(arquivo.file, formato),
+            tamanho_lote=tamanho_lote, usuario_id=current_user.id
+        )
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        # Arquivo malformado: os lotes anteriores já foram gravados
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Arquivo inválido: {e}"
+        )
+
+    logger.info(
+        f"Importação de {entidade} por {current_user.username}: "
+        f"{relatorio.inseridos}/{relatorio.total_linhas} em {relatorio.segundos:.2f}s"
+    )
+    return relatorio.como_dict(limite_erros)
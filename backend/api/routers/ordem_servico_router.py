@@ -15,11 +15,23 @@ from typing import List, Optional
 from datetime import datetime, date
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, asc, func
-
-from backend.database.config import get_db
+from sqlalchemy import and_, desc
+
+from backend.database.agregacao import agregar
+from backend.database.busca_fts import filtro_busca
+from backend.database.contadores_os import ler_contadores
+from backend.api.cache_http import etag_tabelas
+from backend.database.config import get_db, get_read_db
+from backend.database.exportacao import (
+    FORMATO_CSV, FORMATO_EXPORTACAO_DESC, FORMATOS_EXPORTACAO_REGEX, exportar
+)
+from backend.database.group_commit import executar_escrita
+from backend.database.paginacao import (
+    CURSOR_DESC, TOTAL_DESC, TOTAL_MODOS_REGEX, TOTAL_NENHUM, CursorInvalido,
+    contar_total, paginar, resolver_modo_total
+)
 from backend.auth.dependencies import require_operator, get_current_user
 from backend.models.ordem_servico_model import OrdemServico, FaseOS, VisitaTecnica, Orcamento
 from backend.models.cliente_model import Cliente
@@ -64,6 +76,37 @@ router = APIRouter(
     responses={404: {"description": "OS não encontrada"}}
 )
 
+# Status considerados em aberto nos dashboards
+STATUS_OS_EM_ABERTO = [
+    "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
+    "AGUARDANDO_APROVACAO", "EM_EXECUCAO"
+]
+STATUS_OS_LISTA = STATUS_OS_EM_ABERTO + ["FINALIZADA", "CANCELADA", "ARQUIVADA"]
+PRIORIDADES_OS_LISTA = ["baixa", "normal", "alta", "urgente"]
+
+# Campos aceitos em order_by (NOT NULL, exigido pela paginação por cursor)
+ORDENACOES_OS = {
+    "created_at": OrdemServico.created_at,
+    "data_abertura": OrdemServico.data_abertura,
+    "numero_os": OrdemServico.numero_os,
+    "fase_atual": OrdemServico.fase_atual,
+    "status": OrdemServico.status,
+    "id": OrdemServico.id,
+}
+
+# Colunas do arquivo de exportação (sem os JSON de croqui/orçamento)
+COLUNAS_EXPORTACAO = (
+    OrdemServico.id, OrdemServico.numero_os, OrdemServico.cliente_id,
+    OrdemServico.tipo_servico, OrdemServico.categoria, OrdemServico.prioridade,
+    OrdemServico.fase_atual, OrdemServico.status, OrdemServico.data_abertura,
+    OrdemServico.data_prevista_conclusao, OrdemServico.data_conclusao,
+    OrdemServico.usuario_responsavel, OrdemServico.tecnico_responsavel,
+    OrdemServico.valor_orcamento, OrdemServico.valor_desconto, OrdemServico.valor_final,
+    OrdemServico.forma_pagamento, OrdemServico.endereco_execucao,
+    OrdemServico.cidade_execucao, OrdemServico.estado_execucao,
+    OrdemServico.observacoes_abertura, OrdemServico.created_at
+)
+
 
 # ================================
 # UTILITÁRIOS E VALIDAÇÕES
@@ -118,7 +161,7 @@ def calcular_progresso_os(os_obj: OrdemServico) -> float:
 # ================================
 
 @router.post("/", status_code=status.HTTP_201_CREATED)  # response_model removido temporariamente
-async def criar_ordem_servico(
+def criar_ordem_servico(
     os_data: OrdemServicoCreate,
     db: Session = Depends(get_db),
     current_user = Depends(require_operator)  # ADICIONADO - Autenticação
@@ -208,8 +251,51 @@ async def criar_ordem_servico(
     }
 
 
+def _filtrar_ordens_servico(
+    db: Session,
+    cliente_id: Optional[int],
+    status: Optional[str],
+    prioridade: Optional[str],
+    urgente: Optional[bool],
+    numero_os: Optional[str],
+    busca: Optional[str]
+):
+    """Query de OS com os filtros da listagem (também usada na exportação)"""
+    query = db.query(OrdemServico)
+
+    if cliente_id:
+        query = query.filter(OrdemServico.cliente_id == cliente_id)
+
+    if status:
+        query = query.filter(OrdemServico.status == status)
+
+    if prioridade:
+        query = query.filter(OrdemServico.prioridade == prioridade)
+
+    # Urgência é a prioridade "urgente" (não há coluna própria)
+    if urgente is True:
+        query = query.filter(OrdemServico.prioridade == "urgente")
+    elif urgente is False:
+        query = query.filter(OrdemServico.prioridade != "urgente")
+
+    if numero_os:
+        query = query.filter(OrdemServico.numero_os.ilike(f"%{numero_os}%"))
+
+    if busca:
+        query = query.filter(filtro_busca(
+            db, "ordens_servico", OrdemServico, busca,
+            OrdemServico.numero_os,
+            OrdemServico.tipo_servico,
+            OrdemServico.cidade_execucao,
+            OrdemServico.observacoes_abertura
+        ))
+
+    return query
+
+
 @router.get("/")
-async def listar_ordens_servico(
+def listar_ordens_servico(
+    response: Response,
     skip: int = Query(0, ge=0, description="Registros a pular"),
     limit: int = Query(50, ge=1, le=100, description="Limite de registros"),
     cliente_id: Optional[int] = Query(None, description="Filtrar por cliente"),
@@ -217,48 +303,42 @@ async def listar_ordens_servico(
     prioridade: Optional[str] = Query(None, description="Filtrar por prioridade"),
     urgente: Optional[bool] = Query(None, description="Apenas urgentes"),
     numero_os: Optional[str] = Query(None, description="Buscar por número"),
+    busca: Optional[str] = Query(None, description="Busca textual (número, serviço, local, observações)"),
     order_by: str = Query("created_at", description="Campo para ordenação"),
     order_desc: bool = Query(True, description="Ordem decrescente"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESC),
+    total: Optional[str] = Query(None, pattern=TOTAL_MODOS_REGEX, description=TOTAL_DESC),
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista Ordens de Serviço com filtros e paginação
 
     - **skip**: Número de registros para pular (paginação)
     - **limit**: Limite de registros por página (máx 100)
+    - **cursor**: Cursor recebido em X-Next-Cursor/X-Prev-Cursor (substitui skip)
+    - **total**: exato/estimado devolve o total em X-Total-Count
     - **cliente_id**: Filtrar por cliente específico
     - **status**: Filtrar por status da OS
     - **urgente**: Mostrar apenas OS urgentes
+    - **busca**: Palavras (ou início delas) em número, serviço, local e observações
     """
     try:
-        # Query base
-        query = db.query(OrdemServico)
-
-        # Aplicar filtros
-        if cliente_id:
-            query = query.filter(OrdemServico.cliente_id == cliente_id)
-
-        if status:
-            query = query.filter(OrdemServico.status == status)
-
-        if prioridade:
-            query = query.filter(OrdemServico.prioridade == prioridade)
-
-        if urgente is not None:
-            query = query.filter(OrdemServico.urgente == urgente)
-
-        if numero_os:
-            query = query.filter(OrdemServico.numero_os.ilike(f"%{numero_os}%"))
+        query = _filtrar_ordens_servico(
+            db, cliente_id, status, prioridade, urgente, numero_os, busca
+        )
 
-        # Ordenação
-        order_field = getattr(OrdemServico, order_by, OrdemServico.created_at)
-        if order_desc:
-            query = query.order_by(desc(order_field))
-        else:
-            query = query.order_by(asc(order_field))
+        total_registros = contar_total(
+            query, resolver_modo_total(total, cursor, padrao=TOTAL_NENHUM)
+        )
 
-        # Paginação  
-        ordens_servico = query.offset(skip).limit(limit).all()
+        # Ordenação e paginação
+        order_field = ORDENACOES_OS.get(order_by, OrdemServico.created_at)
+        pagina = paginar(
+            query, order_field, OrdemServico.id, limit,
+            cursor=cursor, skip=skip, descendente=order_desc
+        )
+        ordens_servico = pagina.itens
+        response.headers.update(pagina.headers(total_registros))
 
         # Converter para dict simples para evitar erro de validação
         return [
@@ -277,6 +357,8 @@ async def listar_ordens_servico(
             for os in ordens_servico
         ]
 
+    except CursorInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -284,10 +366,39 @@ async def listar_ordens_servico(
         )
 
 
+@router.get("/exportar")
+def exportar_ordens_servico(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    cliente_id: Optional[int] = Query(None, description="Filtrar por cliente"),
+    status: Optional[str] = Query(None, description="Filtrar por status"),
+    prioridade: Optional[str] = Query(None, description="Filtrar por prioridade"),
+    urgente: Optional[bool] = Query(None, description="Apenas urgentes"),
+    numero_os: Optional[str] = Query(None, description="Buscar por número"),
+    busca: Optional[str] = Query(None, description="Busca textual (número, serviço, local, observações)"),
+    order_by: str = Query("created_at", description="Campo para ordenação"),
+    order_desc: bool = Query(True, description="Ordem decrescente"),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Exporta Ordens de Serviço (mesmos filtros e ordenação da listagem)
+    em CSV, NDJSON ou XLSX, enviadas em fluxo
+    """
+    query = _filtrar_ordens_servico(
+        db, cliente_id, status, prioridade, urgente, numero_os, busca
+    )
+    order_field = ORDENACOES_OS.get(order_by, OrdemServico.created_at)
+    if order_desc:
+        query = query.order_by(desc(order_field), desc(OrdemServico.id))
+    else:
+        query = query.order_by(order_field, OrdemServico.id)
+    return exportar(query, COLUNAS_EXPORTACAO, formato, "ordens_servico")
+
+
 @router.get("/{os_id}", response_model=OrdemServicoResponse)
-async def obter_ordem_servico(
+def obter_ordem_servico(
     os_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtém uma Ordem de Serviço específica por ID
@@ -305,7 +416,7 @@ async def obter_ordem_servico(
 
 
 @router.put("/{os_id}", response_model=OrdemServicoResponse)
-async def atualizar_ordem_servico(
+def atualizar_ordem_servico(
     os_id: int,
     os_data: OrdemServicoUpdate,
     db: Session = Depends(get_db)
@@ -342,7 +453,7 @@ async def atualizar_ordem_servico(
 
 
 @router.delete("/{os_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def deletar_ordem_servico(
+def deletar_ordem_servico(
     os_id: int,
     db: Session = Depends(get_db)
 ):
@@ -396,9 +507,9 @@ def criar_fases_iniciais(os_id: int, db: Session):
 
 
 @router.get("/{os_id}/fases", response_model=List[FaseOSResponse])
-async def listar_fases_os(
+def listar_fases_os(
     os_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as fases de uma OS
@@ -414,7 +525,7 @@ async def listar_fases_os(
 
 
 @router.put("/{os_id}/fases/{fase_id}", response_model=FaseOSResponse)
-async def atualizar_fase_os(
+def atualizar_fase_os(
     os_id: int,
     fase_id: int,
     fase_data: FaseOSUpdate,
@@ -457,7 +568,7 @@ async def atualizar_fase_os(
 
 
 @router.post("/{os_id}/mudar-fase", response_model=OrdemServicoResponse)
-async def mudar_fase_os(
+def mudar_fase_os(
     os_id: int,
     mudanca: MudancaFaseRequest,
     db: Session = Depends(get_db)
@@ -519,7 +630,7 @@ async def mudar_fase_os(
 # ================================
 
 @router.post("/{os_id}/visita-tecnica", response_model=VisitaTecnicaResponse, status_code=status.HTTP_201_CREATED)
-async def agendar_visita_tecnica(
+def agendar_visita_tecnica(
     os_id: int,
     visita_data: VisitaTecnicaCreate,
     db: Session = Depends(get_db)
@@ -567,9 +678,9 @@ async def agendar_visita_tecnica(
 
 
 @router.get("/{os_id}/visita-tecnica", response_model=VisitaTecnicaResponse)
-async def obter_visita_tecnica(
+def obter_visita_tecnica(
     os_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtém a visita técnica de uma OS
@@ -597,7 +708,7 @@ async def obter_visita_tecnica(
 # ================================
 
 @router.post("/{os_id}/orcamento", response_model=OrcamentoResponse, status_code=status.HTTP_201_CREATED)
-async def criar_orcamento(
+def criar_orcamento(
     os_id: int,
     orcamento_data: OrcamentoCreate,
     db: Session = Depends(get_db)
@@ -641,9 +752,9 @@ async def criar_orcamento(
 
 
 @router.get("/{os_id}/orcamento", response_model=OrcamentoResponse)
-async def obter_orcamento(
+def obter_orcamento(
     os_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtém o orçamento de uma OS
@@ -670,8 +781,12 @@ async def obter_orcamento(
 # ENDPOINTS DE RELATÓRIOS
 # ================================
 
-@router.get("/dashboard/estatisticas", response_model=EstatisticasOS)
-async def obter_estatisticas_os(db: Session = Depends(get_db)):
+@router.get(
+    "/dashboard/estatisticas",
+    response_model=EstatisticasOS,
+    dependencies=[Depends(etag_tabelas("ordens_servico", autenticado=False))]
+)
+def obter_estatisticas_os(db: Session = Depends(get_read_db)):
     """
     Obtém estatísticas gerais das OS
 
@@ -679,38 +794,54 @@ async def obter_estatisticas_os(db: Session = Depends(get_db)):
     - Distribuição por status, fase, prioridade
     - Métricas de performance
     """
-    total_os = db.query(OrdemServico).count()
-
-    # Estatísticas por status
-    por_status = {}
-    for status_enum in StatusOS:
-        count = db.query(OrdemServico).filter(OrdemServico.status == status_enum.value).count()
-        por_status[status_enum.value] = count
-
-    # Estatísticas por fase
-    por_fase = {}
-    for fase_enum in FaseOSEnum:
-        count = db.query(OrdemServico).filter(OrdemServico.fase_atual == fase_enum.value).count()
-        por_fase[fase_enum.value] = count
-
-    # Estatísticas por prioridade
-    por_prioridade = {}
-    for prioridade_enum in PrioridadeOS:
-        count = db.query(OrdemServico).filter(OrdemServico.prioridade == prioridade_enum.value).count()
-        por_prioridade[prioridade_enum.value] = count
-
-    # Estatísticas por tipo
-    por_tipo = {}
-    for tipo_enum in TipoOS:
-        count = db.query(OrdemServico).filter(OrdemServico.tipo_servico == tipo_enum.value).count()
-        por_tipo[tipo_enum.value] = count
+    # Todas as distribuições em um único GROUP BY
+    resultado = agregar(
+        db.query(OrdemServico),
+        dimensoes={
+            "status": OrdemServico.status,
+            "fase": OrdemServico.fase_atual,
+            "prioridade": OrdemServico.prioridade,
+            "tipo": OrdemServico.tipo_servico,
+        }
+    )
+    rotulos_fase = {numero: fase.value for numero, fase in enumerate(FaseOSEnum, start=1)}
+
+    return EstatisticasOS(
+        total_os=resultado.total(),
+        por_status=resultado.distribuicao("status", [s.value for s in StatusOS]),
+        por_fase=resultado.distribuicao(
+            "fase", [f.value for f in FaseOSEnum], rotulo=rotulos_fase.get
+        ),
+        por_prioridade=resultado.distribuicao("prioridade", [p.value for p in PrioridadeOS]),
+        por_tipo=resultado.distribuicao("tipo", [t.value for t in TipoOS])
+    )
+
 
+def _agregar_os(query):
+    """Status, fase, prioridade e valor das OS em um único GROUP BY"""
+    return agregar(
+        query,
+        dimensoes={
+            "status": OrdemServico.status,
+            "fase": OrdemServico.fase_atual,
+            "prioridade": OrdemServico.prioridade,
+        },
+        somas={"valor": OrdemServico.valor_final}
+    )
+
+
+def _estatisticas_consolidadas(resultado) -> EstatisticasOS:
+    """Montar EstatisticasOS a partir de _agregar_os ou ler_contadores"""
+    valor_total = resultado.soma("valor", onde={"status": STATUS_OS_EM_ABERTO})
     return EstatisticasOS(
-        total_os=total_os,
-        por_status=por_status,
-        por_fase=por_fase,
-        por_prioridade=por_prioridade,
-        por_tipo=por_tipo
+        total_os=resultado.total(),
+        por_status=resultado.distribuicao("status", STATUS_OS_LISTA),
+        por_fase=resultado.distribuicao(
+            "fase", [f"fase_{fase}" for fase in range(1, 8)], rotulo="fase_{}".format
+        ),
+        por_prioridade=resultado.distribuicao("prioridade", PRIORIDADES_OS_LISTA),
+        por_tipo={},
+        valor_total_pendente=Decimal(str(valor_total)) if valor_total else None
     )
 
 
@@ -719,9 +850,9 @@ async def obter_estatisticas_os(db: Session = Depends(get_db)):
 # =============================================================================
 
 @router.get("/{os_id}/historico", response_model=List[HistoricoMudanca])
-async def obter_historico_os(
+def obter_historico_os(
     os_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
@@ -753,8 +884,8 @@ async def obter_historico_os(
 
 
 @router.get("/estatisticas/dashboard", response_model=DashboardOS)
-async def obter_dashboard_detalhado(
-    db: Session = Depends(get_db),
+def obter_dashboard_detalhado(
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
@@ -771,20 +902,14 @@ async def obter_dashboard_detalhado(
         # OS urgentes (prioridade urgente ou alta)
         os_urgentes = db.query(OrdemServico).filter(
             OrdemServico.prioridade.in_(["urgente", "alta"]),
-            OrdemServico.status.in_([
-                "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
-                "AGUARDANDO_APROVACAO", "EM_EXECUCAO"
-            ])
+            OrdemServico.status.in_(STATUS_OS_EM_ABERTO)
         ).limit(10).all()
 
         # OS atrasadas (prazo vencido)
         hoje = datetime.now()
         os_atrasadas = db.query(OrdemServico).filter(
-            OrdemServico.prazo_previsto < hoje,
-            OrdemServico.status.in_([
-                "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
-                "AGUARDANDO_APROVACAO", "EM_EXECUCAO"
-            ])
+            OrdemServico.data_prevista_conclusao < hoje,
+            OrdemServico.status.in_(STATUS_OS_EM_ABERTO)
         ).limit(10).all()
 
         # OS de hoje (criadas hoje)
@@ -795,71 +920,13 @@ async def obter_dashboard_detalhado(
             OrdemServico.data_abertura >= inicio_hoje
         ).limit(10).all()
 
-        # Fases pendentes (quantidade por fase nas OS abertas)
-        fases_pendentes = {}
-        for fase_num in range(1, 8):
-            count = db.query(OrdemServico).filter(
-                OrdemServico.fase_atual == fase_num,
-                OrdemServico.status.in_([
-                    "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
-                    "AGUARDANDO_APROVACAO", "EM_EXECUCAO"
-                ])
-            ).count()
-            fases_pendentes[str(fase_num)] = count
-
-        # Estatísticas gerais
-        total_os = db.query(OrdemServico).count()
-
-        # OS por status
-        por_status = {}
-        for status_item in [
-            "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
-            "AGUARDANDO_APROVACAO", "EM_EXECUCAO",
-            "FINALIZADA", "CANCELADA", "ARQUIVADA"
-        ]:
-            count = db.query(OrdemServico).filter(
-                OrdemServico.status == status_item
-            ).count()
-            por_status[status_item] = count
-
-        # OS por fase
-        por_fase = {}
-        for fase in range(1, 8):
-            count = db.query(OrdemServico).filter(
-                OrdemServico.fase_atual == fase
-            ).count()
-            por_fase[f"fase_{fase}"] = count
-
-        # OS por prioridade
-        por_prioridade = {}
-        for prioridade in ["baixa", "normal", "alta", "urgente"]:
-            count = db.query(OrdemServico).filter(
-                OrdemServico.prioridade == prioridade
-            ).count()
-            por_prioridade[prioridade] = count
-
-        # Valor total pendente
-        valor_total = db.query(
-            func.sum(OrdemServico.valor_total)
-        ).filter(
-            OrdemServico.status.in_([
-                "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
-                "AGUARDANDO_APROVACAO", "EM_EXECUCAO"
-            ])
-        ).scalar()
-        valor_total_pendente = (
-            Decimal(str(valor_total)) if valor_total else None
-        )
-
-        # Estatísticas consolidadas
-        estatisticas = EstatisticasOS(
-            total_os=total_os,
-            por_status=por_status,
-            por_fase=por_fase,
-            por_prioridade=por_prioridade,
-            por_tipo={},
-            valor_total_pendente=valor_total_pendente
+        # Contadores gerais e fases pendentes: tabela os_contadores
+        resultado = ler_contadores(db)
+        fases_pendentes = resultado.distribuicao(
+            "fase", [str(fase) for fase in range(1, 8)], rotulo=str,
+            onde={"status": STATUS_OS_EM_ABERTO}
         )
+        estatisticas = _estatisticas_consolidadas(resultado)
 
         return DashboardOS(
             estatisticas=estatisticas,
@@ -883,14 +950,14 @@ async def obter_dashboard_detalhado(
 
 
 @router.get("/estatisticas/geral", response_model=EstatisticasOS)
-async def obter_estatisticas_periodo(
+def obter_estatisticas_periodo(
     data_inicio: Optional[date] = Query(
         None, description="Data de início do período"
     ),
     data_fim: Optional[date] = Query(
         None, description="Data de fim do período"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     """
@@ -900,6 +967,10 @@ async def obter_estatisticas_periodo(
     Se não informado período, retorna estatísticas de todas as OS.
     """
     try:
+        # Sem período os totais vêm da tabela de contadores
+        if not data_inicio and not data_fim:
+            return _estatisticas_consolidadas(ler_contadores(db))
+
         query = db.query(OrdemServico)
 
         # Filtrar por período se fornecido
@@ -912,56 +983,7 @@ async def obter_estatisticas_periodo(
                 OrdemServico.data_abertura <= data_fim
             )
 
-        # Estatísticas básicas
-        total = query.count()
-
-        # OS por status
-        por_status = {}
-        for status_item in [
-            "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
-            "AGUARDANDO_APROVACAO", "EM_EXECUCAO",
-            "FINALIZADA", "CANCELADA", "ARQUIVADA"
-        ]:
-            count = query.filter(
-                OrdemServico.status == status_item
-            ).count()
-            por_status[status_item] = count
-
-        # OS por fase
-        por_fase = {}
-        for fase in range(1, 8):
-            count = query.filter(
-                OrdemServico.fase_atual == fase
-            ).count()
-            por_fase[f"fase_{fase}"] = count
-
-        # OS por prioridade
-        por_prioridade = {}
-        for prioridade in ["baixa", "normal", "alta", "urgente"]:
-            count = query.filter(
-                OrdemServico.prioridade == prioridade
-            ).count()
-            por_prioridade[prioridade] = count
-
-        # Valor total pendente
-        valor_total = query.filter(
-            OrdemServico.status.in_([
-                "ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
-                "AGUARDANDO_APROVACAO", "EM_EXECUCAO"
-            ])
-        ).with_entities(func.sum(OrdemServico.valor_total)).scalar()
-        valor_total_pendente = (
-            Decimal(str(valor_total)) if valor_total else None
-        )
-
-        return EstatisticasOS(
-            total_os=total,
-            por_status=por_status,
-            por_fase=por_fase,
-            por_prioridade=por_prioridade,
-            por_tipo={},
-            valor_total_pendente=valor_total_pendente
-        )
+        return _estatisticas_consolidadas(_agregar_os(query))
 
     except Exception as e:
         raise HTTPException(
@@ -975,7 +997,7 @@ async def obter_estatisticas_periodo(
 # ================================
 
 @router.post("/{os_id}/croqui", status_code=status.HTTP_200_OK)
-async def salvar_croqui(
+def salvar_croqui(
     os_id: int,
     croqui_data: dict,
     db: Session = Depends(get_db),
@@ -989,19 +1011,22 @@ async def salvar_croqui(
     """
     import json
     
-    os_obj = get_ordem_servico_or_404(os_id, db)
-    
+    # Validar estrutura básica
+    if "objetos" not in croqui_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Campo 'objetos' obrigatório"
+        )
+
+    dados_json = json.dumps(croqui_data, ensure_ascii=False)
+
+    def gravar_croqui(sessao: Session):
+        os_obj = get_ordem_servico_or_404(os_id, sessao)
+        os_obj.dados_croqui_json = dados_json
+
     try:
-        # Validar estrutura básica
-        if "objetos" not in croqui_data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Campo 'objetos' obrigatório"
-            )
-        
         # Salvar JSON no banco
-        os_obj.dados_croqui_json = json.dumps(croqui_data, ensure_ascii=False)
-        db.commit()
+        executar_escrita(db, gravar_croqui)
         
         return {
             "message": "Croqui salvo com sucesso",
@@ -1009,8 +1034,9 @@ async def salvar_croqui(
             "objetos_count": len(croqui_data.get("objetos", []))
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao salvar croqui: {str(e)}"
@@ -1018,9 +1044,9 @@ async def salvar_croqui(
 
 
 @router.get("/{os_id}/croqui")
-async def carregar_croqui(
+def carregar_croqui(
     os_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -1052,7 +1078,7 @@ async def carregar_croqui(
 
 
 @router.post("/{os_id}/orcamento-json")
-async def salvar_orcamento_json(
+def salvar_orcamento_json(
     os_id: int,
     orcamento_data: dict,
     db: Session = Depends(get_db),
@@ -1135,9 +1161,9 @@ async def salvar_orcamento_json(
 
 
 @router.get("/{os_id}/orcamento-json")
-async def carregar_orcamento_json(
+def carregar_orcamento_json(
     os_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -20,7 +20,12 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
-from backend.database.config import get_db
+from backend.database.busca_fts import filtro_busca
+from backend.api.cache_http import etag_tabelas
+from backend.database.config import get_db, get_read_db
+from backend.database.exportacao import (
+    FORMATO_CSV, FORMATO_EXPORTACAO_DESC, FORMATOS_EXPORTACAO_REGEX, exportar
+)
 from backend.auth.dependencies import get_current_user, require_operator
 from backend.models.produto_model import Produto
 from backend.schemas.produto_schemas import (
@@ -35,9 +40,18 @@ router = APIRouter(prefix="/produtos", tags=["Produtos"])
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Colunas do arquivo de exportação
+COLUNAS_EXPORTACAO = (
+    Produto.id, Produto.codigo, Produto.codigo_barras, Produto.descricao, Produto.tipo,
+    Produto.categoria, Produto.subcategoria, Produto.unidade_medida, Produto.preco_custo,
+    Produto.margem_lucro, Produto.preco_venda, Produto.estoque_atual, Produto.estoque_minimo,
+    Produto.estoque_maximo, Produto.localizacao_estoque, Produto.ncm, Produto.status,
+    Produto.data_criacao
+)
+
 
 @router.post("/", response_model=ProdutoResponse, status_code=status.HTTP_201_CREATED)
-async def criar_produto(
+def criar_produto(
     produto_data: ProdutoCreate,
     db: Session = Depends(get_db),
     current_user=Depends(require_operator)
@@ -77,24 +91,38 @@ async def criar_produto(
         )
 
 
-@router.get("/", response_model=ListagemProdutos)
-async def listar_produtos(
+def _filtrar_produtos(db: Session, filtros: FiltrosProduto):
+    """Query de produtos com os filtros da listagem (também usada na exportação)"""
+    query = db.query(Produto)
+
+    if filtros.categoria:
+        query = query.filter(Produto.categoria == filtros.categoria)
+
+    if filtros.status is not None:
+        query = query.filter(Produto.status == filtros.status)
+
+    if filtros.busca:
+        query = query.filter(filtro_busca(
+            db, "produtos", Produto, filtros.busca,
+            Produto.descricao,
+            Produto.codigo,
+            Produto.codigo_barras
+        ))
+
+    return query
+
+
+@router.get("/", response_model=ListagemProdutos, dependencies=[Depends(etag_tabelas("produtos"))])
+def listar_produtos(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     filtros: FiltrosProduto = Depends(),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Listar produtos com filtros"""
     try:
-        query = db.query(Produto)
-
-        # Aplicar filtros
-        if filtros.categoria:
-            query = query.filter(Produto.categoria == filtros.categoria)
-
-        if filtros.status is not None:
-            query = query.filter(Produto.status == filtros.status)
+        query = _filtrar_produtos(db, filtros)
 
         # Total
         total = query.count()
@@ -119,10 +147,22 @@ async def listar_produtos(
         )
 
 
+@router.get("/exportar")
+def exportar_produtos(
+    formato: str = Query(FORMATO_CSV, pattern=FORMATOS_EXPORTACAO_REGEX, description=FORMATO_EXPORTACAO_DESC),
+    filtros: FiltrosProduto = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user)
+):
+    """Exportar produtos (mesmos filtros da listagem) em CSV, NDJSON ou XLSX, em fluxo"""
+    query = _filtrar_produtos(db, filtros).order_by(Produto.id)
+    return exportar(query, COLUNAS_EXPORTACAO, formato, "produtos")
+
+
 @router.get("/{produto_id}", response_model=ProdutoResponse)
-async def obter_produto(
+def obter_produto(
     produto_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     """Obter produto por ID"""
@@ -148,7 +188,7 @@ async def obter_produto(
 
 
 @router.put("/{produto_id}", response_model=ProdutoResponse)
-async def atualizar_produto(
+def atualizar_produto(
     produto_id: int,
     produto_update: ProdutoUpdate,
     db: Session = Depends(get_db),
@@ -188,7 +228,7 @@ async def atualizar_produto(
 
 
 @router.delete("/{produto_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def deletar_produto(
+def deletar_produto(
     produto_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(require_operator)
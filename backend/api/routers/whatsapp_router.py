@@ -24,7 +24,7 @@ import json
 import re
 import requests
 
-from backend.database.config import get_db
+from backend.database.config import get_db, get_read_db
 from backend.models.comunicacao import (
     ComunicacaoConfig, ComunicacaoHistorico, TipoComunicacao, StatusComunicacao
 )
@@ -37,7 +37,7 @@ router = APIRouter(prefix="/whatsapp", tags=["whatsapp"])
 
 
 @router.post("/configurar")
-async def configurar_whatsapp(
+def configurar_whatsapp(
     config: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
@@ -71,7 +71,7 @@ async def configurar_whatsapp(
             )
 
         # Testar conectividade com a API
-        teste_resultado = await testar_conectividade_whatsapp(config)
+        teste_resultado = testar_conectividade_whatsapp(config)
         if not teste_resultado['sucesso']:
             raise HTTPException(
                 status_code=400,
@@ -125,7 +125,7 @@ async def configurar_whatsapp(
         )
 
 @router.get("/configuracao")
-async def obter_configuracao_whatsapp(db: Session = Depends(get_db)):
+def obter_configuracao_whatsapp(db: Session = Depends(get_read_db)):
     """Obter configuração atual do WhatsApp"""
     config = db.query(ComunicacaoConfig).filter(
         ComunicacaoConfig.tipo == TipoComunicacao.WHATSAPP,
@@ -154,7 +154,7 @@ async def obter_configuracao_whatsapp(db: Session = Depends(get_db)):
     }
 
 @router.post("/testar")
-async def testar_whatsapp(db: Session = Depends(get_db)):
+def testar_whatsapp(db: Session = Depends(get_db)):
     """Testar conectividade com WhatsApp Business API"""
     config = db.query(ComunicacaoConfig).filter(
         ComunicacaoConfig.tipo == TipoComunicacao.WHATSAPP,
@@ -168,7 +168,7 @@ async def testar_whatsapp(db: Session = Depends(get_db)):
             detail="Configuração WhatsApp não encontrada"
         )
 
-    resultado = await testar_conectividade_whatsapp(config.configuracoes)
+    resultado = testar_conectividade_whatsapp(config.configuracoes)
 
     return resultado
 
@@ -177,7 +177,7 @@ async def testar_whatsapp(db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.post("/enviar-mensagem")
-async def enviar_mensagem_whatsapp(
+def enviar_mensagem_whatsapp(
     dados: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
@@ -307,7 +307,7 @@ async def enviar_mensagem_whatsapp(
         )
 
 @router.post("/enviar-template")
-async def enviar_template_whatsapp(
+def enviar_template_whatsapp(
     dados: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
@@ -401,11 +401,11 @@ async def enviar_template_whatsapp(
 # ============================================================================
 
 @router.get("/webhook")
-async def verificar_webhook(
+def verificar_webhook(
     hub_mode: str = None,
     hub_verify_token: str = None,
     hub_challenge: str = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Verificação do webhook pelo WhatsApp"""
     # Buscar token de verificação
@@ -451,7 +451,7 @@ async def receber_webhook(
 # FUNÇÕES AUXILIARES
 # ============================================================================
 
-async def testar_conectividade_whatsapp(config: Dict[str, Any]) -> Dict[str, Any]:
+def testar_conectividade_whatsapp(config: Dict[str, Any]) -> Dict[str, Any]:
     """Testar conectividade com WhatsApp Business API"""
     try:
         headers = {
@@ -0,0 +1,110 @@
+"""
+SISTEMA ERP PRIMOTEX - CACHE DE USUÁRIOS AUTENTICADOS
+====================================================
+
+Cache por processo da projeção do usuário autenticado (id, username,
+perfil, ativo), consultado por get_current_user antes de ir ao banco.
+
+Limitado em quantidade (LRU) e em tempo (TTL). Os endpoints de
+auth_router que alteram usuário, status ou senha invalidam a entrada;
+em outros processos a alteração vale quando o TTL expira.
+
+Configuração:
+- AUTH_USER_CACHE_TTL: segundos de validade da entrada (0 desativa)
+- AUTH_USER_CACHE_MAX: quantidade máxima de usuários em cache
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_MAX = int(os.getenv("AUTH_USER_CACHE_MAX", "1024"))
+
+
+@dataclass(frozen=True)
+class UsuarioAutenticado:
+    """Projeção do usuário usada pelas dependências de autenticação"""
+
+    id: int
+    username: str
+    perfil: str
+    ativo: bool
+
+    @classmethod
+    def de_usuario(cls, usuario) -> "UsuarioAutenticado":
+        """Criar a projeção a partir de um Usuario (ou linha com as mesmas colunas)"""
+        return cls(
+            id=usuario.id,
+            username=usuario.username,
+            perfil=usuario.perfil,
+            ativo=bool(usuario.ativo),
+        )
+
+
+class CacheUsuarios:
+    """
+    Mapa user_id -> UsuarioAutenticado com TTL e despejo LRU.
+
+    Seguro entre threads: os handlers síncronos rodam no threadpool.
+    """
+
+    def __init__(self, ttl: float = AUTH_USER_CACHE_TTL, max_itens: int = AUTH_USER_CACHE_MAX,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._relogio = relogio
+        self._itens: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, user_id: int) -> Optional[UsuarioAutenticado]:
+        """Retornar a projeção em cache ou None se ausente ou expirada"""
+        with self._lock:
+            item = self._itens.get(user_id)
+            if item is None:
+                self.faltas += 1
+                return None
+            usuario, expira_em = item
+            if expira_em <= self._relogio():
+                del self._itens[user_id]
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(user_id)
+            self.acertos += 1
+            return usuario
+
+    def guardar(self, usuario: UsuarioAutenticado) -> None:
+        """Guardar a projeção, despejando a menos usada se passar do limite"""
+        if self.ttl <= 0 or self.max_itens <= 0:
+            return
+        with self._lock:
+            self._itens[usuario.id] = (usuario, self._relogio() + self.ttl)
+            self._itens.move_to_end(usuario.id)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, user_id: int) -> None:
+        """Remover o usuário do cache (após alterar perfil, status ou senha)"""
+        with self._lock:
+            self._itens.pop(user_id, None)
+
+    def limpar(self) -> None:
+        """Remover todas as entradas"""
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._itens)
+
+
+# Instância do processo usada pelas dependências e pelo auth_router
+cache_usuarios = CacheUsuarios()
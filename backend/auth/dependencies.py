@@ -14,9 +14,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from backend.database.config import get_database
+from backend.database.config import get_read_db
 from backend.models.user_model import Usuario
 from backend.auth.jwt_handler import decode_access_token
+from backend.auth.cache_usuarios import UsuarioAutenticado, cache_usuarios
 
 # =======================================
 # CONFIGURAÇÃO DA SEGURANÇA
@@ -25,20 +26,48 @@ from backend.auth.jwt_handler import decode_access_token
 # Esquema de segurança Bearer Token (auto_error=False para controle manual de erros)
 security = HTTPBearer(auto_error=False)
 
+def carregar_usuario_autenticado(db: Session, user_id: int) -> Optional[UsuarioAutenticado]:
+    """
+    Obter a projeção do usuário pelo cache do processo ou, na falta, do banco.
+    
+    Args:
+        db: Sessão do banco de dados (só usada se não houver cache)
+        user_id: ID do usuário extraído do token
+        
+    Returns:
+        Projeção do usuário ou None se não existir
+    """
+    usuario = cache_usuarios.obter(user_id)
+    if usuario is not None:
+        return usuario
+    
+    linha = db.query(
+        Usuario.id, Usuario.username, Usuario.perfil, Usuario.ativo
+    ).filter(Usuario.id == user_id).first()
+    if linha is None:
+        return None
+    
+    usuario = UsuarioAutenticado.de_usuario(linha)
+    cache_usuarios.guardar(usuario)
+    return usuario
+
 # =======================================
 # DEPENDÊNCIAS DE AUTENTICAÇÃO
 # =======================================
 
 def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_database)
-) -> Usuario:
+    db: Session = Depends(get_read_db)
+) -> UsuarioAutenticado:
     """
     Dependency para obter usuário atual autenticado.
     
+    Retorna a projeção (id, username, perfil, ativo) mantida em cache;
+    handlers que precisam dos demais campos devem carregar o Usuario.
+    
     Args:
         credentials: Token de autorização
-        db: Sessão do banco de dados
+        db: Sessão do banco de dados (não usada quando há cache)
         
     Returns:
         Usuário autenticado
@@ -77,8 +106,8 @@ def get_current_user(
     except Exception:
         raise credentials_exception
     
-    # Buscar usuário no banco
-    user = db.query(Usuario).filter(Usuario.id == user_id).first()
+    # Buscar usuário no cache ou no banco
+    user = carregar_usuario_autenticado(db, user_id)
     if user is None:
         raise credentials_exception
     
@@ -91,7 +120,7 @@ def get_current_user(
     
     return user
 
-def get_current_active_user(current_user: Usuario = Depends(get_current_user)) -> Usuario:
+def get_current_active_user(current_user: UsuarioAutenticado = Depends(get_current_user)) -> UsuarioAutenticado:
     """
     Dependency para garantir que usuário está ativo.
     
@@ -115,7 +144,7 @@ def get_current_active_user(current_user: Usuario = Depends(get_current_user)) -
 # DEPENDÊNCIAS DE AUTORIZAÇÃO
 # =======================================
 
-def require_admin(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
+def require_admin(current_user: UsuarioAutenticado = Depends(get_current_active_user)) -> UsuarioAutenticado:
     """
     Dependency para exigir perfil de administrador.
     
@@ -135,7 +164,7 @@ def require_admin(current_user: Usuario = Depends(get_current_active_user)) -> U
         )
     return current_user
 
-def require_manager(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
+def require_manager(current_user: UsuarioAutenticado = Depends(get_current_active_user)) -> UsuarioAutenticado:
     """
     Dependency para exigir perfil de gerente ou superior.
     
@@ -156,7 +185,7 @@ def require_manager(current_user: Usuario = Depends(get_current_active_user)) ->
         )
     return current_user
 
-def require_operator(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
+def require_operator(current_user: UsuarioAutenticado = Depends(get_current_active_user)) -> UsuarioAutenticado:
     """
     Dependency para exigir perfil de operador ou superior.
     
@@ -183,8 +212,8 @@ def require_operator(current_user: Usuario = Depends(get_current_active_user)) -
 
 def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_database)
-) -> Optional[Usuario]:
+    db: Session = Depends(get_read_db)
+) -> Optional[UsuarioAutenticado]:
     """
     Dependency para obter usuário atual (opcional).
     Não gera erro se não autenticado.
@@ -210,7 +239,7 @@ def get_current_user_optional(
         if user_id is None:
             return None
             
-        user = db.query(Usuario).filter(Usuario.id == user_id).first()
+        user = carregar_usuario_autenticado(db, user_id)
         if user and user.ativo:
             return user
             
@@ -223,7 +252,7 @@ def get_current_user_optional(
 # FUNÇÕES AUXILIARES
 # =======================================
 
-def check_user_permission(user: Usuario, required_permission: str) -> bool:
+def check_user_permission(user: UsuarioAutenticado, required_permission: str) -> bool:
     """
     Verificar se usuário tem permissão específica.
     
@@ -0,0 +1,201 @@
+"""
+SISTEMA ERP PRIMOTEX - SERVIÇO DE HASH DE SENHAS
+===============================================
+
+Hash de senhas com bcrypt (passlib) executado em um pool limitado de
+threads, para que rajadas de login não ocupem todas as threads dos
+handlers síncronos. O bcrypt libera o GIL durante o cálculo, então as
+threads do pool rodam em paralelo de fato.
+
+O custo (rounds) é calibrado na inicialização para a latência alvo.
+Hashes antigos (SHA-256 com salt fixo) e hashes bcrypt com custo menor
+que o calibrado continuam aceitos e são refeitos no próximo login bem
+sucedido (verificar_e_atualizar).
+
+Configuração:
+- PASSWORD_HASH_WORKERS: threads do pool (padrão: min(4, CPUs))
+- PASSWORD_HASH_TARGET_MS: latência alvo de um hash na calibração
+- PASSWORD_HASH_MIN_ROUNDS / PASSWORD_HASH_MAX_ROUNDS: limites do custo
+- PASSWORD_HASH_ROUNDS: custo fixo (ignora a calibração)
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import hashlib
+import hmac
+import logging
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+from passlib.hash import bcrypt as bcrypt_hash
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+PASSWORD_HASH_MIN_ROUNDS = int(os.getenv("PASSWORD_HASH_MIN_ROUNDS", "10"))
+PASSWORD_HASH_MAX_ROUNDS = int(os.getenv("PASSWORD_HASH_MAX_ROUNDS", "15"))
+PASSWORD_HASH_ROUNDS = os.getenv("PASSWORD_HASH_ROUNDS")
+
+# Formato antigo: SHA-256 hexadecimal de senha + salt fixo
+SALT_LEGADO = "primotex_salt_2025_secure_hash"
+_HASH_LEGADO = re.compile(r"^[0-9a-f]{64}$")
+
+# Custo usado para medir o bcrypt na calibração
+_ROUNDS_MEDICAO = 8
+
+
+def hash_legado(senha: str) -> str:
+    """Hash no formato antigo (mantido para verificar senhas não migradas)"""
+    return hashlib.sha256((senha + SALT_LEGADO).encode()).hexdigest()
+
+
+def is_hash_legado(hash_armazenado: str) -> bool:
+    """Verificar se o hash está no formato SHA-256 antigo"""
+    return bool(hash_armazenado) and _HASH_LEGADO.match(hash_armazenado) is not None
+
+
+def calcular_rounds(segundos_medidos: float, alvo_ms: float,
+                    minimo: int = PASSWORD_HASH_MIN_ROUNDS,
+                    maximo: int = PASSWORD_HASH_MAX_ROUNDS) -> int:
+    """
+    Maior custo bcrypt cuja latência estimada não passa do alvo.
+
+    Cada round a mais dobra o tempo, então o custo é estimado a partir de
+    uma medição com _ROUNDS_MEDICAO rounds.
+    """
+    if segundos_medidos <= 0:
+        return maximo
+    extra = math.floor(math.log2((alvo_ms / 1000.0) / segundos_medidos))
+    return max(minimo, min(maximo, _ROUNDS_MEDICAO + extra))
+
+
+class ServicoHashSenhas:
+    """
+    Hash e verificação de senhas em um pool de threads de tamanho fixo.
+
+    Os métodos são síncronos: quem chama (um handler no threadpool do
+    servidor) espera o resultado, e no máximo `workers` hashes rodam ao
+    mesmo tempo no processo.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, rounds: Optional[int] = None):
+        self.workers = max(1, workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Criação, submissão e encerramento do pool: um único executor por vez
+        self._lock_pool = threading.Lock()
+        if rounds is None:
+            rounds = int(PASSWORD_HASH_ROUNDS) if PASSWORD_HASH_ROUNDS else PASSWORD_HASH_MIN_ROUNDS
+        self.definir_rounds(rounds)
+
+    # ---------------------------------------
+    # Configuração
+    # ---------------------------------------
+
+    def definir_rounds(self, rounds: int) -> None:
+        """Usar `rounds` para novos hashes e refazer hashes com custo menor"""
+        self.rounds = rounds
+        self._contexto = CryptContext(
+            schemes=["bcrypt"],
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+        )
+
+    def calibrar(self, alvo_ms: float = PASSWORD_HASH_TARGET_MS) -> int:
+        """
+        Medir o bcrypt nesta máquina e ajustar o custo para a latência alvo.
+
+        Returns:
+            Custo (rounds) escolhido
+        """
+        if PASSWORD_HASH_ROUNDS:
+            return self.rounds
+
+        medidor = bcrypt_hash.using(rounds=_ROUNDS_MEDICAO)
+        medidor.hash("calibracao")  # carrega o backend
+        amostras = []
+        for _ in range(3):
+            inicio = time.perf_counter()
+            medidor.hash("calibracao")
+            amostras.append(time.perf_counter() - inicio)
+        medido = sorted(amostras)[1]
+
+        rounds = calcular_rounds(medido, alvo_ms)
+        self.definir_rounds(rounds)
+        logger.info(
+            "Custo do bcrypt calibrado: %d rounds (~%.0f ms por hash, alvo %.0f ms)",
+            rounds, medido * 1000 * 2 ** (rounds - _ROUNDS_MEDICAO), alvo_ms
+        )
+        return rounds
+
+    def _executar(self, funcao, *args):
+        """Rodar funcao(*args) no pool (criado no primeiro uso) e esperar o resultado"""
+        with self._lock_pool:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hash-senha"
+                )
+            futuro = self._executor.submit(funcao, *args)
+        return futuro.result()
+
+    def encerrar(self) -> None:
+        """Encerrar o pool (recriado sob demanda no próximo uso)"""
+        with self._lock_pool:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    # ---------------------------------------
+    # Operações
+    # ---------------------------------------
+
+    def hash(self, senha: str) -> str:
+        """Gerar o hash bcrypt da senha"""
+        contexto = self._contexto
+        return self._executar(contexto.hash, senha)
+
+    def verificar(self, senha: str, hash_armazenado: str) -> bool:
+        """Verificar a senha contra o hash armazenado (bcrypt ou legado)"""
+        if is_hash_legado(hash_armazenado):
+            return hmac.compare_digest(hash_legado(senha), hash_armazenado)
+
+        contexto = self._contexto
+        try:
+            return self._executar(contexto.verify, senha, hash_armazenado)
+        except (ValueError, TypeError):
+            # Hash vazio ou em formato desconhecido
+            return False
+
+    def verificar_e_atualizar(self, senha: str, hash_armazenado: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verificar a senha e, se válida, indicar um novo hash quando o
+        armazenado estiver no formato antigo ou com custo abaixo do atual.
+
+        Returns:
+            (senha_valida, novo_hash ou None)
+        """
+        if not hash_armazenado:
+            return False, None
+
+        if is_hash_legado(hash_armazenado):
+            if not hmac.compare_digest(hash_legado(senha), hash_armazenado):
+                return False, None
+            return True, self.hash(senha)
+
+        contexto = self._contexto
+        try:
+            return self._executar(contexto.verify_and_update, senha, hash_armazenado)
+        except (ValueError, TypeError):
+            # Hash em formato desconhecido
+            return False, None
+
+
+# Instância do processo usada por jwt_handler
+servico_hash = ServicoHashSenhas()
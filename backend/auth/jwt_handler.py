@@ -10,10 +10,13 @@ Data: 29/10/2025
 """
 
 import os
+import uuid
 import jwt
-import hashlib
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+from backend.auth.hash_senhas import servico_hash
+from backend.auth.revogacao import lista_revogacao
 
 # =======================================
 # CONFIGURAÇÕES
@@ -24,21 +27,6 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "primotex_secret_key_2025_dev")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 480  # 8 horas
 
-# =======================================
-# CONFIGURAÇÕES DE HASH SEGURO
-# =======================================
-
-# Salt para SHA256 (temporário até corrigir bcrypt)
-SECRET_SALT = "primotex_salt_2025_secure_hash"
-
-def _create_secure_hash(password: str) -> str:
-    """Cria hash seguro com SHA256 e salt"""
-    return hashlib.sha256((password + SECRET_SALT).encode()).hexdigest()
-
-def _verify_secure_hash(password: str, hash_stored: str) -> bool:
-    """Verifica hash SHA256"""
-    return _create_secure_hash(password) == hash_stored
-
 # =======================================
 # FUNÇÕES DE HASH DE SENHA
 # =======================================
@@ -46,7 +34,7 @@ def _verify_secure_hash(password: str, hash_stored: str) -> bool:
   
 def hash_password(password: str) -> str:
     """
-    Fazer hash da senha usando SHA256 seguro.
+    Fazer hash da senha com bcrypt (pool de hash de senhas).
     
     Args:
         password: Senha em texto plano
@@ -54,13 +42,15 @@ def hash_password(password: str) -> str:
     Returns:
         Hash da senha
     """
-    return _create_secure_hash(password)
+    return servico_hash.hash(password)
 
   
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verificar se a senha está correta.
     
+    Aceita hashes bcrypt e o formato SHA-256 antigo.
+    
     Args:
         plain_password: Senha em texto plano
         hashed_password: Hash da senha armazenada
@@ -68,7 +58,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True se a senha estiver correta
     """
-    return _verify_secure_hash(plain_password, hashed_password)
+    return servico_hash.verificar(plain_password, hashed_password)
+
+  
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar a senha e obter novo hash se o armazenado estiver desatualizado.
+    
+    Args:
+        plain_password: Senha em texto plano
+        hashed_password: Hash da senha armazenada
+        
+    Returns:
+        (senha correta, novo hash para gravar ou None)
+    """
+    return servico_hash.verificar_e_atualizar(plain_password, hashed_password)
 
 # =======================================
 # FUNÇÕES JWT
@@ -100,6 +106,8 @@ def create_access_token(
         )
     
     to_encode.update({"exp": expire, "iat": datetime.now(timezone.utc)})
+    # Identificador único, usado pela lista de revogação (logout)
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -113,11 +121,15 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
         token: Token JWT
         
     Returns:
-        Dados do token se válido, None se inválido
+        Dados do token se válido, None se inválido ou revogado
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         
+        # Verificar revogação (em memória, sem consulta ao banco)
+        if lista_revogacao.revogado(payload.get("jti")):
+            return None
+        
         # Verificar se o token não expirou
         exp = payload.get("exp")
         if exp and datetime.now(timezone.utc) > datetime.fromtimestamp(
@@ -129,7 +141,7 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
         
     except jwt.ExpiredSignatureError:
         return None
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         return None
 
   
@@ -221,9 +233,10 @@ def refresh_token(token: str) -> Optional[str]:
     if not payload:
         return None
     
-    # Remover timestamps antigos
+    # Remover timestamps e identificador antigos
     payload.pop("exp", None)
     payload.pop("iat", None)
+    payload.pop("jti", None)
     
     return create_access_token(payload)
 
@@ -0,0 +1,159 @@
+"""
+SISTEMA ERP PRIMOTEX - REVOGAÇÃO DE TOKENS JWT
+=============================================
+
+Lista de tokens revogados (claim jti) consultada por
+decode_access_token em toda requisição autenticada. A consulta é um
+acesso a dict em memória; cada entrada vale até o exp do próprio token
+e é descartada depois dele.
+
+A tabela tokens_revogados persiste a lista: ela é carregada na
+inicialização e relida de forma incremental (por id) em uma thread de
+fundo, para que um logout feito em um worker valha nos demais em até
+REVOGACAO_SYNC_SEGUNDOS.
+
+Tokens emitidos antes da introdução do jti não podem ser revogados e
+continuam válidos até expirar.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.models.user_model import TokenRevogado
+
+logger = logging.getLogger(__name__)
+
+REVOGACAO_SYNC_SEGUNDOS = float(os.getenv("REVOGACAO_SYNC_SEGUNDOS", "5"))
+
+# Intervalo entre remoções das entradas já expiradas da memória
+INTERVALO_LIMPEZA = 300.0
+
+
+class ListaRevogacao:
+    """
+    Conjunto jti -> exp em memória com expiração por entrada.
+
+    Leitura sem lock (um get em dict é atômico no CPython); escritas e
+    limpeza sob lock.
+    """
+
+    def __init__(self, relogio: Callable[[], float] = time.time):
+        self._relogio = relogio
+        self._revogados: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._ultimo_id = 0
+        self._proxima_limpeza = relogio() + INTERVALO_LIMPEZA
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+
+    def revogado(self, jti: Optional[str]) -> bool:
+        """Verificar se o token está revogado (sem acesso ao banco)"""
+        if not jti:
+            return False
+        exp = self._revogados.get(jti)
+        return exp is not None and exp > self._relogio()
+
+    def adicionar(self, jti: str, exp: float) -> None:
+        """Marcar o jti como revogado até `exp` (epoch, segundos)"""
+        agora = self._relogio()
+        with self._lock:
+            if exp > agora:
+                self._revogados[jti] = exp
+            if agora >= self._proxima_limpeza:
+                self._limpar(agora)
+
+    def _limpar(self, agora: float) -> None:
+        expirados = [jti for jti, exp in self._revogados.items() if exp <= agora]
+        for jti in expirados:
+            del self._revogados[jti]
+        self._proxima_limpeza = agora + INTERVALO_LIMPEZA
+
+    def __len__(self) -> int:
+        return len(self._revogados)
+
+    # ---------------------------------------
+    # Persistência
+    # ---------------------------------------
+
+    def revogar(self, db: Session, jti: str, exp: float, user_id: Optional[int] = None) -> None:
+        """
+        Revogar o token: grava em tokens_revogados e já vale neste processo.
+
+        Faz commit na sessão informada.
+        """
+        if not db.query(TokenRevogado.id).filter(TokenRevogado.jti == jti).first():
+            db.add(TokenRevogado(jti=jti, user_id=user_id, expira_em=int(exp)))
+            db.commit()
+        self.adicionar(jti, exp)
+
+    def sincronizar(self, db: Session) -> int:
+        """
+        Ler os tokens revogados gravados desde a última leitura.
+
+        Returns:
+            Quantidade de entradas lidas
+        """
+        agora = int(self._relogio())
+        linhas = db.query(TokenRevogado.id, TokenRevogado.jti, TokenRevogado.expira_em).filter(
+            TokenRevogado.id > self._ultimo_id,
+            TokenRevogado.expira_em > agora,
+        ).order_by(TokenRevogado.id).all()
+        for linha in linhas:
+            self.adicionar(linha.jti, linha.expira_em)
+        if linhas:
+            self._ultimo_id = max(self._ultimo_id, linhas[-1].id)
+        return len(linhas)
+
+    def carregar(self, db: Session) -> int:
+        """
+        Carregar a lista na inicialização, removendo do banco os expirados.
+
+        Returns:
+            Quantidade de tokens revogados ainda válidos
+        """
+        db.query(TokenRevogado).filter(
+            TokenRevogado.expira_em <= int(self._relogio())
+        ).delete(synchronize_session=False)
+        db.commit()
+        with self._lock:
+            self._revogados.clear()
+            self._ultimo_id = 0
+        return self.sincronizar(db)
+
+    def iniciar_sincronizacao(self, session_factory, intervalo: float = REVOGACAO_SYNC_SEGUNDOS) -> None:
+        """Reler a tabela a cada `intervalo` segundos em uma thread de fundo"""
+        if intervalo <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._parar.clear()
+
+        def _executar():
+            while not self._parar.wait(intervalo):
+                db = session_factory()
+                try:
+                    self.sincronizar(db)
+                except Exception as e:
+                    logger.warning(f"Falha ao sincronizar tokens revogados: {e}")
+                finally:
+                    db.close()
+
+        self._thread = threading.Thread(target=_executar, name="revogacao-jwt", daemon=True)
+        self._thread.start()
+
+    def parar_sincronizacao(self) -> None:
+        """Encerrar a thread de sincronização"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Instância do processo usada por jwt_handler e auth_router
+lista_revogacao = ListaRevogacao()
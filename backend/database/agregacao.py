@@ -0,0 +1,157 @@
+"""
+SISTEMA ERP PRIMOTEX - AGREGAÇÃO EM UMA CONSULTA
+===============================================
+
+Estatísticas e dashboards calculados com um único SELECT por tabela em
+vez de um count() por status/fase/prioridade/tipo.
+
+agregar() agrupa pelas colunas de dimensão (todas de baixa
+cardinalidade) e calcula, em cada grupo, o total de linhas, contagens
+condicionais (SUM(CASE WHEN ...)) e somas. As distribuições de cada
+dimensão, inclusive cruzadas ("fases das OS em aberto"), são montadas
+em Python a partir dessas poucas linhas.
+
+contar_varios() junta contagens simples de tabelas diferentes em um
+único SELECT de subconsultas escalares.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import case, func, literal_column, select
+from sqlalchemy.orm import Query, Session
+
+
+class ResultadoAgregacao:
+    """Linhas agrupadas por dimensão com contagens e somas de cada grupo"""
+
+    __slots__ = ("dimensoes", "grupos")
+
+    def __init__(self, dimensoes: List[str], grupos: List[dict]):
+        self.dimensoes = dimensoes
+        self.grupos = grupos
+
+    def _filtrar(self, onde: Optional[Mapping[str, Iterable]]) -> List[dict]:
+        if not onde:
+            return self.grupos
+        permitidos = {dimensao: set(valores) for dimensao, valores in onde.items()}
+        return [
+            grupo for grupo in self.grupos
+            if all(grupo[dimensao] in valores for dimensao, valores in permitidos.items())
+        ]
+
+    def total(self, onde: Optional[Mapping[str, Iterable]] = None) -> int:
+        """Total de linhas (opcionalmente só dos grupos em `onde`)"""
+        return sum(grupo["_total"] for grupo in self._filtrar(onde))
+
+    def contagem(self, nome: str, onde: Optional[Mapping[str, Iterable]] = None) -> int:
+        """Valor de uma contagem condicional"""
+        return sum(grupo[nome] or 0 for grupo in self._filtrar(onde))
+
+    def soma(self, nome: str, onde: Optional[Mapping[str, Iterable]] = None) -> Any:
+        """Valor de uma soma (None se nenhum grupo tiver valor)"""
+        valores = [grupo[nome] for grupo in self._filtrar(onde) if grupo[nome] is not None]
+        return sum(valores) if valores else None
+
+    def distribuicao(
+        self,
+        dimensao: str,
+        chaves: Optional[Iterable] = None,
+        rotulo: Optional[Callable[[Any], Any]] = None,
+        onde: Optional[Mapping[str, Iterable]] = None
+    ) -> Dict[Any, int]:
+        """
+        Quantidade de linhas por valor de uma dimensão.
+
+        Args:
+            dimensao: Nome da dimensão passada para agregar()
+            chaves: Chaves do resultado (preenchidas com 0). Se omitido,
+                usa os valores encontrados
+            rotulo: Converte o valor do banco na chave do resultado
+            onde: Restringe a outros valores de dimensão, ex.:
+                {"status": ["ABERTA", "EM_EXECUCAO"]}
+        """
+        contagens: Dict[Any, int] = {}
+        for grupo in self._filtrar(onde):
+            valor = grupo[dimensao]
+            chave = rotulo(valor) if rotulo else valor
+            contagens[chave] = contagens.get(chave, 0) + grupo["_total"]
+
+        if chaves is None:
+            return contagens
+        return {chave: contagens.get(chave, 0) for chave in chaves}
+
+
+def agregar(
+    query: Query,
+    dimensoes: Optional[Mapping[str, Any]] = None,
+    contagens: Optional[Mapping[str, Any]] = None,
+    somas: Optional[Mapping[str, Any]] = None
+) -> ResultadoAgregacao:
+    """
+    Executar todas as agregações de uma tabela em um único SELECT.
+
+    Args:
+        query: Query já filtrada (ex.: db.query(Modelo).filter(...))
+        dimensoes: {nome: coluna} para GROUP BY. Use só colunas de baixa
+            cardinalidade (status, fase, tipo...)
+        contagens: {nome: condição} contadas com SUM(CASE WHEN ...)
+        somas: {nome: expressão} somadas com SUM(...)
+
+    Example:
+        resultado = agregar(
+            db.query(OrdemServico),
+            dimensoes={"status": OrdemServico.status},
+            contagens={"hoje": OrdemServico.data_abertura >= inicio_hoje},
+            somas={"valor": OrdemServico.valor_final}
+        )
+        resultado.distribuicao("status")
+        resultado.contagem("hoje")
+    """
+    dimensoes = dict(dimensoes or {})
+    contagens = dict(contagens or {})
+    somas = dict(somas or {})
+
+    colunas = [coluna.label(f"d_{nome}") for nome, coluna in dimensoes.items()]
+    colunas.append(func.count(literal_column("*")).label("_total"))
+    colunas.extend(
+        func.sum(case((condicao, 1), else_=0)).label(f"c_{nome}")
+        for nome, condicao in contagens.items()
+    )
+    colunas.extend(func.sum(expressao).label(f"s_{nome}") for nome, expressao in somas.items())
+
+    consulta = query.order_by(None).with_entities(*colunas)
+    if dimensoes:
+        consulta = consulta.group_by(*dimensoes.values())
+
+    nomes = list(dimensoes) + ["_total"] + list(contagens) + list(somas)
+    grupos = [dict(zip(nomes, linha)) for linha in consulta.all()]
+    # Sem GROUP BY e sem linhas o SELECT devolve um grupo com total 0
+    grupos = [grupo for grupo in grupos if grupo["_total"]]
+    return ResultadoAgregacao(list(dimensoes), grupos)
+
+
+def contar_varios(db: Session, **consultas: Query) -> Dict[str, int]:
+    """
+    Contar várias queries (de tabelas diferentes) em um único SELECT.
+
+    Example:
+        contar_varios(
+            db,
+            templates=db.query(Template).filter(Template.ativo == True),
+            fila=db.query(Fila).filter(Fila.status == "PENDENTE")
+        )
+    """
+    if not consultas:
+        return {}
+    colunas = [
+        select(func.count())
+        .select_from(consulta.order_by(None).subquery())
+        .scalar_subquery()
+        .label(nome)
+        for nome, consulta in consultas.items()
+    ]
+    linha = db.execute(select(*colunas)).one()
+    return {nome: int(valor or 0) for nome, valor in zip(consultas, linha)}
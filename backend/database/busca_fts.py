@@ -0,0 +1,346 @@
+"""
+SISTEMA ERP PRIMOTEX - BUSCA TEXTUAL (SQLITE FTS5)
+=================================================
+
+Tabelas FTS5 espelhando clientes, fornecedores, produtos e ordens de
+serviço, mantidas por triggers no próprio banco. Substituem os filtros
+ilike('%termo%'), que obrigam a varrer a tabela inteira a cada busca.
+
+- Tokenizador unicode61 com remove_diacritics 2: "jose" encontra "José"
+- Índices de prefixo de 2 e 3 caracteres: cada palavra digitada casa
+  como prefixo ("cons" encontra "Construtora")
+- Documentos e telefones são indexados também só com os dígitos, então
+  tanto "123.456" quanto "123456" encontram o CPF
+- Ranking por bm25 com peso maior para nome/razão social
+
+Em bancos que não são SQLite as funções indicam que o FTS não está
+disponível e os routers continuam usando ilike. A existência das
+tabelas FTS fica em cache por engine; a ausência é reconferida a cada
+FTS_RECHECAGEM_SEGUNDOS, porque create_fts_tables pode rodar (pela
+linha de comando, em outro processo) com a API no ar.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import os
+import re
+import time
+import weakref
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import column, inspect, or_, text
+from sqlalchemy.engine import Connection, Engine
+
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+PREFIXOS = "2 3"
+
+# Intervalo para conferir de novo uma tabela FTS que não existia
+FTS_RECHECAGEM_SEGUNDOS = float(os.getenv("FTS_RECHECAGEM_SEGUNDOS", "30"))
+
+# engine -> {entidade: True (existe) ou instante da próxima conferência}
+_tabelas_fts: "weakref.WeakKeyDictionary[Engine, Dict[str, Union[bool, float]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _so_digitos(expressao: str) -> str:
+    """Expressão SQL que remove a pontuação usual de documentos/telefones"""
+    for caractere in (".", "-", "/", "(", ")", " "):
+        expressao = f"replace({expressao}, '{caractere}', '')"
+    return expressao
+
+
+def _com_digitos(coluna_sql: str) -> str:
+    """Valor original seguido da versão só com dígitos"""
+    valor = f"coalesce({coluna_sql}, '')"
+    return f"{valor} || ' ' || {_so_digitos(valor)}"
+
+
+class EntidadeFTS:
+    """Definição da tabela FTS de uma entidade"""
+
+    def __init__(
+        self,
+        tabela: str,
+        colunas: List[Tuple[str, str, float]],
+        titulo: str,
+        subtitulo: str
+    ):
+        """
+        Args:
+            tabela: Tabela de origem (rowid da FTS = id da origem)
+            colunas: (nome na FTS, expressão SQL com {r} para a linha, peso bm25)
+            titulo: Coluna da origem exibida como título na busca federada
+            subtitulo: Coluna da origem exibida como subtítulo
+        """
+        self.tabela = tabela
+        self.tabela_fts = f"{tabela}_fts"
+        self.colunas = colunas
+        self.titulo = titulo
+        self.subtitulo = subtitulo
+
+    @property
+    def colunas_origem(self) -> List[str]:
+        """Colunas da origem lidas pelas expressões (para o trigger de UPDATE)"""
+        nomes = set()
+        for _nome, expressao, _peso in self.colunas:
+            nomes.update(re.findall(r"\{r\}\.(\w+)", expressao))
+        return sorted(nomes)
+
+    def valores(self, linha: str) -> str:
+        return ", ".join(expr.format(r=linha) for _nome, expr, _peso in self.colunas)
+
+    def nomes(self) -> str:
+        return ", ".join(nome for nome, _expr, _peso in self.colunas)
+
+    def pesos(self) -> str:
+        return ", ".join(str(peso) for _nome, _expr, peso in self.colunas)
+
+
+ENTIDADES_FTS: Dict[str, EntidadeFTS] = {
+    "clientes": EntidadeFTS(
+        "clientes",
+        [
+            ("nome", "coalesce({r}.nome, '')", 10.0),
+            ("documento", _com_digitos("{r}.cpf_cnpj"), 5.0),
+            ("codigo", "coalesce({r}.codigo, '')", 5.0),
+            ("email", "coalesce({r}.email_principal, '')", 2.0),
+            ("telefone", _com_digitos("{r}.telefone_celular") + " || ' ' || "
+             + _com_digitos("{r}.telefone_fixo"), 2.0),
+            ("cidade", "coalesce({r}.endereco_cidade, '')", 1.0),
+        ],
+        titulo="nome",
+        subtitulo="cpf_cnpj"
+    ),
+    "fornecedores": EntidadeFTS(
+        "fornecedores",
+        [
+            ("razao_social", "coalesce({r}.razao_social, '')", 10.0),
+            ("nome_fantasia", "coalesce({r}.nome_fantasia, '')", 8.0),
+            ("documento", _com_digitos("{r}.cnpj_cpf"), 5.0),
+            ("email", "coalesce({r}.email, '')", 2.0),
+            ("contato", "coalesce({r}.contato_principal, '')", 2.0),
+            ("telefone", _com_digitos("{r}.telefone"), 1.0),
+        ],
+        titulo="razao_social",
+        subtitulo="cnpj_cpf"
+    ),
+    "produtos": EntidadeFTS(
+        "produtos",
+        [
+            ("descricao", "coalesce({r}.descricao, '')", 10.0),
+            ("codigo", "coalesce({r}.codigo, '')", 8.0),
+            ("codigo_barras", "coalesce({r}.codigo_barras, '')", 5.0),
+            ("categoria", "coalesce({r}.categoria, '') || ' ' || coalesce({r}.subcategoria, '')", 1.0),
+        ],
+        titulo="descricao",
+        subtitulo="codigo"
+    ),
+    "ordens_servico": EntidadeFTS(
+        "ordens_servico",
+        [
+            ("numero_os", "coalesce({r}.numero_os, '')", 10.0),
+            ("tipo_servico", "coalesce({r}.tipo_servico, '') || ' ' || coalesce({r}.categoria, '')", 3.0),
+            ("local", "coalesce({r}.endereco_execucao, '') || ' ' || coalesce({r}.cidade_execucao, '')", 2.0),
+            ("observacoes", "coalesce({r}.observacoes_abertura, '')", 1.0),
+        ],
+        titulo="numero_os",
+        subtitulo="tipo_servico"
+    ),
+}
+
+
+# =======================================
+# CRIAÇÃO E RECONSTRUÇÃO
+# =======================================
+
+def _ddl(entidade: EntidadeFTS) -> List[str]:
+    fts = entidade.tabela_fts
+    origem = entidade.tabela
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{entidade.nomes()}, tokenize='{TOKENIZADOR}', prefix='{PREFIXOS}')",
+
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {origem} BEGIN "
+        f"INSERT INTO {fts}(rowid, {entidade.nomes()}) VALUES (new.id, {entidade.valores('new')}); "
+        f"END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {origem} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = old.id; "
+        f"END",
+
+        # Só reindexa quando uma coluna indexada muda
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF "
+        f"{', '.join(entidade.colunas_origem)} ON {origem} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = old.id; "
+        f"INSERT INTO {fts}(rowid, {entidade.nomes()}) VALUES (new.id, {entidade.valores('new')}); "
+        f"END",
+    ]
+
+
+def _transacao(bind: Union[Engine, Connection]):
+    """Transação própria para Engine; conexões (migrações) usam a atual"""
+    if isinstance(bind, Connection):
+        return nullcontext(bind)
+    return bind.begin()
+
+
+def _reconstruir(conn: Connection, entidade: EntidadeFTS):
+    fts = entidade.tabela_fts
+    conn.exec_driver_sql(f"DELETE FROM {fts}")
+    conn.exec_driver_sql(
+        f"INSERT INTO {fts}(rowid, {entidade.nomes()}) "
+        f"SELECT id, {entidade.valores(entidade.tabela)} FROM {entidade.tabela}"
+    )
+
+
+def create_fts_tables(engine: Union[Engine, Connection]) -> List[str]:
+    """
+    Criar as tabelas FTS e os triggers que ainda não existem.
+
+    Tabelas FTS recém-criadas são populadas com o conteúdo atual da
+    origem. Em bancos que não são SQLite não faz nada.
+
+    Returns:
+        Lista com as tabelas FTS criadas
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+
+    _tabelas_fts.pop(engine.engine, None)
+    existentes = set(inspect(engine).get_table_names())
+    criadas = []
+    with _transacao(engine) as conn:
+        for entidade in ENTIDADES_FTS.values():
+            if entidade.tabela not in existentes:
+                continue
+            nova = entidade.tabela_fts not in existentes
+            for comando in _ddl(entidade):
+                conn.exec_driver_sql(comando)
+            if nova:
+                _reconstruir(conn, entidade)
+                criadas.append(entidade.tabela_fts)
+    return criadas
+
+
+def drop_fts_tables(engine: Union[Engine, Connection]):
+    """Remover tabelas FTS e triggers"""
+    if engine.dialect.name != "sqlite":
+        return
+    _tabelas_fts.pop(engine.engine, None)
+    with _transacao(engine) as conn:
+        for entidade in ENTIDADES_FTS.values():
+            fts = entidade.tabela_fts
+            for sufixo in ("ai", "ad", "au"):
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{sufixo}")
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+
+
+def rebuild_fts_tables(engine: Engine):
+    """Reconstruir o conteúdo de todas as tabelas FTS a partir da origem"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        for entidade in ENTIDADES_FTS.values():
+            _reconstruir(conn, entidade)
+
+
+# =======================================
+# CONSULTA
+# =======================================
+
+def expressao_match(termo: Optional[str]) -> Optional[str]:
+    """
+    Converter o texto digitado em uma expressão MATCH segura.
+
+    Cada palavra vira um prefixo entre aspas e todas precisam casar
+    ("joao silv" -> "joao"* "silv"*). Operadores FTS digitados pelo
+    usuário são tratados como texto.
+    """
+    if not termo:
+        return None
+    palavras = re.findall(r"\w+", termo, flags=re.UNICODE)
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+
+def fts_disponivel(db, entidade: str) -> bool:
+    """Verificar se a sessão usa SQLite e a tabela FTS da entidade existe"""
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    cache = _tabelas_fts.setdefault(bind.engine, {})
+    estado = cache.get(entidade)
+    if estado is True:
+        return True
+    agora = time.monotonic()
+    if estado is not None and agora < estado:
+        return False
+    existe = db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+        {"nome": ENTIDADES_FTS[entidade].tabela_fts}
+    ).first() is not None
+    # Só a existência fica em cache de vez; a ausência é reconferida
+    cache[entidade] = True if existe else agora + FTS_RECHECAGEM_SEGUNDOS
+    return existe
+
+
+def filtro_ids(entidade: str, termo: str):
+    """
+    Subconsulta com os ids que casam com o termo, para usar em
+    Modelo.id.in_(...).
+    """
+    fts = ENTIDADES_FTS[entidade].tabela_fts
+    return text(
+        f"SELECT rowid FROM {fts} WHERE {fts} MATCH :fts_{entidade}"
+    ).bindparams(**{f"fts_{entidade}": expressao_match(termo)}).columns(column("rowid"))
+
+
+def filtro_busca(db, entidade: str, modelo, termo: str, *colunas_ilike):
+    """
+    Condição de busca textual para as listagens.
+
+    Usa a tabela FTS quando disponível; caso contrário (outro banco ou
+    termo só com pontuação) volta ao ilike nas colunas informadas.
+
+    Args:
+        db: Sessão da requisição
+        entidade: Chave em ENTIDADES_FTS
+        modelo: Modelo da tabela de origem (usa modelo.id)
+        termo: Texto digitado
+        colunas_ilike: Colunas do fallback com ilike('%termo%')
+    """
+    if expressao_match(termo) and fts_disponivel(db, entidade):
+        return modelo.id.in_(filtro_ids(entidade, termo))
+    padrao = f"%{termo}%"
+    return or_(*(coluna.ilike(padrao) for coluna in colunas_ilike))
+
+
+def buscar(db, entidade: str, termo: str, limite: int = 5) -> List[dict]:
+    """
+    Melhores resultados de uma entidade, ordenados por bm25.
+
+    Returns:
+        Lista de {"id", "titulo", "subtitulo", "rank"}
+    """
+    expressao = expressao_match(termo)
+    if not expressao:
+        return []
+    definicao = ENTIDADES_FTS[entidade]
+    fts = definicao.tabela_fts
+    linhas = db.execute(
+        text(
+            f"SELECT o.id, o.{definicao.titulo}, o.{definicao.subtitulo}, "
+            f"bm25({fts}, {definicao.pesos()}) AS rank "
+            f"FROM {fts} JOIN {definicao.tabela} o ON o.id = {fts}.rowid "
+            f"WHERE {fts} MATCH :q ORDER BY rank LIMIT :limite"
+        ),
+        {"q": expressao, "limite": limite}
+    ).fetchall()
+    return [
+        {"id": linha[0], "titulo": linha[1], "subtitulo": linha[2], "rank": round(linha[3], 4)}
+        for linha in linhas
+    ]
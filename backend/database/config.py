@@ -10,10 +10,13 @@ Data: 29/10/2025
 """
 
 import os
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.pool import QueuePool
+from typing import Generator, Tuple
+
+from backend.database.instrumentacao import instrumentar_engine
 
 # =======================================
 # CONFIGURAÇÕES DO BANCO
@@ -34,20 +37,124 @@ else:
     connect_args = {}
     echo = False
 
+# Tamanho do threadpool que executa os handlers síncronos (def) do FastAPI.
+# Todos os endpoints que usam Session são declarados como "def" para que as
+# queries rodem fora do event loop do uvicorn.
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "40"))
+
+# Perfil de performance do SQLite (aplicado em toda nova conexão)
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+
+# Conexões de leitura dedicadas (listas, estatísticas, dashboards)
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+
+# Group commit: agrupa escritas pequenas e concorrentes em uma transação
+DB_GROUP_COMMIT = os.getenv("DB_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+DB_GROUP_COMMIT_MAX_LOTE = int(os.getenv("DB_GROUP_COMMIT_MAX_LOTE", "64"))
+
 # =======================================
 # CONFIGURAÇÃO DO SQLAlchemy
 # =======================================
 
-# Criar engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args=connect_args,
-    echo=echo  # Log das queries SQL em desenvolvimento
-)
+def _aplicar_pragmas_sqlite(dbapi_connection, somente_leitura: bool = False):
+    """
+    Aplicar o perfil de performance em uma conexão SQLite.
+
+    WAL permite que leitores avancem enquanto o escritor grava;
+    synchronous=NORMAL (padrão) é seguro em WAL e evita um fsync por
+    commit. Use SQLITE_SYNCHRONOUS=FULL para durabilidade a cada commit.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if somente_leitura:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def create_sqlite_engines(
+    url: str,
+    read_pool_size: int = DB_READ_POOL_SIZE,
+    echo_sql: bool = False
+) -> Tuple:
+    """
+    Criar o par de engines SQLite: um escritor único e serializado
+    (pool de 1 conexão) e um pool de leitores somente leitura.
+
+    Args:
+        url: URL SQLAlchemy do arquivo SQLite
+        read_pool_size: Número de conexões de leitura
+        echo_sql: Log das queries SQL
+
+    Returns:
+        Tupla (engine_escrita, engine_leitura)
+    """
+    # Espera pela conexão do escritor um pouco além do busy_timeout
+    pool_timeout = SQLITE_BUSY_TIMEOUT_MS / 1000 * 6
+
+    writer = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=pool_timeout,
+        echo=echo_sql
+    )
+    reader = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=max(1, read_pool_size),
+        max_overflow=0,
+        pool_timeout=pool_timeout,
+        echo=echo_sql
+    )
+
+    event.listen(
+        writer, "connect",
+        lambda conn, record: _aplicar_pragmas_sqlite(conn)
+    )
+    event.listen(
+        reader, "connect",
+        lambda conn, record: _aplicar_pragmas_sqlite(conn, somente_leitura=True)
+    )
+    return instrumentar_engine(writer), instrumentar_engine(reader)
+
+
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    # Escritor serializado + leitores em WAL
+    engine, read_engine = create_sqlite_engines(
+        SQLALCHEMY_DATABASE_URL, echo_sql=echo  # Log das queries SQL em desenvolvimento
+    )
+else:
+    # Pool de conexões para PostgreSQL (leitura e escrita no mesmo engine)
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args=connect_args,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,
+        echo=echo
+    )
+    instrumentar_engine(engine)
+    read_engine = engine
 
 # SessionLocal para criar sessões do banco
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessões somente leitura (listas, estatísticas, dashboards)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 # Base para os modelos
 Base = declarative_base()
 
@@ -73,6 +180,19 @@ def get_db() -> Generator:
         db.close()
 
 
+def get_read_db() -> Generator:
+    """
+    Dependency injection para obter sessão somente leitura.
+    Usado nos endpoints GET (listas, estatísticas, dashboards) para não
+    disputar a conexão do escritor.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def get_database() -> Generator:
     """
     Dependency injection para obter sessão do banco de dados.
@@ -111,29 +231,36 @@ def init_database():
         print(f"❌ Erro ao inicializar banco de dados: {e}")
         return False
 
+def configure_threadpool(size: int = DB_THREADPOOL_SIZE) -> int:
+    """
+    Ajustar o limite do threadpool usado pelo FastAPI/Starlette para
+    executar handlers e dependências síncronas.
+
+    Deve ser chamado dentro do event loop (evento de startup).
+
+    Args:
+        size: Número máximo de threads simultâneas
+
+    Returns:
+        Limite configurado
+    """
+    from anyio import to_thread
+
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(1, size)
+    return limiter.total_tokens
+
 def get_database_info():
     """Obter informações sobre o banco de dados atual"""
     return {
         "url": SQLALCHEMY_DATABASE_URL,
         "environment": ENVIRONMENT,
         "engine": str(engine.url),
-        "echo": echo
+        "echo": echo,
+        "threadpool_size": DB_THREADPOOL_SIZE,
+        "read_pool_size": read_engine.pool.size() if read_engine is not engine else 0
     }
 
-# =======================================
-# CONFIGURAÇÕES DE CONEXÃO
-# =======================================
-
-# Pool de conexões para PostgreSQL
-if ENVIRONMENT == "production":
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
-        pool_recycle=3600,
-        echo=False
-    )
-
 # =======================================
 # BACKUP E RESTAURAÇÃO (FUTURO)
 # =======================================
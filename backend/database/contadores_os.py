@@ -0,0 +1,240 @@
+"""
+SISTEMA ERP PRIMOTEX - CONTADORES INCREMENTAIS DAS OS
+====================================================
+
+Mantém a tabela os_contadores (quantidade e valor_final por status,
+fase e prioridade) em sincronia com ordens_servico. O dashboard lê os
+totais em uma consulta pequena, sem varrer as OS a cada atualização.
+
+Os deltas são calculados no after_flush de qualquer Session e gravados
+na mesma transação da alteração da OS: criar, atualizar, mudar de fase
+e excluir (por qualquer rota ou pelo group commit) mantêm os contadores
+corretos, e um rollback desfaz os dois juntos. As colunas monitoradas
+usam active_history para que o valor anterior seja conhecido mesmo
+quando a OS é alterada depois de um commit (atributos expirados); o
+listener e o comando administrativo vêm de totais_incrementais.
+
+Uso administrativo:
+    python -m backend.database.contadores_os --verificar
+    python -m backend.database.contadores_os --reconstruir
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import logging
+import sys
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from backend.database import totais_incrementais
+from backend.database.agregacao import ResultadoAgregacao, agregar
+from backend.database.totais_incrementais import alterado, incrementar, valores_anteriores
+from backend.models.ordem_servico_model import ContadorOS, OrdemServico
+
+logger = logging.getLogger(__name__)
+
+# Colunas da OS que alteram os contadores
+CAMPOS_CHAVE = ("status", "fase_atual", "prioridade")
+CAMPOS_MONITORADOS = CAMPOS_CHAVE + ("valor_final",)
+
+Chave = Tuple[str, int, str]
+
+_tabela = ContadorOS.__table__
+
+
+def _chave(status, fase_atual, prioridade) -> Chave:
+    return (status, fase_atual, prioridade or "")
+
+
+def _valor(valor) -> Decimal:
+    return Decimal(str(valor)) if valor is not None else Decimal("0")
+
+
+# =======================================
+# DELTAS NO FLUSH
+# =======================================
+
+def _calcular_deltas(session: Session) -> Dict[Chave, List]:
+    deltas: Dict[Chave, List] = {}
+
+    def acumular(chave: Chave, quantidade: int, valor: Decimal):
+        atual = deltas.setdefault(chave, [0, Decimal("0")])
+        atual[0] += quantidade
+        atual[1] += valor
+
+    for obj in session.new:
+        if isinstance(obj, OrdemServico):
+            acumular(_chave(obj.status, obj.fase_atual, obj.prioridade), 1, _valor(obj.valor_final))
+
+    for obj in session.deleted:
+        if isinstance(obj, OrdemServico):
+            antes = valores_anteriores(obj, CAMPOS_MONITORADOS)
+            acumular(
+                _chave(antes["status"], antes["fase_atual"], antes["prioridade"]),
+                -1, -_valor(antes["valor_final"])
+            )
+
+    for obj in session.dirty:
+        if not isinstance(obj, OrdemServico) or not alterado(obj, CAMPOS_MONITORADOS):
+            continue
+        antes = valores_anteriores(obj, CAMPOS_MONITORADOS)
+        acumular(
+            _chave(antes["status"], antes["fase_atual"], antes["prioridade"]),
+            -1, -_valor(antes["valor_final"])
+        )
+        acumular(_chave(obj.status, obj.fase_atual, obj.prioridade), 1, _valor(obj.valor_final))
+
+    return {
+        chave: delta for chave, delta in deltas.items()
+        if delta[0] != 0 or delta[1] != 0
+    }
+
+
+def _aplicar_deltas(conn: Connection, deltas: Dict[Chave, List]):
+    """
+    Upsert incremental por combinação: duas transações criando a mesma
+    (status, fase, prioridade) somam na mesma linha em vez de violar
+    uq_os_contadores_chave (PostgreSQL, sem escritor único)
+    """
+    for (status, fase_atual, prioridade), (quantidade, valor) in sorted(deltas.items(), key=str):
+        incrementar(
+            conn, _tabela,
+            {"status": status, "fase_atual": fase_atual, "prioridade": prioridade},
+            {"quantidade": quantidade, "valor_final": valor}
+        )
+
+
+# Alterações de OS de cada flush aplicadas nos contadores
+_atualizar_contadores = totais_incrementais.monitorar(
+    OrdemServico, CAMPOS_MONITORADOS, _calcular_deltas, _aplicar_deltas
+)
+
+
+# =======================================
+# LEITURA
+# =======================================
+
+def ler_contadores(db: Session) -> ResultadoAgregacao:
+    """
+    Contadores no mesmo formato de agregar() com as dimensões status,
+    fase e prioridade e a soma "valor" (valor_final).
+    """
+    linhas = db.query(
+        ContadorOS.status, ContadorOS.fase_atual, ContadorOS.prioridade,
+        ContadorOS.quantidade, ContadorOS.valor_final
+    ).filter(ContadorOS.quantidade > 0).all()
+    grupos = [
+        {
+            "status": status,
+            "fase": fase_atual,
+            "prioridade": prioridade or None,
+            "_total": quantidade,
+            "valor": valor,
+        }
+        for status, fase_atual, prioridade, quantidade, valor in linhas
+    ]
+    return ResultadoAgregacao(["status", "fase", "prioridade"], grupos)
+
+
+# =======================================
+# RECONSTRUÇÃO E VERIFICAÇÃO
+# =======================================
+
+def _recontar(db: Session) -> Dict[Chave, Tuple[int, Decimal]]:
+    resultado = agregar(
+        db.query(OrdemServico),
+        dimensoes={
+            "status": OrdemServico.status,
+            "fase": OrdemServico.fase_atual,
+            "prioridade": OrdemServico.prioridade,
+        },
+        somas={"valor": OrdemServico.valor_final}
+    )
+    contagem: Dict[Chave, Tuple[int, Decimal]] = {}
+    for grupo in resultado.grupos:
+        chave = _chave(grupo["status"], grupo["fase"], grupo["prioridade"])
+        quantidade, valor = contagem.get(chave, (0, Decimal("0")))
+        contagem[chave] = (quantidade + grupo["_total"], valor + _valor(grupo["valor"]))
+    return contagem
+
+
+def verificar_contadores(db: Session) -> List[str]:
+    """
+    Comparar os contadores com uma recontagem completa das OS.
+
+    Returns:
+        Lista de divergências (vazia se tudo confere)
+    """
+    esperado = _recontar(db)
+    gravado = {
+        _chave(c.status, c.fase_atual, c.prioridade): (c.quantidade, _valor(c.valor_final))
+        for c in db.query(ContadorOS).filter(
+            (ContadorOS.quantidade != 0) | (ContadorOS.valor_final != 0)
+        )
+    }
+    divergencias = []
+    for chave in sorted(set(esperado) | set(gravado), key=str):
+        quantidade_esperada, valor_esperado = esperado.get(chave, (0, Decimal("0")))
+        quantidade_gravada, valor_gravado = gravado.get(chave, (0, Decimal("0")))
+        if quantidade_esperada != quantidade_gravada or abs(valor_esperado - valor_gravado) >= Decimal("0.01"):
+            divergencias.append(
+                f"{chave}: contador={quantidade_gravada}/{valor_gravado} "
+                f"recontagem={quantidade_esperada}/{valor_esperado}"
+            )
+    return divergencias
+
+
+def reconstruir_contadores(db: Session) -> int:
+    """
+    Apagar e recalcular os contadores a partir de ordens_servico.
+
+    Não faz commit. Returns: número de combinações gravadas.
+    """
+    db.query(ContadorOS).delete(synchronize_session=False)
+    contagem = _recontar(db)
+    for (status, fase_atual, prioridade), (quantidade, valor) in contagem.items():
+        db.add(ContadorOS(
+            status=status, fase_atual=fase_atual, prioridade=prioridade,
+            quantidade=quantidade, valor_final=valor
+        ))
+    db.flush()
+    return len(contagem)
+
+
+def sincronizar_contadores(engine: Engine) -> bool:
+    """
+    Conferir os contadores no startup e reconstruir se divergirem
+    (tabela recém-criada em banco existente, edição manual do banco).
+
+    Returns:
+        True se foi preciso reconstruir
+    """
+    return totais_incrementais.sincronizar(engine, verificar_contadores, reconstruir_contadores)
+
+
+# =======================================
+# LINHA DE COMANDO
+# =======================================
+
+def main(argv=None, fabrica_sessao=None) -> int:
+    """
+    Verificar (e opcionalmente reconstruir) os contadores.
+
+    Returns:
+        0 se os contadores conferem, 1 se há divergências
+    """
+    return totais_incrementais.main(
+        argv, fabrica_sessao, "Contadores das ordens de serviço",
+        verificar_contadores, reconstruir_contadores,
+        ajuda_reconstruir="Recalcular e conferir",
+        reconstruido="Contadores reconstruídos: {} combinações",
+        confere="Contadores conferem com a recontagem",
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+SISTEMA ERP PRIMOTEX - TABELAS ESCRITAS POR TRANSAÇÃO
+====================================================
+
+Rastreador único, no nível do Engine, das tabelas alteradas em cada
+transação. Usado pelas versões das tabelas (ETag), pela invalidação do
+cache em memória e pelo cache de resultados do DatabaseOptimizer.
+
+As escritas são observadas no before_cursor_execute de qualquer Engine,
+pelo texto da instrução: ORM (flush), bulk_insert_mappings, Core, SQL
+textual e group commit passam por ele. As tabelas são entregues em dois
+momentos:
+
+- no_commit: no evento commit, ainda na transação, antes do COMMIT do
+  DBAPI (versoes_tabelas incrementa as versões junto com os dados)
+- apos_commit: depois do COMMIT do DBAPI, quando a conexão volta ao
+  pool (a Session e o engine.begin() a devolvem logo após o commit) ou
+  no próximo begin da mesma conexão, o que vier primeiro. Caches só
+  podem ser invalidados aqui: antes disso um leitor ainda enxerga os
+  dados antigos no snapshot do WAL e os guardaria de novo.
+
+Um rollback descarta as tabelas da transação.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import logging
+import re
+import threading
+from typing import Callable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+_RE_ESCRITA = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)'
+    r'\s+["`\[]?([A-Za-z_][A-Za-z0-9_]*)',
+    re.IGNORECASE
+)
+_PREFIXOS_ESCRITA = ("INSERT", "UPDATE", "DELETE", "REPLAC")
+
+# Chaves em Connection.info (info do registro da conexão no pool)
+_CHAVE_TRANSACAO = "escritas.transacao"
+_CHAVE_CONFIRMADAS = "escritas.confirmadas"
+
+_no_commit: Tuple[Callable[[Connection, Set[str]], None], ...] = ()
+_apos_commit: Tuple[Callable[[Set[str]], None], ...] = ()
+_lock = threading.Lock()
+
+
+def tabela_escrita(sql: str) -> Optional[str]:
+    """Tabela alterada por um INSERT/UPDATE/DELETE, ou None"""
+    if sql.lstrip()[:6].upper() not in _PREFIXOS_ESCRITA:
+        return None
+    encontrado = _RE_ESCRITA.match(sql)
+    return encontrado.group(1).lower() if encontrado else None
+
+
+def no_commit(callback: Callable[[Connection, Set[str]], None]) -> Callable:
+    """
+    Registrar callback(conn, tabelas) chamado dentro da transação, antes
+    do COMMIT do DBAPI. Escritas feitas pelo callback entram na mesma
+    transação. Pode ser usado como decorador.
+    """
+    global _no_commit
+    with _lock:
+        _no_commit = _no_commit + (callback,)
+    return callback
+
+
+def apos_commit(callback: Callable[[Set[str]], None]) -> Callable:
+    """
+    Registrar callback(tabelas) chamado depois do COMMIT do DBAPI. Erros
+    do callback são registrados no log e não chegam a quem fez o commit.
+    Pode ser usado como decorador.
+    """
+    global _apos_commit
+    with _lock:
+        _apos_commit = _apos_commit + (callback,)
+    return callback
+
+
+def _entregar(tabelas: Optional[Set[str]]) -> None:
+    if not tabelas:
+        return
+    for callback in _apos_commit:
+        try:
+            callback(tabelas)
+        except Exception as e:
+            # O commit já aconteceu: uma falha aqui não pode virar erro da requisição
+            logger.warning(f"Falha ao notificar escritas em {sorted(tabelas)}: {e}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _registrar_escrita(conn, cursor, statement, parameters, context, executemany):
+    tabela = tabela_escrita(statement)
+    if tabela is not None:
+        conn.info.setdefault(_CHAVE_TRANSACAO, set()).add(tabela)
+
+
+@event.listens_for(Engine, "begin")
+def _entregar_no_begin(conn: Connection):
+    # Commit anterior nesta conexão ainda não entregue (conexão mantida fora do pool)
+    _entregar(conn.info.pop(_CHAVE_CONFIRMADAS, None))
+
+
+@event.listens_for(Engine, "commit")
+def _confirmar(conn: Connection):
+    tabelas = conn.info.get(_CHAVE_TRANSACAO)
+    if tabelas:
+        for callback in _no_commit:
+            callback(conn, tabelas)
+    # Inclui as escritas feitas pelos callbacks acima
+    tabelas = conn.info.pop(_CHAVE_TRANSACAO, None)
+    if tabelas:
+        conn.info.setdefault(_CHAVE_CONFIRMADAS, set()).update(tabelas)
+
+
+@event.listens_for(Engine, "rollback")
+def _descartar(conn: Connection):
+    conn.info.pop(_CHAVE_TRANSACAO, None)
+
+
+@event.listens_for(Pool, "checkin")
+def _entregar_no_checkin(dbapi_connection, connection_record):
+    if connection_record is not None:
+        _entregar(connection_record.info.pop(_CHAVE_CONFIRMADAS, None))
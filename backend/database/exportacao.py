@@ -0,0 +1,271 @@
+"""
+SISTEMA ERP PRIMOTEX - EXPORTAÇÃO EM FLUXO (CSV / NDJSON / XLSX)
+===============================================================
+
+As listagens são exportadas sem carregar o resultado inteiro: a query
+filtrada é lida em lotes com yield_per (somente as colunas exportadas,
+sem montar objetos ORM) e cada lote é serializado e enviado ao cliente
+antes de o próximo ser buscado. A memória usada é a de um lote,
+qualquer que seja o número de linhas.
+
+Formatos:
+- csv: separador ';' e BOM UTF-8 (abre direto no Excel em português);
+  o arquivo pode ser reimportado por backend.database.importacao
+- ndjson: um objeto JSON por linha
+- xlsx: planilha gerada com zipfile em modo fluxo (strings inline, sem
+  dependência externa e sem arquivo temporário)
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import csv
+import enum
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy.orm import Query
+from starlette.responses import StreamingResponse
+
+FORMATO_CSV = "csv"
+FORMATO_NDJSON = "ndjson"
+FORMATO_XLSX = "xlsx"
+FORMATOS_EXPORTACAO = (FORMATO_CSV, FORMATO_NDJSON, FORMATO_XLSX)
+FORMATOS_EXPORTACAO_REGEX = f"^({'|'.join(FORMATOS_EXPORTACAO)})$"
+
+# Linhas buscadas por ida ao banco e serializadas por pedaço enviado
+TAMANHO_LOTE_EXPORTACAO = 1000
+
+TIPOS_CONTEUDO = {
+    FORMATO_CSV: "text/csv; charset=utf-8",
+    FORMATO_NDJSON: "application/x-ndjson",
+    FORMATO_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Descrição do parâmetro de query compartilhado pelos routers
+FORMATO_EXPORTACAO_DESC = "Formato do arquivo: csv, ndjson ou xlsx"
+
+# Caracteres de controle não permitidos em XML 1.0
+_CONTROLE_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+# =======================================
+# LEITURA EM LOTES
+# =======================================
+
+def ler_lotes(
+    query: Query,
+    colunas: Sequence,
+    tamanho_lote: int = TAMANHO_LOTE_EXPORTACAO
+) -> Iterator[List[Tuple]]:
+    """
+    Ler a query filtrada em lotes de tuplas.
+
+    Args:
+        query: Query já filtrada e ordenada
+        colunas: Atributos do modelo a exportar
+        tamanho_lote: Linhas por lote (yield_per)
+    """
+    resultado = query.with_entities(*colunas).yield_per(tamanho_lote)
+    lote = []
+    for linha in resultado:
+        lote.append(tuple(linha))
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _valor_simples(valor: Any) -> Any:
+    """Valor de coluna convertido para tipo nativo serializável"""
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+def _valor_csv(valor: Any) -> Any:
+    """Valor de coluna no texto do CSV (Decimal sem perda de casas)"""
+    if valor is None:
+        return ""
+    if isinstance(valor, Decimal):
+        return valor
+    return _valor_simples(valor)
+
+
+# =======================================
+# SERIALIZADORES
+# =======================================
+
+def gerar_csv(cabecalhos: Sequence[str], lotes: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """CSV com ';' e BOM; cada lote vira um pedaço da resposta"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=";", lineterminator="\n")
+    escritor.writerow(cabecalhos)
+    yield buffer.getvalue().encode("utf-8-sig")
+
+    for lote in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        for linha in lote:
+            escritor.writerow(map(_valor_csv, linha))
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gerar_ndjson(cabecalhos: Sequence[str], lotes: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """Um objeto JSON por linha"""
+    codificador = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for lote in lotes:
+        yield "".join(
+            codificador.encode(dict(zip(cabecalhos, map(_valor_simples, linha)))) + "\n"
+            for linha in lote
+        ).encode("utf-8")
+
+
+class _SaidaZip:
+    """Destino não posicionável do zipfile: acumula bytes até serem drenados"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados: bytes) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def drenar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+_XLSX_ARQUIVOS_FIXOS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Dados" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _celula_xlsx(valor: Any) -> str:
+    valor = _valor_simples(valor)
+    if valor is None:
+        return "<c/>"
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float)):
+        return f"<c><v>{valor!r}</v></c>"
+    texto = escape(_CONTROLE_XML.sub("", str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _linha_xlsx(valores: Iterable[Any]) -> str:
+    return "<row>" + "".join(map(_celula_xlsx, valores)) + "</row>"
+
+
+def gerar_xlsx(cabecalhos: Sequence[str], lotes: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """
+    Planilha XLSX mínima (uma aba) escrita em fluxo.
+
+    O zipfile grava em um destino não posicionável (descritores de dados
+    após cada entrada) e o buffer é drenado a cada lote, então nada além
+    do lote atual e do nível de compressão fica em memória.
+    """
+    saida = _SaidaZip()
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome, conteudo in _XLSX_ARQUIVOS_FIXOS.items():
+            arquivo_zip.writestr(nome, conteudo)
+        yield saida.drenar()
+
+        with arquivo_zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as planilha:
+            planilha.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetData>' + _linha_xlsx(cabecalhos)
+            ).encode("utf-8"))
+            for lote in lotes:
+                planilha.write("".join(map(_linha_xlsx, lote)).encode("utf-8"))
+                yield saida.drenar()
+            planilha.write(b"</sheetData></worksheet>")
+    yield saida.drenar()
+
+
+GERADORES = {
+    FORMATO_CSV: gerar_csv,
+    FORMATO_NDJSON: gerar_ndjson,
+    FORMATO_XLSX: gerar_xlsx,
+}
+
+
+# =======================================
+# RESPOSTA HTTP
+# =======================================
+
+def exportar(
+    query: Query,
+    colunas: Sequence,
+    formato: str,
+    nome_arquivo: str,
+    tamanho_lote: int = TAMANHO_LOTE_EXPORTACAO
+) -> StreamingResponse:
+    """
+    Resposta em fluxo com a listagem filtrada.
+
+    A sessão da query precisa continuar aberta enquanto a resposta é
+    enviada (dependências get_db/get_read_db só fecham a sessão depois
+    do envio).
+
+    Args:
+        query: Query filtrada e ordenada, como a do endpoint de listagem
+        colunas: Atributos do modelo exportados (cabeçalho = nome da coluna)
+        formato: csv, ndjson ou xlsx
+        nome_arquivo: Nome sem extensão sugerido no download
+        tamanho_lote: Linhas por lote
+    """
+    cabecalhos = [coluna.key for coluna in colunas]
+    corpo = GERADORES[formato](cabecalhos, ler_lotes(query, colunas, tamanho_lote))
+    return StreamingResponse(
+        corpo,
+        media_type=TIPOS_CONTEUDO[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}.{formato}"'}
+    )
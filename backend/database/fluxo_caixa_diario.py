@@ -0,0 +1,444 @@
+"""
+SISTEMA ERP PRIMOTEX - FLUXO DE CAIXA DIÁRIO INCREMENTAL
+=======================================================
+
+Mantém a tabela fluxo_caixa (uma linha por dia) em sincronia com
+movimentacoes_financeiras: entradas e saídas realizadas, resultado,
+saldo inicial/final acumulados e o detalhamento por categoria.
+
+Como em contadores_os (base comum em totais_incrementais), os deltas
+de cada flush (movimentação criada, alterada, desativada por soft
+delete ou excluída, inclusive as geradas pela baixa/pagamento de
+contas) são gravados na mesma transação. Os resumos de período passam
+a ser uma leitura por faixa de datas nas linhas diárias, sem SUM sobre
+as movimentações.
+
+Os valores numéricos são somados no próprio UPDATE; o detalhamento por
+categoria (JSON) é lido e regravado, então a linha do dia é criada por
+INSERT ... ON CONFLICT DO NOTHING e lida com SELECT ... FOR UPDATE: no
+PostgreSQL duas movimentações concorrentes no mesmo dia se serializam
+nessa linha e nenhum delta de categoria se perde.
+
+Uso administrativo (backfill / reconstrução):
+    python -m backend.database.fluxo_caixa_diario --verificar
+    python -m backend.database.fluxo_caixa_diario --reconstruir
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import logging
+import sys
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from backend.database import totais_incrementais
+from backend.database.totais_incrementais import alterado, inserir_se_ausente, valores_anteriores
+from backend.models.financeiro_model import FluxoCaixa, MovimentacaoFinanceira
+
+logger = logging.getLogger(__name__)
+
+# Valores de tipo_movimentacao (modelo e schemas usam vocabulários diferentes)
+TIPOS_ENTRADA = frozenset({"entrada", "receita"})
+TIPOS_SAIDA = frozenset({"saída", "saida", "despesa"})
+
+PERIODO_DIARIO = "Diário"
+CATEGORIA_PADRAO = "Sem categoria"
+
+# Colunas da movimentação que alteram o fluxo de caixa
+CAMPOS_MONITORADOS = (
+    "tipo_movimentacao", "categoria_movimentacao", "valor", "data_movimentacao", "ativo"
+)
+
+ZERO = Decimal("0.00")
+
+# (dia, "entrada" | "saida", categoria)
+Chave = Tuple[date, str, str]
+
+_tabela = FluxoCaixa.__table__
+
+
+def _sentido(tipo_movimentacao: Optional[str]) -> Optional[str]:
+    """"entrada", "saida" ou None (transferências não alteram o saldo)"""
+    tipo = (tipo_movimentacao or "").strip().lower()
+    if tipo in TIPOS_ENTRADA:
+        return "entrada"
+    if tipo in TIPOS_SAIDA:
+        return "saida"
+    return None
+
+
+def _dia(valor) -> Optional[date]:
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if isinstance(valor, str) and valor:
+        return date.fromisoformat(valor[:10])
+    return None
+
+
+def _decimal(valor) -> Decimal:
+    return Decimal(str(valor)) if valor is not None else ZERO
+
+
+def _inicio_do_dia(dia: date) -> datetime:
+    return datetime.combine(dia, time.min)
+
+
+def _contribuicao(valores: dict) -> Optional[Tuple[Chave, Decimal]]:
+    """Chave e valor com que uma movimentação entra no fluxo (None se não entra)"""
+    if valores["ativo"] is False:
+        return None
+    sentido = _sentido(valores["tipo_movimentacao"])
+    dia = _dia(valores["data_movimentacao"])
+    if sentido is None or dia is None:
+        return None
+    categoria = valores["categoria_movimentacao"] or CATEGORIA_PADRAO
+    return (dia, sentido, categoria), _decimal(valores["valor"])
+
+
+def _valores_atuais(mov: MovimentacaoFinanceira) -> dict:
+    return {campo: getattr(mov, campo) for campo in CAMPOS_MONITORADOS}
+
+
+# =======================================
+# DELTAS NO FLUSH
+# =======================================
+
+def _calcular_deltas(session: Session) -> Dict[Chave, Decimal]:
+    deltas: Dict[Chave, Decimal] = {}
+
+    def acumular(valores: dict, sinal: int):
+        contribuicao = _contribuicao(valores)
+        if contribuicao:
+            chave, valor = contribuicao
+            deltas[chave] = deltas.get(chave, ZERO) + sinal * valor
+
+    for obj in session.new:
+        if isinstance(obj, MovimentacaoFinanceira):
+            acumular(_valores_atuais(obj), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, MovimentacaoFinanceira):
+            acumular(valores_anteriores(obj, CAMPOS_MONITORADOS), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, MovimentacaoFinanceira) or not alterado(obj, CAMPOS_MONITORADOS):
+            continue
+        acumular(valores_anteriores(obj, CAMPOS_MONITORADOS), -1)
+        acumular(_valores_atuais(obj), 1)
+
+    return {chave: delta for chave, delta in deltas.items() if delta != 0}
+
+
+def _somar_detalhamento(detalhamento: Optional[dict], deltas: Dict[str, Decimal]) -> dict:
+    """Aplicar deltas por categoria ao JSON de detalhamento (remove zeros)"""
+    resultado = dict(detalhamento or {})
+    for categoria, delta in deltas.items():
+        total = _decimal(resultado.get(categoria)) + delta
+        if total == 0:
+            resultado.pop(categoria, None)
+        else:
+            resultado[categoria] = float(total)
+    return resultado
+
+
+def _linha_do_dia(referencia: datetime):
+    """SELECT da linha do dia com trava (FOR UPDATE; ignorado no SQLite)"""
+    return (
+        select(_tabela.c.id, _tabela.c.detalhamento_entradas, _tabela.c.detalhamento_saidas)
+        .where(_tabela.c.data_referencia == referencia)
+        .with_for_update()
+    )
+
+
+def _criar_linha_do_dia(conn: Connection, referencia: datetime) -> None:
+    """Linha zerada do dia, com o saldo do dia anterior (se ainda não existir)"""
+    anterior = conn.execute(
+        select(_tabela.c.saldo_final)
+        .where(_tabela.c.data_referencia < referencia)
+        .order_by(_tabela.c.data_referencia.desc())
+        .limit(1)
+    ).scalar()
+    saldo_inicial = _decimal(anterior)
+    inserir_se_ausente(conn, _tabela, dict(
+        data_referencia=referencia, periodo_tipo=PERIODO_DIARIO,
+        saldo_inicial=saldo_inicial, saldo_final=saldo_inicial,
+        entradas_realizadas=ZERO, entradas_previstas=ZERO, entradas_total=ZERO,
+        saidas_realizadas=ZERO, saidas_previstas=ZERO, saidas_total=ZERO,
+        resultado_realizado=ZERO, resultado_previsto=ZERO,
+        detalhamento_entradas={}, detalhamento_saidas={},
+        fechado=False
+    ), ["data_referencia"])
+
+
+def _aplicar_deltas(conn: Connection, deltas: Dict[Chave, Decimal]):
+    """Atualizar a linha de cada dia e deslocar os saldos dos dias seguintes"""
+    por_dia: Dict[date, Dict[str, Dict[str, Decimal]]] = {}
+    for (dia, sentido, categoria), delta in deltas.items():
+        por_dia.setdefault(dia, {"entrada": {}, "saida": {}})[sentido][categoria] = delta
+
+    for dia, sentidos in sorted(por_dia.items()):
+        entradas = sum(sentidos["entrada"].values(), ZERO)
+        saidas = sum(sentidos["saida"].values(), ZERO)
+        resultado = entradas - saidas
+        referencia = _inicio_do_dia(dia)
+
+        linha = conn.execute(_linha_do_dia(referencia)).first()
+        if linha is None:
+            _criar_linha_do_dia(conn, referencia)
+            linha = conn.execute(_linha_do_dia(referencia)).first()
+
+        # Com a linha travada, o JSON lido não muda até o commit
+        conn.execute(
+            update(_tabela)
+            .where(_tabela.c.id == linha.id)
+            .values(
+                entradas_realizadas=_tabela.c.entradas_realizadas + entradas,
+                entradas_total=_tabela.c.entradas_total + entradas,
+                saidas_realizadas=_tabela.c.saidas_realizadas + saidas,
+                saidas_total=_tabela.c.saidas_total + saidas,
+                resultado_realizado=_tabela.c.resultado_realizado + resultado,
+                saldo_final=_tabela.c.saldo_final + resultado,
+                detalhamento_entradas=_somar_detalhamento(
+                    linha.detalhamento_entradas, sentidos["entrada"]
+                ),
+                detalhamento_saidas=_somar_detalhamento(
+                    linha.detalhamento_saidas, sentidos["saida"]
+                ),
+            )
+        )
+
+        if resultado != 0:
+            conn.execute(
+                update(_tabela)
+                .where(_tabela.c.data_referencia > referencia)
+                .values(
+                    saldo_inicial=_tabela.c.saldo_inicial + resultado,
+                    saldo_final=_tabela.c.saldo_final + resultado
+                )
+            )
+
+
+# Movimentações de cada flush aplicadas nas linhas diárias
+_atualizar_fluxo_caixa = totais_incrementais.monitorar(
+    MovimentacaoFinanceira, CAMPOS_MONITORADOS, _calcular_deltas, _aplicar_deltas
+)
+
+
+# =======================================
+# LEITURA POR PERÍODO
+# =======================================
+
+def ler_periodo(db: Session, data_inicio: date, data_fim: date) -> List[FluxoCaixa]:
+    """Linhas diárias do período, em ordem de data (uma leitura por faixa)"""
+    return db.query(FluxoCaixa).filter(
+        FluxoCaixa.data_referencia >= _inicio_do_dia(data_inicio),
+        FluxoCaixa.data_referencia <= _inicio_do_dia(data_fim)
+    ).order_by(FluxoCaixa.data_referencia).all()
+
+
+def _somar_categorias(detalhamentos: Iterable[Optional[dict]]) -> Dict[str, float]:
+    totais: Dict[str, Decimal] = {}
+    for detalhamento in detalhamentos:
+        for categoria, valor in (detalhamento or {}).items():
+            totais[categoria] = totais.get(categoria, ZERO) + _decimal(valor)
+    return {categoria: float(valor) for categoria, valor in totais.items() if valor != 0}
+
+
+def resumo_periodo(db: Session, data_inicio: date, data_fim: date) -> dict:
+    """
+    Totais do período a partir das linhas diárias.
+
+    Returns:
+        dict com total_entradas, total_saidas, saldo_periodo (Decimal),
+        saldo_inicial, saldo_final, entradas_por_categoria,
+        saidas_por_categoria e dias (linhas lidas)
+    """
+    dias = ler_periodo(db, data_inicio, data_fim)
+    entradas = sum((_decimal(d.entradas_realizadas) for d in dias), ZERO)
+    saidas = sum((_decimal(d.saidas_realizadas) for d in dias), ZERO)
+
+    if dias:
+        saldo_inicial = _decimal(dias[0].saldo_inicial)
+    else:
+        # Nenhum movimento no período: saldo do último dia anterior
+        saldo_inicial = _decimal(db.query(FluxoCaixa.saldo_final).filter(
+            FluxoCaixa.data_referencia < _inicio_do_dia(data_inicio)
+        ).order_by(FluxoCaixa.data_referencia.desc()).limit(1).scalar())
+
+    return {
+        "total_entradas": entradas,
+        "total_saidas": saidas,
+        "saldo_periodo": entradas - saidas,
+        "saldo_inicial": saldo_inicial,
+        "saldo_final": saldo_inicial + entradas - saidas,
+        "entradas_por_categoria": _somar_categorias(d.detalhamento_entradas for d in dias),
+        "saidas_por_categoria": _somar_categorias(d.detalhamento_saidas for d in dias),
+        "dias": dias,
+    }
+
+
+# =======================================
+# BACKFILL, RECONSTRUÇÃO E VERIFICAÇÃO
+# =======================================
+
+def _recontar(db: Session) -> Dict[date, dict]:
+    """Entradas, saídas e categorias por dia direto das movimentações"""
+    dia = func.date(MovimentacaoFinanceira.data_movimentacao)
+    linhas = db.query(
+        dia,
+        MovimentacaoFinanceira.tipo_movimentacao,
+        MovimentacaoFinanceira.categoria_movimentacao,
+        func.sum(MovimentacaoFinanceira.valor)
+    ).filter(
+        MovimentacaoFinanceira.ativo.isnot(False)
+    ).group_by(
+        dia, MovimentacaoFinanceira.tipo_movimentacao,
+        MovimentacaoFinanceira.categoria_movimentacao
+    ).all()
+
+    dias: Dict[date, dict] = {}
+    for dia_mov, tipo, categoria, valor in linhas:
+        contribuicao = _contribuicao({
+            "ativo": True, "tipo_movimentacao": tipo, "categoria_movimentacao": categoria,
+            "data_movimentacao": dia_mov, "valor": valor,
+        })
+        if not contribuicao:
+            continue
+        (dia_ref, sentido, categoria), total = contribuicao
+        item = dias.setdefault(dia_ref, {"entrada": {}, "saida": {}})
+        item[sentido][categoria] = item[sentido].get(categoria, ZERO) + total
+
+    return {
+        dia_ref: {
+            "entradas": sum(item["entrada"].values(), ZERO),
+            "saidas": sum(item["saida"].values(), ZERO),
+            "detalhamento_entradas": _somar_detalhamento(None, item["entrada"]),
+            "detalhamento_saidas": _somar_detalhamento(None, item["saida"]),
+        }
+        for dia_ref, item in dias.items()
+    }
+
+
+def _linhas_esperadas(db: Session, dias_existentes: Iterable[date]) -> Dict[date, dict]:
+    """Valores que cada linha diária deve ter, com os saldos acumulados"""
+    recontagem = _recontar(db)
+    vazio = {"entradas": ZERO, "saidas": ZERO,
+             "detalhamento_entradas": {}, "detalhamento_saidas": {}}
+    esperado = {}
+    saldo = ZERO
+    for dia_ref in sorted(set(recontagem) | set(dias_existentes)):
+        valores = dict(recontagem.get(dia_ref, vazio))
+        valores["saldo_inicial"] = saldo
+        saldo += valores["entradas"] - valores["saidas"]
+        valores["saldo_final"] = saldo
+        esperado[dia_ref] = valores
+    return esperado
+
+
+def verificar_fluxo_caixa(db: Session) -> List[str]:
+    """
+    Comparar as linhas diárias com uma recontagem completa das movimentações.
+
+    Returns:
+        Lista de divergências (vazia se tudo confere)
+    """
+    existentes = {_dia(linha.data_referencia): linha for linha in db.query(FluxoCaixa)}
+    divergencias = []
+    for dia_ref, valores in _linhas_esperadas(db, existentes).items():
+        linha = existentes.get(dia_ref)
+        gravado = {
+            "entradas": _decimal(linha.entradas_realizadas) if linha else ZERO,
+            "saidas": _decimal(linha.saidas_realizadas) if linha else ZERO,
+            "saldo_inicial": _decimal(linha.saldo_inicial) if linha else ZERO,
+            "saldo_final": _decimal(linha.saldo_final) if linha else ZERO,
+            "detalhamento_entradas": (linha.detalhamento_entradas or {}) if linha else {},
+            "detalhamento_saidas": (linha.detalhamento_saidas or {}) if linha else {},
+        }
+        if linha is None and not (valores["entradas"] or valores["saidas"]):
+            continue
+        for campo, esperado in valores.items():
+            if campo.startswith("detalhamento"):
+                confere = _somar_categorias([gravado[campo]]) == _somar_categorias([esperado])
+            else:
+                confere = abs(gravado[campo] - esperado) < Decimal("0.01")
+            if not confere:
+                divergencias.append(
+                    f"{dia_ref} {campo}: gravado={gravado[campo]} recontagem={esperado}"
+                )
+    return divergencias
+
+
+def reconstruir_fluxo_caixa(db: Session) -> int:
+    """
+    Recalcular as linhas diárias a partir das movimentações (backfill).
+
+    Linhas existentes são atualizadas (mantendo fechamento e observações),
+    dias sem linha são criados. Não faz commit.
+
+    Returns:
+        Número de dias gravados
+    """
+    existentes = {_dia(linha.data_referencia): linha for linha in db.query(FluxoCaixa)}
+    esperado = _linhas_esperadas(db, existentes)
+    for dia_ref, valores in esperado.items():
+        linha = existentes.get(dia_ref)
+        if linha is None:
+            linha = FluxoCaixa(
+                data_referencia=_inicio_do_dia(dia_ref), periodo_tipo=PERIODO_DIARIO,
+                entradas_previstas=ZERO, saidas_previstas=ZERO, resultado_previsto=ZERO
+            )
+            db.add(linha)
+        linha.saldo_inicial = valores["saldo_inicial"]
+        linha.saldo_final = valores["saldo_final"]
+        linha.entradas_realizadas = valores["entradas"]
+        linha.entradas_total = valores["entradas"] + _decimal(linha.entradas_previstas)
+        linha.saidas_realizadas = valores["saidas"]
+        linha.saidas_total = valores["saidas"] + _decimal(linha.saidas_previstas)
+        linha.resultado_realizado = valores["entradas"] - valores["saidas"]
+        linha.detalhamento_entradas = valores["detalhamento_entradas"]
+        linha.detalhamento_saidas = valores["detalhamento_saidas"]
+    db.flush()
+    return len(esperado)
+
+
+def sincronizar_fluxo_caixa(engine: Engine) -> bool:
+    """
+    Conferir o fluxo diário no startup e reconstruir se divergir
+    (movimentações anteriores à tabela ser mantida, edição manual).
+
+    Returns:
+        True se foi preciso reconstruir
+    """
+    return totais_incrementais.sincronizar(engine, verificar_fluxo_caixa, reconstruir_fluxo_caixa)
+
+
+# =======================================
+# LINHA DE COMANDO
+# =======================================
+
+def main(argv=None, fabrica_sessao=None) -> int:
+    """
+    Verificar (e opcionalmente reconstruir) o fluxo de caixa diário.
+
+    Returns:
+        0 se as linhas conferem, 1 se há divergências
+    """
+    return totais_incrementais.main(
+        argv, fabrica_sessao, "Fluxo de caixa diário",
+        verificar_fluxo_caixa, reconstruir_fluxo_caixa,
+        ajuda_reconstruir="Recalcular (backfill) e conferir",
+        reconstruido="Fluxo de caixa reconstruído: {} dias",
+        confere="Fluxo de caixa confere com as movimentações",
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
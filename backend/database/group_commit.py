@@ -0,0 +1,289 @@
+"""
+SISTEMA ERP PRIMOTEX - GROUP COMMIT DE ESCRITAS
+===============================================
+
+Escritor opcional que agrupa unidades de escrita pequenas e concorrentes
+(vindas de requisições diferentes) em uma única transação, pagando um
+único fsync por lote no SQLite.
+
+Cada chamador recebe o próprio resultado ou erro: se uma unidade falhar,
+o lote é refeito sem ela, com um SAVEPOINT por unidade, de modo que só a
+unidade com erro é desfeita. Se o COMMIT do lote falhar, as unidades são
+reexecutadas individualmente.
+
+Habilitado com DB_GROUP_COMMIT=true. Desabilitado, executar_escrita()
+roda a unidade na sessão da requisição e faz o commit como antes.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Optional, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from backend.database import config
+from backend.database.instrumentacao import instrumentar_engine
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Unidade de escrita: recebe a sessão e devolve o resultado para o chamador
+UnidadeEscrita = Callable[[Session], Any]
+
+
+class _Pedido:
+    """Unidade de escrita aguardando o lote"""
+
+    __slots__ = ("unidade", "resultado", "erro", "concluido")
+
+    def __init__(self, unidade: UnidadeEscrita):
+        self.unidade = unidade
+        self.resultado = None
+        self.erro: Optional[BaseException] = None
+        self.concluido = threading.Event()
+
+
+class GroupCommitWriter:
+    """
+    Thread escritora que consome a fila de unidades em lotes.
+
+    Não há janela artificial de espera: enquanto um lote é gravado, os
+    pedidos que chegam se acumulam e formam o próximo lote. Com um único
+    escritor cada lote tem uma unidade e o custo extra é apenas a troca
+    de thread.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_lote: int = 64):
+        self._session_factory = session_factory
+        self._max_lote = max(1, max_lote)
+        self._fila: "queue.Queue[Optional[_Pedido]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.estatisticas = {"lotes": 0, "unidades": 0, "erros": 0, "reexecucoes": 0}
+
+    def submit(self, unidade: UnidadeEscrita) -> Any:
+        """
+        Enfileirar uma unidade e aguardar o commit do lote.
+
+        Returns:
+            Valor retornado pela unidade
+
+        Raises:
+            A exceção lançada pela própria unidade ou pelo commit
+        """
+        self._iniciar()
+        pedido = _Pedido(unidade)
+        self._fila.put(pedido)
+        pedido.concluido.wait()
+        if pedido.erro is not None:
+            raise pedido.erro
+        return pedido.resultado
+
+    def parar(self, timeout: float = 5.0):
+        """Encerrar a thread escritora após esvaziar a fila"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._fila.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _iniciar(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="group-commit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            primeiro = self._fila.get()
+            if primeiro is None:
+                return
+
+            lote = [primeiro]
+            encerrar = False
+            while len(lote) < self._max_lote:
+                try:
+                    pedido = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if pedido is None:
+                    encerrar = True
+                    break
+                lote.append(pedido)
+
+            self._gravar_lote(lote)
+            if encerrar:
+                return
+
+    def _gravar_lote(self, lote: List[_Pedido]):
+        # Caminho otimista: unidades em sequência na mesma transação, sem
+        # SAVEPOINT. Na primeira falha o lote é desfeito, o erro fica com a
+        # unidade culpada e o restante é refeito com um SAVEPOINT por unidade.
+        pendentes = list(lote)
+        usar_savepoint = False
+        try:
+            while pendentes:
+                sessao = self._session_factory()
+                falha = None
+                try:
+                    for pedido in pendentes:
+                        if usar_savepoint:
+                            self._executar_com_savepoint(sessao, pedido)
+                            continue
+                        try:
+                            pedido.resultado = pedido.unidade(sessao)
+                        except Exception as e:
+                            pedido.erro = e
+                            falha = pedido
+                            break
+
+                    if falha is not None:
+                        sessao.rollback()
+                        pendentes = [p for p in pendentes if p is not falha]
+                        for pedido in pendentes:
+                            pedido.resultado = None
+                        usar_savepoint = True
+                        continue
+
+                    try:
+                        sessao.commit()
+                    except Exception as e:
+                        sessao.rollback()
+                        logger.warning(f"Commit do lote falhou ({e}); reexecutando individualmente")
+                        self._reexecutar_individualmente([p for p in pendentes if p.erro is None])
+                    break
+                finally:
+                    sessao.close()
+        finally:
+            self.estatisticas["lotes"] += 1
+            self.estatisticas["unidades"] += len(lote)
+            for pedido in lote:
+                if pedido.erro is not None:
+                    self.estatisticas["erros"] += 1
+                pedido.concluido.set()
+
+    @staticmethod
+    def _executar_com_savepoint(sessao: Session, pedido: _Pedido):
+        savepoint = sessao.begin_nested()
+        try:
+            pedido.resultado = pedido.unidade(sessao)
+            savepoint.commit()
+        except Exception as e:
+            savepoint.rollback()
+            pedido.erro = e
+
+    def _reexecutar_individualmente(self, pedidos: List[_Pedido]):
+        for pedido in pedidos:
+            self.estatisticas["reexecucoes"] += 1
+            sessao = self._session_factory()
+            try:
+                pedido.resultado = pedido.unidade(sessao)
+                sessao.commit()
+            except Exception as e:
+                sessao.rollback()
+                pedido.resultado = None
+                pedido.erro = e
+            finally:
+                sessao.close()
+
+
+# =======================================
+# ENGINE DO ESCRITOR
+# =======================================
+
+def create_group_commit_engine(url: str, echo_sql: bool = False):
+    """
+    Criar o engine dedicado do group commit.
+
+    No SQLite o driver pysqlite não emite BEGIN/SAVEPOINT corretamente;
+    o controle de transação é assumido aqui (BEGIN IMMEDIATE) para que os
+    SAVEPOINTs por unidade funcionem e o lock de escrita seja obtido no
+    início do lote.
+    """
+    if not url.startswith("sqlite"):
+        return instrumentar_engine(create_engine(url, pool_size=1, max_overflow=0, echo=echo_sql))
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        echo=echo_sql
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        config._aplicar_pragmas_sqlite(dbapi_connection)
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return instrumentar_engine(engine)
+
+
+# =======================================
+# INSTÂNCIA GLOBAL
+# =======================================
+
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_group_commit_writer() -> Optional[GroupCommitWriter]:
+    """Obter o escritor global (None se DB_GROUP_COMMIT desabilitado)"""
+    global _writer
+    if not config.DB_GROUP_COMMIT:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                engine = create_group_commit_engine(config.SQLALCHEMY_DATABASE_URL)
+                _writer = GroupCommitWriter(
+                    sessionmaker(bind=engine, autoflush=False, expire_on_commit=False),
+                    max_lote=config.DB_GROUP_COMMIT_MAX_LOTE
+                )
+    return _writer
+
+
+def executar_escrita(db: Session, unidade: Callable[[Session], T]) -> T:
+    """
+    Executar uma unidade de escrita e fazer o commit.
+
+    Com group commit habilitado a unidade é enviada ao escritor global e
+    roda em outra sessão; por isso ela deve fazer todo o seu acesso ao
+    banco (inclusive leituras de validação) pela sessão recebida, e dar
+    flush/refresh nos objetos que o chamador vai serializar.
+
+    Args:
+        db: Sessão da requisição (usada quando o group commit está desligado)
+        unidade: Função que recebe a sessão e realiza a escrita
+
+    Returns:
+        Valor retornado pela unidade
+    """
+    writer = get_group_commit_writer()
+    if writer is not None:
+        return writer.submit(unidade)
+
+    try:
+        resultado = unidade(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return resultado
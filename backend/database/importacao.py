@@ -0,0 +1,622 @@
+"""
+SISTEMA ERP PRIMOTEX - IMPORTAÇÃO EM MASSA
+=========================================
+
+Importação de clientes, produtos e fornecedores a partir de CSV ou JSON
+(array ou um objeto por linha), lida em fluxo e gravada em lotes.
+
+Para cada lote de N linhas:
+- conversão e validação dos campos pelo tipo das colunas do modelo
+- CPF/CNPJ validados em lote (validar_documentos_em_lote)
+- duplicados detectados com uma consulta IN por coluna única, além dos
+  repetidos dentro do próprio arquivo
+- códigos (CLI00001, PRD00001) alocados em bloco a partir do maior id,
+  em vez de um order_by(id.desc()).first() por registro
+- inserção com bulk_insert_mappings e um commit por lote
+
+Linhas com erro não interrompem a importação: vão para o relatório com
+o número da linha e o motivo.
+
+Uso:
+    python -m backend.database.importacao clientes clientes.csv
+    python -m backend.database.importacao produtos produtos.json --relatorio erros.csv
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, String, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.models.cliente_model import TIPOS_PESSOA, Cliente
+from backend.models.fornecedor_model import PESSOA_JURIDICA, TIPOS_FORNECEDOR, Fornecedor
+from backend.models.produto_model import Produto
+from shared.formatadores import formatar_cnpj, formatar_cpf
+from shared.validadores import validar_documentos_em_lote
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_PADRAO = 1000
+FORMATOS = ("csv", "json")
+
+# Maior objeto JSON aceito (em caracteres); acima disso o arquivo é recusado
+MAX_CARACTERES_OBJETO = int(os.getenv("IMPORTACAO_MAX_CARACTERES_OBJETO", str(1024 * 1024)))
+
+# Colunas preenchidas pelo banco/sistema, nunca pelo arquivo
+COLUNAS_IGNORADAS = frozenset({
+    "id", "data_criacao", "data_atualizacao", "created_at", "updated_at",
+    "usuario_criacao_id", "usuario_atualizacao_id", "usuario_cadastro_id",
+})
+
+_NAO_DIGITOS = re.compile(r"\D")
+_VERDADEIROS = frozenset({"1", "true", "sim", "s", "yes", "y", "verdadeiro"})
+_FALSOS = frozenset({"0", "false", "nao", "não", "n", "no", "falso"})
+
+# (linha no arquivo, registro bruto)
+Registro = Tuple[int, Dict[str, Any]]
+
+
+# =======================================
+# ENTIDADES
+# =======================================
+
+@dataclass(frozen=True)
+class EntidadeImportacao:
+    """Modelo importável e suas regras de documento, código e unicidade"""
+
+    nome: str
+    modelo: type
+    coluna_documento: Optional[str] = None
+    coluna_codigo: Optional[str] = None
+    prefixo_codigo: str = ""
+    coluna_usuario: Optional[str] = None
+    # (pessoa física, pessoa jurídica) deduzido do documento quando ausente
+    tipos_pessoa: Optional[Tuple[str, str]] = None
+    outras_unicas: Tuple[str, ...] = ()
+
+    @property
+    def colunas_unicas(self) -> Tuple[str, ...]:
+        colunas = (self.coluna_documento, self.coluna_codigo) + self.outras_unicas
+        return tuple(c for c in colunas if c)
+
+
+ENTIDADES_IMPORTACAO: Dict[str, EntidadeImportacao] = {
+    "clientes": EntidadeImportacao(
+        nome="clientes", modelo=Cliente, coluna_documento="cpf_cnpj",
+        coluna_codigo="codigo", prefixo_codigo="CLI", coluna_usuario="usuario_criacao_id",
+        tipos_pessoa=(TIPOS_PESSOA[0], TIPOS_PESSOA[1])
+    ),
+    "produtos": EntidadeImportacao(
+        nome="produtos", modelo=Produto, coluna_codigo="codigo", prefixo_codigo="PRD",
+        coluna_usuario="usuario_criacao_id", outras_unicas=("codigo_barras",)
+    ),
+    "fornecedores": EntidadeImportacao(
+        nome="fornecedores", modelo=Fornecedor, coluna_documento="cnpj_cpf",
+        coluna_usuario="usuario_cadastro_id",
+        tipos_pessoa=(TIPOS_FORNECEDOR[0], PESSOA_JURIDICA)
+    ),
+}
+
+
+# =======================================
+# RELATÓRIO
+# =======================================
+
+@dataclass
+class ErroImportacao:
+    linha: int
+    mensagem: str
+    campo: Optional[str] = None
+    valor: Any = None
+
+    def como_dict(self) -> dict:
+        return {"linha": self.linha, "campo": self.campo, "mensagem": self.mensagem,
+                "valor": None if self.valor is None else str(self.valor)}
+
+
+@dataclass
+class RelatorioImportacao:
+    """Resumo da importação e erros por linha"""
+
+    entidade: str
+    total_linhas: int = 0
+    inseridos: int = 0
+    duplicados: int = 0
+    erros: List[ErroImportacao] = field(default_factory=list)
+    colunas_ignoradas: Set[str] = field(default_factory=set)
+    segundos: float = 0.0
+
+    @property
+    def rejeitados(self) -> int:
+        return self.total_linhas - self.inseridos
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        return self.total_linhas / self.segundos if self.segundos else 0.0
+
+    def como_dict(self, limite_erros: Optional[int] = None) -> dict:
+        erros = self.erros if limite_erros is None else self.erros[:limite_erros]
+        return {
+            "entidade": self.entidade,
+            "total_linhas": self.total_linhas,
+            "inseridos": self.inseridos,
+            "rejeitados": self.rejeitados,
+            "duplicados": self.duplicados,
+            "colunas_ignoradas": sorted(self.colunas_ignoradas),
+            "segundos": round(self.segundos, 3),
+            "linhas_por_segundo": round(self.linhas_por_segundo, 1),
+            "erros": [erro.como_dict() for erro in erros],
+            "erros_omitidos": len(self.erros) - len(erros),
+        }
+
+    def gravar_csv(self, destino: IO[str]):
+        """Relatório completo de erros (linha;campo;mensagem;valor)"""
+        escritor = csv.writer(destino, delimiter=";")
+        escritor.writerow(["linha", "campo", "mensagem", "valor"])
+        for erro in self.erros:
+            escritor.writerow([erro.linha, erro.campo or "", erro.mensagem,
+                               "" if erro.valor is None else erro.valor])
+
+
+# =======================================
+# LEITURA EM FLUXO
+# =======================================
+
+def ler_csv(arquivo: IO[str]) -> Iterator[Registro]:
+    """Registros de um CSV (separador ; ou , detectado no cabeçalho)"""
+    cabecalho = arquivo.readline()
+    if not cabecalho:
+        return
+    delimitador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+    colunas = [c.strip().lower() for c in next(csv.reader([cabecalho], delimiter=delimitador))]
+    leitor = csv.reader(arquivo, delimiter=delimitador)
+    for valores in leitor:
+        if not any(valores):
+            continue
+        # +1 do cabeçalho lido fora do leitor
+        yield leitor.line_num + 1, dict(zip(colunas, valores))
+
+
+def ler_json(arquivo: IO[str], tamanho_bloco: int = 65536,
+             maximo_objeto: int = MAX_CARACTERES_OBJETO) -> Iterator[Registro]:
+    """
+    Registros de um array JSON ou de JSON Lines, sem carregar o arquivo
+    inteiro: os objetos são decodificados um a um conforme os blocos chegam.
+
+    Um objeto que não decodifica com maximo_objeto caracteres acumulados
+    (malformado ou grande demais) interrompe a leitura com ValueError,
+    em vez de ler o restante do arquivo para a memória.
+    """
+    decodificador = json.JSONDecoder()
+    buffer = ""
+    posicao = 0
+    numero = 0
+    fim = False
+    while True:
+        # Pula espaços, vírgulas e os colchetes do array
+        while posicao < len(buffer) and buffer[posicao] in " \t\r\n,[]":
+            posicao += 1
+        if posicao >= len(buffer):
+            if fim:
+                return
+            bloco = arquivo.read(tamanho_bloco)
+            buffer, posicao = buffer[posicao:] + bloco, 0
+            fim = not bloco
+            continue
+        try:
+            objeto, final = decodificador.raw_decode(buffer, posicao)
+        except json.JSONDecodeError:
+            if len(buffer) - posicao >= maximo_objeto:
+                raise ValueError(
+                    f"Registro {numero + 1} malformado ou maior que {maximo_objeto} caracteres"
+                )
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                raise
+            buffer, posicao = buffer[posicao:] + bloco, 0
+            continue
+        posicao = final
+        numero += 1
+        if not isinstance(objeto, dict):
+            raise ValueError(f"Registro {numero} não é um objeto JSON")
+        yield numero, {str(chave).strip().lower(): valor for chave, valor in objeto.items()}
+        if posicao > tamanho_bloco:
+            buffer, posicao = buffer[posicao:], 0
+
+
+def abrir_registros(arquivo_binario: IO[bytes], formato: str) -> Iterator[Registro]:
+    """Registros de um arquivo binário (upload ou disco) em UTF-8"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato não suportado: {formato}. Use {', '.join(FORMATOS)}")
+    texto = io.TextIOWrapper(arquivo_binario, encoding="utf-8-sig", newline="")
+    return ler_csv(texto) if formato == "csv" else ler_json(texto)
+
+
+def formato_do_arquivo(nome: Optional[str]) -> str:
+    """Formato pela extensão (.csv, .json, .jsonl, .ndjson)"""
+    extensao = (nome or "").rsplit(".", 1)[-1].lower()
+    return "json" if extensao in ("json", "jsonl", "ndjson") else "csv"
+
+
+# =======================================
+# CONVERSÃO DAS COLUNAS
+# =======================================
+
+def _conversor(coluna) -> Callable[[Any], Any]:
+    tipo = coluna.type
+    if isinstance(tipo, Boolean):
+        def converter(valor):
+            if isinstance(valor, bool):
+                return valor
+            texto = str(valor).strip().lower()
+            if texto in _VERDADEIROS:
+                return True
+            if texto in _FALSOS:
+                return False
+            raise ValueError("valor booleano inválido")
+        return converter
+    if isinstance(tipo, Integer):
+        return lambda valor: int(str(valor).strip())
+    if isinstance(tipo, Numeric):
+        def converter(valor):
+            try:
+                return Decimal(str(valor).strip().replace(",", "."))
+            except InvalidOperation:
+                raise ValueError("número inválido") from None
+        return converter
+    if isinstance(tipo, DateTime):
+        return lambda valor: valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor).strip())
+    if isinstance(tipo, Date):
+        return lambda valor: valor if isinstance(valor, date) else date.fromisoformat(str(valor).strip()[:10])
+    if isinstance(tipo, String) and tipo.length:
+        limite = tipo.length
+
+        def converter(valor):
+            texto = str(valor).strip()
+            if len(texto) > limite:
+                raise ValueError(f"máximo de {limite} caracteres")
+            return texto
+        return converter
+    return lambda valor: str(valor).strip() if isinstance(valor, str) else valor
+
+
+def _gerador_padrao(coluna) -> Optional[Callable[[], Any]]:
+    """Valor padrão Python da coluna, avaliado a cada linha"""
+    padrao = coluna.default
+    if padrao is None:
+        return None
+    if padrao.is_callable:
+        return lambda: padrao.arg(None)
+    if padrao.is_scalar:
+        return lambda: padrao.arg
+    return None
+
+
+class _Esquema:
+    """Conversores, padrões e obrigatórios de uma entidade (calculado uma vez)"""
+
+    def __init__(self, entidade: EntidadeImportacao):
+        tabela = entidade.modelo.__table__
+        colunas = [c for c in tabela.columns if c.name not in COLUNAS_IGNORADAS]
+        self.conversores = {c.name: _conversor(c) for c in colunas}
+        self.padroes = {c.name: _gerador_padrao(c) for c in colunas if _gerador_padrao(c)}
+        # Colunas que podem receber NULL explícito quando ausentes na linha
+        self.anulaveis = {c.name for c in colunas if c.nullable and c.server_default is None}
+        gerados = {entidade.coluna_codigo}
+        if entidade.tipos_pessoa:
+            gerados.add("tipo_pessoa")
+        self.obrigatorias = [
+            c.name for c in colunas
+            if not c.nullable and c.default is None and c.server_default is None
+            and c.name not in gerados
+        ]
+
+
+_esquemas: Dict[str, _Esquema] = {}
+
+
+def _esquema(entidade: EntidadeImportacao) -> _Esquema:
+    if entidade.nome not in _esquemas:
+        _esquemas[entidade.nome] = _Esquema(entidade)
+    return _esquemas[entidade.nome]
+
+
+def _preparar(entidade: EntidadeImportacao, linha: int, bruto: Dict[str, Any],
+              relatorio: RelatorioImportacao) -> Optional[dict]:
+    """Converter um registro nas colunas do modelo (None se houver erro)"""
+    esquema = _esquema(entidade)
+    dados = {}
+    erros = []
+    for campo, valor in bruto.items():
+        conversor = esquema.conversores.get(campo)
+        if conversor is None:
+            relatorio.colunas_ignoradas.add(campo)
+            continue
+        if valor is None or (isinstance(valor, str) and not valor.strip()):
+            continue
+        try:
+            dados[campo] = conversor(valor)
+        except (ValueError, TypeError) as erro:
+            erros.append(ErroImportacao(linha, str(erro) or "valor inválido", campo, valor))
+
+    for campo in esquema.obrigatorias:
+        if campo not in dados and not any(e.campo == campo for e in erros):
+            erros.append(ErroImportacao(linha, "campo obrigatório", campo))
+
+    if erros:
+        relatorio.erros.extend(erros)
+        return None
+    return dados
+
+
+def _uniformizar(entidade: EntidadeImportacao, linhas: List[dict]) -> List[dict]:
+    """
+    Dar a todas as linhas do lote as mesmas chaves (padrão da coluna ou
+    NULL) e ordenar pelas chaves restantes: o bulk_insert_mappings emite
+    um executemany por sequência de linhas com o mesmo conjunto de chaves.
+    """
+    esquema = _esquema(entidade)
+    todas = set().union(*linhas)
+    for dados in linhas:
+        for campo in todas.difference(dados):
+            padrao = esquema.padroes.get(campo)
+            if padrao is not None:
+                dados[campo] = padrao()
+            elif campo in esquema.anulaveis:
+                dados[campo] = None
+    return sorted(linhas, key=lambda dados: sorted(dados))
+
+
+def _variantes_documento(digitos: str) -> Tuple[str, ...]:
+    """Formas em que o documento pode estar gravado (com e sem máscara)"""
+    formatado = formatar_cpf(digitos) if len(digitos) == 11 else formatar_cnpj(digitos)
+    return (digitos, formatado)
+
+
+# =======================================
+# IMPORTAÇÃO
+# =======================================
+
+class _AlocadorCodigos:
+    """Códigos sequenciais (prefixo + número) reservados em bloco"""
+
+    def __init__(self, db: Session, entidade: EntidadeImportacao):
+        self.entidade = entidade
+        self.proximo = (db.query(func.max(entidade.modelo.id)).scalar() or 0) + 1
+
+    def formatar(self, numero: int) -> str:
+        return f"{self.entidade.prefixo_codigo}{numero:05d}"
+
+    def reservar(self, quantidade: int) -> List[str]:
+        codigos = [self.formatar(n) for n in range(self.proximo, self.proximo + quantidade)]
+        self.proximo += quantidade
+        return codigos
+
+
+class _Importador:
+    def __init__(self, db: Session, entidade: EntidadeImportacao, usuario_id: Optional[int]):
+        self.db = db
+        self.entidade = entidade
+        self.usuario_id = usuario_id
+        self.relatorio = RelatorioImportacao(entidade.nome)
+        # Valores únicos já vistos no arquivo: coluna -> {valor: linha}
+        self.vistos: Dict[str, Dict[str, int]] = {c: {} for c in entidade.colunas_unicas}
+        self.alocador = _AlocadorCodigos(db, entidade) if entidade.coluna_codigo else None
+
+    def _chave_unica(self, coluna: str, valor) -> str:
+        if coluna == self.entidade.coluna_documento:
+            return _NAO_DIGITOS.sub("", valor)
+        return str(valor)
+
+    def _validar_documentos(self, lote: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        coluna = self.entidade.coluna_documento
+        if not coluna:
+            return lote
+        mensagens = validar_documentos_em_lote(dados.get(coluna) for _, dados in lote)
+        validos = []
+        for (linha, dados), mensagem in zip(lote, mensagens):
+            if mensagem:
+                self.relatorio.erros.append(ErroImportacao(linha, mensagem, coluna, dados.get(coluna)))
+                continue
+            if self.entidade.tipos_pessoa and not dados.get("tipo_pessoa"):
+                digitos = _NAO_DIGITOS.sub("", dados[coluna])
+                dados["tipo_pessoa"] = self.entidade.tipos_pessoa[len(digitos) == 14]
+            validos.append((linha, dados))
+        return validos
+
+    def _existentes(self, coluna: str, chaves: Iterable[str]) -> Set[str]:
+        """Uma consulta IN por coluna única para o lote inteiro"""
+        chaves = set(chaves)
+        if not chaves:
+            return set()
+        atributo = getattr(self.entidade.modelo, coluna)
+        if coluna == self.entidade.coluna_documento:
+            valores = {v for chave in chaves for v in _variantes_documento(chave)}
+            return {
+                _NAO_DIGITOS.sub("", valor)
+                for (valor,) in self.db.query(atributo).filter(atributo.in_(valores))
+            }
+        return {str(valor) for (valor,) in self.db.query(atributo).filter(atributo.in_(chaves))}
+
+    def _remover_duplicados(self, lote: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        for coluna in self.entidade.colunas_unicas:
+            no_banco = self._existentes(
+                coluna, (self._chave_unica(coluna, d[coluna]) for _, d in lote if d.get(coluna))
+            )
+            restantes = []
+            for linha, dados in lote:
+                valor = dados.get(coluna)
+                if valor:
+                    chave = self._chave_unica(coluna, valor)
+                    anterior = self.vistos[coluna].get(chave)
+                    if chave in no_banco or anterior is not None:
+                        origem = "já cadastrado" if chave in no_banco else f"repetido (linha {anterior})"
+                        self.relatorio.erros.append(ErroImportacao(linha, origem, coluna, valor))
+                        self.relatorio.duplicados += 1
+                        continue
+                    self.vistos[coluna][chave] = linha
+                restantes.append((linha, dados))
+            lote = restantes
+        return lote
+
+    def _alocar_codigos(self, lote: List[Tuple[int, dict]]):
+        coluna = self.entidade.coluna_codigo
+        if not coluna:
+            return
+        sem_codigo = [(linha, dados) for linha, dados in lote if not dados.get(coluna)]
+        while sem_codigo:
+            codigos = self.alocador.reservar(len(sem_codigo))
+            # Códigos personalizados já gravados ou no arquivo não são reutilizados
+            ocupados = self._existentes(coluna, codigos) | set(self.vistos[coluna])
+            pendentes = []
+            for (linha, dados), codigo in zip(sem_codigo, codigos):
+                if codigo in ocupados:
+                    pendentes.append((linha, dados))
+                    continue
+                dados[coluna] = codigo
+                self.vistos[coluna][codigo] = linha
+            sem_codigo = pendentes
+
+    def _inserir(self, lote: List[Tuple[int, dict]]):
+        modelo = self.entidade.modelo
+        linhas = [dados for _, dados in lote]
+        if self.entidade.coluna_usuario and self.usuario_id:
+            for dados in linhas:
+                dados[self.entidade.coluna_usuario] = self.usuario_id
+        try:
+            self.db.bulk_insert_mappings(modelo, _uniformizar(self.entidade, linhas))
+            self.db.commit()
+            self.relatorio.inseridos += len(linhas)
+        except IntegrityError:
+            # Conflito com escrita concorrente entre a verificação e o
+            # INSERT: refaz o lote linha a linha para apontar as culpadas
+            self.db.rollback()
+            for linha, dados in lote:
+                try:
+                    self.db.bulk_insert_mappings(modelo, [dados])
+                    self.db.commit()
+                    self.relatorio.inseridos += 1
+                except IntegrityError as erro:
+                    self.db.rollback()
+                    self.relatorio.erros.append(ErroImportacao(
+                        linha, f"violação de unicidade: {erro.orig}"
+                    ))
+
+    def processar(self, lote: List[Registro]):
+        self.relatorio.total_linhas += len(lote)
+        preparados = []
+        for linha, bruto in lote:
+            dados = _preparar(self.entidade, linha, bruto, self.relatorio)
+            if dados is not None:
+                preparados.append((linha, dados))
+        preparados = self._validar_documentos(preparados)
+        preparados = self._remover_duplicados(preparados)
+        self._alocar_codigos(preparados)
+        if preparados:
+            self._inserir(preparados)
+
+
+def importar(
+    db: Session,
+    entidade: str,
+    registros: Iterable[Registro],
+    tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+    usuario_id: Optional[int] = None
+) -> RelatorioImportacao:
+    """
+    Importar registros em lotes.
+
+    Args:
+        db: Sessão de escrita
+        entidade: "clientes", "produtos" ou "fornecedores"
+        registros: (linha, dicionário) - ver ler_csv / ler_json
+        tamanho_lote: Linhas por lote (uma transação por lote)
+        usuario_id: Gravado na coluna de auditoria da entidade
+
+    Returns:
+        RelatorioImportacao com contagens e erros por linha
+    """
+    if entidade not in ENTIDADES_IMPORTACAO:
+        raise ValueError(
+            f"Entidade inválida: {entidade}. Use {', '.join(ENTIDADES_IMPORTACAO)}"
+        )
+    inicio = time.perf_counter()
+    importador = _Importador(db, ENTIDADES_IMPORTACAO[entidade], usuario_id)
+    iterador = iter(registros)
+    while True:
+        lote = list(islice(iterador, tamanho_lote))
+        if not lote:
+            break
+        importador.processar(lote)
+    importador.relatorio.segundos = time.perf_counter() - inicio
+
+    relatorio = importador.relatorio
+    logger.info(
+        f"Importação de {entidade}: {relatorio.inseridos}/{relatorio.total_linhas} "
+        f"inseridos em {relatorio.segundos:.2f}s ({relatorio.linhas_por_segundo:.0f} linhas/s)"
+    )
+    return relatorio
+
+
+# =======================================
+# LINHA DE COMANDO
+# =======================================
+
+def main(argv=None, fabrica_sessao=None) -> int:
+    """
+    Importar um arquivo CSV/JSON.
+
+    Returns:
+        0 se todas as linhas foram importadas, 1 se alguma foi rejeitada
+    """
+    parser = argparse.ArgumentParser(description="Importação em massa")
+    parser.add_argument("entidade", choices=sorted(ENTIDADES_IMPORTACAO))
+    parser.add_argument("arquivo", help="Arquivo .csv, .json ou .jsonl")
+    parser.add_argument("--formato", choices=FORMATOS, help="Padrão: pela extensão")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="Linhas por transação")
+    parser.add_argument("--relatorio", help="Gravar todos os erros neste CSV")
+    args = parser.parse_args(argv)
+
+    if fabrica_sessao is None:
+        from backend.database.config import SessionLocal as fabrica_sessao
+
+    formato = args.formato or formato_do_arquivo(args.arquivo)
+    with open(args.arquivo, "rb") as arquivo, fabrica_sessao() as db:
+        relatorio = importar(db, args.entidade, abrir_registros(arquivo, formato), args.lote)
+
+    print(
+        f"✅ {relatorio.inseridos} de {relatorio.total_linhas} {args.entidade} importados "
+        f"em {relatorio.segundos:.2f}s ({relatorio.linhas_por_segundo:.0f} linhas/s)"
+    )
+    if relatorio.colunas_ignoradas:
+        print(f"⚠️ Colunas ignoradas: {', '.join(sorted(relatorio.colunas_ignoradas))}")
+    if relatorio.erros:
+        print(f"❌ {relatorio.rejeitados} linha(s) rejeitada(s)")
+        for erro in relatorio.erros[:20]:
+            campo = f" [{erro.campo}]" if erro.campo else ""
+            print(f"   linha {erro.linha}{campo}: {erro.mensagem}")
+        if args.relatorio:
+            with open(args.relatorio, "w", encoding="utf-8", newline="") as destino:
+                relatorio.gravar_csv(destino)
+            print(f"   Relatório completo: {args.relatorio}")
+    return 1 if relatorio.rejeitados else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
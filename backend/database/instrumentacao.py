@@ -0,0 +1,322 @@
+"""
+SISTEMA ERP PRIMOTEX - INSTRUMENTAÇÃO DAS CONSULTAS SQL
+======================================================
+
+Listeners de cursor nos engines da aplicação (escrita, leitura e group
+commit) que medem cada instrução e a atribuem à medição ativa no
+contexto atual (uma por requisição HTTP, ver
+backend.api.instrumentacao) e aos observadores registrados (ex.: o
+assert_max_queries dos testes).
+
+Durante a requisição só se contam instruções por texto (com parâmetros
+vinculados, o N+1 de um lazy load repete o mesmo texto); a
+normalização para agrupar formatos equivalentes (literais, listas de
+IN) roda uma vez no fim, sobre as instruções distintas.
+
+Instruções acima de SQL_LENTA_MS vão para consultas_lentas: um anel de
+tamanho fixo com as ocorrências mais recentes e um agregado por
+formato (execuções, tempo total e máximo). Na primeira vez que um
+formato passa do limite são guardados o EXPLAIN QUERY PLAN (na mesma
+conexão, sem executar a instrução de novo) e os parâmetros redigidos
+(só tipo e tamanho, nunca o valor). Instruções rápidas custam uma
+comparação a mais.
+
+Configuração:
+- SQL_N_MAIS_1_LIMITE: execuções do mesmo formato em uma requisição a
+  partir das quais ela é sinalizada como N+1 (padrão: 10)
+- SQL_LENTA_MS: limite de consulta lenta em milissegundos (padrão: 100)
+- SQL_LENTAS_MAX: ocorrências mantidas no anel (padrão: 256)
+- SQL_LENTAS_FORMATOS: formatos lentos distintos mantidos (padrão: 500)
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_N_MAIS_1_LIMITE = int(os.getenv("SQL_N_MAIS_1_LIMITE", "10"))
+SQL_LENTA_MS = float(os.getenv("SQL_LENTA_MS", "100"))
+SQL_LENTAS_MAX = int(os.getenv("SQL_LENTAS_MAX", "256"))
+SQL_LENTAS_FORMATOS = int(os.getenv("SQL_LENTAS_FORMATOS", "500"))
+
+# Instruções com plano de execução (INSERT não tem plano interessante)
+_PREFIXOS_COM_PLANO = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+_RE_ESPACOS = re.compile(r"\s+")
+_RE_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalizar_sql(statement: str) -> str:
+    """Formato da instrução: literais viram ? e listas de IN viram (?)"""
+    sql = _RE_TEXTO.sub("?", statement)
+    sql = _RE_NUMERO.sub("?", sql)
+    sql = _RE_LISTA.sub("(?)", sql)
+    return _RE_ESPACOS.sub(" ", sql).strip()
+
+
+class ConsultasRequisicao:
+    """Instruções executadas durante uma medição (normalmente uma requisição)"""
+
+    __slots__ = ("total", "tempo", "instrucoes")
+
+    def __init__(self):
+        self.total = 0
+        self.tempo = 0.0
+        # texto da instrução -> execuções
+        self.instrucoes: Dict[str, int] = {}
+
+    def registrar(self, statement: str, duracao: float) -> None:
+        self.total += 1
+        self.tempo += duracao
+        self.instrucoes[statement] = self.instrucoes.get(statement, 0) + 1
+
+    def formatos(self) -> Dict[str, int]:
+        """Execuções por formato normalizado"""
+        contagem: Dict[str, int] = {}
+        for statement, vezes in self.instrucoes.items():
+            formato = normalizar_sql(statement)
+            contagem[formato] = contagem.get(formato, 0) + vezes
+        return contagem
+
+    def repetidas(self, limite: int = SQL_N_MAIS_1_LIMITE) -> List[Tuple[str, int]]:
+        """Formatos executados mais de `limite` vezes, do mais repetido ao menos"""
+        if self.total <= limite:
+            return []
+        return sorted(
+            ((formato, vezes) for formato, vezes in self.formatos().items() if vezes > limite),
+            key=lambda item: item[1], reverse=True
+        )
+
+
+# =======================================
+# CONSULTAS LENTAS
+# =======================================
+
+def _redigir(valor: Any) -> Any:
+    if valor is None or isinstance(valor, bool):
+        return valor
+    if isinstance(valor, (str, bytes)):
+        return f"<{type(valor).__name__}:{len(valor)}>"
+    return f"<{type(valor).__name__}>"
+
+
+def redigir_parametros(parameters: Any) -> Any:
+    """Parâmetros vinculados sem os valores: só tipo (e tamanho de textos)"""
+    if isinstance(parameters, dict):
+        return {chave: _redigir(valor) for chave, valor in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redigir(valor) for valor in parameters]
+    return _redigir(parameters)
+
+
+class FormatoLento:
+    """Agregado de um formato de instrução que passou do limite"""
+
+    __slots__ = ("sql", "execucoes", "tempo_total", "tempo_max", "primeira", "ultima",
+                 "plano", "parametros")
+
+    def __init__(self, sql: str, agora: float):
+        self.sql = sql
+        self.execucoes = 0
+        self.tempo_total = 0.0
+        self.tempo_max = 0.0
+        self.primeira = agora
+        self.ultima = agora
+        self.plano: Optional[List[str]] = None
+        self.parametros: Any = None
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "execucoes": self.execucoes,
+            "tempo_total_ms": round(self.tempo_total * 1000, 2),
+            "tempo_medio_ms": round(self.tempo_total / self.execucoes * 1000, 2) if self.execucoes else 0,
+            "tempo_max_ms": round(self.tempo_max * 1000, 2),
+            "primeira": datetime.fromtimestamp(self.primeira).isoformat(),
+            "ultima": datetime.fromtimestamp(self.ultima).isoformat(),
+            "plano": self.plano,
+            "parametros": self.parametros,
+        }
+
+
+class ConsultasLentas:
+    """
+    Registro das instruções acima do limite.
+
+    O anel guarda (instante, formato, duração) em posições fixas (inserção
+    O(1), as mais antigas são sobrescritas); os agregados por formato
+    ficam em um OrderedDict limitado, descartando o formato lento visto há
+    mais tempo.
+    """
+
+    def __init__(self, limite_ms: float = SQL_LENTA_MS, capacidade: int = SQL_LENTAS_MAX,
+                 max_formatos: int = SQL_LENTAS_FORMATOS):
+        self.limite = limite_ms / 1000
+        self.capacidade = max(1, capacidade)
+        self.max_formatos = max(1, max_formatos)
+        self._anel: List[Optional[Tuple[float, str, float]]] = [None] * self.capacidade
+        self._posicao = 0
+        self.total = 0
+        self._formatos: "OrderedDict[str, FormatoLento]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, conn, statement: str, parameters: Any, duracao: float,
+                  executemany: bool = False) -> None:
+        formato = normalizar_sql(statement)
+        agora = time.time()
+        with self._lock:
+            agregado = self._formatos.get(formato)
+            novo = agregado is None
+            if novo:
+                agregado = self._formatos[formato] = FormatoLento(formato, agora)
+                if len(self._formatos) > self.max_formatos:
+                    self._formatos.popitem(last=False)
+            else:
+                self._formatos.move_to_end(formato)
+            agregado.execucoes += 1
+            agregado.tempo_total += duracao
+            agregado.tempo_max = max(agregado.tempo_max, duracao)
+            agregado.ultima = agora
+            self._anel[self._posicao] = (agora, formato, duracao)
+            self._posicao = (self._posicao + 1) % self.capacidade
+            self.total += 1
+
+        if novo:
+            if executemany:
+                parameters = parameters[0] if parameters else ()
+            agregado.parametros = redigir_parametros(parameters)
+            agregado.plano = self._plano(conn, statement, parameters)
+
+    @staticmethod
+    def _plano(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+        """Plano de execução pela conexão DBAPI (não passa pelos listeners)"""
+        if statement.lstrip()[:6].upper() not in _PREFIXOS_COM_PLANO:
+            return None
+        sqlite = conn.dialect.name == "sqlite"
+        prefixo = "EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN "
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(prefixo + statement, parameters or ())
+                return [str(linha[-1] if sqlite else linha[0]) for linha in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f"(plano indisponível: {e})"]
+
+    def piores(self, limite: int = 20) -> List[Dict[str, Any]]:
+        """Formatos lentos ordenados pelo tempo total"""
+        with self._lock:
+            agregados = sorted(self._formatos.values(), key=lambda a: a.tempo_total, reverse=True)
+            return [agregado.como_dict() for agregado in agregados[:limite]]
+
+    def recentes(self, limite: int = 20) -> List[Dict[str, Any]]:
+        """Últimas ocorrências, da mais nova para a mais antiga"""
+        resultado = []
+        with self._lock:
+            for i in range(1, min(limite, self.capacidade) + 1):
+                item = self._anel[(self._posicao - i) % self.capacidade]
+                if item is None:
+                    break
+                instante, formato, duracao = item
+                resultado.append({
+                    "instante": datetime.fromtimestamp(instante).isoformat(),
+                    "sql": formato,
+                    "duracao_ms": round(duracao * 1000, 2),
+                })
+        return resultado
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._anel = [None] * self.capacidade
+            self._posicao = 0
+            self.total = 0
+            self._formatos.clear()
+
+
+consultas_lentas = ConsultasLentas()
+
+
+# =======================================
+# LISTENERS E MEDIÇÕES
+# =======================================
+
+# Medição ativa no contexto atual (None = nenhuma)
+_medicao: ContextVar[Optional[ConsultasRequisicao]] = ContextVar("instrumentacao_sql", default=None)
+
+# Observadores de todas as instruções, de qualquer thread: (statement, duração)
+_observadores: Tuple[Callable[[str, float], None], ...] = ()
+_lock = threading.Lock()
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._instrumentacao_inicio = time.perf_counter()
+
+
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_instrumentacao_inicio", None)
+    duracao = time.perf_counter() - inicio if inicio is not None else 0.0
+    if duracao >= consultas_lentas.limite:
+        consultas_lentas.registrar(conn, statement, parameters, duracao, executemany)
+    medicao = _medicao.get()
+    if medicao is None and not _observadores:
+        return
+    if medicao is not None:
+        medicao.registrar(statement, duracao)
+    for observador in _observadores:
+        observador(statement, duracao)
+
+
+def instrumentar_engine(engine: Engine) -> Engine:
+    """Ligar os listeners de medição ao engine (idempotente)"""
+    with _lock:
+        if not event.contains(engine, "after_cursor_execute", _depois):
+            event.listen(engine, "before_cursor_execute", _antes)
+            event.listen(engine, "after_cursor_execute", _depois)
+    return engine
+
+
+@contextmanager
+def medir_consultas() -> Iterator[ConsultasRequisicao]:
+    """
+    Medir as instruções executadas no contexto atual (inclusive nos
+    handlers síncronos, que herdam o contexto no threadpool).
+
+    Example:
+        with medir_consultas() as consultas:
+            listar_clientes(db)
+        consultas.total, consultas.tempo, consultas.repetidas()
+    """
+    consultas = ConsultasRequisicao()
+    token = _medicao.set(consultas)
+    try:
+        yield consultas
+    finally:
+        _medicao.reset(token)
+
+
+@contextmanager
+def observar_consultas(observador: Callable[[str, float], None]) -> Iterator[None]:
+    """Chamar observador(statement, duração) para toda instrução, de qualquer thread"""
+    global _observadores
+    with _lock:
+        _observadores = _observadores + (observador,)
+    try:
+        yield
+    finally:
+        with _lock:
+            _observadores = tuple(o for o in _observadores if o is not observador)
@@ -0,0 +1,27 @@
+"""
+SISTEMA ERP PRIMOTEX - INVALIDAÇÃO DO CACHE NO COMMIT
+====================================================
+
+Liga o cache em memória (shared.cache_system) ao rastreador de escritas
+do Engine (backend.database.escritas): depois do COMMIT de qualquer
+transação, as entradas que dependem das tabelas escritas nela são
+invalidadas (shared.cache_system.invalidate_tables). Um rollback não
+invalida nada.
+
+O rastreador vê ORM, bulk_insert_mappings (importação), Core e SQL
+textual, então nenhuma escrita pela API fica coberta só pelo TTL.
+Processos sem engine (o desktop) não recebem essas invalidações.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+from typing import Set
+
+from backend.database import escritas
+from shared.cache_system import invalidate_tables
+
+
+@escritas.apos_commit
+def _invalidar_no_commit(tabelas: Set[str]) -> None:
+    invalidate_tables(tabelas)
@@ -0,0 +1,64 @@
+"""
+SISTEMA ERP PRIMOTEX - AMBIENTE DAS MIGRAÇÕES ALEMBIC
+====================================================
+
+Usa a mesma URL e os mesmos modelos da aplicação
+(backend.database.config / backend.models).
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from backend.database.config import Base, SQLALCHEMY_DATABASE_URL
+from backend.database.versoes_tabelas import CONEXAO_MIGRACAO
+import backend.models  # noqa: F401  (registra todas as tabelas no metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _url() -> str:
+    return config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+
+def run_migrations_offline():
+    """Gerar o SQL das migrações sem conectar ao banco"""
+    context.configure(
+        url=_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=_url().startswith("sqlite"),
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplicar as migrações conectando ao banco"""
+    engine = create_engine(_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        # Migrações anteriores à 0006 escrevem antes de versoes_tabelas existir
+        connection.info[CONEXAO_MIGRACAO] = True
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
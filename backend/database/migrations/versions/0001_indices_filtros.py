@@ -0,0 +1,104 @@
+"""
+Índices compostos e parciais para as colunas de filtro mais usadas
+
+Primeira migração do projeto: o esquema base é o criado por
+create_all_tables(). Índices que já existirem (bancos novos, criados
+depois da declaração nos modelos) são ignorados.
+
+Revision ID: 0001_indices_filtros
+Revises:
+Create Date: 2026-10-16
+"""
+
+from typing import Optional
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_indices_filtros"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Filtro dos índices parciais (registros não excluídos logicamente)
+_SOMENTE_ATIVOS = {
+    "sqlite_where": sa.text("ativo = 1"),
+    "postgresql_where": sa.text("ativo"),
+}
+
+# (nome, tabela, colunas, opções)
+INDICES = [
+    ("idx_cliente_status_nome", "clientes", ["status", "nome"], {}),
+    ("idx_cliente_tipo_nome", "clientes", ["tipo_pessoa", "nome"], {}),
+    ("idx_cliente_cidade_estado", "clientes", ["endereco_cidade", "endereco_estado"], {}),
+
+    ("idx_os_cliente_abertura", "ordens_servico", ["cliente_id", "data_abertura"], {}),
+    ("idx_os_cliente_created", "ordens_servico", ["cliente_id", "created_at"], {}),
+    ("idx_os_status_created", "ordens_servico", ["status", "created_at"], {}),
+    ("idx_os_prioridade_created", "ordens_servico", ["prioridade", "created_at"], {}),
+    ("idx_os_fase_status", "ordens_servico", ["fase_atual", "status"], {}),
+    ("idx_os_tipo_servico", "ordens_servico", ["tipo_servico"], {}),
+    ("idx_os_data_abertura", "ordens_servico", ["data_abertura"], {}),
+    ("idx_os_previsao_status", "ordens_servico", ["data_prevista_conclusao", "status"], {}),
+    ("idx_os_created_at", "ordens_servico", ["created_at"], {}),
+
+    ("idx_conta_receber_status_vencimento", "contas_receber", ["status", "data_vencimento"], _SOMENTE_ATIVOS),
+    ("idx_conta_receber_vencimento", "contas_receber", ["data_vencimento"], _SOMENTE_ATIVOS),
+    ("idx_conta_receber_cliente_vencimento", "contas_receber", ["cliente_id", "data_vencimento"], {}),
+    ("idx_conta_receber_os", "contas_receber", ["ordem_servico_id"], {}),
+
+    ("idx_conta_pagar_status_vencimento", "contas_pagar", ["status", "data_vencimento"], _SOMENTE_ATIVOS),
+    ("idx_conta_pagar_vencimento", "contas_pagar", ["data_vencimento"], _SOMENTE_ATIVOS),
+    ("idx_conta_pagar_fornecedor_vencimento", "contas_pagar", ["fornecedor_id", "data_vencimento"], {}),
+
+    ("idx_movimentacao_data", "movimentacoes_financeiras", ["data_movimentacao"], {}),
+    ("idx_movimentacao_tipo_data", "movimentacoes_financeiras", ["tipo_movimentacao", "data_movimentacao"], {}),
+    ("idx_movimentacao_conta_receber", "movimentacoes_financeiras", ["conta_receber_id"], {}),
+    ("idx_movimentacao_conta_pagar", "movimentacoes_financeiras", ["conta_pagar_id"], {}),
+
+    ("idx_com_historico_criado_em", "comunicacao_historico", ["criado_em"], {}),
+    ("idx_com_historico_status_criado", "comunicacao_historico", ["status", "criado_em"], {}),
+    ("idx_com_historico_tipo_criado", "comunicacao_historico", ["tipo", "criado_em"], {}),
+    ("idx_com_historico_cliente_criado", "comunicacao_historico", ["cliente_id", "criado_em"], {}),
+    ("idx_com_historico_origem", "comunicacao_historico", ["origem_modulo", "origem_id"], {}),
+    ("idx_com_historico_template", "comunicacao_historico", ["template_id"], {}),
+    ("idx_com_fila_status_prioridade", "comunicacao_fila", ["status", "prioridade", "criado_em"], {}),
+
+    ("idx_agendamento_data_inicio", "agendamentos", ["data_inicio"], {}),
+    ("idx_agendamento_status_inicio", "agendamentos", ["status", "data_inicio"], {}),
+    ("idx_agendamento_cliente_inicio", "agendamentos", ["cliente_id", "data_inicio"], {}),
+    ("idx_agendamento_os", "agendamentos", ["ordem_servico_id"], {}),
+
+    ("idx_produto_categoria_status", "produtos", ["categoria", "status"], {}),
+    ("idx_produto_status", "produtos", ["status"], {}),
+
+    ("idx_colaborador_nome", "colaboradores", ["nome_completo"], {}),
+    ("idx_colaborador_status", "colaboradores", ["status"], {}),
+    ("idx_colaborador_departamento", "colaboradores", ["departamento_id"], {}),
+    ("idx_colaborador_cargo", "colaboradores", ["cargo_id"], {}),
+    ("idx_colaborador_doc_colaborador", "colaborador_documentos", ["colaborador_id", "data_upload"], {}),
+    ("idx_colaborador_doc_validade", "colaborador_documentos", ["data_validade"], {}),
+]
+
+
+def _indices_existentes(tabela: str) -> Optional[set]:
+    """Nomes dos índices da tabela (None se a tabela não existir)"""
+    inspector = sa.inspect(op.get_bind())
+    if tabela not in inspector.get_table_names():
+        return None
+    return {ix["name"] for ix in inspector.get_indexes(tabela)}
+
+
+def upgrade():
+    for nome, tabela, colunas, opcoes in INDICES:
+        existentes = _indices_existentes(tabela)
+        if existentes is None or nome in existentes:
+            continue
+        op.create_index(nome, tabela, colunas, **opcoes)
+
+
+def downgrade():
+    for nome, tabela, _colunas, _opcoes in reversed(INDICES):
+        existentes = _indices_existentes(tabela)
+        if existentes and nome in existentes:
+            op.drop_index(nome, table_name=tabela)
@@ -0,0 +1,28 @@
+"""
+Tabelas de busca textual (SQLite FTS5) e triggers de sincronização
+
+Cria clientes_fts, fornecedores_fts, produtos_fts e ordens_servico_fts
+(definidas em backend.database.busca_fts) e popula com os dados
+atuais. Em outros bancos não faz nada: as buscas continuam com ilike.
+
+Revision ID: 0002_busca_fts
+Revises: 0001_indices_filtros
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+from backend.database.busca_fts import create_fts_tables, drop_fts_tables
+
+revision = "0002_busca_fts"
+down_revision = "0001_indices_filtros"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_fts_tables(op.get_bind())
+
+
+def downgrade():
+    drop_fts_tables(op.get_bind())
@@ -0,0 +1,48 @@
+"""
+Tabela os_contadores (contadores incrementais do dashboard de OS)
+
+Cria a tabela e preenche com a contagem atual de ordens_servico. A
+partir daí ela é mantida por backend.database.contadores_os.
+
+Revision ID: 0003_contadores_os
+Revises: 0002_busca_fts
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_contadores_os"
+down_revision = "0002_busca_fts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tabelas = sa.inspect(op.get_bind()).get_table_names()
+    if "os_contadores" in tabelas:
+        return
+
+    op.create_table(
+        "os_contadores",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("status", sa.String(30), nullable=False),
+        sa.Column("fase_atual", sa.Integer(), nullable=False),
+        sa.Column("prioridade", sa.String(20), nullable=False),
+        sa.Column("quantidade", sa.Integer(), nullable=False),
+        sa.Column("valor_final", sa.DECIMAL(14, 2), nullable=False),
+        sa.UniqueConstraint("status", "fase_atual", "prioridade", name="uq_os_contadores_chave"),
+    )
+
+    if "ordens_servico" in tabelas:
+        op.execute(
+            "INSERT INTO os_contadores (status, fase_atual, prioridade, quantidade, valor_final) "
+            "SELECT status, fase_atual, COALESCE(prioridade, ''), COUNT(*), "
+            "COALESCE(SUM(valor_final), 0) "
+            "FROM ordens_servico GROUP BY status, fase_atual, COALESCE(prioridade, '')"
+        )
+
+
+def downgrade():
+    if "os_contadores" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("os_contadores")
@@ -0,0 +1,50 @@
+"""
+Soft delete das movimentações e backfill do fluxo de caixa diário
+
+Adiciona movimentacoes_financeiras.ativo e recalcula as linhas diárias
+de fluxo_caixa a partir das movimentações existentes. A partir daí a
+tabela é mantida por backend.database.fluxo_caixa_diario.
+
+Revision ID: 0004_fluxo_caixa_diario
+Revises: 0003_contadores_os
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+revision = "0004_fluxo_caixa_diario"
+down_revision = "0003_contadores_os"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspetor = sa.inspect(bind)
+    tabelas = inspetor.get_table_names()
+    if "movimentacoes_financeiras" not in tabelas:
+        return
+
+    colunas = {c["name"] for c in inspetor.get_columns("movimentacoes_financeiras")}
+    if "ativo" not in colunas:
+        op.add_column(
+            "movimentacoes_financeiras",
+            sa.Column("ativo", sa.Boolean(), nullable=False, server_default=sa.true())
+        )
+
+    if "fluxo_caixa" in tabelas:
+        from backend.database.fluxo_caixa_diario import reconstruir_fluxo_caixa
+        db = Session(bind=bind)
+        reconstruir_fluxo_caixa(db)
+        db.flush()
+
+
+def downgrade():
+    colunas = {
+        c["name"] for c in sa.inspect(op.get_bind()).get_columns("movimentacoes_financeiras")
+    }
+    if "ativo" in colunas:
+        with op.batch_alter_table("movimentacoes_financeiras") as batch:
+            batch.drop_column("ativo")
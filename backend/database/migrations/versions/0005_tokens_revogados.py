@@ -0,0 +1,43 @@
+"""
+Tabela tokens_revogados (lista de revogação de JWT)
+
+Guarda o jti dos tokens revogados no logout até a expiração deles. A
+consulta por requisição é feita em memória por backend.auth.revogacao.
+O id é AUTOINCREMENT: os workers sincronizam por "id > último lido" e o
+maior id não pode voltar a ser usado depois que expira e é apagado.
+
+Revision ID: 0005_tokens_revogados
+Revises: 0004_fluxo_caixa_diario
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_tokens_revogados"
+down_revision = "0004_fluxo_caixa_diario"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "tokens_revogados" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "tokens_revogados",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("jti", sa.String(64), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer()),
+        sa.Column("expira_em", sa.Integer(), nullable=False),
+        sa.Column("data_revogacao", sa.DateTime(timezone=True),
+                  server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_tokens_revogados_expira_em", "tokens_revogados", ["expira_em"])
+
+
+def downgrade():
+    if "tokens_revogados" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_index("ix_tokens_revogados_expira_em", table_name="tokens_revogados")
+        op.drop_table("tokens_revogados")
@@ -0,0 +1,35 @@
+"""
+Tabela versoes_tabelas (contador de alterações por tabela)
+
+Incrementada no commit das transações que escrevem em cada tabela
+(backend.database.versoes_tabelas) e usada no ETag das respostas GET.
+As linhas são criadas por criar_versoes() na inicialização.
+
+Revision ID: 0006_versoes_tabelas
+Revises: 0005_tokens_revogados
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_versoes_tabelas"
+down_revision = "0005_tokens_revogados"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "versoes_tabelas" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "versoes_tabelas",
+        sa.Column("tabela", sa.String(64), primary_key=True),
+        sa.Column("versao", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    if "versoes_tabelas" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("versoes_tabelas")
@@ -0,0 +1,269 @@
+"""
+SISTEMA ERP PRIMOTEX - PAGINAÇÃO POR CURSOR (KEYSET)
+===================================================
+
+Paginação das listagens pela chave de ordenação em vez de OFFSET: a
+próxima página é buscada com "ordem > último valor visto", o que usa o
+índice da coluna e custa o mesmo em qualquer profundidade.
+
+Os tokens next/prev são opacos para o cliente (base64 de um JSON com a
+chave de ordenação, o valor da última/primeira linha e o id usado como
+desempate). O skip/limit antigo continua aceito; quando um cursor é
+informado o skip é ignorado.
+
+A coluna de ordenação deve ser NOT NULL (o desempate é sempre pelo id).
+
+No SQLite, colunas DateTime são texto e o formato gravado varia: o ORM
+grava "YYYY-MM-DD HH:MM:SS.ffffff", mas server_default CURRENT_TIMESTAMP /
+datetime('now') gravam "YYYY-MM-DD HH:MM:SS". Por isso o cursor dessas
+colunas leva o texto exatamente como está no banco e é comparado como
+texto, na mesma ordem do ORDER BY (e ainda pelo índice da coluna).
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import DateTime, String, and_, asc, desc, func, or_, type_coerce
+from sqlalchemy.orm import Query
+
+# Modos de contagem do total
+TOTAL_EXATO = "exato"
+TOTAL_ESTIMADO = "estimado"
+TOTAL_NENHUM = "nenhum"
+TOTAL_MODOS_REGEX = f"^({TOTAL_EXATO}|{TOTAL_ESTIMADO}|{TOTAL_NENHUM})$"
+
+# Acima deste número o total "estimado" deixa de contar linha a linha
+TOTAL_ESTIMADO_LIMITE = 10_000
+
+DIRECAO_PROXIMA = "next"
+DIRECAO_ANTERIOR = "prev"
+
+# Descrições dos parâmetros de query compartilhados pelos routers
+CURSOR_DESC = "Cursor next/prev da página (substitui skip)"
+TOTAL_DESC = "Contagem do total: exato, estimado ou nenhum"
+
+
+class CursorInvalido(ValueError):
+    """Token de cursor malformado ou gerado para outra ordenação"""
+
+
+class PaginaCursor:
+    """Resultado de uma página: itens e tokens para as páginas vizinhas"""
+
+    __slots__ = ("itens", "next_cursor", "prev_cursor")
+
+    def __init__(self, itens: List[Any], next_cursor: Optional[str], prev_cursor: Optional[str]):
+        self.itens = itens
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def headers(self, total: Optional[int] = None) -> dict:
+        """Cabeçalhos para endpoints que retornam lista simples"""
+        headers = {}
+        if self.next_cursor:
+            headers["X-Next-Cursor"] = self.next_cursor
+        if self.prev_cursor:
+            headers["X-Prev-Cursor"] = self.prev_cursor
+        if total is not None:
+            headers["X-Total-Count"] = str(total)
+        return headers
+
+
+# =======================================
+# TOKENS
+# =======================================
+
+def _serializar_valor(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {"dec": str(valor)}
+    return valor
+
+
+def _desserializar_valor(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+        if "dec" in valor:
+            return Decimal(valor["dec"])
+        raise ValueError("tipo de valor desconhecido")
+    return valor
+
+
+def codificar_cursor(chave: str, valor: Any, id_registro: int, direcao: str) -> str:
+    """Gerar o token opaco de uma posição da listagem"""
+    dados = {"k": chave, "v": _serializar_valor(valor), "id": id_registro, "d": direcao}
+    bruto = json.dumps(dados, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(token: str, chave: str) -> Tuple[Any, int, str]:
+    """
+    Ler um token gerado por codificar_cursor.
+
+    Args:
+        token: Valor recebido no parâmetro cursor
+        chave: Chave de ordenação esperada pelo endpoint
+
+    Returns:
+        (valor da coluna de ordenação, id, direção)
+
+    Raises:
+        CursorInvalido: token malformado ou de outra ordenação
+    """
+    try:
+        preenchimento = "=" * (-len(token) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(token + preenchimento))
+        valor = _desserializar_valor(dados["v"])
+        id_registro = int(dados["id"])
+        direcao = dados["d"]
+        chave_token = dados["k"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise CursorInvalido("Cursor de paginação inválido") from e
+
+    if chave_token != chave:
+        raise CursorInvalido("Cursor gerado para outra ordenação")
+    if direcao not in (DIRECAO_PROXIMA, DIRECAO_ANTERIOR):
+        raise CursorInvalido("Cursor de paginação inválido")
+    return valor, id_registro, direcao
+
+
+# =======================================
+# PAGINAÇÃO
+# =======================================
+
+def _coluna_como_texto(query: Query, coluna):
+    """
+    Coluna DateTime vista como o texto gravado (SQLite), ou None quando a
+    comparação pelo tipo da coluna já é exata.
+    """
+    if not isinstance(coluna.type, DateTime):
+        return None
+    bind = query.session.get_bind()
+    if bind.dialect.name != "sqlite":
+        return None
+    return type_coerce(coluna, String)
+
+def paginar(
+    query: Query,
+    coluna,
+    coluna_id,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descendente: bool = False,
+    chave: Optional[str] = None
+) -> PaginaCursor:
+    """
+    Aplicar ordenação (coluna, id) e buscar uma página.
+
+    Sem cursor funciona como antes (OFFSET skip), mas já devolve o token
+    da próxima página. Busca limit + 1 linhas para saber se há mais
+    registros sem precisar contar.
+
+    Args:
+        query: Query já filtrada e sem ORDER BY
+        coluna: Coluna de ordenação (NOT NULL)
+        coluna_id: Coluna de desempate (chave primária)
+        limit: Tamanho da página
+        cursor: Token next/prev recebido do cliente
+        skip: Offset legado (ignorado quando há cursor)
+        descendente: Ordem decrescente
+        chave: Nome da ordenação gravado no token (padrão: nome da coluna)
+    """
+    chave = chave or coluna.key
+    direcao = DIRECAO_PROXIMA
+    como_texto = _coluna_como_texto(query, coluna)
+
+    if cursor:
+        valor, id_registro, direcao = decodificar_cursor(cursor, chave)
+        comparada = coluna
+        if como_texto is not None and isinstance(valor, str):
+            comparada = como_texto
+        # Voltar uma página = percorrer no sentido inverso a partir do
+        # primeiro item da página atual
+        buscar_menores = descendente if direcao == DIRECAO_PROXIMA else not descendente
+        if buscar_menores:
+            condicao = or_(comparada < valor, and_(comparada == valor, coluna_id < id_registro))
+        else:
+            condicao = or_(comparada > valor, and_(comparada == valor, coluna_id > id_registro))
+        query = query.filter(condicao)
+
+    inverter = direcao == DIRECAO_ANTERIOR
+    ordem_desc = descendente != inverter
+    ordenar = desc if ordem_desc else asc
+    query = query.order_by(ordenar(coluna), ordenar(coluna_id))
+
+    if como_texto is not None:
+        query = query.add_columns(como_texto)
+
+    if not cursor and skip:
+        query = query.offset(skip)
+    linhas = query.limit(limit + 1).all()
+
+    ha_mais = len(linhas) > limit
+    linhas = linhas[:limit]
+    if inverter:
+        linhas.reverse()
+
+    if como_texto is not None:
+        itens = [linha[0] for linha in linhas]
+        valores = [linha[-1] for linha in linhas]
+    else:
+        itens = linhas
+        valores = [getattr(item, coluna.key) for item in itens]
+
+    def _token(posicao, sentido):
+        return codificar_cursor(chave, valores[posicao], getattr(itens[posicao], coluna_id.key), sentido)
+
+    if not itens:
+        return PaginaCursor(itens, None, None)
+
+    if inverter:
+        next_cursor = _token(-1, DIRECAO_PROXIMA)
+        prev_cursor = _token(0, DIRECAO_ANTERIOR) if ha_mais else None
+    else:
+        next_cursor = _token(-1, DIRECAO_PROXIMA) if ha_mais else None
+        tem_anterior = bool(cursor) or skip > 0
+        prev_cursor = _token(0, DIRECAO_ANTERIOR) if tem_anterior else None
+
+    return PaginaCursor(itens, next_cursor, prev_cursor)
+
+
+def resolver_modo_total(total: Optional[str], cursor: Optional[str], padrao: str = TOTAL_EXATO) -> str:
+    """
+    Modo de contagem efetivo: o informado pelo cliente ou, se omitido,
+    nenhum em navegação por cursor e o padrão do endpoint no modo skip.
+    """
+    if total:
+        return total
+    return TOTAL_NENHUM if cursor else padrao
+
+
+def contar_total(query: Query, modo: str) -> Optional[int]:
+    """
+    Contar os registros da listagem filtrada.
+
+    - exato: COUNT(*) completo
+    - estimado: COUNT limitado a TOTAL_ESTIMADO_LIMITE linhas; acima
+      disso retorna o próprio limite (valor mínimo)
+    - nenhum: None, sem consulta
+    """
+    if modo == TOTAL_NENHUM:
+        return None
+    if modo == TOTAL_ESTIMADO:
+        subquery = query.order_by(None).limit(TOTAL_ESTIMADO_LIMITE).subquery()
+        return query.session.query(func.count()).select_from(subquery).scalar()
+    return query.order_by(None).count()
@@ -0,0 +1,202 @@
+"""
+SISTEMA ERP PRIMOTEX - TOTAIS INCREMENTAIS (BASE COMUM)
+======================================================
+
+Partes comuns às tabelas de totais mantidas no flush
+(backend.database.contadores_os e backend.database.fluxo_caixa_diario):
+
+- monitorar(): listeners com active_history nas colunas monitoradas e
+  o after_flush que calcula e grava os deltas na mesma transação
+- valores_anteriores() / alterado(): histórico das colunas no flush
+- inserir_se_ausente(): INSERT ... ON CONFLICT DO NOTHING do dialeto,
+  para criar a linha de uma chave sem corrida entre transações
+- incrementar(): INSERT ... ON CONFLICT DO UPDATE somando os deltas
+- sincronizar() e main(): conferência no startup e o comando
+  administrativo --verificar / --reconstruir
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import argparse
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from sqlalchemy import Table, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, attributes
+
+# Dialetos com INSERT ... ON CONFLICT
+_INSERT_COM_CONFLITO = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+# =======================================
+# DELTAS NO FLUSH
+# =======================================
+
+def valores_anteriores(obj, campos: Iterable[str]) -> dict:
+    """Valores das colunas antes das alterações deste flush"""
+    anteriores = {}
+    for campo in campos:
+        historico = attributes.get_history(obj, campo)
+        if historico.deleted:
+            anteriores[campo] = historico.deleted[0]
+        else:
+            anteriores[campo] = getattr(obj, campo)
+    return anteriores
+
+
+def alterado(obj, campos: Iterable[str]) -> bool:
+    """Alguma das colunas mudou neste flush"""
+    estado = inspect(obj)
+    return any(estado.attrs[campo].history.has_changes() for campo in campos)
+
+
+def _carregar_valor_anterior(alvo, valor, anterior, iniciador):
+    return valor
+
+
+def monitorar(modelo, campos: Iterable[str],
+              calcular_deltas: Callable[[Session], Dict],
+              aplicar_deltas: Callable[[Connection, Dict], None]) -> Callable:
+    """
+    Registrar a manutenção incremental de uma tabela de totais.
+
+    Com active_history o valor antigo das colunas é carregado antes da
+    atribuição mesmo quando o atributo expirou (ex.: alteração depois de
+    um commit). No after_flush de qualquer Session, os deltas calculados
+    são aplicados na conexão da própria transação.
+
+    Returns:
+        O listener de after_flush registrado
+    """
+    for campo in campos:
+        event.listen(
+            getattr(modelo, campo), "set", _carregar_valor_anterior,
+            active_history=True, retval=True
+        )
+
+    def aplicar_no_flush(session: Session, flush_context):
+        deltas = calcular_deltas(session)
+        if deltas:
+            aplicar_deltas(session.connection(), deltas)
+
+    event.listen(Session, "after_flush", aplicar_no_flush)
+    return aplicar_no_flush
+
+
+def inserir_se_ausente(conn: Connection, tabela: Table, valores: dict,
+                       colunas_unicas: Sequence[str]) -> None:
+    """
+    Inserir a linha se nenhuma outra tiver as mesmas colunas_unicas.
+
+    Em SQLite e PostgreSQL é um INSERT ... ON CONFLICT DO NOTHING (no
+    PostgreSQL, espera a transação concorrente que inseriu a mesma
+    chave). Nos demais, um SAVEPOINT absorve a violação de unicidade.
+    """
+    insert = _INSERT_COM_CONFLITO.get(conn.dialect.name)
+    if insert is not None:
+        conn.execute(insert(tabela).values(**valores).on_conflict_do_nothing(
+            index_elements=list(colunas_unicas)
+        ))
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(tabela.insert().values(**valores))
+    except IntegrityError:
+        pass
+
+
+def incrementar(conn: Connection, tabela: Table, chave: dict, incrementos: dict) -> None:
+    """
+    Somar os incrementos na linha da chave, criando-a com eles se não existir.
+
+    Em SQLite e PostgreSQL é um único INSERT ... ON CONFLICT DO UPDATE
+    (atômico mesmo sem escritor único). Nos demais, UPDATE e, sem linha,
+    INSERT em SAVEPOINT; se outra transação criou a linha nesse meio
+    tempo, o UPDATE é repetido.
+    """
+    insert = _INSERT_COM_CONFLITO.get(conn.dialect.name)
+    if insert is not None:
+        comando = insert(tabela).values(**chave, **incrementos)
+        conn.execute(comando.on_conflict_do_update(
+            index_elements=list(chave),
+            set_={coluna: tabela.c[coluna] + comando.excluded[coluna] for coluna in incrementos}
+        ))
+        return
+
+    def somar() -> int:
+        return conn.execute(
+            tabela.update()
+            .where(*(tabela.c[coluna] == valor for coluna, valor in chave.items()))
+            .values({coluna: tabela.c[coluna] + valor for coluna, valor in incrementos.items()})
+        ).rowcount
+
+    if somar():
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(tabela.insert().values(**chave, **incrementos))
+    except IntegrityError:
+        somar()
+
+
+# =======================================
+# STARTUP E LINHA DE COMANDO
+# =======================================
+
+def sincronizar(engine: Engine, verificar: Callable[[Session], List[str]],
+                reconstruir: Callable[[Session], int]) -> bool:
+    """
+    Conferir a tabela no startup e reconstruir se divergir.
+
+    Returns:
+        True se foi preciso reconstruir
+    """
+    with Session(bind=engine) as db:
+        if not verificar(db):
+            return False
+        reconstruir(db)
+        db.commit()
+        return True
+
+
+def main(argv, fabrica_sessao, descricao: str,
+         verificar: Callable[[Session], List[str]],
+         reconstruir: Callable[[Session], int],
+         ajuda_reconstruir: str, reconstruido: str, confere: str) -> int:
+    """
+    Comando --verificar / --reconstruir de uma tabela de totais.
+
+    Args:
+        reconstruido: mensagem com {} para o retorno de reconstruir()
+        confere: mensagem quando não há divergências
+
+    Returns:
+        0 se a tabela confere, 1 se há divergências
+    """
+    parser = argparse.ArgumentParser(description=descricao)
+    acao = parser.add_mutually_exclusive_group(required=True)
+    acao.add_argument("--verificar", action="store_true", help="Comparar com recontagem completa")
+    acao.add_argument("--reconstruir", action="store_true", help=ajuda_reconstruir)
+    args = parser.parse_args(argv)
+
+    if fabrica_sessao is None:
+        from backend.database.config import SessionLocal as fabrica_sessao
+
+    with fabrica_sessao() as db:
+        if args.reconstruir:
+            gravados = reconstruir(db)
+            db.commit()
+            print(f"✅ {reconstruido.format(gravados)}")
+
+        divergencias = verificar(db)
+
+    if divergencias:
+        print(f"❌ {len(divergencias)} divergência(s):")
+        for divergencia in divergencias:
+            print(f"   {divergencia}")
+        return 1
+    print(f"✅ {confere}")
+    return 0
@@ -0,0 +1,96 @@
+"""
+SISTEMA ERP PRIMOTEX - VERSÕES DAS TABELAS
+=========================================
+
+Mantém versoes_tabelas: um contador por tabela incrementado no commit
+de toda transação que executou INSERT, UPDATE ou DELETE nela. O ETag
+das respostas GET (backend.api.cache_http) é derivado dessas versões,
+então uma resposta só muda de ETag quando alguma tabela lida mudou.
+
+As escritas vêm do rastreador do Engine (backend.database.escritas:
+ORM, bulk_insert_mappings, Core, SQL textual e group commit) e o
+incremento é feito no evento commit, na mesma transação: um rollback
+não altera as versões.
+
+A conexão das migrações (backend/database/migrations/env.py) é marcada
+com CONEXAO_MIGRACAO: nela o incremento só acontece se versoes_tabelas
+já existe, porque as migrações anteriores à 0006 também escrevem.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import logging
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from backend.database import escritas
+from backend.database.config import Base
+from backend.models.versao_tabela_model import VersaoTabela
+
+logger = logging.getLogger(__name__)
+
+_tabela = VersaoTabela.__table__
+
+# Chave em Connection.info da conexão usada pelo Alembic
+CONEXAO_MIGRACAO = "versoes_tabelas.migracao"
+
+
+@escritas.no_commit
+def _incrementar_no_commit(conn: Connection, tabelas: Set[str]) -> None:
+    # Só tabelas do ERP: outros bancos abertos pelo processo não têm versoes_tabelas
+    tabelas = {nome for nome in tabelas if nome in Base.metadata.tables}
+    if not tabelas:
+        return
+    if conn.info.get(CONEXAO_MIGRACAO) and not inspect(conn).has_table(_tabela.name):
+        return
+    incrementar_versoes(conn, tabelas)
+
+
+def incrementar_versoes(conn: Connection, tabelas: Set[str]) -> None:
+    """Somar 1 à versão das tabelas (criando a linha na primeira escrita)"""
+    for nome in sorted(tabelas - {_tabela.name}):
+        resultado = conn.execute(
+            update(_tabela).where(_tabela.c.tabela == nome).values(versao=_tabela.c.versao + 1)
+        )
+        if resultado.rowcount == 0:
+            conn.execute(_tabela.insert().values(tabela=nome, versao=1))
+
+
+def ler_versoes(db: Session, tabelas: Iterable[str]) -> Dict[str, int]:
+    """
+    Versões atuais das tabelas (0 para tabela ainda sem escrita).
+
+    Uma consulta pela chave primária de versoes_tabelas.
+    """
+    tabelas = list(tabelas)
+    versoes = dict.fromkeys(tabelas, 0)
+    linhas = db.execute(
+        select(_tabela.c.tabela, _tabela.c.versao).where(_tabela.c.tabela.in_(tabelas))
+    ).all()
+    for nome, versao in linhas:
+        versoes[nome] = versao
+    return versoes
+
+
+def criar_versoes(engine: Engine) -> int:
+    """
+    Criar a linha de versão das tabelas que ainda não têm uma, para que o
+    commit só precise de UPDATE (evita corrida no INSERT entre workers).
+
+    Returns:
+        Quantidade de linhas criadas
+    """
+    with engine.begin() as conn:
+        existentes = set(conn.execute(select(_tabela.c.tabela)).scalars())
+        novas = [
+            {"tabela": nome, "versao": 0}
+            for nome in Base.metadata.tables
+            if nome not in existentes and nome != _tabela.name
+        ]
+        if novas:
+            conn.execute(_tabela.insert(), novas)
+    return len(novas)
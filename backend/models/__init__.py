@@ -8,6 +8,8 @@ corretamente pelo SQLAlchemy.
 
 MODELOS DISPONÍVEIS:
 - Usuario: Usuários do sistema (autenticação)
+- TokenRevogado: Tokens JWT revogados no logout
+- VersaoTabela: Contador de alterações por tabela (ETag)
 - Cliente: Clientes da empresa
 - Produto: Produtos e serviços
 - OrdemServico: Ordem de serviço principal
@@ -26,7 +28,7 @@ from backend.database.config import Base
 # =======================================
 
 # Modelo de usuários (autenticação)
-from .user_model import Usuario, PERFIS_SISTEMA
+from .user_model import Usuario, TokenRevogado, PERFIS_SISTEMA
 
 # Modelo de clientes
 from .cliente_model import (
@@ -77,6 +79,7 @@ from .ordem_servico_model import (
     FaseOS,
     VisitaTecnica,
     Orcamento,
+    ContadorOS,
     FASES_OS,
     STATUS_FASES,
     STATUS_OS,
@@ -124,6 +127,18 @@ from .comunicacao import (
     CANAIS_COMUNICACAO
 )
 
+# Versões das tabelas (ETag das respostas GET)
+from .versao_tabela_model import VersaoTabela
+
+# Manutenção incremental de os_contadores (registra o listener de flush)
+from backend.database import contadores_os  # noqa: F401,E402
+# Manutenção incremental do fluxo de caixa diário (listener de flush)
+from backend.database import fluxo_caixa_diario  # noqa: F401,E402
+# Incremento das versões das tabelas no commit (listener do engine)
+from backend.database import versoes_tabelas  # noqa: F401,E402
+# Invalidação do cache em memória após o commit (rastreador de escritas do engine)
+from backend.database import invalidacao_cache  # noqa: F401,E402
+
 # =======================================
 # LISTA DE TODOS OS MODELOS
 # =======================================
@@ -131,6 +146,7 @@ from .comunicacao import (
 # Esta lista é usada para criar todas as tabelas
 ALL_MODELS = [
     Usuario,
+    TokenRevogado,
     Cliente,
     Produto,
     Fornecedor,
@@ -145,6 +161,7 @@ ALL_MODELS = [
     FaseOS,
     VisitaTecnica,
     Orcamento,
+    ContadorOS,
     Agendamento,
     ConfiguracaoAgenda,
     DisponibilidadeUsuario,
@@ -158,7 +175,8 @@ ALL_MODELS = [
     ComunicacaoHistorico,
     ComunicacaoConfig,
     ComunicacaoFila,
-    ComunicacaoEstatisticas
+    ComunicacaoEstatisticas,
+    VersaoTabela
 ]
 
 # =======================================
@@ -175,12 +193,62 @@ def create_all_tables(engine):
     try:
         # Criar todas as tabelas baseadas nos modelos
         Base.metadata.create_all(bind=engine)
+        # create_all não adiciona índices novos em tabelas já existentes
+        criados = create_missing_indexes(engine)
+        if criados:
+            print(f"✅ Índices criados: {', '.join(criados)}")
+        # Tabelas de busca textual (FTS5) e triggers de sincronização
+        from backend.database.busca_fts import create_fts_tables
+        fts = create_fts_tables(engine)
+        if fts:
+            print(f"✅ Tabelas de busca criadas: {', '.join(fts)}")
+        # Contadores do dashboard de OS (reconstruídos se divergirem)
+        from backend.database.contadores_os import sincronizar_contadores
+        if sincronizar_contadores(engine):
+            print("✅ Contadores de OS reconstruídos")
+        # Fluxo de caixa diário (backfill quando divergir das movimentações)
+        from backend.database.fluxo_caixa_diario import sincronizar_fluxo_caixa
+        if sincronizar_fluxo_caixa(engine):
+            print("✅ Fluxo de caixa diário reconstruído")
+        # Versões das tabelas usadas no ETag das respostas GET
+        from backend.database.versoes_tabelas import criar_versoes
+        criar_versoes(engine)
         print("✅ Todas as tabelas criadas com sucesso!")
         return True
     except Exception as e:
         print(f"❌ Erro ao criar tabelas: {e}")
         return False
 
+def create_missing_indexes(engine):
+    """
+    Criar os índices declarados nos modelos que ainda não existem no banco.
+    
+    Bancos criados antes da declaração dos índices só os recebem por aqui
+    (ou pela migração Alembic equivalente).
+    
+    Args:
+        engine: Engine do SQLAlchemy
+        
+    Returns:
+        Lista com os nomes dos índices criados
+    """
+    from sqlalchemy import inspect
+    
+    inspector = inspect(engine)
+    tabelas_existentes = set(inspector.get_table_names())
+    criados = []
+    
+    for tabela in Base.metadata.tables.values():
+        if tabela.name not in tabelas_existentes:
+            continue
+        existentes = {ix["name"] for ix in inspector.get_indexes(tabela.name)}
+        for indice in tabela.indexes:
+            if indice.name not in existentes:
+                indice.create(bind=engine)
+                criados.append(indice.name)
+    
+    return criados
+
 # =======================================
 # FUNÇÃO PARA LISTAR TODAS AS TABELAS
 # =======================================
@@ -11,7 +11,7 @@ Criado em: 29/10/2025
 Autor: GitHub Copilot
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database.config import Base
@@ -94,6 +94,14 @@ class Agendamento(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_by = Column(String(100), nullable=False)
     
+    # Índices para a agenda por período, por cliente e por OS
+    __table_args__ = (
+        Index('idx_agendamento_data_inicio', 'data_inicio'),
+        Index('idx_agendamento_status_inicio', 'status', 'data_inicio'),
+        Index('idx_agendamento_cliente_inicio', 'cliente_id', 'data_inicio'),
+        Index('idx_agendamento_os', 'ordem_servico_id'),
+    )
+    
     # Relacionamentos
     ordem_servico = relationship("OrdemServico", back_populates="agendamentos")
     cliente = relationship("Cliente", back_populates="agendamentos")
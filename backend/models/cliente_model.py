@@ -34,7 +34,7 @@ ORIGENS_CLIENTE = [
 ]
 TIPOS_CLIENTE = ["Residencial", "Comercial", "Industrial", "Público"]
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, Date
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database.config import Base
@@ -302,6 +302,17 @@ class Cliente(Base):
         comment="ID do usuário que fez a última atualização"
     )
     
+    # =======================================
+    # ÍNDICES PARA PERFORMANCE
+    # =======================================
+    
+    # Listagem ordenada por nome com filtro de status/tipo
+    __table_args__ = (
+        Index('idx_cliente_status_nome', 'status', 'nome'),
+        Index('idx_cliente_tipo_nome', 'tipo_pessoa', 'nome'),
+        Index('idx_cliente_cidade_estado', 'endereco_cidade', 'endereco_estado'),
+    )
+    
     # =======================================
     # RELACIONAMENTOS (FASE 3)
     # =======================================
@@ -31,7 +31,7 @@ Data: 01/11/2025
 
 from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime, Date, Text, 
-    DECIMAL, ForeignKey, Enum as SQLEnum
+    DECIMAL, ForeignKey, Index, Enum as SQLEnum
 )
 from sqlalchemy.orm import relationship, remote
 from sqlalchemy.sql import func
@@ -247,6 +247,14 @@ class Colaborador(Base):
     data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
     cadastrado_por = Column(Integer, ForeignKey("usuarios.id"))
     
+    # Índices para a listagem (ordenada por nome) e contadores por status
+    __table_args__ = (
+        Index('idx_colaborador_nome', 'nome_completo'),
+        Index('idx_colaborador_status', 'status'),
+        Index('idx_colaborador_departamento', 'departamento_id'),
+        Index('idx_colaborador_cargo', 'cargo_id'),
+    )
+    
     # Relacionamentos
     usuario = relationship("Usuario", foreign_keys=[user_id])
     cargo = relationship("Cargo", back_populates="colaboradores")
@@ -371,6 +379,11 @@ class ColaboradorDocumento(Base):
     data_upload = Column(DateTime, default=func.now())
     uploadado_por = Column(Integer, ForeignKey("usuarios.id"))
     
+    __table_args__ = (
+        Index('idx_colaborador_doc_colaborador', 'colaborador_id', 'data_upload'),
+        Index('idx_colaborador_doc_validade', 'data_validade'),
+    )
+    
     # Relacionamentos
     colaborador = relationship("Colaborador", back_populates="documentos")
     
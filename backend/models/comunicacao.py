@@ -17,7 +17,7 @@ Autor: GitHub Copilot
 Data: 29/10/2025
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database.config import Base
@@ -144,6 +144,16 @@ class ComunicacaoHistorico(Base):
     criado_em = Column(DateTime(timezone=True), server_default=func.now())
     atualizado_em = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Índices para o histórico paginado por data e métricas do dashboard
+    __table_args__ = (
+        Index('idx_com_historico_criado_em', 'criado_em'),
+        Index('idx_com_historico_status_criado', 'status', 'criado_em'),
+        Index('idx_com_historico_tipo_criado', 'tipo', 'criado_em'),
+        Index('idx_com_historico_cliente_criado', 'cliente_id', 'criado_em'),
+        Index('idx_com_historico_origem', 'origem_modulo', 'origem_id'),
+        Index('idx_com_historico_template', 'template_id'),
+    )
+    
     # Relacionamentos
     template = relationship("ComunicacaoTemplate", back_populates="comunicacoes")
     cliente = relationship("Cliente", back_populates="comunicacoes")
@@ -215,6 +225,11 @@ class ComunicacaoFila(Base):
     processado_em = Column(DateTime(timezone=True), nullable=True)
     erro_detalhes = Column(Text, nullable=True)
 
+    # Índice do processamento da fila (pendentes por prioridade)
+    __table_args__ = (
+        Index('idx_com_fila_status_prioridade', 'status', 'prioridade', 'criado_em'),
+    )
+
 class ComunicacaoEstatisticas(Base):
     """
     Modelo para estatísticas de comunicação
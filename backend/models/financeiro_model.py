@@ -11,7 +11,7 @@ Criado em: 29/10/2025
 Autor: GitHub Copilot
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Index, text
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -83,6 +83,20 @@ class ContaReceber(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Índices parciais: as listagens e totais filtram sempre ativo = 1
+    __table_args__ = (
+        Index(
+            'idx_conta_receber_status_vencimento', 'status', 'data_vencimento',
+            sqlite_where=text('ativo = 1'), postgresql_where=text('ativo')
+        ),
+        Index(
+            'idx_conta_receber_vencimento', 'data_vencimento',
+            sqlite_where=text('ativo = 1'), postgresql_where=text('ativo')
+        ),
+        Index('idx_conta_receber_cliente_vencimento', 'cliente_id', 'data_vencimento'),
+        Index('idx_conta_receber_os', 'ordem_servico_id'),
+    )
+    
     # Relacionamentos
     ordem_servico = relationship("OrdemServico", back_populates="contas_receber")
     cliente = relationship("Cliente", back_populates="contas_receber")
@@ -178,6 +192,19 @@ class ContaPagar(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Índices parciais: as listagens e totais filtram sempre ativo = 1
+    __table_args__ = (
+        Index(
+            'idx_conta_pagar_status_vencimento', 'status', 'data_vencimento',
+            sqlite_where=text('ativo = 1'), postgresql_where=text('ativo')
+        ),
+        Index(
+            'idx_conta_pagar_vencimento', 'data_vencimento',
+            sqlite_where=text('ativo = 1'), postgresql_where=text('ativo')
+        ),
+        Index('idx_conta_pagar_fornecedor_vencimento', 'fornecedor_id', 'data_vencimento'),
+    )
+    
     # Relacionamentos
     movimentacoes = relationship("MovimentacaoFinanceira", back_populates="conta_pagar", cascade="all, delete-orphan")
     
@@ -235,6 +262,9 @@ class MovimentacaoFinanceira(Base):
     conciliado = Column(Boolean, default=False)
     data_conciliacao = Column(DateTime(timezone=True))
     
+    # Status
+    ativo = Column(Boolean, default=True, nullable=False)  # Campo para soft delete
+    
     # Responsável
     usuario_responsavel = Column(String(100), nullable=False)
     
@@ -242,6 +272,14 @@ class MovimentacaoFinanceira(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Índices para extrato por período e baixas por conta
+    __table_args__ = (
+        Index('idx_movimentacao_data', 'data_movimentacao'),
+        Index('idx_movimentacao_tipo_data', 'tipo_movimentacao', 'data_movimentacao'),
+        Index('idx_movimentacao_conta_receber', 'conta_receber_id'),
+        Index('idx_movimentacao_conta_pagar', 'conta_pagar_id'),
+    )
+    
     # Relacionamentos
     conta_receber = relationship("ContaReceber", back_populates="movimentacoes")
     conta_pagar = relationship("ContaPagar", back_populates="movimentacoes")
@@ -12,7 +12,9 @@ Autor: GitHub Copilot
 """
 
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, text
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Index, UniqueConstraint, text
+)
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.orm import relationship
 from backend.database.config import Base
@@ -103,6 +105,19 @@ class OrdemServico(Base):
     created_at = Column(DateTime(timezone=True), server_default=text('CURRENT_TIMESTAMP'))
     updated_at = Column(DateTime(timezone=True), onupdate=text('CURRENT_TIMESTAMP'))
     
+    # Índices para listagens, histórico do cliente e contadores do dashboard
+    __table_args__ = (
+        Index('idx_os_cliente_abertura', 'cliente_id', 'data_abertura'),
+        Index('idx_os_cliente_created', 'cliente_id', 'created_at'),
+        Index('idx_os_status_created', 'status', 'created_at'),
+        Index('idx_os_prioridade_created', 'prioridade', 'created_at'),
+        Index('idx_os_fase_status', 'fase_atual', 'status'),
+        Index('idx_os_tipo_servico', 'tipo_servico'),
+        Index('idx_os_data_abertura', 'data_abertura'),
+        Index('idx_os_previsao_status', 'data_prevista_conclusao', 'status'),
+        Index('idx_os_created_at', 'created_at'),
+    )
+    
     # Relacionamentos
     cliente = relationship("Cliente", back_populates="ordens_servico")
     fases = relationship("FaseOS", back_populates="ordem_servico", cascade=CASCADE_DELETE_ORPHAN)
@@ -309,6 +324,35 @@ class Orcamento(Base):
         return f"<Orcamento(numero='{self.numero_orcamento}', valor_total={self.valor_total}, status='{self.status_aprovacao}')>"
 
 
+class ContadorOS(Base):
+    """
+    Contadores das OS por (status, fase, prioridade)
+
+    Mantidos no mesmo flush em que uma OS é criada, alterada ou
+    excluída (backend.database.contadores_os), para o dashboard ler
+    totais e valor em aberto sem varrer ordens_servico.
+    """
+    __tablename__ = "os_contadores"
+
+    id = Column(Integer, primary_key=True)
+
+    # Chave (prioridade nula é gravada como "")
+    status = Column(String(30), nullable=False)
+    fase_atual = Column(Integer, nullable=False)
+    prioridade = Column(String(20), nullable=False, default="")
+
+    # Valores
+    quantidade = Column(Integer, nullable=False, default=0)
+    valor_final = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("status", "fase_atual", "prioridade", name="uq_os_contadores_chave"),
+    )
+
+    def __repr__(self):
+        return f"<ContadorOS(status='{self.status}', fase={self.fase_atual}, prioridade='{self.prioridade}', quantidade={self.quantidade})>"
+
+
 # Constantes para as fases da OS
 FASES_OS = {
     1: {
@@ -21,7 +21,7 @@ Autor: GitHub Copilot
 Data: 29/10/2025
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey, Index
 from sqlalchemy.sql import func
 from backend.database.config import Base
 
@@ -318,6 +318,15 @@ class Produto(Base):
         comment="Observações gerais sobre o produto/serviço"
     )
     
+    # =======================================
+    # ÍNDICES PARA PERFORMANCE
+    # =======================================
+    
+    __table_args__ = (
+        Index('idx_produto_categoria_status', 'categoria', 'status'),
+        Index('idx_produto_status', 'status'),
+    )
+    
     # =======================================
     # MÉTODOS DA CLASSE
     # =======================================
@@ -155,6 +155,34 @@ class Usuario(Base):
         """Verificar se pode acessar módulo financeiro"""
         return self.perfil in ["Administrador", "Gerente", "Financeiro"]
 
+class TokenRevogado(Base):
+    """
+    Tokens JWT revogados (logout) até a data de expiração.
+
+    A consulta em cada requisição é feita em memória
+    (backend.auth.revogacao); a tabela só persiste a lista entre
+    reinícios e a repassa aos demais workers.
+
+    Os workers leem as linhas novas por id; AUTOINCREMENT impede o SQLite
+    de reaproveitar o maior id depois que a linha expirada é apagada.
+    """
+    __tablename__ = "tokens_revogados"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), nullable=False, unique=True, comment="Identificador do token (claim jti)")
+    user_id = Column(Integer, comment="Usuário dono do token")
+    expira_em = Column(Integer, nullable=False, index=True, comment="Expiração do token (epoch, segundos)")
+    data_revogacao = Column(
+        DateTime(timezone=True),
+        server_default=text('CURRENT_TIMESTAMP'),
+        nullable=False,
+        comment="Data e hora da revogação"
+    )
+
+    def __repr__(self):
+        return f"<TokenRevogado(jti='{self.jti}', user_id={self.user_id}, expira_em={self.expira_em})>"
+
 # =======================================
 # PERFIS DISPONÍVEIS NO SISTEMA
 # =======================================
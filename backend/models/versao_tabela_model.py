@@ -0,0 +1,25 @@
+"""
+SISTEMA ERP PRIMOTEX - MODELO DE VERSÕES DAS TABELAS
+===================================================
+
+Contador de alterações por tabela, incrementado no commit de qualquer
+transação que escreveu na tabela (backend.database.versoes_tabelas).
+Usado para gerar o ETag das respostas GET.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+from sqlalchemy import Column, Integer, String
+from backend.database.config import Base
+
+
+class VersaoTabela(Base):
+    """Versão (contador de commits com escrita) de uma tabela"""
+    __tablename__ = "versoes_tabelas"
+
+    tabela = Column(String(64), primary_key=True, comment="Nome da tabela")
+    versao = Column(Integer, nullable=False, default=0, comment="Incrementada a cada commit com escrita")
+
+    def __repr__(self):
+        return f"<VersaoTabela(tabela='{self.tabela}', versao={self.versao})>"
@@ -423,10 +423,12 @@ class CalendarioResponse(BaseModel):
 class AgendamentoListResponse(BaseModel):
     """Schema de resposta para listagem de agendamentos"""
     items: List[AgendamentoResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
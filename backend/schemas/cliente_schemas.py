@@ -387,9 +387,11 @@ class ListagemClientes(BaseModel):
     Usado na ABA 1 (Lista de Clientes) para retornar resultados paginados.
     """
     itens: List[ClienteResponse] = Field(..., description="Lista de clientes")
-    total: int = Field(..., description="Total de registros encontrados")
+    total: Optional[int] = Field(None, description="Total de registros encontrados (None se total=nenhum)")
     skip: int = Field(..., description="Registros pulados (offset)")
     limit: int = Field(..., description="Limite de registros por página")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página")
+    prev_cursor: Optional[str] = Field(None, description="Cursor da página anterior")
 
 
 class ClienteResumido(BaseModel):
@@ -540,10 +540,12 @@ class FornecedorListResponse(BaseModel):
     """Resposta da listagem de fornecedores"""
 
     items: List[FornecedorListItem]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -27,6 +27,7 @@ from email import encoders
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from backend.database.group_commit import executar_escrita
 from backend.models.comunicacao import (
     ComunicacaoTemplate, ComunicacaoHistorico, ComunicacaoConfig, 
     ComunicacaoFila, TipoComunicacao, StatusComunicacao
@@ -113,10 +114,9 @@ class ComunicacaoService:
 
             # Se é para agendar, adicionar à fila
             if request.agendar_para and request.agendar_para > datetime.now():
-                self._adicionar_a_fila(request, conteudo, assunto)
+                fila_item = self._criar_item_fila(request, conteudo, assunto)
                 historico.status = StatusComunicacao.PENDENTE
-                self.db.add(historico)
-                self.db.commit()
+                self._gravar_historico(historico, fila_item)
 
                 return EnvioMensagemResponse(
                     sucesso=True,
@@ -134,8 +134,7 @@ class ComunicacaoService:
             historico.erro_detalhes = resultado.get('erro')
             historico.provider_response = resultado.get('detalhes')
 
-            self.db.add(historico)
-            self.db.commit()
+            self._gravar_historico(historico)
 
             return EnvioMensagemResponse(
                 sucesso=resultado['sucesso'],
@@ -151,9 +150,21 @@ class ComunicacaoService:
                 mensagem=f"Erro interno: {str(e)}"
             )
 
-    def _adicionar_a_fila(self, request: EnvioMensagemRequest, conteudo: str, assunto: str):
-        """Adicionar mensagem à fila de processamento"""
-        fila_item = ComunicacaoFila(
+    def _gravar_historico(self, historico: ComunicacaoHistorico,
+                          fila_item: Optional[ComunicacaoFila] = None):
+        """Gravar histórico (e item de fila) em uma única unidade de escrita"""
+        def gravar(sessao: Session):
+            if fila_item is not None:
+                sessao.add(fila_item)
+            sessao.add(historico)
+            sessao.flush()
+
+        executar_escrita(self.db, gravar)
+
+    def _criar_item_fila(self, request: EnvioMensagemRequest, conteudo: str,
+                         assunto: str) -> ComunicacaoFila:
+        """Criar item da fila de processamento (gravado junto com o histórico)"""
+        return ComunicacaoFila(
             template_id=request.template_id,
             prioridade=request.prioridade,
             destinatario_nome=request.destinatario_nome,
@@ -167,9 +178,6 @@ class ComunicacaoService:
             origem_id=request.origem_id
         )
 
-        self.db.add(fila_item)
-        self.db.commit()
-
     def _enviar_imediato(self, tipo: TipoComunicacao, request: EnvioMensagemRequest, 
                         conteudo: str, assunto: str) -> Dict[str, Any]:
         """Enviar mensagem imediatamente"""
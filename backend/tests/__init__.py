@@ -0,0 +1,7 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO BACKEND
+=======================================
+
+Executar na raiz do projeto:
+    python -m pytest -q backend/tests
+"""
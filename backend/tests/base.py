@@ -0,0 +1,140 @@
+"""
+SISTEMA ERP PRIMOTEX - BASE DOS TESTES DE API
+============================================
+
+Sobe a aplicação contra um banco SQLite temporário (mesmo perfil de
+produção: WAL, escritor serializado e pool de leitores) e autentica um
+usuário administrador. assert_max_queries(n) fixa o orçamento de
+consultas de um trecho (ex.: uma chamada de endpoint).
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from backend.api.main import app
+from backend.auth.cache_usuarios import UsuarioAutenticado, cache_usuarios
+from backend.auth.jwt_handler import generate_user_token, hash_password
+from backend.database.busca_fts import create_fts_tables
+from backend.database.config import Base, create_sqlite_engines, get_db, get_read_db
+from backend.database.instrumentacao import ConsultasRequisicao, observar_consultas
+from backend.models import Usuario
+
+
+@contextmanager
+def assert_max_queries(n: int):
+    """
+    Falhar se o bloco executar mais de n instruções SQL (em qualquer
+    engine instrumentado e em qualquer thread, inclusive no TestClient).
+
+    Example:
+        with assert_max_queries(3):
+            client.get("/api/v1/clientes/")
+    """
+    consultas = ConsultasRequisicao()
+    with observar_consultas(consultas.registrar):
+        yield consultas
+    if consultas.total > n:
+        formatos = sorted(consultas.formatos().items(), key=lambda item: item[1], reverse=True)
+        detalhes = "\n".join(f"  {vezes}x {formato[:200]}" for formato, vezes in formatos)
+        raise AssertionError(f"{consultas.total} consultas executadas, máximo {n}:\n{detalhes}")
+
+
+class ApiTestCase(unittest.TestCase):
+    """Caso de teste com banco temporário e cliente HTTP autenticado"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.mkdtemp(prefix="erp_teste_")
+        # IDs de usuário se repetem entre os bancos temporários de cada classe
+        cache_usuarios.limpar()
+        url = f"sqlite:///{os.path.join(cls._tmp, 'teste.db')}"
+        cls.engine, cls.read_engine = create_sqlite_engines(url, read_pool_size=2)
+        Base.metadata.create_all(bind=cls.engine)
+        create_fts_tables(cls.engine)
+
+        cls.SessionLocal = sessionmaker(bind=cls.engine, autoflush=False)
+        cls.ReadSessionLocal = sessionmaker(bind=cls.read_engine, autoflush=False)
+
+        def _get_db():
+            db = cls.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        def _get_read_db():
+            db = cls.ReadSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        cls._overrides_anteriores = dict(app.dependency_overrides)
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_read_db] = _get_read_db
+
+        db = cls.SessionLocal()
+        admin = Usuario(
+            username="admin_teste",
+            email="admin_teste@primotex.com",
+            senha_hash=hash_password("Senha@123"),
+            nome_completo="Administrador de Teste",
+            perfil="administrador",
+            ativo=True
+        )
+        db.add(admin)
+        db.commit()
+        token = generate_user_token(admin.id, admin.username, admin.email, admin.perfil)
+        cls.admin_id = admin.id
+        # Com o cache aquecido, as contagens de consultas não incluem a autenticação
+        cache_usuarios.guardar(UsuarioAutenticado.de_usuario(admin))
+        db.close()
+
+        cls.headers = {"Authorization": f"Bearer {token}"}
+        cls.client = TestClient(app, raise_server_exceptions=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(cls._overrides_anteriores)
+        cache_usuarios.limpar()
+        cls.engine.dispose()
+        cls.read_engine.dispose()
+        shutil.rmtree(cls._tmp, ignore_errors=True)
+
+    def assert_max_queries(self, n: int):
+        """Atalho para assert_max_queries(n) dentro dos casos de teste"""
+        return assert_max_queries(n)
+
+    @contextmanager
+    def contar_consultas(self):
+        """
+        Capturar as instruções SQL executadas nos dois engines.
+
+        Example:
+            with self.contar_consultas() as consultas:
+                self.client.get(...)
+            self.assertEqual(len(consultas), 2)
+        """
+        consultas = []
+
+        def _registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        for engine in (self.engine, self.read_engine):
+            event.listen(engine, "before_cursor_execute", _registrar)
+        try:
+            yield consultas
+        finally:
+            for engine in (self.engine, self.read_engine):
+                event.remove(engine, "before_cursor_execute", _registrar)
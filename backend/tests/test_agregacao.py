@@ -0,0 +1,195 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DAS ESTATÍSTICAS AGREGADAS
+=======================================================
+
+Endpoints de estatísticas e dashboards de OS, agendamentos,
+colaboradores e comunicação: confere os números contra os dados
+semeados e o número de consultas SQL de cada requisição (uma consulta
+agregada por tabela, independente da quantidade de status/fases).
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from backend.api.routers.colaborador_router import (
+    _agregar_colaboradores, _calcular_contadores_gerais, _calcular_por_tipo_contrato
+)
+from backend.api.routers.ordem_servico_router import (
+    STATUS_OS_EM_ABERTO, _agregar_os, _estatisticas_consolidadas
+)
+from backend.models import Cliente, OrdemServico, Usuario
+from backend.models.agendamento_model import Agendamento
+from backend.models.colaborador_model import (
+    Cargo, Colaborador, Departamento, StatusColaborador, TipoContrato
+)
+from backend.models.comunicacao import (
+    ComunicacaoFila, ComunicacaoHistorico, StatusComunicacao, TipoComunicacao
+)
+from backend.tests.base import ApiTestCase
+
+# (status, fase, prioridade, valor_final)
+ORDENS = [
+    ("ABERTA", 1, "alta", "100.00"),
+    ("ABERTA", 1, "normal", "50.00"),
+    ("EM_EXECUCAO", 5, "urgente", "300.00"),
+    ("ORCAMENTO", 3, "normal", "80.00"),
+    ("FINALIZADA", 7, "normal", "1000.00"),
+    ("FINALIZADA", 7, "baixa", "500.00"),
+    ("CANCELADA", 2, "baixa", "0.00"),
+]
+
+
+class EstatisticasAgregadasTestCase(ApiTestCase):
+    """Resultados e número de consultas dos endpoints de estatísticas"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        cliente = Cliente(codigo="CLI000001", nome="Cliente Estatística",
+                          tipo_pessoa="Física", cpf_cnpj="52998224725")
+        db.add(cliente)
+        db.flush()
+
+        agora = datetime.now()
+        for i, (status_os, fase, prioridade, valor) in enumerate(ORDENS):
+            db.add(OrdemServico(
+                numero_os=f"OS{i + 1:06d}", cliente_id=cliente.id,
+                tipo_servico="Instalação", categoria="Residencial",
+                usuario_abertura="teste", status=status_os, fase_atual=fase,
+                prioridade=prioridade, valor_final=Decimal(valor),
+                data_prevista_conclusao=agora - timedelta(days=1)
+            ))
+
+        hoje = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=10)
+        for dias, status_ag, tipo in [
+            (0, "confirmado", "instalacao"),
+            (0, "agendado", "visita_tecnica"),
+            (40, "concluido", "instalacao"),
+            (400, "cancelado", "reuniao"),
+        ]:
+            db.add(Agendamento(
+                titulo="Visita", tipo_evento=tipo, status=status_ag,
+                data_inicio=hoje - timedelta(days=dias),
+                data_fim=hoje - timedelta(days=dias) + timedelta(hours=1),
+                organizador="teste", created_by="teste"
+            ))
+
+        departamento = Departamento(nome="Obras")
+        cargo = Cargo(nome="Instalador")
+        db.add_all([departamento, cargo])
+        db.flush()
+        for i, (ativo, status_colab, contrato) in enumerate([
+            (True, StatusColaborador.ATIVO, TipoContrato.CLT),
+            (True, StatusColaborador.FERIAS, TipoContrato.CLT),
+            (True, StatusColaborador.AFASTADO, TipoContrato.TERCEIRIZADO),
+            (False, StatusColaborador.DEMITIDO, TipoContrato.CLT),
+        ]):
+            usuario = Usuario(username=f"colab{i}", email=f"colab{i}@primotex.com",
+                              senha_hash="x", nome_completo=f"Colaborador {i}",
+                              perfil="operador")
+            db.add(usuario)
+            db.flush()
+            db.add(Colaborador(
+                user_id=usuario.id, matricula=f"M{i:04d}", nome_completo=f"Colaborador {i}",
+                cpf=f"{i:011d}", cargo_id=cargo.id, departamento_id=departamento.id,
+                tipo_contrato=contrato, data_admissao=date(2020, 1, 1),
+                ativo=ativo, status=status_colab
+            ))
+
+        for status_com in [StatusComunicacao.ENTREGUE, StatusComunicacao.LIDO, StatusComunicacao.ERRO]:
+            db.add(ComunicacaoHistorico(
+                tipo=TipoComunicacao.EMAIL, canal_usado="smtp", destinatario_nome="Cliente",
+                destinatario_contato="cliente@exemplo.com", conteudo_texto="Olá",
+                status=status_com
+            ))
+        db.add(ComunicacaoFila(destinatario_nome="Cliente", destinatario_contato="x",
+                               conteudo="Olá", status="PENDENTE"))
+        db.commit()
+        db.close()
+
+    def _get(self, url: str, consultas_esperadas: int) -> dict:
+        with self.contar_consultas() as consultas:
+            resposta = self.client.get(url, headers=self.headers)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        # A leitura das versões para o ETag não conta como consulta do handler
+        consultas = [c for c in consultas if "FROM versoes_tabelas" not in c]
+        self.assertEqual(len(consultas), consultas_esperadas, "\n".join(consultas))
+        return resposta.json()
+
+    def test_estatisticas_os_em_uma_consulta(self):
+        dados = self._get("/api/v1/os/dashboard/estatisticas", 1)
+        self.assertEqual(dados["total_os"], len(ORDENS))
+        self.assertEqual(dados["por_fase"]["1-Criação"], 2)
+        self.assertEqual(dados["por_fase"]["7-Finalização"], 2)
+        self.assertEqual(sum(dados["por_fase"].values()), len(ORDENS))
+        self.assertEqual(dados["por_tipo"]["Instalação"], len(ORDENS))
+
+    def test_agregacao_do_dashboard_os(self):
+        # O endpoint /os/estatisticas/dashboard ainda falha na validação de
+        # ResumoOrdemServico (schema diferente do modelo); aqui é testada a
+        # parte agregada que ele usa
+        db = self.ReadSessionLocal()
+        with self.contar_consultas() as consultas:
+            resultado = _agregar_os(db.query(OrdemServico))
+        self.assertEqual(len(consultas), 1)
+
+        estatisticas = _estatisticas_consolidadas(resultado)
+        self.assertEqual(estatisticas.total_os, len(ORDENS))
+        self.assertEqual(estatisticas.por_status["ABERTA"], 2)
+        self.assertEqual(estatisticas.por_status["ARQUIVADA"], 0)
+        self.assertEqual(estatisticas.por_fase["fase_7"], 2)
+        self.assertEqual(estatisticas.por_prioridade["normal"], 3)
+        self.assertEqual(estatisticas.valor_total_pendente, Decimal("530.00"))
+        self.assertEqual(
+            resultado.distribuicao(
+                "fase", [str(f) for f in range(1, 8)], rotulo=str,
+                onde={"status": STATUS_OS_EM_ABERTO}
+            ),
+            {"1": 2, "2": 0, "3": 1, "4": 0, "5": 1, "6": 0, "7": 0}
+        )
+        db.close()
+
+    def test_estatisticas_os_por_periodo(self):
+        dados = self._get("/api/v1/os/estatisticas/geral?data_inicio=2000-01-01", 1)
+        self.assertEqual(dados["total_os"], len(ORDENS))
+        dados = self._get("/api/v1/os/estatisticas/geral?data_fim=2000-01-01", 1)
+        self.assertEqual(dados["total_os"], 0)
+        self.assertEqual(dados["por_status"]["ABERTA"], 0)
+
+    def test_estatisticas_agendamento(self):
+        dados = self._get("/api/v1/agendamento/estatisticas/", 1)
+        self.assertEqual(dados["total_agendamentos"], 4)
+        self.assertEqual(dados["agendamentos_hoje"], 2)
+        self.assertEqual(dados["por_status"]["cancelado"], 1)
+        self.assertEqual(dados["por_tipo"]["instalacao"], 2)
+        # confirmado + concluído sobre os 3 não cancelados
+        self.assertAlmostEqual(dados["taxa_confirmacao"], 66.67)
+
+    def test_contadores_colaboradores(self):
+        # /colaboradores/stats/resumo ainda falha na validação da resposta
+        # (distribuicao_tempo_empresa não é calculado); testa os contadores
+        db = self.ReadSessionLocal()
+        with self.contar_consultas() as consultas:
+            agregado = _agregar_colaboradores(db)
+        self.assertEqual(len(consultas), 1)
+
+        self.assertEqual(_calcular_contadores_gerais(agregado), {
+            "total": 4, "ativos": 3, "inativos": 1, "ferias": 1, "afastados": 1
+        })
+        self.assertEqual(
+            _calcular_por_tipo_contrato(agregado), {"CLT": 3, "Terceirizado": 1}
+        )
+        db.close()
+
+    def test_metricas_dashboard_comunicacao(self):
+        # histórico + contadores das outras tabelas + últimas comunicações
+        dados = self._get("/api/v1/comunicacao/dashboard", 3)
+        self.assertEqual(dados["comunicacoes_hoje"], 3)
+        self.assertEqual(dados["comunicacoes_mes"], 3)
+        self.assertAlmostEqual(dados["taxa_entrega_media"], 2 / 3)
+        self.assertEqual(dados["fila_pendente"], 1)
+        self.assertEqual(dados["templates_ativos"], 0)
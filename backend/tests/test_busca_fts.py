@@ -0,0 +1,218 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DA BUSCA TEXTUAL (FTS5)
+====================================================
+
+Busca sem acentos, por prefixo e por documento (com ou sem pontuação),
+sincronização das tabelas FTS pelos triggers, filtros das listagens e
+o endpoint de busca global.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend.database import busca_fts
+from backend.database.busca_fts import (
+    ENTIDADES_FTS, create_fts_tables, drop_fts_tables, expressao_match, fts_disponivel
+)
+from backend.database.config import Base
+from backend.models import Cliente, Fornecedor, OrdemServico, Produto
+from backend.tests.base import ApiTestCase
+
+
+class BuscaFtsTestCase(ApiTestCase):
+    """Tabelas FTS, filtros das listagens e /api/v1/busca"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        clientes = [
+            Cliente(codigo="CLI000001", nome="João da Silva", tipo_pessoa="Física",
+                    cpf_cnpj="529.982.247-25", email_principal="joao@exemplo.com",
+                    telefone_celular="(11) 98765-4321"),
+            Cliente(codigo="CLI000002", nome="Construtora Ação Ltda", tipo_pessoa="Jurídica",
+                    cpf_cnpj="11.222.333/0001-81"),
+            Cliente(codigo="CLI000003", nome="Maria Souza", tipo_pessoa="Física",
+                    cpf_cnpj="111.444.777-35"),
+        ]
+        db.add_all(clientes)
+        db.add(Fornecedor(cnpj_cpf="44.555.666/0001-70", razao_social="Gesso Paulista Indústria",
+                          nome_fantasia="Gessopal", tipo_pessoa="Jurídica"))
+        db.add(Produto(codigo="PRD001", descricao="Placa de gesso acartonado",
+                       categoria="Drywall", preco_venda=10))
+        db.flush()
+        db.add(OrdemServico(numero_os="OS000001", cliente_id=clientes[1].id,
+                            tipo_servico="Instalação de forro", categoria="Comercial",
+                            cidade_execucao="São Paulo", usuario_abertura="teste"))
+        db.commit()
+        cls.joao_id = clientes[0].id
+        cls.construtora_id = clientes[1].id
+        cls.maria_id = clientes[2].id
+        db.close()
+
+    def _ids_clientes(self, busca: str) -> list:
+        resposta = self.client.get(
+            "/api/v1/clientes/", params={"busca": busca}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        return [c["id"] for c in resposta.json()["itens"]]
+
+    def test_busca_sem_acentos_e_por_prefixo(self):
+        self.assertEqual(self._ids_clientes("joao"), [self.joao_id])
+        self.assertEqual(self._ids_clientes("JOÃO sil"), [self.joao_id])
+        self.assertEqual(self._ids_clientes("acao constr"), [self.construtora_id])
+        self.assertEqual(self._ids_clientes("inexistente"), [])
+
+    def test_busca_por_documento_e_telefone(self):
+        self.assertEqual(self._ids_clientes("52998224725"), [self.joao_id])
+        self.assertEqual(self._ids_clientes("529.982.247-25"), [self.joao_id])
+        self.assertEqual(self._ids_clientes("11222333"), [self.construtora_id])
+        self.assertEqual(self._ids_clientes("11987654321"), [self.joao_id])
+
+    def test_triggers_sincronizam_update_e_delete(self):
+        db = self.SessionLocal()
+        temporario = Cliente(codigo="CLI000099", nome="Temporário Ramos",
+                             tipo_pessoa="Física", cpf_cnpj="00000000191")
+        db.add(temporario)
+        db.commit()
+        self.assertEqual(self._ids_clientes("temporario"), [temporario.id])
+
+        temporario.nome = "Definitivo Ramos"
+        db.commit()
+        self.assertEqual(self._ids_clientes("temporario"), [])
+        self.assertEqual(self._ids_clientes("definitivo"), [temporario.id])
+
+        db.delete(temporario)
+        db.commit()
+        self.assertEqual(self._ids_clientes("ramos"), [])
+        db.close()
+
+    def test_filtros_das_outras_listagens(self):
+        resposta = self.client.get(
+            "/api/v1/fornecedores", params={"search": "gessopal"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        self.assertEqual(len(resposta.json()["items"]), 1)
+
+        resposta = self.client.get(
+            "/api/v1/produtos/", params={"busca": "acartonado"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        self.assertEqual(resposta.json()["total"], 1)
+
+        resposta = self.client.get(
+            "/api/v1/os/", params={"busca": "sao paulo forro"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        self.assertEqual([o["numero_os"] for o in resposta.json()], ["OS000001"])
+
+    def test_busca_global_agrupada_e_ordenada(self):
+        resposta = self.client.get(
+            "/api/v1/busca/", params={"q": "gesso"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        resultados = resposta.json()["resultados"]
+        self.assertEqual(set(resultados), set(ENTIDADES_FTS))
+        self.assertEqual(resultados["fornecedores"][0]["titulo"], "Gesso Paulista Indústria")
+        self.assertEqual(resultados["produtos"][0]["subtitulo"], "PRD001")
+        self.assertEqual(resultados["clientes"], [])
+
+        resposta = self.client.get(
+            "/api/v1/busca/", params={"q": "s", "entidades": "clientes"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 422)
+        resposta = self.client.get(
+            "/api/v1/busca/", params={"q": "silva", "entidades": "pedidos"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_busca_global_ranking_por_relevancia(self):
+        # Nome pesa mais que e-mail: "maria" no nome vem antes de "maria" no e-mail
+        db = self.SessionLocal()
+        db.add(Cliente(codigo="CLI000010", nome="Pedro Alves", tipo_pessoa="Física",
+                       cpf_cnpj="00000000272", email_principal="maria.pedro@exemplo.com"))
+        db.commit()
+        db.close()
+        resposta = self.client.get(
+            "/api/v1/busca/", params={"q": "maria", "entidades": "clientes"}, headers=self.headers
+        )
+        titulos = [r["titulo"] for r in resposta.json()["resultados"]["clientes"]]
+        self.assertEqual(titulos, ["Maria Souza", "Pedro Alves"])
+
+
+class CriacaoFtsTestCase(unittest.TestCase):
+    """Criação idempotente em banco existente e expressão MATCH"""
+
+    def test_create_fts_tables_popula_banco_existente(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(Cliente.__table__.insert().values(
+                codigo="CLI000001", nome="Cliente Antigo", tipo_pessoa="Física",
+                cpf_cnpj="52998224725"
+            ))
+
+        self.assertEqual(sorted(create_fts_tables(engine)),
+                         sorted(e.tabela_fts for e in ENTIDADES_FTS.values()))
+        self.assertEqual(create_fts_tables(engine), [])
+        with engine.connect() as conn:
+            encontrados = conn.execute(text(
+                "SELECT rowid FROM clientes_fts WHERE clientes_fts MATCH :q"
+            ), {"q": expressao_match("antigo")}).fetchall()
+        self.assertEqual(len(encontrados), 1)
+
+        drop_fts_tables(engine)
+        self.assertEqual(len(create_fts_tables(engine)), len(ENTIDADES_FTS))
+        engine.dispose()
+
+    def test_fts_disponivel_reconfere_tabela_ausente(self):
+        engine = create_engine(f"sqlite:///{self._banco_temporario()}")
+        Base.metadata.create_all(bind=engine)
+        # Outro engine no mesmo arquivo faz o papel da linha de comando
+        externo = create_engine(engine.url)
+        self.addCleanup(engine.dispose)
+        self.addCleanup(externo.dispose)
+
+        with patch("backend.database.busca_fts.time.monotonic", return_value=1000.0), \
+                Session(bind=engine) as db:
+            self.assertFalse(fts_disponivel(db, "clientes"))
+        create_fts_tables(externo)
+
+        with patch("backend.database.busca_fts.time.monotonic", return_value=1001.0), \
+                Session(bind=engine) as db:
+            self.assertFalse(fts_disponivel(db, "clientes"))
+        instante = 1000.0 + busca_fts.FTS_RECHECAGEM_SEGUNDOS
+        with patch("backend.database.busca_fts.time.monotonic", return_value=instante), \
+                Session(bind=engine) as db:
+            self.assertTrue(fts_disponivel(db, "clientes"))
+
+        # Criação e remoção pelo próprio engine descartam o cache na hora
+        drop_fts_tables(engine)
+        with Session(bind=engine) as db:
+            self.assertFalse(fts_disponivel(db, "clientes"))
+        create_fts_tables(engine)
+        with Session(bind=engine) as db:
+            self.assertTrue(fts_disponivel(db, "clientes"))
+
+    def _banco_temporario(self) -> str:
+        pasta = tempfile.mkdtemp(prefix="erp_fts_")
+        self.addCleanup(shutil.rmtree, pasta, True)
+        return os.path.join(pasta, "fts.db")
+
+    def test_expressao_match_neutraliza_operadores(self):
+        self.assertEqual(expressao_match('joão "OR" silva*'), '"joão"* "OR"* "silva"*')
+        self.assertIsNone(expressao_match("  -*- "))
+        self.assertIsNone(expressao_match(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
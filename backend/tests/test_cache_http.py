@@ -0,0 +1,112 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO GET CONDICIONAL (ETag / 304)
+============================================================
+
+O ETag muda só quando uma tabela lida recebe um commit com escrita (um
+rollback não conta) e depende dos parâmetros e do perfil do usuário.
+Com If-None-Match igual ao ETag atual a resposta é 304 sem executar as
+consultas do handler; sem autenticação é sempre 401, nunca 304.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+from datetime import date, timedelta
+from unittest import mock
+
+from backend.auth.cache_usuarios import UsuarioAutenticado, cache_usuarios
+from backend.auth.jwt_handler import generate_user_token
+from backend.database.versoes_tabelas import ler_versoes
+from backend.models import Cliente, Usuario
+from backend.tests.base import ApiTestCase
+
+URL = "/api/v1/clientes/"
+
+
+class CacheHttpTestCase(ApiTestCase):
+    """ETag e 304 na listagem de clientes"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        db.add(Cliente(codigo="CLI000001", nome="Cliente ETag", tipo_pessoa="Física",
+                       cpf_cnpj="529.982.247-25"))
+        operador = Usuario(username="operador_teste", email="operador_teste@primotex.com",
+                           senha_hash="x", nome_completo="Operador", perfil="operador", ativo=True)
+        db.add(operador)
+        db.commit()
+        cache_usuarios.guardar(UsuarioAutenticado.de_usuario(operador))
+        token = generate_user_token(operador.id, operador.username, operador.email, operador.perfil)
+        cls.headers_operador = {"Authorization": f"Bearer {token}"}
+        db.close()
+
+    def _get(self, etag=None, headers=None, **params):
+        headers = dict(headers or self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        return self.client.get(URL, params=params or {"limit": 10}, headers=headers)
+
+    def test_304_sem_consultas_do_handler(self):
+        resposta = self._get()
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        etag = resposta.headers["ETag"]
+
+        with self.contar_consultas() as consultas:
+            condicional = self._get(etag)
+        self.assertEqual(condicional.status_code, 304)
+        self.assertEqual(condicional.headers["ETag"], etag)
+        self.assertEqual(condicional.content, b"")
+        self.assertEqual(len(consultas), 1, consultas)
+        self.assertIn("versoes_tabelas", consultas[0])
+
+        # Lista de ETags e ETag fraco também conferem
+        self.assertEqual(self._get(f'"outro", W/{etag}').status_code, 304)
+        self.assertEqual(self._get('"outro"').status_code, 200)
+
+    def test_etag_muda_no_commit_e_nao_no_rollback(self):
+        etag = self._get().headers["ETag"]
+
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        db.add(Cliente(codigo="CLI000002", nome="Descartado", tipo_pessoa="Física",
+                       cpf_cnpj="111.444.777-35"))
+        db.flush()
+        db.rollback()
+        self.assertEqual(self._get(etag).status_code, 304)
+
+        versao = ler_versoes(db, ["clientes"])["clientes"]
+        db.add(Cliente(codigo="CLI000003", nome="Novo", tipo_pessoa="Física",
+                       cpf_cnpj="390.533.447-05"))
+        db.commit()
+        self.assertEqual(ler_versoes(db, ["clientes"])["clientes"], versao + 1)
+
+        resposta = self._get(etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta.headers["ETag"], etag)
+
+    def test_etag_depende_dos_parametros_e_do_perfil(self):
+        etag = self._get().headers["ETag"]
+        self.assertNotEqual(self._get(limit=5).headers["ETag"], etag)
+        operador = self._get(headers=self.headers_operador)
+        self.assertEqual(operador.status_code, 200, operador.text)
+        self.assertNotEqual(operador.headers["ETag"], etag)
+        self.assertEqual(self._get(etag, headers=self.headers_operador).status_code, 200)
+
+    def test_get_condicional_sem_autenticacao_e_401(self):
+        etag = self._get().headers["ETag"]
+        for if_none_match in ("*", etag):
+            resposta = self.client.get(URL, params={"limit": 10}, headers={"If-None-Match": if_none_match})
+            self.assertEqual(resposta.status_code, 401, if_none_match)
+            self.assertNotIn("ETag", resposta.headers)
+
+    def test_asterisco_nao_confere(self):
+        self.assertEqual(self._get("*").status_code, 200)
+
+    def test_estatisticas_de_agendamento_mudam_com_o_dia(self):
+        url = "/api/v1/agendamento/estatisticas/"
+        etag = self.client.get(url).headers["ETag"]
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        with mock.patch("backend.api.cache_http.date") as data:
+            data.today.return_value = date.today() + timedelta(days=1)
+            self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 200)
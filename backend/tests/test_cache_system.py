@@ -0,0 +1,353 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO AdvancedCache
+=============================================
+
+Remoção LRU pela ordem de uso, limite por bytes estimados, índice de
+namespaces e modo por referência (sem serialização); decorador
+@cached com single-flight (sync e async) e stale-while-revalidate;
+invalidação das entradas dependentes no commit das tabelas; segundo
+nível em SQLite compartilhado entre processos.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import asyncio
+import os
+import pickle
+import shutil
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+from backend.database.importacao import importar
+from backend.models import Cliente, Produto
+from backend.tests.base import ApiTestCase
+from shared.cache_system import AdvancedCache, SQLiteL2Cache, cached, erp_cache, estimate_size
+
+
+class AdvancedCacheTestCase(unittest.TestCase):
+    """Estrutura LRU do AdvancedCache"""
+
+    def _cache(self, **opcoes) -> AdvancedCache:
+        cache = AdvancedCache(cleanup_interval=0, **opcoes)
+        self.addCleanup(cache.shutdown)
+        return cache
+
+    def test_remove_a_menos_usada(self):
+        cache = self._cache(max_size=3, max_bytes=0)
+        for chave in "abc":
+            cache.set("ns", chave, chave)
+        self.assertEqual(cache.get("ns", "a"), "a")  # "b" passa a ser a menos usada
+        cache.set("ns", "d", "d")
+
+        self.assertIsNone(cache.get("ns", "b"))
+        self.assertEqual([cache.get("ns", c) for c in "acd"], ["a", "c", "d"])
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_limite_por_bytes(self):
+        valor = "x" * 1000
+        cache = self._cache(max_bytes=3500, compression_threshold=10**6)
+        for i in range(10):
+            cache.set("ns", str(i), valor)
+
+        stats = cache.get_stats()
+        self.assertLessEqual(stats["memory_usage_mb"] * 1024 * 1024, 3500)
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(cache.get("ns", "9"), valor)
+
+        # Valor maior que o limite não é guardado nem esvazia o cache
+        cache.set("ns", "grande", "y" * 10_000)
+        self.assertIsNone(cache.get("ns", "grande"))
+        self.assertEqual(cache.get_stats()["entries"], 3)
+
+    def test_invalidacao_por_namespace(self):
+        cache = self._cache()
+        cache.set("clientes", "list", [1], params={"ativo": True})
+        cache.set("clientes", "list", [2])
+        cache.set("produtos", "list", [3])
+        self.assertEqual(sorted(cache.namespaces()), ["clientes", "produtos"])
+
+        cache.invalidate("clientes")
+        self.assertIsNone(cache.get("clientes", "list"))
+        self.assertEqual(cache.get("produtos", "list"), [3])
+        self.assertEqual(cache.namespaces(), ["produtos"])
+
+        cache.invalidate("produtos", "list")
+        self.assertEqual(cache.get_stats()["entries"], 0)
+        self.assertEqual(cache.get_stats()["memory_usage_mb"], 0)
+
+    def test_modo_por_referencia(self):
+        valor = {"itens": [1, 2, 3]}
+        copia = self._cache()
+        copia.set("ns", "k", valor)
+        self.assertIsNot(copia.get("ns", "k"), valor)
+        self.assertEqual(copia.get("ns", "k"), valor)
+
+        referencia = self._cache(serialize=False)
+        referencia.set("ns", "k", valor)
+        self.assertIs(referencia.get("ns", "k"), valor)
+        self.assertGreater(referencia.get_stats()["memory_usage_mb"], 0)
+
+        # A escolha também pode ser feita por entrada
+        copia.set("ns", "r", valor, serialize=False)
+        self.assertIs(copia.get("ns", "r"), valor)
+
+    def test_estimativa_de_tamanho(self):
+        pequena = estimate_size([{"nome": "a" * 10}] * 4)
+        grande = estimate_size([{"nome": "a" * 10}] * 400)
+        self.assertGreater(grande, pequena * 50)
+
+
+class DecoradorCachedTestCase(unittest.TestCase):
+    """@cached: chave por argumentos, single-flight e stale-while-revalidate"""
+
+    def setUp(self):
+        self.cache = AdvancedCache(cleanup_interval=0)
+        self.addCleanup(self.cache.shutdown)
+
+    def test_chave_inclui_argumentos_posicionais(self):
+        chamadas = []
+
+        @cached("teste", cache=self.cache)
+        def dobrar(valor, fator=2):
+            chamadas.append(valor)
+            return valor * fator
+
+        self.assertEqual(dobrar(1), 2)
+        self.assertEqual(dobrar(2), 4)
+        # Mesma chamada escrita de outra forma usa a mesma chave
+        self.assertEqual(dobrar(valor=1, fator=2), 2)
+        self.assertEqual(chamadas, [1, 2])
+
+    def test_single_flight_sincrono(self):
+        chamadas = []
+        liberar = threading.Event()
+
+        @cached("teste", cache=self.cache)
+        def lento():
+            chamadas.append(1)
+            liberar.wait(5)
+            return "ok"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futuros = [executor.submit(lento) for _ in range(8)]
+            time.sleep(0.1)
+            liberar.set()
+            self.assertEqual([f.result() for f in futuros], ["ok"] * 8)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_single_flight_repassa_erro_e_nao_guarda(self):
+        chamadas = []
+
+        @cached("teste", cache=self.cache)
+        def falha():
+            chamadas.append(1)
+            raise ValueError("erro")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                falha()
+        self.assertEqual(len(chamadas), 2)
+
+    def test_single_flight_async(self):
+        chamadas = []
+
+        @cached("teste", cache=self.cache)
+        async def consultar(codigo):
+            chamadas.append(codigo)
+            await asyncio.sleep(0.05)
+            return codigo.upper()
+
+        async def cenario():
+            return await asyncio.gather(*[consultar("a") for _ in range(10)], consultar("b"))
+
+        self.assertEqual(asyncio.run(cenario()), ["A"] * 10 + ["B"])
+        self.assertEqual(sorted(chamadas), ["a", "b"])
+        self.assertEqual(asyncio.run(consultar("a")), "A")
+        self.assertEqual(len(chamadas), 2)
+
+    def test_stale_while_revalidate(self):
+        versao = [1]
+        recalculado = threading.Event()
+
+        @cached("teste", ttl=0.05, stale_ttl=60, cache=self.cache)
+        def metricas():
+            if versao[0] > 1:
+                recalculado.set()
+            return versao[0]
+
+        self.assertEqual(metricas(), 1)
+        versao[0] = 2
+        time.sleep(0.1)
+        # Expirado: devolve o valor antigo na hora e recalcula em segundo plano
+        self.assertEqual(metricas(), 1)
+        self.assertTrue(recalculado.wait(5))
+        for _ in range(50):
+            if metricas() == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(metricas(), 2)
+
+
+class InvalidacaoPorCommitTestCase(ApiTestCase):
+    """Commit invalida só as entradas que dependem das tabelas escritas"""
+
+    def setUp(self):
+        erp_cache.cache.clear()
+        self.addCleanup(erp_cache.cache.clear)
+        erp_cache.set_clientes([{"id": 1}])
+        erp_cache.set_produtos([{"id": 2}])
+        erp_cache.set_dashboard_metrics("clientes", {"total": 1})
+        erp_cache.set_dashboard_metrics("financeiro", {"saldo": 0})
+
+    def test_commit_invalida_dependentes(self):
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        db.add(Cliente(codigo="CLI000001", nome="Cliente Cache", tipo_pessoa="Física",
+                       cpf_cnpj="529.982.247-25"))
+        db.flush()
+        # Antes do commit nada muda
+        self.assertIsNotNone(erp_cache.get_clientes())
+        db.commit()
+
+        self.assertIsNone(erp_cache.get_clientes())
+        self.assertIsNone(erp_cache.get_dashboard_metrics("clientes"))
+        self.assertEqual(erp_cache.get_produtos(), [{"id": 2}])
+        self.assertEqual(erp_cache.get_dashboard_metrics("financeiro"), {"saldo": 0})
+
+    def test_rollback_nao_invalida(self):
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        db.add(Cliente(codigo="CLI000002", nome="Descartado", tipo_pessoa="Física",
+                       cpf_cnpj="111.444.777-35"))
+        db.flush()
+        db.rollback()
+        self.assertEqual(erp_cache.get_clientes(), [{"id": 1}])
+
+    def test_update_em_massa_e_decorador_com_tabelas(self):
+        chamadas = []
+
+        @cached("teste_produtos", tables=("produtos",))
+        def contar_produtos():
+            chamadas.append(1)
+            return len(chamadas)
+
+        self.assertEqual(contar_produtos(), 1)
+        self.assertEqual(contar_produtos(), 1)
+
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        db.query(Produto).filter(Produto.id < 0).update({"status": "Inativo"}, synchronize_session=False)
+        db.commit()
+
+        self.assertIsNone(erp_cache.get_produtos())
+        self.assertEqual(contar_produtos(), 2)
+        self.assertEqual(erp_cache.get_clientes(), [{"id": 1}])
+
+    def test_importacao_em_massa_e_sql_textual_invalidam(self):
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        # bulk_insert_mappings não dispara eventos de flush
+        relatorio = importar(db, "clientes", [(2, {"nome": "Importado", "cpf_cnpj": "390.533.447-05"})])
+        self.assertEqual(relatorio.inseridos, 1)
+        self.assertIsNone(erp_cache.get_clientes())
+        self.assertEqual(erp_cache.get_produtos(), [{"id": 2}])
+
+        db.execute(text("UPDATE produtos SET status = 'Inativo' WHERE id < 0"))
+        db.commit()
+        self.assertIsNone(erp_cache.get_produtos())
+
+
+class CacheL2TestCase(unittest.TestCase):
+    """Segundo nível em SQLite compartilhado (dois caches = dois workers)"""
+
+    def setUp(self):
+        self._tmp = tempfile.mkdtemp(prefix="erp_cache_l2_")
+        self.addCleanup(shutil.rmtree, self._tmp, True)
+        caminho = os.path.join(self._tmp, "l2.db")
+        self.worker_a = self._cache(SQLiteL2Cache(caminho, sync_interval=0))
+        self.worker_b = self._cache(SQLiteL2Cache(caminho, sync_interval=0))
+
+    def _cache(self, l2) -> AdvancedCache:
+        cache = AdvancedCache(cleanup_interval=0, l2=l2)
+        self.addCleanup(cache.shutdown)
+        return cache
+
+    def test_falta_no_l1_consulta_o_l2(self):
+        self.worker_a.set("clientes", "list", [1, 2], params={"ativo": True})
+        self.worker_a.set("imutavel", "k", (1, 2), serialize=False)
+
+        self.assertEqual(self.worker_b.get("clientes", "list", {"ativo": True}), [1, 2])
+        self.assertEqual(self.worker_b.get("imutavel", "k"), (1, 2))
+        self.assertEqual(self.worker_b.get_stats()["l2_hits"], 2)
+        # Promovida para o L1 do worker B
+        self.assertEqual(self.worker_b.get("clientes", "list", {"ativo": True}), [1, 2])
+        self.assertEqual(self.worker_b.get_stats()["l2_hits"], 2)
+
+    def test_invalidacao_chega_ao_l1_do_outro_worker(self):
+        self.worker_a.add_dependency("clientes", ["clientes"])
+        self.worker_b.add_dependency("clientes", ["clientes"])
+        self.worker_a.set("clientes", "list", [1])
+        self.worker_a.set("produtos", "list", [2])
+        self.assertEqual(self.worker_b.get("clientes", "list"), [1])
+        self.assertEqual(self.worker_b.get("produtos", "list"), [2])
+
+        self.worker_a.invalidate_tables(["clientes"])
+        self.assertIsNone(self.worker_b.get("clientes", "list"))
+        self.assertEqual(self.worker_b.get("produtos", "list"), [2])
+
+        self.worker_b.invalidate("produtos", "list")
+        self.assertIsNone(self.worker_a.get("produtos", "list"))
+
+    def test_l2_indisponivel_nao_quebra_o_cache(self):
+        cache = self._cache(SQLiteL2Cache(os.path.join(self._tmp, "nao", "existe.db"), retry_interval=60))
+        cache.set("ns", "k", {"a": 1})
+        self.assertEqual(cache.get("ns", "k"), {"a": 1})
+        self.assertIsNone(cache.get("ns", "outra"))
+        cache.invalidate("ns")
+        self.assertIsNone(cache.get("ns", "k"))
+        self.assertFalse(cache.get_stats()["l2_available"])
+        self.assertEqual(cache.l2.errors, 1)
+
+    def test_entrada_adulterada_nao_chega_ao_pickle(self):
+        self.worker_a.set("clientes", "list", [1, 2])
+        caminho = self.worker_a.l2.path
+        with sqlite3.connect(caminho) as conn:
+            assinatura = bytes(conn.execute("SELECT dados FROM entradas").fetchone()[0])[:32]
+            conn.execute("UPDATE entradas SET dados = ?", (assinatura + pickle.dumps({"plantado": True}),))
+
+        self.assertIsNone(self.worker_b.get("clientes", "list"))
+        self.assertEqual(self.worker_b.l2.rejeitadas, 1)
+        with sqlite3.connect(caminho) as conn:
+            self.assertEqual(conn.execute("SELECT count(*) FROM entradas").fetchone()[0], 0)
+
+        # Chave diferente (outro segredo) também não é aceita
+        self.worker_a.set("clientes", "list", [1, 2])
+        outro = self._cache(SQLiteL2Cache(caminho, sync_interval=0, chave="outro-segredo"))
+        self.assertIsNone(outro.get("clientes", "list"))
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "permissões POSIX")
+    def test_recusa_diretorio_aberto_e_arquivo_de_outro_usuario(self):
+        publico = os.path.join(self._tmp, "publico")
+        os.mkdir(publico)
+        os.chmod(publico, 0o1777)
+        cache = self._cache(SQLiteL2Cache(os.path.join(publico, "l2.db"), retry_interval=60))
+        cache.set("ns", "k", 1)
+        self.assertFalse(cache.get_stats()["l2_available"])
+        self.assertFalse(os.path.exists(os.path.join(publico, "l2.db")))
+
+        self.worker_a.set("ns", "k", 1)
+        self.assertEqual(stat.S_IMODE(os.stat(self.worker_a.l2.path).st_mode), 0o600)
+        if os.getuid() != 0:
+            self.skipTest("trocar o dono do arquivo exige root")
+        os.chown(self.worker_a.l2.path, os.getuid() + 1, -1)
+        cache = self._cache(SQLiteL2Cache(self.worker_a.l2.path, retry_interval=60))
+        self.assertIsNone(cache.get("ns", "k"))
+        self.assertFalse(cache.get_stats()["l2_available"])
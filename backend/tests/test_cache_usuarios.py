@@ -0,0 +1,117 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO CACHE DE USUÁRIOS AUTENTICADOS
+==============================================================
+
+Requisições autenticadas repetidas não devem consultar a tabela de
+usuários, e as alterações de usuário, status e senha no auth_router
+devem invalidar a entrada do cache.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import unittest
+
+from backend.auth.cache_usuarios import CacheUsuarios, UsuarioAutenticado, cache_usuarios
+from backend.auth.jwt_handler import generate_user_token, hash_password
+from backend.models import Usuario
+from backend.tests.base import ApiTestCase
+
+
+class CacheUsuariosTestCase(unittest.TestCase):
+    """TTL e limite de itens do cache"""
+
+    def setUp(self):
+        self.agora = 0.0
+        self.cache = CacheUsuarios(ttl=10, max_itens=2, relogio=lambda: self.agora)
+
+    def _usuario(self, user_id: int) -> UsuarioAutenticado:
+        return UsuarioAutenticado(id=user_id, username=f"u{user_id}", perfil="operador", ativo=True)
+
+    def test_expira_pelo_ttl(self):
+        self.cache.guardar(self._usuario(1))
+        self.agora = 9.9
+        self.assertEqual(self.cache.obter(1).username, "u1")
+        self.agora = 10.0
+        self.assertIsNone(self.cache.obter(1))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_despeja_o_menos_usado(self):
+        self.cache.guardar(self._usuario(1))
+        self.cache.guardar(self._usuario(2))
+        self.cache.obter(1)
+        self.cache.guardar(self._usuario(3))
+        self.assertIsNone(self.cache.obter(2))
+        self.assertIsNotNone(self.cache.obter(1))
+        self.assertIsNotNone(self.cache.obter(3))
+
+    def test_ttl_zero_desativa(self):
+        cache = CacheUsuarios(ttl=0, max_itens=10)
+        cache.guardar(self._usuario(1))
+        self.assertIsNone(cache.obter(1))
+
+
+class AutenticacaoComCacheTestCase(ApiTestCase):
+    """get_current_user servido pelo cache e invalidado pelo auth_router"""
+
+    def setUp(self):
+        db = self.SessionLocal()
+        usuario = Usuario(
+            username=f"operador_{self._testMethodName}"[:50],
+            email=f"{self._testMethodName}@primotex.com",
+            senha_hash=hash_password("Senha@123"),
+            nome_completo="Operador de Teste",
+            perfil="operador",
+            ativo=True
+        )
+        db.add(usuario)
+        db.commit()
+        self.usuario_id = usuario.id
+        token = generate_user_token(usuario.id, usuario.username, usuario.email, usuario.perfil)
+        db.close()
+        self.headers_operador = {"Authorization": f"Bearer {token}"}
+
+    def _listar(self, headers):
+        return self.client.get("/api/v1/clientes/", params={"limit": 1}, headers=headers)
+
+    def test_requisicoes_repetidas_nao_consultam_o_banco(self):
+        self.assertEqual(self._listar(self.headers_operador).status_code, 200)
+        self.assertIn(self.usuario_id, cache_usuarios._itens)
+
+        with self.contar_consultas() as consultas:
+            for _ in range(3):
+                self.assertEqual(self._listar(self.headers_operador).status_code, 200)
+        self.assertTrue(consultas)
+        self.assertEqual([c for c in consultas if "usuarios" in c], [])
+
+    def test_desativacao_invalida_o_cache(self):
+        self.assertEqual(self._listar(self.headers_operador).status_code, 200)
+
+        resposta = self.client.put(
+            f"/api/v1/auth/users/{self.usuario_id}", json={"ativo": False}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        self.assertEqual(self._listar(self.headers_operador).status_code, 403)
+
+    def test_alteracao_de_perfil_vale_na_proxima_requisicao(self):
+        resposta = self.client.get("/api/v1/auth/users", headers=self.headers_operador)
+        self.assertEqual(resposta.status_code, 403)
+
+        resposta = self.client.put(
+            f"/api/v1/auth/users/{self.usuario_id}", json={"perfil": "gerente"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        resposta = self.client.get("/api/v1/auth/users", headers=self.headers_operador)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+
+    def test_troca_de_senha_invalida_o_cache(self):
+        self.assertEqual(self._listar(self.headers_operador).status_code, 200)
+        self.assertIn(self.usuario_id, cache_usuarios._itens)
+
+        resposta = self.client.post("/api/v1/auth/change-password", json={
+            "current_password": "Senha@123",
+            "new_password": "NovaSenha1",
+            "confirm_password": "NovaSenha1"
+        }, headers=self.headers_operador)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        self.assertNotIn(self.usuario_id, cache_usuarios._itens)
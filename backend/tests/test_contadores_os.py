@@ -0,0 +1,241 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DOS CONTADORES DE OS
+=================================================
+
+A tabela os_contadores deve acompanhar criação, alteração, mudança de
+fase, exclusão e rollback das OS sem recontagem, e o dashboard deve
+ler os totais dela em uma consulta.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from decimal import Decimal
+from unittest import mock
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, UniqueConstraint, create_engine, event, select
+
+from backend.database import totais_incrementais
+from backend.database.contadores_os import (
+    ler_contadores, main, reconstruir_contadores, sincronizar_contadores, verificar_contadores
+)
+from backend.models import Cliente, ContadorOS, OrdemServico
+from backend.tests.base import ApiTestCase
+
+
+class ContadoresOSTestCase(ApiTestCase):
+    """Manutenção incremental, leitura pelo dashboard e comando administrativo"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        cliente = Cliente(codigo="CLI000001", nome="Cliente Contador",
+                          tipo_pessoa="Física", cpf_cnpj="52998224725")
+        db.add(cliente)
+        db.commit()
+        cls.cliente_id = cliente.id
+        db.close()
+        cls._sequencia = 0
+
+    def setUp(self):
+        # Registrado primeiro, roda por último (depois de fechar as sessões do teste)
+        self.addCleanup(self._conferir_contadores)
+
+    def _conferir_contadores(self):
+        db = self.SessionLocal()
+        try:
+            self.assertEqual(verificar_contadores(db), [])
+        finally:
+            db.close()
+
+    def _sessao(self):
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        return db
+
+    def _nova_os(self, db, **campos) -> OrdemServico:
+        type(self)._sequencia += 1
+        os_obj = OrdemServico(
+            numero_os=f"OS{self._sequencia:06d}", cliente_id=self.cliente_id,
+            tipo_servico="Instalação", categoria="Residencial",
+            usuario_abertura="teste", **campos
+        )
+        db.add(os_obj)
+        return os_obj
+
+    def _contadores(self):
+        db = self.ReadSessionLocal()
+        resultado = ler_contadores(db)
+        db.close()
+        return resultado
+
+    def test_criar_alterar_mudar_fase_e_excluir(self):
+        db = self._sessao()
+        antes = self._contadores()
+        os_obj = self._nova_os(db, prioridade="alta", valor_final=Decimal("250.00"))
+        db.commit()
+
+        depois = self._contadores()
+        self.assertEqual(depois.total(), antes.total() + 1)
+        # Valores padrão do modelo (status ABERTA, fase 1) também contam
+        self.assertEqual(
+            depois.total(onde={"status": ["ABERTA"], "fase": [1], "prioridade": ["alta"]}),
+            antes.total(onde={"status": ["ABERTA"], "fase": [1], "prioridade": ["alta"]}) + 1
+        )
+
+        os_obj.status = "EM_EXECUCAO"
+        os_obj.valor_final = Decimal("300.00")
+        db.commit()
+        os_obj.fase_atual = 5
+        db.commit()
+        resultado = self._contadores()
+        self.assertEqual(resultado.total(onde={"status": ["EM_EXECUCAO"], "fase": [5]}), 1)
+        self.assertEqual(
+            resultado.soma("valor", onde={"status": ["EM_EXECUCAO"]}), Decimal("300.00")
+        )
+
+        # Alteração de campo que não entra nos contadores não gera escrita
+        with self.contar_consultas() as consultas:
+            os_obj.observacoes_internas = "sem efeito nos contadores"
+            db.commit()
+        self.assertFalse([c for c in consultas if "os_contadores" in c])
+
+        db.delete(os_obj)
+        db.commit()
+        self.assertEqual(self._contadores().total(), antes.total())
+        db.close()
+
+    def test_combinacao_nova_em_um_upsert(self):
+        comandos = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            if "os_contadores" in statement:
+                comandos.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", registrar)
+        self.addCleanup(event.remove, self.engine, "before_cursor_execute", registrar)
+        db = self._sessao()
+        self._nova_os(db, status="EM_ESPERA_UPSERT", valor_final=Decimal("10.00"))
+        self._nova_os(db, status="EM_ESPERA_UPSERT", valor_final=Decimal("5.00"))
+        db.commit()
+
+        self.assertEqual(len(comandos), 1)
+        self.assertIn("ON CONFLICT", comandos[0])
+        contador = db.query(ContadorOS).filter(ContadorOS.status == "EM_ESPERA_UPSERT").one()
+        self.assertEqual((contador.quantidade, Decimal(str(contador.valor_final))), (2, Decimal("15.00")))
+
+    def test_rollback_desfaz_contadores(self):
+        db = self._sessao()
+        antes = self._contadores().total()
+        self._nova_os(db)
+        db.flush()
+        db.rollback()
+        db.close()
+        self.assertEqual(self._contadores().total(), antes)
+
+    def test_exclusao_pela_api(self):
+        db = self._sessao()
+        os_obj = self._nova_os(db, status="ABERTA", prioridade="baixa")
+        db.commit()
+        os_id = os_obj.id
+        db.close()
+        antes = self._contadores().total()
+
+        resposta = self.client.delete(f"/api/v1/os/{os_id}", headers=self.headers)
+        self.assertEqual(resposta.status_code, 204, resposta.text)
+        self.assertEqual(self._contadores().total(), antes - 1)
+
+    def test_dashboard_le_contadores_em_uma_consulta(self):
+        db = self._sessao()
+        self._nova_os(db, status="ORCAMENTO", fase_atual=3, valor_final=Decimal("80.00"))
+        self._nova_os(db, status="FINALIZADA", fase_atual=7, valor_final=Decimal("900.00"))
+        db.commit()
+        total = db.query(OrdemServico).count()
+        pendente = sum(
+            (o.valor_final or 0) for o in db.query(OrdemServico).filter(
+                OrdemServico.status.in_(["ABERTA", "VISITA_AGENDADA", "ORCAMENTO",
+                                         "AGUARDANDO_APROVACAO", "EM_EXECUCAO"])
+            )
+        )
+        db.close()
+
+        with self.contar_consultas() as consultas:
+            resposta = self.client.get("/api/v1/os/estatisticas/geral", headers=self.headers)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        # usuário autenticado vem do cache; só os_contadores
+        self.assertEqual(len(consultas), 1, consultas)
+        self.assertIn("os_contadores", consultas[-1])
+        self.assertNotIn("ordens_servico", consultas[-1])
+
+        dados = resposta.json()
+        self.assertEqual(dados["total_os"], total)
+        self.assertEqual(dados["por_status"]["FINALIZADA"], 1)
+        self.assertEqual(Decimal(str(dados["valor_total_pendente"])), Decimal(pendente))
+
+    def test_comando_verifica_e_reconstroi(self):
+        db = self._sessao()
+        self._nova_os(db)
+        db.commit()
+        db.query(ContadorOS).update({ContadorOS.quantidade: ContadorOS.quantidade + 5})
+        db.commit()
+        self.assertTrue(verificar_contadores(db))
+        db.close()
+
+        saida = io.StringIO()
+        with redirect_stdout(saida):
+            self.assertEqual(main(["--verificar"], fabrica_sessao=self.SessionLocal), 1)
+            self.assertEqual(main(["--reconstruir"], fabrica_sessao=self.SessionLocal), 0)
+        self.assertIn("divergência", saida.getvalue())
+
+        # Startup: nada a fazer quando conferem, reconstrói quando divergem
+        self.assertFalse(sincronizar_contadores(self.engine))
+        db = self._sessao()
+        db.query(ContadorOS).delete()
+        db.commit()
+        db.close()
+        self.assertTrue(sincronizar_contadores(self.engine))
+
+    def test_reconstruir_em_banco_com_os_existentes(self):
+        db = self._sessao()
+        self._nova_os(db, prioridade=None)
+        db.commit()
+        combinacoes = reconstruir_contadores(db)
+        db.commit()
+        self.assertEqual(combinacoes, db.query(ContadorOS).count())
+        self.assertEqual(self._contadores().total(), db.query(OrdemServico).count())
+        db.close()
+
+
+class IncrementarSemOnConflictTestCase(unittest.TestCase):
+    """Caminho dos dialetos sem ON CONFLICT: linha criada por outra transação"""
+
+    def test_insert_concorrente_vira_update(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        tabela = Table(
+            "totais", MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("chave", String(10), nullable=False),
+            Column("quantidade", Integer, nullable=False),
+            UniqueConstraint("chave"),
+        )
+        tabela.metadata.create_all(engine)
+
+        def criar_antes_do_insert(conn, cursor, statement, parameters, context, executemany):
+            # Depois do primeiro UPDATE (sem linha), outra "transação" cria a chave
+            if statement.startswith("UPDATE") and not criada:
+                criada.append(1)
+                cursor.connection.execute("INSERT INTO totais (chave, quantidade) VALUES ('a', 5)")
+
+        criada = []
+        event.listen(engine, "after_cursor_execute", criar_antes_do_insert)
+        with mock.patch.dict(totais_incrementais._INSERT_COM_CONFLITO, clear=True):
+            with engine.begin() as conn:
+                totais_incrementais.incrementar(conn, tabela, {"chave": "a"}, {"quantidade": 2})
+
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(select(tabela.c.quantidade)).scalars().all(), [7])
@@ -0,0 +1,177 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO CACHE DE RESULTADOS (DatabaseOptimizer)
+=======================================================================
+
+O cache fica no engine da aplicação, é limitado por entradas e bytes e
+descarta, no commit, só os resultados que leram as tabelas escritas
+(por ORM, Core ou SQL textual), depois do COMMIT do DBAPI: uma leitura
+feita durante o commit não fica no cache. Um rollback não invalida nada.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import threading
+import unittest
+
+from sqlalchemy import event, text
+
+from backend.models import Cliente, Produto
+from backend.tests.base import ApiTestCase
+from shared.database_optimizer import (
+    DatabaseOptimizer, QueryResultCache, cached_query, table_written, tables_read
+)
+
+SQL_CLIENTES = "SELECT count(*) FROM clientes"
+SQL_PRODUTOS = "SELECT count(*) FROM produtos"
+
+
+class QueryResultCacheTestCase(unittest.TestCase):
+    """Estrutura do cache: LRU limitado e índice por tabela"""
+
+    def test_limite_de_entradas_e_indice_por_tabela(self):
+        cache = QueryResultCache(max_entries=2)
+        cache.put("a", [1], ["clientes"])
+        cache.put("b", [2], ["produtos"])
+        self.assertEqual(cache.get("a"), (True, [1]))  # "b" passa a ser a menos usada
+        cache.put("c", [3], ["clientes", "produtos"])
+
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.invalidate_tables(["produtos"]), 1)
+        self.assertEqual(cache.get("a"), (True, [1]))
+        self.assertEqual(cache.get("c"), (False, None))
+
+    def test_limite_por_bytes(self):
+        cache = QueryResultCache(max_bytes=2000)
+        for i in range(10):
+            cache.put(str(i), "x" * 500, ["t"])
+        self.assertLessEqual(cache.stats()["bytes"], 2000)
+        self.assertTrue(cache.get("9")[0])
+        self.assertFalse(cache.put("grande", "y" * 5000, ["t"]))
+
+    def test_resultado_calculado_durante_escrita_nao_e_guardado(self):
+        cache = QueryResultCache()
+        desde = cache.snapshot()
+        cache.invalidate_tables(["clientes"])
+        self.assertFalse(cache.put("k", [1], ["clientes"], desde=desde))
+        self.assertTrue(cache.put("k", [1], ["produtos"], desde=desde))
+
+    def test_acesso_concorrente(self):
+        cache = QueryResultCache(max_entries=50)
+
+        def trabalhar(n):
+            for i in range(500):
+                cache.put(f"{n}:{i}", [i], [f"t{i % 5}"])
+                cache.get(f"{n}:{i - 1}")
+                if i % 50 == 0:
+                    cache.invalidate_tables(["t0"])
+
+        threads = [threading.Thread(target=trabalhar, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(cache), 50)
+        # Índice por tabela consistente com as entradas
+        chaves = {c for chaves in cache._por_tabela.values() for c in chaves}
+        self.assertEqual(chaves, set(cache._entradas))
+
+    def test_tabelas_lidas_e_escritas(self):
+        self.assertEqual(
+            tables_read('SELECT * FROM "clientes" c LEFT OUTER JOIN produtos p ON 1 = 1'),
+            {"clientes", "produtos"}
+        )
+        self.assertEqual(table_written("INSERT OR REPLACE INTO clientes (id) VALUES (1)"), "clientes")
+        self.assertEqual(table_written('UPDATE "produtos" SET nome = ?'), "produtos")
+        self.assertEqual(table_written("DELETE FROM os_fases WHERE id = 1"), "os_fases")
+        self.assertIsNone(table_written("SELECT 1 FROM clientes"))
+
+
+class DatabaseOptimizerCacheTestCase(ApiTestCase):
+    """Invalidação exata no commit do engine da aplicação"""
+
+    def setUp(self):
+        self.optimizer = DatabaseOptimizer(engine=self.engine, read_engine=self.read_engine)
+
+    def _consultar(self, sql):
+        return self.optimizer.execute_cached_query(sql)[0][0]
+
+    def _novo_cliente(self, db, codigo, cpf):
+        db.add(Cliente(codigo=codigo, nome="Cliente Cache", tipo_pessoa="Física", cpf_cnpj=cpf))
+
+    def test_commit_invalida_so_as_tabelas_escritas(self):
+        total = self._consultar(SQL_CLIENTES)
+        self._consultar(SQL_PRODUTOS)
+
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        self._novo_cliente(db, "CLI000101", "529.982.247-25")
+        db.flush()
+        self.assertEqual(self._consultar(SQL_CLIENTES), total)
+        db.commit()
+
+        with self.contar_consultas() as consultas:
+            self.assertEqual(self._consultar(SQL_CLIENTES), total + 1)
+            self._consultar(SQL_PRODUTOS)
+        self.assertEqual(consultas, [SQL_CLIENTES])
+
+    def test_rollback_nao_invalida(self):
+        self._consultar(SQL_CLIENTES)
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        self._novo_cliente(db, "CLI000102", "111.444.777-35")
+        db.flush()
+        db.rollback()
+
+        with self.contar_consultas() as consultas:
+            self._consultar(SQL_CLIENTES)
+        self.assertEqual(consultas, [])
+
+    def test_leitura_durante_o_commit_nao_fica_no_cache(self):
+        total = self._consultar(SQL_CLIENTES)
+
+        def ler_durante_o_commit(conn):
+            # Antes do COMMIT do DBAPI: o leitor ainda vê o snapshot antigo
+            self.assertEqual(self._consultar(SQL_CLIENTES), total)
+
+        event.listen(self.engine, "commit", ler_durante_o_commit)
+        self.addCleanup(event.remove, self.engine, "commit", ler_durante_o_commit)
+        self.optimizer.result_cache.clear()
+
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        self._novo_cliente(db, "CLI000104", "248.438.034-80")
+        db.commit()
+
+        self.assertEqual(self._consultar(SQL_CLIENTES), total + 1)
+
+    def test_sql_textual_invalida(self):
+        self._consultar(SQL_PRODUTOS)
+        with self.engine.begin() as conn:
+            conn.execute(text("UPDATE produtos SET status = 'Inativo' WHERE id < 0"))
+        self.assertEqual(len(self.optimizer.result_cache), 0)
+
+    def test_decorador_coleta_as_tabelas_lidas(self):
+        chamadas = []
+
+        @cached_query(ttl=60, optimizer=self.optimizer)
+        def contar(modelo):
+            chamadas.append(modelo)
+            with self.ReadSessionLocal() as db:
+                return db.query(modelo).count()
+
+        contar(Cliente)
+        contar(Produto)
+        contar(Cliente)
+        self.assertEqual(len(chamadas), 2)
+
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        self._novo_cliente(db, "CLI000103", "390.533.447-05")
+        db.commit()
+
+        contar(Cliente)
+        contar(Produto)
+        self.assertEqual(chamadas, [Cliente, Produto, Cliente])
+        self.assertGreater(self.optimizer.get_performance_report()["general_stats"]["cache_hit_ratio"], 0)
@@ -0,0 +1,173 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DA EXPORTAÇÃO EM FLUXO
+===================================================
+
+Endpoints /exportar em CSV, NDJSON e XLSX: mesmos filtros das
+listagens, arquivo reimportável, planilha válida e leitura em lotes.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import io
+import json
+import unittest
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.etree import ElementTree
+
+from backend.database.exportacao import gerar_csv, gerar_xlsx, ler_lotes
+from backend.database.importacao import importar, ler_csv
+from backend.models import Cliente, ContaReceber, Produto
+from backend.models.comunicacao import ComunicacaoHistorico, StatusComunicacao, TipoComunicacao
+from backend.tests.base import ApiTestCase
+
+NS_PLANILHA = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def _cpf(numero: int) -> str:
+    """CPF válido gerado a partir de 9 dígitos"""
+    digitos = [int(c) for c in f"{numero:09d}"]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, digitos))
+
+
+def _linhas_xlsx(conteudo: bytes):
+    """Valores das células da primeira aba de um XLSX"""
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo:
+        corrompido = arquivo.testzip()
+        assert corrompido is None, corrompido
+        raiz = ElementTree.fromstring(arquivo.read("xl/worksheets/sheet1.xml"))
+    linhas = []
+    for linha in raiz.iter(f"{NS_PLANILHA}row"):
+        valores = []
+        for celula in linha:
+            texto = celula.find(f"{NS_PLANILHA}is/{NS_PLANILHA}t")
+            valor = celula.find(f"{NS_PLANILHA}v")
+            valores.append(texto.text if texto is not None else
+                           valor.text if valor is not None else None)
+        linhas.append(valores)
+    return linhas
+
+
+class ExportacaoTestCase(ApiTestCase):
+    """Exportação das listagens"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        registros = ((n, {"nome": f"Cliente {n:03d}", "cpf_cnpj": _cpf(n + 100),
+                          "endereco_cidade": "Curitiba" if n % 2 else "Londrina",
+                          "limite_credito": "10,50"}) for n in range(1, 51))
+        importar(db, "clientes", registros)
+        db.add_all(Produto(codigo=f"EXP{n:03d}", descricao=f"Perfil <aço> & cia {n}",
+                           categoria="Perfis", preco_venda=Decimal("12.30"))
+                   for n in range(7))
+        db.add(ComunicacaoHistorico(
+            tipo=TipoComunicacao.WHATSAPP, canal_usado="whatsapp", destinatario_nome="Ana",
+            destinatario_contato="41999990000", conteudo_texto="Sua OS foi agendada",
+            status=StatusComunicacao.ENVIADO
+        ))
+        db.add(ContaReceber(
+            cliente_id=1, numero_documento="CR-EXP", descricao="Forro sala",
+            valor_original=Decimal("400"), valor_final=Decimal("400"), valor_saldo=Decimal("400"),
+            data_vencimento=datetime(2026, 10, 1), usuario_criacao="teste"
+        ))
+        db.commit()
+        db.close()
+
+    def test_csv_de_clientes_com_filtros_e_reimportavel(self):
+        resposta = self.client.get("/api/v1/clientes/exportar", headers=self.headers,
+                                   params={"cidade": "curitiba"})
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        self.assertIn('filename="clientes.csv"', resposta.headers["content-disposition"])
+        texto = resposta.content.decode("utf-8-sig")
+        linhas = list(ler_csv(io.StringIO(texto)))
+        self.assertEqual(len(linhas), 25)
+        self.assertEqual([d["nome"] for _, d in linhas[:2]], ["Cliente 001", "Cliente 003"])
+        self.assertEqual(linhas[0][1]["limite_credito"], "10.50")
+
+        # Mesmo filtro da listagem: busca textual
+        resposta = self.client.get("/api/v1/clientes/exportar", headers=self.headers,
+                                   params={"busca": "Cliente 007", "formato": "ndjson"})
+        self.assertEqual([json.loads(l)["nome"] for l in resposta.text.splitlines()],
+                         ["Cliente 007"])
+
+        # O arquivo exportado volta pela importação (todos já cadastrados)
+        db = self.SessionLocal()
+        try:
+            relatorio = importar(db, "clientes", ler_csv(io.StringIO(texto)))
+        finally:
+            db.close()
+        self.assertEqual((relatorio.inseridos, relatorio.duplicados), (0, 25))
+
+    def test_xlsx_valido_com_texto_escapado(self):
+        resposta = self.client.get("/api/v1/produtos/exportar", headers=self.headers,
+                                   params={"formato": "xlsx", "categoria": "Perfis"})
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        linhas = _linhas_xlsx(resposta.content)
+        cabecalho, dados = linhas[0], linhas[1:]
+        self.assertEqual(len(dados), 7)
+        self.assertEqual(dados[0][cabecalho.index("descricao")], "Perfil <aço> & cia 0")
+        self.assertEqual(float(dados[0][cabecalho.index("preco_venda")]), 12.3)
+
+    def test_demais_entidades(self):
+        casos = {
+            "/api/v1/fornecedores/exportar": 0,
+            "/api/v1/os/exportar": 0,
+            "/api/v1/financeiro/contas-receber/exportar": 1,
+            "/api/v1/financeiro/contas-pagar/exportar": 0,
+            "/api/v1/financeiro/movimentacoes/exportar": 0,
+            "/api/v1/comunicacao/historico/exportar": 1,
+        }
+        for caminho, esperado in casos.items():
+            with self.subTest(caminho=caminho):
+                resposta = self.client.get(caminho, headers=self.headers, params={"formato": "ndjson"})
+                self.assertEqual(resposta.status_code, 200, resposta.text)
+                self.assertEqual(len(resposta.text.splitlines()), esperado)
+
+        resposta = self.client.get("/api/v1/comunicacao/historico/exportar", headers=self.headers,
+                                   params={"formato": "ndjson"})
+        item = json.loads(resposta.text)
+        self.assertEqual((item["tipo"], item["status"]), ("WHATSAPP", "ENVIADO"))
+
+        resposta = self.client.get("/api/v1/produtos/exportar", headers=self.headers,
+                                   params={"formato": "pdf"})
+        self.assertEqual(resposta.status_code, 422)
+        self.assertEqual(self.client.get("/api/v1/produtos/exportar").status_code, 401)
+
+    def test_leitura_em_lotes(self):
+        db = self.ReadSessionLocal()
+        try:
+            query = db.query(Cliente).order_by(Cliente.id)
+            with self.contar_consultas() as consultas:
+                lotes = list(ler_lotes(query, (Cliente.id, Cliente.nome), tamanho_lote=20))
+        finally:
+            db.close()
+        # Uma única consulta, consumida em lotes (sem OFFSET por página)
+        self.assertEqual(len(consultas), 1, consultas)
+        self.assertEqual([len(l) for l in lotes], [20, 20, 10])
+
+        # Um pedaço da resposta por lote
+        pedacos = list(gerar_csv(["id", "nome"], iter(lotes)))
+        self.assertEqual(len(pedacos), 1 + len(lotes))
+
+
+class GeradorXlsxTestCase(unittest.TestCase):
+    """Planilha gerada sem arquivo posicionável"""
+
+    def test_planilha_grande_em_pedacos(self):
+        lotes = ([(i, f"linha {i}", None, True) for i in range(j, j + 500)] for j in range(0, 3000, 500))
+        pedacos = list(gerar_xlsx(["n", "texto", "vazio", "flag"], lotes))
+        self.assertGreater(len(pedacos), 6)
+        linhas = _linhas_xlsx(b"".join(pedacos))
+        self.assertEqual(len(linhas), 3001)
+        self.assertEqual(linhas[-1], ["2999", "linha 2999", None, "1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO GROUP COMMIT
+============================================
+
+Lote de unidades concorrentes no GroupCommitWriter: a unidade que falha
+(IntegrityError) é desfeita sozinha por SAVEPOINT, o chamador recebe a
+própria exceção, cada um recebe o próprio resultado, e um COMMIT de lote
+que falha cai na reexecução individual. Também a criação de cliente pela
+API com o group commit ligado.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import config, group_commit
+from backend.database.group_commit import GroupCommitWriter, create_group_commit_engine
+from backend.models import Cliente
+from backend.tests.base import ApiTestCase
+
+
+class GroupCommitWriterTestCase(unittest.TestCase):
+    """Isolamento por unidade dentro do lote"""
+
+    def setUp(self):
+        self._tmp = tempfile.mkdtemp(prefix="erp_group_commit_")
+        self.engine = create_group_commit_engine(f"sqlite:///{os.path.join(self._tmp, 'teste.db')}")
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE itens (codigo TEXT PRIMARY KEY, valor INTEGER)"))
+        self.fabrica = sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self.writer = GroupCommitWriter(self.fabrica)
+
+    def tearDown(self):
+        self.writer.parar()
+        self.engine.dispose()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+    @staticmethod
+    def inserir(codigo: str, valor: int):
+        def unidade(sessao):
+            sessao.execute(text("INSERT INTO itens VALUES (:c, :v)"), {"c": codigo, "v": valor})
+            return sessao.execute(text("SELECT valor * 10 FROM itens WHERE codigo = :c"), {"c": codigo}).scalar()
+        return unidade
+
+    def codigos_gravados(self):
+        with self.engine.connect() as conn:
+            return sorted(conn.execute(text("SELECT codigo FROM itens")).scalars())
+
+    def submeter_em_lote(self, unidades):
+        """
+        Submeter as unidades de threads diferentes garantindo que formem um
+        único lote: uma unidade inicial segura o escritor até todas estarem
+        na fila.
+        """
+        ocupado = threading.Event()
+        liberar = threading.Event()
+
+        def segurar(sessao):
+            ocupado.set()
+            liberar.wait(5)
+            return "inicial"
+
+        resultados = {}
+
+        def chamar(nome, unidade):
+            try:
+                resultados[nome] = ("ok", self.writer.submit(unidade))
+            except Exception as e:
+                resultados[nome] = ("erro", e)
+
+        threads = [threading.Thread(target=chamar, args=("inicial", segurar))]
+        threads[0].start()
+        ocupado.wait(5)
+        for nome, unidade in unidades.items():
+            threads.append(threading.Thread(target=chamar, args=(nome, unidade)))
+            threads[-1].start()
+        while self.writer._fila.qsize() < len(unidades):
+            time.sleep(0.001)
+        liberar.set()
+        for thread in threads:
+            thread.join(5)
+        return resultados
+
+    def test_falha_de_uma_unidade_nao_desfaz_as_outras(self):
+        self.writer.submit(self.inserir("A", 0))
+        resultados = self.submeter_em_lote({
+            "b": self.inserir("B", 1),
+            "duplicado": self.inserir("A", 2),
+            "c": self.inserir("C", 3),
+            "d": self.inserir("D", 4),
+        })
+
+        self.assertEqual(self.writer.estatisticas["lotes"], 3)
+        self.assertEqual(resultados["b"], ("ok", 10))
+        self.assertEqual(resultados["c"], ("ok", 30))
+        self.assertEqual(resultados["d"], ("ok", 40))
+        tipo, erro = resultados["duplicado"]
+        self.assertEqual(tipo, "erro")
+        self.assertIsInstance(erro, IntegrityError)
+        self.assertEqual(self.codigos_gravados(), ["A", "B", "C", "D"])
+
+    def test_excecao_da_propria_unidade_chega_ao_chamador(self):
+        class ErroDeNegocio(Exception):
+            pass
+
+        def recusar(sessao):
+            sessao.execute(text("INSERT INTO itens VALUES ('X', 0)"))
+            raise ErroDeNegocio("recusado")
+
+        resultados = self.submeter_em_lote({"recusa": recusar, "e": self.inserir("E", 5)})
+
+        self.assertIsInstance(resultados["recusa"][1], ErroDeNegocio)
+        self.assertEqual(resultados["e"], ("ok", 50))
+        self.assertEqual(self.codigos_gravados(), ["E"])
+
+    def test_resultados_voltam_para_cada_chamador(self):
+        unidades = {f"u{i}": self.inserir(f"K{i:02d}", i) for i in range(20)}
+        resultados = self.submeter_em_lote(unidades)
+
+        for i in range(20):
+            self.assertEqual(resultados[f"u{i}"], ("ok", i * 10))
+        self.assertEqual(len(self.codigos_gravados()), 20)
+        self.assertEqual(self.writer.estatisticas["lotes"], 2)
+
+    def test_commit_do_lote_que_falha_reexecuta_individualmente(self):
+        falhas = []
+        armar = [True]
+
+        @event.listens_for(self.engine, "commit")
+        def falhar_uma_vez(conn):
+            if falhas:
+                falhas.pop()
+                raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+
+        def inserir_e_armar(sessao):
+            # Só o COMMIT do lote falha; a reexecução desta unidade não rearma
+            if armar.pop() if armar else False:
+                falhas.append(1)
+            return self.inserir("F", 6)(sessao)
+
+        resultados = self.submeter_em_lote({"f": inserir_e_armar, "g": self.inserir("G", 7)})
+
+        self.assertEqual(resultados["f"], ("ok", 60))
+        self.assertEqual(resultados["g"], ("ok", 70))
+        self.assertEqual(self.writer.estatisticas["reexecucoes"], 2)
+        self.assertEqual(self.codigos_gravados(), ["F", "G"])
+
+
+class GroupCommitApiTestCase(ApiTestCase):
+    """criar_cliente passando pelo escritor"""
+
+    def setUp(self):
+        self.writer = GroupCommitWriter(sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False))
+        patches = [
+            mock.patch.object(config, "DB_GROUP_COMMIT", True),
+            mock.patch.object(group_commit, "_writer", self.writer),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.writer.parar)
+
+    def test_criar_cliente_pelo_group_commit(self):
+        corpo = {"nome": "Cliente Lote", "tipo_pessoa": "Física", "cpf_cnpj": "529.982.247-25"}
+        resposta = self.client.post("/api/v1/clientes/", json=corpo, headers=self.headers)
+        self.assertEqual(resposta.status_code, 201, resposta.text)
+        self.assertEqual(self.writer.estatisticas["unidades"], 1)
+
+        repetido = self.client.post("/api/v1/clientes/", json=corpo, headers=self.headers)
+        self.assertEqual(repetido.status_code, 400)
+
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(Cliente).filter(Cliente.nome == "Cliente Lote").count(), 1)
@@ -0,0 +1,132 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO SERVIÇO DE HASH DE SENHAS
+=========================================================
+
+Hash bcrypt no pool, calibração do custo e migração transparente dos
+hashes SHA-256 antigos (e de custo menor) no login.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from backend.auth.hash_senhas import (
+    ServicoHashSenhas, calcular_rounds, hash_legado, is_hash_legado, servico_hash
+)
+from backend.models import Usuario
+from backend.tests.base import ApiTestCase
+
+
+class ServicoHashSenhasTestCase(unittest.TestCase):
+    """Operações do serviço com custo baixo"""
+
+    def setUp(self):
+        self.servico = ServicoHashSenhas(workers=2, rounds=4)
+        self.addCleanup(self.servico.encerrar)
+
+    def test_hash_e_verificacao(self):
+        hash_senha = self.servico.hash("Senha@123")
+        self.assertTrue(hash_senha.startswith("$2b$04$"))
+        self.assertTrue(self.servico.verificar("Senha@123", hash_senha))
+        self.assertFalse(self.servico.verificar("outra", hash_senha))
+
+    def test_hash_legado_e_refeito(self):
+        antigo = hash_legado("Senha@123")
+        self.assertTrue(is_hash_legado(antigo))
+
+        self.assertEqual(self.servico.verificar_e_atualizar("errada", antigo), (False, None))
+        valida, novo = self.servico.verificar_e_atualizar("Senha@123", antigo)
+        self.assertTrue(valida)
+        self.assertFalse(is_hash_legado(novo))
+        self.assertEqual(self.servico.verificar_e_atualizar("Senha@123", novo), (True, None))
+
+    def test_custo_maior_refaz_hash_antigo(self):
+        hash_fraco = self.servico.hash("Senha@123")
+        self.servico.definir_rounds(5)
+        valida, novo = self.servico.verificar_e_atualizar("Senha@123", hash_fraco)
+        self.assertTrue(valida)
+        self.assertTrue(novo.startswith("$2b$05$"))
+
+    def test_hash_invalido(self):
+        self.assertEqual(self.servico.verificar_e_atualizar("x", "texto qualquer"), (False, None))
+        self.assertEqual(self.servico.verificar_e_atualizar("x", ""), (False, None))
+
+    def test_primeiros_usos_concorrentes_criam_um_so_pool(self):
+        criados = []
+
+        def criar_pool(*args, **kwargs):
+            time.sleep(0.01)  # alarga a janela entre verificar e criar
+            criados.append(ThreadPoolExecutor(*args, **kwargs))
+            return criados[-1]
+
+        em_andamento = [0, 0]  # atual, máximo
+        lock = threading.Lock()
+
+        def lento():
+            with lock:
+                em_andamento[0] += 1
+                em_andamento[1] = max(em_andamento[1], em_andamento[0])
+            time.sleep(0.02)
+            with lock:
+                em_andamento[0] -= 1
+
+        barreira = threading.Barrier(8)
+
+        def chamar():
+            barreira.wait()
+            self.servico._executar(lento)
+
+        with mock.patch("backend.auth.hash_senhas.ThreadPoolExecutor", side_effect=criar_pool):
+            threads = [threading.Thread(target=chamar) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.addCleanup(lambda: [pool.shutdown() for pool in criados])
+
+        self.assertEqual(len(criados), 1)
+        self.assertLessEqual(em_andamento[1], self.servico.workers)
+
+    def test_calcular_rounds(self):
+        # 8 rounds em 15 ms: 12 rounds ~240 ms cabem em 250 ms, 13 não
+        self.assertEqual(calcular_rounds(0.015, 250, minimo=4, maximo=16), 12)
+        self.assertEqual(calcular_rounds(0.015, 250, minimo=13, maximo=16), 13)
+        self.assertEqual(calcular_rounds(0.015, 250, minimo=4, maximo=10), 10)
+
+
+class LoginRehashTestCase(ApiTestCase):
+    """Login com hash antigo grava o hash bcrypt"""
+
+    def test_login_migra_hash_legado(self):
+        db = self.SessionLocal()
+        usuario = Usuario(
+            username="usuario_legado", email="legado@primotex.com",
+            senha_hash=hash_legado("Senha@123"), nome_completo="Usuário Legado",
+            perfil="operador", ativo=True
+        )
+        db.add(usuario)
+        db.commit()
+        usuario_id = usuario.id
+        db.close()
+
+        credenciais = {"username": "usuario_legado", "password": "Senha@123"}
+        resposta = self.client.post("/api/v1/auth/login", json=credenciais)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+
+        db = self.SessionLocal()
+        hash_atual = db.query(Usuario.senha_hash).filter(Usuario.id == usuario_id).scalar()
+        db.close()
+        self.assertFalse(is_hash_legado(hash_atual))
+        self.assertTrue(servico_hash.verificar("Senha@123", hash_atual))
+
+        resposta = self.client.post("/api/v1/auth/login", json=credenciais)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        resposta = self.client.post(
+            "/api/v1/auth/login", json={"username": "usuario_legado", "password": "Errada@1"}
+        )
+        self.assertEqual(resposta.status_code, 401)
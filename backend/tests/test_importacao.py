@@ -0,0 +1,194 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DA IMPORTAÇÃO EM MASSA
+===================================================
+
+CSV e JSON lidos em fluxo, validação de CPF/CNPJ em lote, duplicados
+(no banco e no próprio arquivo), alocação de códigos em bloco,
+relatório de erros por linha, endpoint de upload e linha de comando.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from backend.database.importacao import importar, ler_csv, ler_json, main
+from backend.models import Cliente, Fornecedor, Produto
+from backend.tests.base import ApiTestCase
+from shared.validadores import validar_cnpj, validar_cpf, validar_documentos_em_lote
+
+
+def _cpf(numero: int) -> str:
+    """CPF válido gerado a partir de 9 dígitos"""
+    digitos = [int(c) for c in f"{numero:09d}"]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, digitos))
+
+
+class ImportacaoTestCase(ApiTestCase):
+    """Importação de clientes, produtos e fornecedores"""
+
+    def _importar(self, entidade: str, registros, **kwargs):
+        db = self.SessionLocal()
+        try:
+            return importar(db, entidade, registros, **kwargs)
+        finally:
+            db.close()
+
+    def test_csv_de_clientes_com_erros_por_linha(self):
+        db = self.SessionLocal()
+        db.add(Cliente(codigo="CLI00500", nome="Existente", tipo_pessoa="Física",
+                       cpf_cnpj="529.982.247-25"))
+        db.commit()
+        db.close()
+
+        arquivo = io.StringIO(
+            "nome;cpf_cnpj;email_principal;limite_credito;coluna_extra\n"
+            f"Ana;{_cpf(1)};ana@exemplo.com;1500,50;x\n"
+            "Duplicado no banco;52998224725;;;\n"
+            f"Bruno;{_cpf(1)};;;\n"
+            "Documento inválido;123.456.789-00;;;\n"
+            f";{_cpf(2)};;;\n"
+            f"Construtora;11.222.333/0001-81;;abc;\n"
+            f"Carla;{_cpf(3)};;;\n"
+        )
+        relatorio = self._importar("clientes", ler_csv(arquivo), tamanho_lote=3)
+
+        self.assertEqual(relatorio.total_linhas, 7)
+        self.assertEqual(relatorio.inseridos, 2)
+        self.assertEqual(relatorio.duplicados, 2)
+        self.assertEqual(relatorio.colunas_ignoradas, {"coluna_extra"})
+        erros = {(e.linha, e.campo): e.mensagem for e in relatorio.erros}
+        self.assertEqual(erros[(3, "cpf_cnpj")], "já cadastrado")
+        self.assertEqual(erros[(4, "cpf_cnpj")], "repetido (linha 2)")
+        self.assertEqual(erros[(5, "cpf_cnpj")], "CPF inválido")
+        self.assertEqual(erros[(6, "nome")], "campo obrigatório")
+        self.assertEqual(erros[(7, "limite_credito")], "número inválido")
+
+        db = self.SessionLocal()
+        ana = db.query(Cliente).filter(Cliente.nome == "Ana").one()
+        self.assertEqual(str(ana.limite_credito), "1500.50")
+        self.assertEqual(ana.tipo_pessoa, "Física")
+        self.assertEqual(ana.status, "Ativo")
+        # Códigos alocados em bloco a partir do maior id, sem colidir
+        codigos = sorted(c for (c,) in db.query(Cliente.codigo).filter(Cliente.nome.in_(["Ana", "Carla"])))
+        self.assertEqual(len(set(codigos)), 2)
+        self.assertTrue(all(c.startswith("CLI") for c in codigos))
+        db.close()
+
+    def test_json_array_e_jsonl_de_produtos(self):
+        registros = [
+            {"codigo": "FRR-001", "descricao": "Forro PVC", "categoria": "Forros",
+             "preco_venda": 25.9, "codigo_barras": "789000000001"},
+            {"descricao": "Perfil", "categoria": "Perfis", "codigo_barras": "789000000002"},
+            {"descricao": "Sem categoria"},
+            {"descricao": "Barras repetidas", "categoria": "Perfis", "codigo_barras": "789000000001"},
+        ]
+        # Bloco pequeno força objetos partidos entre leituras
+        relatorio = self._importar(
+            "produtos", ler_json(io.StringIO(json.dumps(registros, indent=2)), tamanho_bloco=16)
+        )
+        self.assertEqual((relatorio.inseridos, relatorio.duplicados), (2, 1))
+        self.assertEqual({e.linha for e in relatorio.erros}, {3, 4})
+
+        jsonl = "\n".join(json.dumps({"descricao": f"Item {i}", "categoria": "Diversos"})
+                          for i in range(5))
+        self.assertEqual(self._importar("produtos", ler_json(io.StringIO(jsonl))).inseridos, 5)
+
+        db = self.SessionLocal()
+        self.assertEqual(db.query(Produto).filter(Produto.codigo.like("PRD%")).count(), 6)
+        db.close()
+
+    def test_json_malformado_nao_le_o_arquivo_inteiro(self):
+        arquivo = io.StringIO('[{"descricao": "Quebrado",\n' + '{"descricao": "Item"},\n' * 5000 + "]")
+        registros = ler_json(arquivo, tamanho_bloco=64, maximo_objeto=256)
+        with self.assertRaisesRegex(ValueError, "Registro 1"):
+            next(registros)
+        self.assertLess(arquivo.tell(), 512)
+
+        # Objetos válidos maiores que o bloco continuam aceitos até o limite
+        grande = json.dumps({"descricao": "x" * 200})
+        registros = list(ler_json(io.StringIO(f"[{grande},{grande}]"), tamanho_bloco=16, maximo_objeto=256))
+        self.assertEqual([numero for numero, _ in registros], [1, 2])
+
+    def test_upload_pela_api(self):
+        conteudo = (
+            "razao_social,cnpj_cpf,cidade\n"
+            "Gesso Sul Ltda,11.444.777/0001-61,Curitiba\n"
+            f"José Instalador,{_cpf(42)},Londrina\n"
+            "Quebrado,11.444.777/0001-00,Curitiba\n"
+        ).encode("utf-8")
+        resposta = self.client.post(
+            "/api/v1/importacao/fornecedores", headers=self.headers,
+            files={"arquivo": ("fornecedores.csv", conteudo, "text/csv")}
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        dados = resposta.json()
+        self.assertEqual((dados["inseridos"], dados["rejeitados"]), (2, 1))
+        self.assertEqual(dados["erros"][0]["linha"], 4)
+
+        db = self.SessionLocal()
+        pessoa_fisica = db.query(Fornecedor).filter(Fornecedor.razao_social == "José Instalador").one()
+        self.assertEqual(pessoa_fisica.tipo_pessoa, "Pessoa Física")
+        db.close()
+
+        # Importadas aparecem na busca textual (triggers FTS)
+        resposta = self.client.get("/api/v1/busca/", params={"q": "gesso sul"}, headers=self.headers)
+        self.assertEqual(len(resposta.json()["resultados"]["fornecedores"]), 1)
+
+        resposta = self.client.post(
+            "/api/v1/importacao/pedidos", headers=self.headers,
+            files={"arquivo": ("x.csv", b"a\n1\n", "text/csv")}
+        )
+        self.assertEqual(resposta.status_code, 404)
+        resposta = self.client.post(
+            "/api/v1/importacao/produtos", headers=self.headers,
+            files={"arquivo": ("x.json", b'[{"descricao": ', "application/json")}
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_linha_de_comando_grava_relatorio(self):
+        pasta = tempfile.mkdtemp(dir=self._tmp)
+        origem = os.path.join(pasta, "clientes.csv")
+        destino = os.path.join(pasta, "erros.csv")
+        with open(origem, "w", encoding="utf-8") as arquivo:
+            arquivo.write(f"nome,cpf_cnpj\nDiego,{_cpf(77)}\nErro,000\n")
+
+        saida = io.StringIO()
+        with redirect_stdout(saida):
+            codigo = main(["clientes", origem, "--relatorio", destino],
+                          fabrica_sessao=self.SessionLocal)
+        self.assertEqual(codigo, 1)
+        self.assertIn("1 de 2 clientes importados", saida.getvalue())
+        with open(destino, encoding="utf-8") as arquivo:
+            self.assertEqual(arquivo.read().splitlines()[1].split(";")[0], "3")
+
+
+class ValidacaoEmLoteTestCase(unittest.TestCase):
+    """validar_documentos_em_lote concorda com os validadores individuais"""
+
+    def test_mesmo_resultado_que_validadores_individuais(self):
+        documentos = [_cpf(n) for n in range(0, 5000, 37)] + [
+            "529.982.247-25", "52998224724", "11.222.333/0001-81", "11222333000180",
+            "00000000000", "11111111111111", "123", "",
+        ]
+        for documento, erro in zip(documentos, validar_documentos_em_lote(documentos)):
+            numeros = "".join(filter(str.isdigit, documento))
+            if len(numeros) == 14:
+                esperado = validar_cnpj(documento)[0]
+            elif len(numeros) == 11:
+                esperado = validar_cpf(documento)[0]
+            else:
+                esperado = False
+            self.assertEqual(erro is None, esperado, documento)
+
+
+if __name__ == "__main__":
+    unittest.main()
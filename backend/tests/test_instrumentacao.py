@@ -0,0 +1,167 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DA INSTRUMENTAÇÃO SQL
+==================================================
+
+Orçamento de consultas dos endpoints de listagem e estatísticas (não
+pode crescer com o número de registros), o middleware que mede as
+consultas de cada requisição e sinaliza N+1 e o registro de consultas
+lentas (anel, plano de execução, parâmetros redigidos e endpoint).
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.api.instrumentacao import InstrumentacaoSQLMiddleware, ocorrencias_n_mais_1
+from backend.auth.cache_usuarios import UsuarioAutenticado, cache_usuarios
+from backend.auth.jwt_handler import generate_user_token
+from backend.database.instrumentacao import ConsultasLentas, consultas_lentas, normalizar_sql
+from backend.models import Cliente, Usuario
+from backend.tests.base import ApiTestCase, assert_max_queries
+
+# Endpoint -> máximo de consultas (inclui a leitura das versões do ETag)
+ORCAMENTOS = {
+    "/api/v1/clientes/?limit=50": 3,
+    "/api/v1/produtos/": 3,
+    "/api/v1/colaboradores/": 2,
+    "/api/v1/os/": 1,
+    "/api/v1/os/dashboard/estatisticas": 2,
+    "/api/v1/financeiro/contas-receber": 1,
+    "/api/v1/comunicacao/historico": 2,
+    "/api/v1/comunicacao/dashboard": 4,
+}
+
+
+class OrcamentoConsultasTestCase(ApiTestCase):
+    """Número de consultas por endpoint independente do volume"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        for i in range(30):
+            db.add(Cliente(codigo=f"CLI{i:06d}", nome=f"Cliente {i}", tipo_pessoa="Jurídica",
+                           cpf_cnpj=f"{i:014d}"))
+        db.commit()
+        db.close()
+
+    def test_orcamento_dos_endpoints(self):
+        for url, maximo in ORCAMENTOS.items():
+            with self.subTest(url=url):
+                with self.assert_max_queries(maximo):
+                    resposta = self.client.get(url, headers=self.headers)
+                self.assertEqual(resposta.status_code, 200, resposta.text[:200])
+
+    def test_orcamento_excedido_lista_os_formatos(self):
+        with self.assertRaises(AssertionError) as contexto:
+            with assert_max_queries(1):
+                with self.engine.connect() as conn:
+                    for i in range(3):
+                        conn.execute(text(f"SELECT nome FROM clientes WHERE id = {i}"))
+        self.assertIn("3 consultas executadas, máximo 1", str(contexto.exception))
+        self.assertIn("3x SELECT nome FROM clientes WHERE id = ?", str(contexto.exception))
+
+
+class InstrumentacaoMiddlewareTestCase(ApiTestCase):
+    """Medição por requisição, N+1 e Server-Timing"""
+
+    def setUp(self):
+        ocorrencias_n_mais_1.clear()
+        app = FastAPI()
+        engine = self.read_engine
+
+        @app.get("/clientes/{quantidade}")
+        def consultar(quantidade: int):
+            with engine.connect() as conn:
+                for i in range(quantidade):
+                    conn.execute(text(f"SELECT nome FROM clientes WHERE id = {i}"))
+            return {"ok": True}
+
+        app.add_middleware(InstrumentacaoSQLMiddleware, limite_repeticoes=5, server_timing=True)
+        self.cliente_http = TestClient(app)
+
+    def test_sinaliza_n_mais_1(self):
+        with self.assertLogs("backend.api.instrumentacao", level="WARNING") as logs:
+            resposta = self.cliente_http.get("/clientes/8")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn("Possível N+1", logs.output[0])
+
+        ocorrencia = ocorrencias_n_mais_1[-1]
+        self.assertEqual(ocorrencia["rota"], "/clientes/{quantidade}")
+        self.assertEqual(ocorrencia["repeticoes"], 8)
+        self.assertEqual(ocorrencia["sql"], "SELECT nome FROM clientes WHERE id = ?")
+
+    def test_abaixo_do_limite_nao_sinaliza(self):
+        resposta = self.cliente_http.get("/clientes/3")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(ocorrencias_n_mais_1), 0)
+        self.assertRegex(resposta.headers["server-timing"], r'^db;dur=[\d.]+;desc="3 consultas"$')
+
+    def test_normalizacao(self):
+        self.assertEqual(
+            normalizar_sql("SELECT *\n  FROM t WHERE a IN (?, ?, ?) AND b = 'x''y' AND c = 10"),
+            "SELECT * FROM t WHERE a IN (?) AND b = ? AND c = ?"
+        )
+
+
+class ConsultasLentasTestCase(ApiTestCase):
+    """Registro de consultas lentas e endpoint de diagnóstico"""
+
+    def setUp(self):
+        limite = consultas_lentas.limite
+        consultas_lentas.limpar()
+        # Todas as instruções passam a contar como lentas
+        consultas_lentas.limite = 0
+        self.addCleanup(setattr, consultas_lentas, "limite", limite)
+        self.addCleanup(consultas_lentas.limpar)
+
+    def _consultar(self, nome):
+        with self.read_engine.connect() as conn:
+            conn.execute(text("SELECT id FROM clientes WHERE nome = :nome"), {"nome": nome})
+
+    def test_plano_e_parametros_redigidos_na_primeira_vez(self):
+        self._consultar("Segredo Primeiro")
+        self._consultar("Outro")
+
+        formato = next(c for c in consultas_lentas.piores(50) if "WHERE nome = ?" in c["sql"])
+        self.assertEqual(formato["execucoes"], 2)
+        self.assertEqual(formato["parametros"], ["<str:16>"])
+        self.assertTrue(any("clientes" in linha for linha in formato["plano"]), formato["plano"])
+        self.assertNotIn("Segredo", str(consultas_lentas.piores(50)))
+
+    def test_anel_sobrescreve_as_mais_antigas(self):
+        registro = ConsultasLentas(limite_ms=0, capacidade=3)
+        for i in range(5):
+            registro.registrar(None, f"INSERT INTO t{i} VALUES (?)", (i,), duracao=0.001 * (i + 1))
+        self.assertEqual([r["sql"] for r in registro.recentes(10)],
+                         ["INSERT INTO t4 VALUES (?)", "INSERT INTO t3 VALUES (?)",
+                          "INSERT INTO t2 VALUES (?)"])
+        self.assertEqual(registro.total, 5)
+        self.assertEqual(registro.piores(1)[0]["sql"], "INSERT INTO t4 VALUES (?)")
+
+    def test_endpoint_so_para_administrador(self):
+        self._consultar("x")
+        resposta = self.client.get("/api/v1/diagnostico/consultas-lentas", headers=self.headers)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        corpo = resposta.json()
+        totais = [c["tempo_total_ms"] for c in corpo["consultas"]]
+        self.assertEqual(totais, sorted(totais, reverse=True))
+        self.assertTrue(corpo["recentes"])
+
+        db = self.SessionLocal()
+        operador = Usuario(username="operador_diag", email="operador_diag@primotex.com",
+                           senha_hash="x", nome_completo="Operador", perfil="operador", ativo=True)
+        db.add(operador)
+        db.commit()
+        cache_usuarios.guardar(UsuarioAutenticado.de_usuario(operador))
+        token = generate_user_token(operador.id, operador.username, operador.email, operador.perfil)
+        db.close()
+        negado = self.client.get("/api/v1/diagnostico/consultas-lentas",
+                                 headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(negado.status_code, 403)
+
+        self.assertEqual(self.client.delete("/api/v1/diagnostico/consultas-lentas",
+                                            headers=self.headers).status_code, 204)
@@ -0,0 +1,216 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DAS MÉTRICAS HTTP
+==============================================
+
+Contagem, erros e histograma por rota (com o caminho parametrizado da
+rota, não o literal), exposição em /metrics no formato do Prometheus,
+soma entre workers pelo arquivo SQLite compartilhado e leitura dessas
+métricas pelo MetricsCollector do monitoramento.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import metricas as modulo_metricas
+from backend.api.metricas import (
+    MetricasHTTP, MetricasMiddleware, MetricasSQLite, metricas_http, renderizar_metricas
+)
+from backend.tests.base import ApiTestCase
+
+
+class MetricasEndpointTestCase(ApiTestCase):
+    """Middleware na aplicação real e GET /metrics"""
+
+    def setUp(self):
+        metricas_http.limpar()
+
+    def _metricas(self) -> str:
+        resposta = self.client.get("/metrics")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        return resposta.text
+
+    def test_contagem_e_histograma_por_rota(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get("/api/v1/clientes/", headers=self.headers).status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/clientes/999999", headers=self.headers).status_code, 404)
+        self.client.get("/caminho-inexistente")
+
+        texto = self._metricas()
+        self.assertIn('erp_http_requests_total{method="GET",route="/api/v1/clientes/",status="200"} 2', texto)
+        self.assertIn(
+            'erp_http_requests_total{method="GET",route="/api/v1/clientes/{cliente_id}",status="404"} 1', texto
+        )
+        self.assertIn('erp_http_requests_total{method="GET",route="<nao_roteada>",status="404"} 1', texto)
+        self.assertIn(
+            'erp_http_request_duration_seconds_bucket{method="GET",route="/api/v1/clientes/",le="+Inf"} 2', texto
+        )
+        self.assertIn('erp_http_request_duration_seconds_count{method="GET",route="/api/v1/clientes/"} 2', texto)
+        for familia in ("erp_db_pool_checked_out{engine=\"escrita\"}", "erp_cache_hit_ratio",
+                        "erp_http_requests_in_flight 1", "erp_db_slow_queries_total"):
+            self.assertIn(familia, texto)
+
+    def test_token_das_metricas(self):
+        with mock.patch.object(modulo_metricas, "METRICAS_TOKEN", "segredo"):
+            self.assertEqual(self.client.get("/metrics").status_code, 401)
+            self.assertEqual(self.client.get(
+                "/metrics", headers={"Authorization": "Bearer outro"}).status_code, 401)
+            self.assertEqual(self.client.get(
+                "/metrics", headers={"Authorization": "Bearer segredo"}).status_code, 200)
+
+    def test_health_com_horario_atual(self):
+        horario = datetime.fromisoformat(self.client.get("/health").json()["timestamp"])
+        self.assertLess(abs((datetime.now(timezone.utc) - horario).total_seconds()), 60)
+
+
+class MetricasMiddlewareTestCase(unittest.TestCase):
+    """Erros e baldes de latência"""
+
+    def setUp(self):
+        self.metricas = MetricasHTTP()
+        app = FastAPI()
+
+        @app.get("/falha")
+        def falha():
+            raise RuntimeError("erro")
+
+        @app.get("/ok")
+        def ok():
+            return {}
+
+        app.add_middleware(MetricasMiddleware, metricas=self.metricas)
+        self.client = TestClient(app, raise_server_exceptions=False)
+
+    def test_excecao_conta_como_erro(self):
+        self.assertEqual(self.client.get("/falha").status_code, 500)
+        self.client.get("/ok")
+
+        self.assertEqual(self.metricas.series[("GET", "/falha")].erros, 1)
+        self.assertEqual(self.metricas.series[("GET", "/ok")].erros, 0)
+        resumo = self.metricas.resumo()
+        self.assertEqual((resumo["requisicoes"], resumo["erros"], resumo["em_andamento"]), (2, 1, 0))
+
+    def test_baldes_acumulados(self):
+        for duracao in (0.001, 0.02, 0.02, 7.0, 30.0):
+            self.metricas.observar("GET", "/x", 200, duracao)
+        texto = renderizar_metricas(self.metricas, engines={})
+        esperado = {"0.005": 1, "0.01": 1, "0.025": 3, "5.0": 3, "10.0": 4, "+Inf": 5}
+        for limite, total in esperado.items():
+            self.assertIn(f'erp_http_request_duration_seconds_bucket{{method="GET",route="/x",le="{limite}"}} {total}',
+                          texto)
+
+
+class MetricasEntreWorkersTestCase(unittest.TestCase):
+    """Soma dos workers pelo arquivo compartilhado"""
+
+    def setUp(self):
+        self._tmp = tempfile.mkdtemp(prefix="erp_metricas_")
+        self.addCleanup(shutil.rmtree, self._tmp, True)
+        self.caminho = os.path.join(self._tmp, "metricas.db")
+        self.agora = [1000.0]
+        self.workers = [self._worker() for _ in range(2)]
+
+    def _worker(self):
+        compartilhadas = MetricasSQLite(self.caminho, intervalo=5, relogio=lambda: self.agora[0])
+        self.addCleanup(compartilhadas.fechar)
+        return MetricasHTTP(), compartilhadas
+
+    def _renderizar(self, indice: int) -> str:
+        metricas, compartilhadas = self.workers[indice]
+        return renderizar_metricas(metricas, engines={}, compartilhadas=compartilhadas)
+
+    def test_qualquer_worker_devolve_a_soma(self):
+        (a, _), (b, _) = self.workers
+        a.observar("GET", "/x", 200, 0.02)
+        b.observar("GET", "/x", 200, 0.02)
+        b.observar("GET", "/x", 500, 7.0)
+        b.em_andamento = 3
+        self._renderizar(1)
+
+        for indice in (0, 1):
+            texto = self._renderizar(indice)
+            self.assertIn('erp_http_requests_total{method="GET",route="/x",status="200"} 2', texto)
+            self.assertIn('erp_http_requests_total{method="GET",route="/x",status="500"} 1', texto)
+            self.assertIn('erp_http_request_errors_total{method="GET",route="/x"} 1', texto)
+            self.assertIn('erp_http_request_duration_seconds_bucket{method="GET",route="/x",le="0.025"} 2', texto)
+            self.assertIn("erp_http_requests_in_flight 3", texto)
+            self.assertIn("erp_workers 2", texto)
+
+    def test_worker_encerrado_mantem_contadores_sem_duplicar(self):
+        (a, _), (b, compartilhadas_b) = self.workers
+        a.observar("GET", "/x", 200, 0.1)
+        b.observar("GET", "/x", 200, 0.1)
+        b.em_andamento = 1
+        self._renderizar(1)
+
+        # B parou de publicar: contadores continuam, medidores não
+        self.agora[0] += 60
+        texto = self._renderizar(0)
+        self.assertIn('erp_http_requests_total{method="GET",route="/x",status="200"} 2', texto)
+        self.assertIn("erp_http_requests_in_flight 0", texto)
+        self.assertIn("erp_workers 1", texto)
+
+        # Consolidado depois de uma hora; uma publicação atrasada de B não conta de novo
+        self.agora[0] += modulo_metricas.CONSOLIDAR_APOS
+        self.assertIn('status="200"} 2', self._renderizar(0))
+        compartilhadas_b.publicar(modulo_metricas.instantaneo(b, engines={}))
+        self.agora[0] += 120
+        self.assertIn('erp_http_requests_total{method="GET",route="/x",status="200"} 2', self._renderizar(0))
+
+    def test_middleware_publica_periodicamente(self):
+        metricas = MetricasHTTP()
+        compartilhadas = MetricasSQLite(self.caminho, intervalo=0.01)
+        self.addCleanup(compartilhadas.fechar)
+        app = FastAPI()
+
+        @app.get("/ok")
+        def ok():
+            return {}
+
+        app.add_middleware(MetricasMiddleware, metricas=metricas, compartilhadas=compartilhadas)
+        with TestClient(app) as client:
+            client.get("/ok")
+            time.sleep(0.1)
+            ativos, _encerrados = compartilhadas.ler()
+        self.assertEqual(len(ativos), 1)
+        self.assertEqual(ativos[0]["series"][0][4], 1)
+
+    def test_arquivo_indisponivel_mostra_so_o_worker(self):
+        metricas = MetricasHTTP()
+        metricas.observar("GET", "/x", 200, 0.1)
+        compartilhadas = MetricasSQLite(os.path.join(self._tmp, "nao", "existe.db"))
+        texto = renderizar_metricas(metricas, engines={}, compartilhadas=compartilhadas)
+        self.assertIn('erp_http_requests_total{method="GET",route="/x",status="200"} 1', texto)
+        self.assertIn("erp_workers 1", texto)
+        self.assertEqual(compartilhadas.erros, 1)
+
+
+@unittest.skipUnless(importlib.util.find_spec("psutil"), "psutil não instalado")
+class MetricsCollectorTestCase(unittest.TestCase):
+    """collect_application_metrics lê o /metrics da API"""
+
+    def test_metricas_reais_da_api(self):
+        from shared.monitoring import MetricsCollector
+
+        metricas = MetricasHTTP()
+        metricas.observar("GET", "/a", 200, 0.1)
+        metricas.observar("GET", "/b", 500, 0.3)
+        resposta = mock.Mock(status_code=200, text=renderizar_metricas(metricas, engines={}))
+        with mock.patch("shared.monitoring.requests.get", return_value=resposta):
+            coletadas = MetricsCollector(api_url="http://api").collect_application_metrics()
+
+        self.assertEqual(coletadas.total_requests, 2)
+        self.assertEqual(coletadas.error_count, 1)
+        self.assertAlmostEqual(coletadas.avg_response_time, 0.2)
@@ -0,0 +1,59 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DAS MIGRAÇÕES
+==========================================
+
+alembic upgrade head sobre um banco com o esquema base (o de
+create_all_tables() antes das migrações): as tabelas criadas pelas
+migrações não existem e as migrações que escrevem dados antes da 0006
+não podem depender de versoes_tabelas.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+import backend.models  # noqa: F401  (registra todas as tabelas no metadata)
+from backend.database.config import Base
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tabelas que só existem a partir das migrações
+TABELAS_DAS_MIGRACOES = {"os_contadores", "tokens_revogados", "versoes_tabelas"}
+
+
+class MigracoesTestCase(unittest.TestCase):
+    """Cadeia completa de migrações"""
+
+    def setUp(self):
+        self._tmp = tempfile.mkdtemp(prefix="erp_migracoes_")
+        self.addCleanup(shutil.rmtree, self._tmp, True)
+        self.url = f"sqlite:///{os.path.join(self._tmp, 'base.db')}"
+        engine = create_engine(self.url)
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine, tables=[
+            tabela for nome, tabela in Base.metadata.tables.items() if nome not in TABELAS_DAS_MIGRACOES
+        ])
+        self.engine = engine
+
+        # Sem arquivo de configuração: não reconfigura o logging dos outros testes
+        self.config = Config()
+        self.config.set_main_option("script_location", os.path.join(RAIZ, "backend", "database", "migrations"))
+        self.config.set_main_option("sqlalchemy.url", self.url)
+
+    def test_upgrade_head_no_esquema_base(self):
+        command.upgrade(self.config, "head")
+
+        tabelas = set(inspect(self.engine).get_table_names())
+        self.assertLessEqual(TABELAS_DAS_MIGRACOES, tabelas)
+        with self.engine.connect() as conn:
+            versao = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        self.assertEqual(versao, ScriptDirectory.from_config(self.config).get_current_head())
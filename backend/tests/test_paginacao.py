@@ -0,0 +1,218 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DA PAGINAÇÃO POR CURSOR
+====================================================
+
+Percorre as listagens com next_cursor/prev_cursor (corpo da resposta,
+clientes) e X-Next-Cursor/X-Prev-Cursor (cabeçalhos, ordens de serviço)
+e compara com a listagem completa via skip/limit, incluindo empates na
+coluna de ordenação e datas gravadas pelo server_default do SQLite
+(sem microssegundos) misturadas às gravadas pelo ORM.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+from datetime import datetime, timedelta
+
+from backend.database.paginacao import (
+    CursorInvalido, codificar_cursor, decodificar_cursor
+)
+from backend.models import Cliente, OrdemServico
+from backend.tests.base import ApiTestCase
+
+TOTAL_CLIENTES = 57
+TOTAL_OS = 45
+
+
+class PaginacaoCursorTestCase(ApiTestCase):
+    """Navegação por cursor nas listagens de clientes e ordens de serviço"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        # Nomes repetidos de 3 em 3 para exercitar o desempate pelo id
+        for i in range(TOTAL_CLIENTES):
+            db.add(Cliente(
+                codigo=f"CLI{i + 1:06d}",
+                nome=f"Cliente {i // 3:03d}",
+                tipo_pessoa="Física",
+                cpf_cnpj=f"{i + 1:011d}"
+            ))
+        db.flush()
+        cliente_id = db.query(Cliente.id).first()[0]
+
+        base = datetime(2026, 1, 1)
+        for i in range(TOTAL_OS):
+            db.add(OrdemServico(
+                numero_os=f"OS{i + 1:06d}",
+                cliente_id=cliente_id,
+                tipo_servico="Forro",
+                categoria="Residencial",
+                usuario_abertura="teste",
+                data_abertura=base + timedelta(days=i // 4),
+                created_at=base + timedelta(days=i // 4)
+            ))
+        db.commit()
+        db.close()
+
+    def _listar_clientes(self, **params) -> dict:
+        resposta = self.client.get("/api/v1/clientes/", params=params, headers=self.headers)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        return resposta.json()
+
+    def test_clientes_cursor_percorre_tudo_na_ordem_do_offset(self):
+        completo = self._listar_clientes(limit=1000)
+        ids_esperados = [c["id"] for c in completo["itens"]]
+        self.assertEqual(len(ids_esperados), TOTAL_CLIENTES)
+        self.assertEqual(completo["total"], TOTAL_CLIENTES)
+
+        ids, cursor, paginas = [], None, 0
+        while True:
+            params = {"limit": 10}
+            if cursor:
+                params["cursor"] = cursor
+            pagina = self._listar_clientes(**params)
+            ids.extend(c["id"] for c in pagina["itens"])
+            paginas += 1
+            if cursor:
+                # Navegação por cursor não conta o total por padrão
+                self.assertIsNone(pagina["total"])
+            cursor = pagina["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(ids, ids_esperados)
+        self.assertEqual(paginas, 6)
+
+    def test_clientes_prev_cursor_volta_a_pagina_anterior(self):
+        primeira = self._listar_clientes(limit=10)
+        self.assertIsNone(primeira["prev_cursor"])
+        segunda = self._listar_clientes(limit=10, cursor=primeira["next_cursor"])
+        terceira = self._listar_clientes(limit=10, cursor=segunda["next_cursor"])
+
+        de_volta = self._listar_clientes(limit=10, cursor=terceira["prev_cursor"])
+        self.assertEqual(de_volta["itens"], segunda["itens"])
+
+        inicio = self._listar_clientes(limit=10, cursor=de_volta["prev_cursor"])
+        self.assertEqual(inicio["itens"], primeira["itens"])
+        self.assertIsNone(inicio["prev_cursor"])
+
+    def test_skip_legado_devolve_cursor_equivalente(self):
+        pagina_skip = self._listar_clientes(skip=20, limit=10)
+        self.assertIsNotNone(pagina_skip["prev_cursor"])
+        seguinte = self._listar_clientes(limit=10, cursor=pagina_skip["next_cursor"])
+        por_offset = self._listar_clientes(skip=30, limit=10)
+        self.assertEqual(seguinte["itens"], por_offset["itens"])
+
+    def test_modos_de_total(self):
+        self.assertIsNone(self._listar_clientes(limit=5, total="nenhum")["total"])
+        self.assertEqual(self._listar_clientes(limit=5, total="estimado")["total"], TOTAL_CLIENTES)
+        primeira = self._listar_clientes(limit=5)
+        com_total = self._listar_clientes(limit=5, cursor=primeira["next_cursor"], total="exato")
+        self.assertEqual(com_total["total"], TOTAL_CLIENTES)
+
+    def test_cursor_invalido_retorna_400(self):
+        resposta = self.client.get(
+            "/api/v1/clientes/", params={"cursor": "nao-e-um-cursor"}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+        outra_ordem = codificar_cursor("data_cadastro", "x", 1, "next")
+        resposta = self.client.get(
+            "/api/v1/clientes/", params={"cursor": outra_ordem}, headers=self.headers
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_os_cursor_nos_cabecalhos(self):
+        completo = self.client.get(
+            "/api/v1/os/", params={"limit": 100, "total": "exato"}, headers=self.headers
+        )
+        self.assertEqual(completo.status_code, 200, completo.text)
+        self.assertEqual(completo.headers["X-Total-Count"], str(TOTAL_OS))
+        self.assertNotIn("X-Next-Cursor", completo.headers)
+        ids_esperados = [os_item["id"] for os_item in completo.json()]
+
+        ids, cursor = [], None
+        while True:
+            params = {"limit": 7}
+            if cursor:
+                params["cursor"] = cursor
+            resposta = self.client.get("/api/v1/os/", params=params, headers=self.headers)
+            self.assertEqual(resposta.status_code, 200, resposta.text)
+            self.assertNotIn("X-Total-Count", resposta.headers)
+            ids.extend(os_item["id"] for os_item in resposta.json())
+            cursor = resposta.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        self.assertEqual(ids, ids_esperados)
+
+    def test_token_roundtrip_de_datas(self):
+        valor = datetime(2026, 10, 16, 8, 30, 15, 123456)
+        token = codificar_cursor("data_vencimento", valor, 42, "prev")
+        self.assertEqual(decodificar_cursor(token, "data_vencimento"), (valor, 42, "prev"))
+        with self.assertRaises(CursorInvalido):
+            decodificar_cursor(token, "nome")
+
+
+class PaginacaoServerDefaultTestCase(ApiTestCase):
+    """Cursor em colunas DateTime preenchidas por CURRENT_TIMESTAMP"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        cliente = Cliente(codigo="CLI000001", nome="Cliente", tipo_pessoa="Física", cpf_cnpj="00000000001")
+        db.add(cliente)
+        db.flush()
+        # created_at/data_abertura pelo server_default ("YYYY-MM-DD HH:MM:SS")
+        for i in range(10):
+            db.add(OrdemServico(numero_os=f"OS{i + 1:06d}", cliente_id=cliente.id, tipo_servico="Forro",
+                                categoria="Residencial", usuario_abertura="teste"))
+        # e pelo ORM, com microssegundos, antes e depois delas
+        agora = datetime.utcnow().replace(microsecond=0)
+        for i, delta in enumerate((-3600, -1, 1.5, 3600)):
+            instante = agora + timedelta(seconds=delta, microseconds=i)
+            db.add(OrdemServico(numero_os=f"OS{i + 11:06d}", cliente_id=cliente.id, tipo_servico="Forro",
+                                categoria="Residencial", usuario_abertura="teste",
+                                created_at=instante, data_abertura=instante))
+        db.commit()
+        db.close()
+
+    def _pagina(self, **params):
+        resposta = self.client.get("/api/v1/os/", params=params, headers=self.headers)
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+        return [os_item["id"] for os_item in resposta.json()], resposta.headers
+
+    def _percorrer(self, order_by: str, order_desc: bool):
+        params = {"order_by": order_by, "order_desc": order_desc}
+        esperados, _ = self._pagina(limit=100, **params)
+        self.assertEqual(len(esperados), 14)
+
+        paginas, cursor = [], None
+        while len(paginas) <= len(esperados):
+            ids, headers = self._pagina(limit=3, cursor=cursor, **params) if cursor else self._pagina(limit=3, **params)
+            paginas.append(ids)
+            cursor = headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        self.assertEqual([i for ids in paginas for i in ids], esperados)
+
+        # De volta, da última página até a primeira
+        cursor = headers.get("X-Prev-Cursor")
+        for anterior in reversed(paginas[:-1]):
+            ids, headers = self._pagina(limit=3, cursor=cursor, **params)
+            self.assertEqual(ids, anterior)
+            cursor = headers.get("X-Prev-Cursor")
+        self.assertIsNone(cursor)
+
+    def test_created_at_descendente(self):
+        self._percorrer("created_at", True)
+
+    def test_created_at_ascendente(self):
+        self._percorrer("created_at", False)
+
+    def test_data_abertura_nos_dois_sentidos(self):
+        self._percorrer("data_abertura", True)
+        self._percorrer("data_abertura", False)
@@ -0,0 +1,184 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DE PLANO DE CONSULTA
+=================================================
+
+Regressão dos índices das colunas de filtro: chama os endpoints de
+listagem e de estatísticas, captura os SELECTs emitidos e roda
+EXPLAIN QUERY PLAN em cada um. Falha se uma tabela quente for lida por
+varredura completa com filtro (SCAN sem índice) ou se a ordenação da
+página precisar de uma B-tree temporária.
+
+Buscas por substring (LIKE '%termo%') não usam índice B-tree e ficam
+fora destes casos.
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import importlib.util
+import os
+import re
+import unittest
+
+from sqlalchemy import create_engine, event, inspect
+
+from backend.database.config import Base
+from backend.models import Cliente, create_missing_indexes
+from backend.tests.base import ApiTestCase
+
+TABELAS_QUENTES = {
+    "clientes",
+    "ordens_servico",
+    "contas_receber",
+    "contas_pagar",
+    "movimentacoes_financeiras",
+    "comunicacao_historico",
+    "comunicacao_fila",
+    "agendamentos",
+    "produtos",
+    "colaboradores",
+    "colaborador_documentos",
+}
+
+ENDPOINTS = [
+    "/api/v1/clientes/",
+    "/api/v1/clientes/?tipo_pessoa=Física",
+    "/api/v1/clientes/{cliente_id}/historico",
+    "/api/v1/produtos/?categoria=Forro&status=Ativo",
+    "/api/v1/produtos/?status=Ativo",
+    "/api/v1/colaboradores/",
+    "/api/v1/colaboradores/alertas/documentos-vencidos",
+    "/api/v1/os/",
+    "/api/v1/os/?status=ABERTA",
+    "/api/v1/os/?prioridade=Alta",
+    "/api/v1/os/?cliente_id={cliente_id}",
+    "/api/v1/os/?order_by=data_abertura",
+    "/api/v1/os/dashboard/estatisticas",
+    "/api/v1/financeiro/contas-receber",
+    "/api/v1/financeiro/contas-receber?status_param=pendente",
+    "/api/v1/financeiro/contas-receber?cliente_id={cliente_id}",
+    "/api/v1/financeiro/contas-receber?data_inicio=2026-01-01&data_fim=2026-12-31",
+    "/api/v1/financeiro/contas-pagar",
+    "/api/v1/financeiro/contas-pagar?status_param=pendente",
+    "/api/v1/comunicacao/historico",
+    "/api/v1/comunicacao/historico?status=ENVIADO",
+    "/api/v1/comunicacao/historico?tipo=EMAIL",
+    "/api/v1/comunicacao/historico?cliente_id={cliente_id}",
+    "/api/v1/comunicacao/dashboard",
+]
+
+_RE_SCAN = re.compile(r"^SCAN (\w+)( AS \w+)?$")
+
+
+class QueryPlanTestCase(ApiTestCase):
+    """EXPLAIN QUERY PLAN dos endpoints de listagem e estatísticas"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db = cls.SessionLocal()
+        cliente = Cliente(
+            codigo="CLI000001",
+            nome="Cliente Plano",
+            tipo_pessoa="Física",
+            cpf_cnpj="52998224725"
+        )
+        db.add(cliente)
+        db.commit()
+        cls.cliente_id = cliente.id
+        db.close()
+
+    def _capturar_selects(self, url: str) -> list:
+        capturados = []
+
+        def _registrar(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and not executemany:
+                capturados.append((statement, parameters))
+
+        event.listen(self.read_engine, "before_cursor_execute", _registrar)
+        event.listen(self.engine, "before_cursor_execute", _registrar)
+        try:
+            resposta = self.client.get(url, headers=self.headers)
+        finally:
+            event.remove(self.read_engine, "before_cursor_execute", _registrar)
+            event.remove(self.engine, "before_cursor_execute", _registrar)
+
+        self.assertEqual(resposta.status_code, 200, f"{url}: {resposta.text[:200]}")
+        return capturados
+
+    def _problemas_do_plano(self, statement: str, parameters) -> list:
+        with self.read_engine.connect() as conn:
+            plano = [
+                linha[-1] for linha in
+                conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            ]
+
+        tabelas_no_plano = {
+            m.group(1) for m in (re.search(r"(?:SCAN|SEARCH) (\w+)", d) for d in plano) if m
+        }
+        tem_filtro = " WHERE " in statement.upper()
+        problemas = []
+        for detalhe in plano:
+            varredura = _RE_SCAN.match(detalhe)
+            if varredura and varredura.group(1) in TABELAS_QUENTES and tem_filtro:
+                problemas.append(detalhe)
+            if "TEMP B-TREE FOR ORDER BY" in detalhe and tabelas_no_plano & TABELAS_QUENTES:
+                problemas.append(detalhe)
+        return problemas
+
+    def test_endpoints_sem_varredura_completa(self):
+        for modelo in ENDPOINTS:
+            url = modelo.format(cliente_id=self.cliente_id)
+            with self.subTest(url=url):
+                selects = self._capturar_selects(url)
+                self.assertTrue(selects, f"{url}: nenhum SELECT capturado")
+                for statement, parameters in selects:
+                    problemas = self._problemas_do_plano(statement, parameters)
+                    self.assertFalse(
+                        problemas,
+                        f"{url}: {problemas}\n{' '.join(statement.split())[:400]}"
+                    )
+
+
+class IndicesDeclaradosTestCase(unittest.TestCase):
+    """Índices dos modelos x migração Alembic x criação no startup"""
+
+    def _indices_da_migracao(self) -> set:
+        caminho = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)),
+            "database", "migrations", "versions", "0001_indices_filtros.py"
+        )
+        spec = importlib.util.spec_from_file_location("migracao_0001", caminho)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        return {nome for nome, _tabela, _colunas, _opcoes in modulo.INDICES}
+
+    def test_migracao_cobre_indices_dos_modelos(self):
+        declarados = {
+            indice.name
+            for tabela in Base.metadata.tables.values()
+            for indice in tabela.indexes
+            if indice.name.startswith("idx_") and tabela.name in TABELAS_QUENTES
+        }
+        self.assertEqual(declarados, self._indices_da_migracao())
+
+    def test_create_missing_indexes_em_banco_existente(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX idx_os_status_created")
+            conn.exec_driver_sql("DROP INDEX idx_conta_receber_vencimento")
+
+        criados = create_missing_indexes(engine)
+
+        self.assertEqual(
+            sorted(criados), ["idx_conta_receber_vencimento", "idx_os_status_created"]
+        )
+        nomes = {ix["name"] for ix in inspect(engine).get_indexes("ordens_servico")}
+        self.assertIn("idx_os_status_created", nomes)
+        self.assertEqual(create_missing_indexes(engine), [])
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DO LIMITE DE REQUISIÇÕES
+=====================================================
+
+Token bucket com reabastecimento preguiçoso, limpeza de baldes ociosos,
+backend SQLite compartilhado entre processos (e a queda para a memória
+quando o arquivo falha) e o middleware (429 com Retry-After, baldes por
+usuário e por IP).
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api.main import app as app_principal
+from backend.api.rate_limit import (
+    BaldesMemoria, BaldesSQLite, GrupoLimite, INTERVALO_LIMPEZA, RateLimitMiddleware
+)
+from backend.auth.jwt_handler import generate_user_token
+
+GRUPO = GrupoLimite("teste", ("/api/",), capacidade=3, por_segundo=1)
+
+
+def chave(identidade: str, grupo: GrupoLimite = GRUPO) -> tuple:
+    return (grupo.nome, grupo.por_segundo, grupo.capacidade, identidade)
+
+
+class BaldesMemoriaTestCase(unittest.TestCase):
+    """Token bucket em memória com relógio controlado"""
+
+    def setUp(self):
+        self.agora = 1000.0
+        self.baldes = BaldesMemoria(relogio=lambda: self.agora)
+
+    def test_rajada_e_reabastecimento(self):
+        for _ in range(3):
+            self.assertEqual(self.baldes.consumir(chave("a"), GRUPO), 0)
+        self.assertAlmostEqual(self.baldes.consumir(chave("a"), GRUPO), 1.0)
+        # Outra identidade tem o próprio balde
+        self.assertEqual(self.baldes.consumir(chave("b"), GRUPO), 0)
+
+        self.agora += 0.5
+        self.assertAlmostEqual(self.baldes.consumir(chave("a"), GRUPO), 0.5)
+        self.agora += 0.5
+        self.assertEqual(self.baldes.consumir(chave("a"), GRUPO), 0)
+
+    def test_baldes_ociosos_sao_removidos(self):
+        self.baldes.consumir(chave("a"), GRUPO)
+        self.agora += INTERVALO_LIMPEZA - 1
+        for _ in range(3):
+            self.baldes.consumir(chave("b"), GRUPO)
+        self.assertEqual(len(self.baldes), 2)
+
+        # "a" já estaria cheio; "b" ainda não (esvaziado há menos de 3 s)
+        self.agora += 1.5
+        self.baldes.consumir(chave("c"), GRUPO)
+        self.assertEqual(len(self.baldes), 2)
+        self.assertNotIn(chave("a"), self.baldes._baldes)
+
+
+class BaldesSQLiteTestCase(unittest.TestCase):
+    """Dois backends no mesmo arquivo simulam dois workers"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="erp_rate_")
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        caminho = os.path.join(self.tmp, "baldes.db")
+        self.agora = 1000.0
+        self.worker_a = BaldesSQLite(caminho, relogio=lambda: self.agora)
+        self.worker_b = BaldesSQLite(caminho, relogio=lambda: self.agora)
+        self.addCleanup(self.worker_a.fechar)
+        self.addCleanup(self.worker_b.fechar)
+
+    def test_balde_compartilhado(self):
+        self.assertEqual(self.worker_a.consumir(chave("a"), GRUPO), 0)
+        self.assertEqual(self.worker_b.consumir(chave("a"), GRUPO), 0)
+        self.assertEqual(self.worker_a.consumir(chave("a"), GRUPO), 0)
+        self.assertAlmostEqual(self.worker_b.consumir(chave("a"), GRUPO), 1.0)
+
+        self.agora += 1
+        self.assertEqual(self.worker_b.consumir(chave("a"), GRUPO), 0)
+        self.assertGreater(self.worker_a.consumir(chave("a"), GRUPO), 0)
+
+    def test_banco_bloqueado_usa_baldes_em_memoria(self):
+        self.worker_a.consumir(chave("a"), GRUPO)
+        bloqueio = sqlite3.connect(self.worker_a.caminho, isolation_level=None)
+        self.addCleanup(bloqueio.close)
+        bloqueio.execute("BEGIN EXCLUSIVE")
+
+        with self.assertLogs("backend.api.rate_limit", "WARNING") as logs:
+            for _ in range(3):
+                self.assertEqual(self.worker_a.consumir(chave("a"), GRUPO), 0)
+        self.assertEqual(len(logs.output), 1)  # um aviso por queda
+        self.assertEqual(self.worker_a.erros, 1)
+        # O limite continua valendo, agora por processo
+        self.assertGreater(self.worker_a.consumir(chave("a"), GRUPO), 0)
+
+        # Passado o retry_interval, volta ao arquivo
+        bloqueio.execute("COMMIT")
+        self.agora += self.worker_a.retry_interval
+        self.assertEqual(self.worker_a.consumir(chave("a"), GRUPO), 0)
+        self.assertEqual(self.worker_a.erros, 1)
+
+    def test_diretorio_ausente_nao_derruba_o_middleware(self):
+        baldes = BaldesSQLite(os.path.join(self.tmp, "nao", "existe.db"))
+        app = FastAPI()
+
+        @app.get("/api/ping")
+        def ping():
+            return {}
+
+        app.add_middleware(RateLimitMiddleware, grupos=[GRUPO], baldes=baldes)
+        with self.assertLogs("backend.api.rate_limit", "WARNING"):
+            respostas = [TestClient(app).get("/api/ping").status_code for _ in range(4)]
+        self.assertEqual(respostas, [200, 200, 200, 429])
+
+
+class RateLimitMiddlewareTestCase(unittest.TestCase):
+    """429 com Retry-After e identificação por usuário ou IP"""
+
+    def setUp(self):
+        app = FastAPI()
+
+        @app.get("/api/v1/dados")
+        def dados():
+            return {"ok": True}
+
+        @app.post("/api/v1/auth/login")
+        def login():
+            return {"ok": True}
+
+        @app.get("/health")
+        def health():
+            return {"ok": True}
+
+        grupos = [
+            GrupoLimite("login", ("/api/v1/auth/login",), capacidade=2, por_segundo=0.01,
+                        por_usuario=False),
+            GrupoLimite("api", ("/api/v1/",), capacidade=3, por_segundo=0.01),
+        ]
+        app.add_middleware(RateLimitMiddleware, grupos=grupos, baldes=BaldesMemoria())
+        self.client = TestClient(app)
+
+    def _headers(self, user_id: int) -> dict:
+        token = generate_user_token(user_id, f"u{user_id}", f"u{user_id}@primotex.com", "operador")
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_429_com_retry_after_por_usuario(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get("/api/v1/dados", headers=self._headers(1)).status_code, 200)
+        resposta = self.client.get("/api/v1/dados", headers=self._headers(1))
+        self.assertEqual(resposta.status_code, 429)
+        self.assertEqual(resposta.headers["retry-after"], "100")
+        self.assertIn("detail", resposta.json())
+
+        # Outro usuário (mesmo IP) e requisições anônimas têm baldes próprios
+        self.assertEqual(self.client.get("/api/v1/dados", headers=self._headers(2)).status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/dados").status_code, 200)
+
+    def test_token_invalido_usa_o_ip(self):
+        for i in range(3):
+            headers = {"Authorization": f"Bearer invalido{i}"}
+            self.assertEqual(self.client.get("/api/v1/dados", headers=headers).status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/dados").status_code, 429)
+
+    def test_login_limitado_por_ip_e_rotas_livres(self):
+        for i in range(2):
+            self.assertEqual(self.client.post("/api/v1/auth/login", headers=self._headers(i)).status_code, 200)
+        self.assertEqual(self.client.post("/api/v1/auth/login", headers=self._headers(9)).status_code, 429)
+        for _ in range(10):
+            self.assertEqual(self.client.get("/health").status_code, 200)
+
+    def test_middleware_registrado_na_aplicacao(self):
+        classes = [m.cls for m in app_principal.user_middleware]
+        self.assertIn(RateLimitMiddleware, classes)
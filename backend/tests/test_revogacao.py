@@ -0,0 +1,106 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DA REVOGAÇÃO DE TOKENS
+===================================================
+
+Logout revoga o token usado (e só ele), a verificação não consulta o
+banco, a lista expira com o token e é recarregada da tabela
+tokens_revogados após reinício ou por outro worker.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import time
+
+from backend.auth.jwt_handler import decode_access_token, generate_user_token
+from backend.auth.revogacao import ListaRevogacao, lista_revogacao
+from backend.models import TokenRevogado
+from backend.tests.base import ApiTestCase
+
+
+class RevogacaoTokensTestCase(ApiTestCase):
+    """Logout pela API e persistência da lista"""
+
+    def _token(self) -> str:
+        return generate_user_token(self.admin_id, "admin_teste", "admin_teste@primotex.com", "administrador")
+
+    def _listar(self, token: str):
+        return self.client.get(
+            "/api/v1/clientes/", params={"limit": 1}, headers={"Authorization": f"Bearer {token}"}
+        )
+
+    def test_logout_revoga_somente_o_token_usado(self):
+        token, outro = self._token(), self._token()
+        self.assertNotEqual(decode_access_token(token)["jti"], decode_access_token(outro)["jti"])
+
+        resposta = self.client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(resposta.status_code, 200, resposta.text)
+
+        self.assertEqual(self._listar(token).status_code, 401)
+        with self.contar_consultas() as consultas:
+            self.assertEqual(self._listar(outro).status_code, 200)
+        self.assertEqual([c for c in consultas if "tokens_revogados" in c], [])
+
+    def test_lista_recarregada_do_banco(self):
+        token = self._token()
+        payload = decode_access_token(token)
+        self.client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {token}"})
+
+        # Outro worker (ou o mesmo após reinício)
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        nova = ListaRevogacao()
+        nova.carregar(db)
+        self.assertTrue(nova.revogado(payload["jti"]))
+
+        # Logout feito em outro worker chega pela sincronização incremental
+        outro = decode_access_token(self._token())
+        lista_revogacao.revogar(db, outro["jti"], outro["exp"], self.admin_id)
+        self.assertFalse(nova.revogado(outro["jti"]))
+        self.assertEqual(nova.sincronizar(db), 1)
+        self.assertTrue(nova.revogado(outro["jti"]))
+        self.assertEqual(nova.sincronizar(db), 0)
+
+    def test_entradas_expiram_com_o_token(self):
+        agora = [1000.0]
+        lista = ListaRevogacao(relogio=lambda: agora[0])
+        lista.adicionar("abc", 1010)
+        lista.adicionar("ja_expirado", 999)
+        self.assertTrue(lista.revogado("abc"))
+        self.assertFalse(lista.revogado("ja_expirado"))
+        self.assertFalse(lista.revogado(None))
+        self.assertEqual(len(lista), 1)
+
+        agora[0] = 1010.0
+        self.assertFalse(lista.revogado("abc"))
+
+    def test_id_do_revogado_expirado_nao_e_reaproveitado(self):
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        lista = ListaRevogacao()
+        lista.carregar(db)
+
+        db.add(TokenRevogado(jti="maior_id_expira", user_id=self.admin_id, expira_em=int(time.time()) + 1))
+        db.commit()
+        lista.sincronizar(db)
+        maior_id = db.query(TokenRevogado.id).filter(TokenRevogado.jti == "maior_id_expira").scalar()
+
+        # A linha de maior id expira e outro worker a apaga ao iniciar
+        db.query(TokenRevogado).filter(TokenRevogado.id == maior_id).update({"expira_em": 0})
+        db.commit()
+        ListaRevogacao().carregar(db)
+
+        novo = decode_access_token(self._token())
+        lista_revogacao.revogar(db, novo["jti"], novo["exp"], self.admin_id)
+        self.assertGreater(db.query(TokenRevogado.id).filter(TokenRevogado.jti == novo["jti"]).scalar(), maior_id)
+        self.assertEqual(lista.sincronizar(db), 1)
+        self.assertTrue(lista.revogado(novo["jti"]))
+
+    def test_carregar_remove_expirados_do_banco(self):
+        db = self.SessionLocal()
+        self.addCleanup(db.close)
+        db.add(TokenRevogado(jti="expirado_teste", user_id=self.admin_id, expira_em=int(time.time()) - 10))
+        db.commit()
+
+        ListaRevogacao().carregar(db)
+        self.assertIsNone(db.query(TokenRevogado).filter(TokenRevogado.jti == "expirado_teste").first())
@@ -0,0 +1,103 @@
+"""
+SISTEMA ERP PRIMOTEX - TESTES DAS SÉRIES TEMPORAIS DO MONITORAMENTO
+==================================================================
+
+Anel colunar (sobrescrita do mais antigo, busca binária por
+intervalo), níveis de resolução com média por balde e escolha do nível
+pela janela consultada; histórico do MetricsCollector.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import importlib.util
+import time
+import unittest
+
+from shared.series_temporais import NIVEIS_PADRAO, AnelSerie, SerieMultiResolucao
+
+
+class AnelSerieTestCase(unittest.TestCase):
+    """Ring buffer colunar"""
+
+    def test_sobrescreve_o_mais_antigo_e_busca_por_intervalo(self):
+        anel = AnelSerie(["a", "b"], capacidade=4)
+        for i in range(6):
+            anel.adicionar(float(i * 10), (i, -i))
+
+        self.assertEqual(len(anel), 4)
+        self.assertEqual([t for t, _ in anel.intervalo(0)], [20.0, 30.0, 40.0, 50.0])
+        self.assertEqual(list(anel.intervalo(25, 40)), [(30.0, (3.0, -3.0)), (40.0, (4.0, -4.0))])
+        self.assertEqual(list(anel.intervalo(51)), [])
+        self.assertEqual(anel.ultimo(), (50.0, (5.0, -5.0)))
+
+    def test_relogio_que_volta_nao_quebra_a_ordem(self):
+        anel = AnelSerie(["a"], capacidade=8)
+        for instante in (10.0, 20.0, 15.0, 30.0):
+            anel.adicionar(instante, (1,))
+        instantes = [t for t, _ in anel.intervalo(0)]
+        self.assertEqual(instantes, sorted(instantes))
+        self.assertEqual(len(list(anel.intervalo(20))), 3)
+
+
+class SerieMultiResolucaoTestCase(unittest.TestCase):
+    """Downsampling 5 s -> 1 min -> 1 h"""
+
+    def setUp(self):
+        # 1 h a cada 5 s, 2 h a cada minuto, 24 h a cada hora
+        self.serie = SerieMultiResolucao(["valor", "opcional"], niveis=((5, 720), (60, 120), (3600, 24)))
+        self.inicio = 1_699_999_200.0  # múltiplo de 1 h
+        # 3 horas de amostras a cada 5 s: valor = minuto da amostra
+        for i in range(3 * 720):
+            instante = self.inicio + i * 5
+            self.serie.adicionar(instante, (i // 12, None if i % 2 else 1.0))
+        self.fim = self.inicio + (3 * 720 - 1) * 5
+
+    def test_janela_curta_usa_5_segundos(self):
+        passo, pontos = self.serie.intervalo(self.fim - 600)
+        self.assertEqual(passo, 5)
+        self.assertEqual(len(pontos), 121)
+
+    def test_janela_longa_usa_media_por_minuto(self):
+        passo, pontos = self.serie.intervalo(self.inicio + 80 * 60)
+        self.assertEqual(passo, 60)
+        # Minutos 80 a 178; o minuto 179 ainda está aberto
+        self.assertEqual(len(pontos), 99)
+        # Cada minuto fechado tem a média das 12 amostras (todas com o mesmo valor)
+        for instante, (valor, opcional) in pontos:
+            self.assertEqual(valor, (instante - self.inicio) // 60)
+            self.assertEqual(opcional, 1.0)  # None (NaN) fica fora da média
+
+    def test_janela_maior_que_o_historico_usa_horas(self):
+        passo, pontos = self.serie.intervalo(self.inicio - 86400)
+        self.assertEqual(passo, 3600)
+        # Duas horas fechadas: média dos minutos 0..59 e 60..119
+        self.assertEqual([valor for _, (valor, _) in pontos], [29.5, 89.5])
+
+    def test_memoria_fixa(self):
+        # 1 instante + 2 campos, 8 bytes cada, em todos os pontos de todos os níveis
+        pontos = sum(capacidade for _, capacidade in NIVEIS_PADRAO)
+        self.assertEqual(SerieMultiResolucao(["a", "b"]).nbytes, pontos * 3 * 8)
+        self.assertEqual(self.serie.nbytes, (720 + 120 + 24) * 3 * 8)
+
+
+@unittest.skipUnless(importlib.util.find_spec("psutil"), "psutil não instalado")
+class MetricsCollectorHistoricoTestCase(unittest.TestCase):
+    """get_metrics_history sobre as séries"""
+
+    def test_historico_com_resolucao(self):
+        from shared.monitoring import ApplicationMetrics, MetricsCollector
+
+        coletor = MetricsCollector(api_url="http://api")
+        agora = time.time()
+        for i in range(10):
+            coletor.record_application_metrics(
+                ApplicationMetrics(timestamp="", active_connections=i, total_requests=i * 10,
+                                   error_count=0, avg_response_time=0.01, database_connections=1,
+                                   cache_hit_rate=0.5, uptime_seconds=i * 5),
+                instante=agora - 50 + i * 5
+            )
+        historico = coletor.get_metrics_history(hours=1)
+        self.assertEqual(historico["resolution_seconds"]["application"], 5)
+        self.assertEqual([p["total_requests"] for p in historico["application"]], list(range(0, 100, 10)))
+        self.assertEqual(coletor.get_latest_metrics()["application"]["active_connections"], 9)
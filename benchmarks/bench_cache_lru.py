@@ -0,0 +1,116 @@
+"""
+BENCHMARK - AdvancedCache (LRU O(1) x implementação anterior)
+=============================================================
+
+Com o cache cheio (10k e 100k entradas), mede:
+
+- set: inserção de chaves novas, cada uma provocando uma remoção LRU
+- get: leitura de chaves presentes (com e sem serialização)
+- invalidate: remoção de um namespace pequeno entre muitos
+
+A implementação anterior (min() sobre todas as chaves na remoção,
+varredura por prefixo na invalidação, pickle/gzip em todo get) é
+reproduzida em CacheAnterior para a comparação.
+
+Uso:
+    python benchmarks/bench_cache_lru.py [--tamanhos 10000 100000]
+"""
+
+import argparse
+import gzip
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.cache_system import AdvancedCache, CacheEntry
+
+# Uma página pequena de listagem (20 registros)
+VALOR = [{"id": i, "nome": f"Cliente {i}", "email": f"cliente{i}@exemplo.com", "ativo": True}
+         for i in range(20)]
+
+
+class CacheAnterior(AdvancedCache):
+    """Algoritmo do AdvancedCache antes da reescrita (dict simples)"""
+
+    def __init__(self, max_size: int):
+        super().__init__(max_size=max_size, max_bytes=0, cleanup_interval=0)
+        self._cache = {}
+
+    def _compress_data(self, data):
+        serialized = pickle.dumps(data)
+        if len(serialized) > self.compression_threshold:
+            return gzip.compress(serialized), True
+        return serialized, False
+
+    def get(self, namespace, key, params=None):
+        cache_key = self._generate_key(namespace, key, params)
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is None or entry.is_expired():
+                return None
+            entry.touch()
+            return self._decompress_data(entry.data, entry.compressed)
+
+    def set(self, namespace, key, value, ttl=None, params=None):
+        cache_key = self._generate_key(namespace, key, params)
+        data, compressed = self._compress_data(value)
+        entry = CacheEntry(data=data, created_at=time.time(), ttl=ttl or self.default_ttl,
+                           compressed=compressed)
+        with self._lock:
+            self._cache.pop(cache_key, None)
+            if len(self._cache) >= self.max_size:
+                oldest_key = min(self._cache.keys(), key=lambda k: self._cache[k].last_accessed)
+                del self._cache[oldest_key]
+            self._cache[cache_key] = entry
+
+    def invalidate(self, namespace, key=None, params=None):
+        with self._lock:
+            for k in [k for k in self._cache.keys() if k.startswith(f"{namespace}:")]:
+                del self._cache[k]
+
+
+def medir(funcao, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        funcao(i)
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def cenario(nome: str, cache, tamanho: int, repeticoes: int, **opcoes):
+    for i in range(tamanho):
+        cache.set(f"ns{i % 50}", str(i), VALOR, **opcoes)
+
+    def ler(i):
+        chave = tamanho - 1 - i % tamanho
+        assert cache.get(f"ns{chave % 50}", str(chave)) is not None
+
+    custo_get = medir(ler, repeticoes * 10)
+    # Cada set de chave nova remove a menos usada
+    custo_set = medir(lambda i: cache.set("novo", f"k{i}", VALOR, **opcoes), repeticoes)
+    for i in range(100):
+        cache.set("pequeno", str(i), VALOR, **opcoes)
+    custo_inv = medir(lambda i: cache.invalidate("pequeno"), 1)
+    print(f"{nome:<28}{tamanho:>9}{custo_set:>12.2f}{custo_get:>12.2f}{custo_inv:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'implementação':<28}{'entradas':>9}{'set µs':>12}{'get µs':>12}{'invalidate µs':>14}")
+    for tamanho in args.tamanhos:
+        cenario("anterior", CacheAnterior(tamanho), tamanho, args.repeticoes)
+        cenario("LRU O(1) serializado", AdvancedCache(max_size=tamanho, max_bytes=0, cleanup_interval=0),
+                tamanho, args.repeticoes)
+        cenario("LRU O(1) por referência",
+                AdvancedCache(max_size=tamanho, max_bytes=0, cleanup_interval=0, serialize=False),
+                tamanho, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
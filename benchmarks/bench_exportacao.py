@@ -0,0 +1,123 @@
+"""
+BENCHMARK - EXPORTAÇÃO EM FLUXO
+===============================
+
+Pico de memória Python (tracemalloc) e vazão ao exportar 1 mil, 100 mil
+e 1 milhão de produtos em CSV, NDJSON e XLSX pelo mesmo gerador usado
+pelos endpoints /exportar, comparado com montar a lista inteira
+(query.all() + serialização em memória, como faria um export baseado
+na listagem JSON).
+
+O pico da exportação em fluxo deve ficar constante (um lote) qualquer
+que seja o número de linhas.
+
+Uso:
+    python benchmarks/bench_exportacao.py [--maximo 1000000] [--lote 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.config import Base, create_sqlite_engines
+from backend.database.exportacao import FORMATOS_EXPORTACAO, exportar
+from backend.models import Produto
+
+COLUNAS = (
+    Produto.id, Produto.codigo, Produto.descricao, Produto.categoria,
+    Produto.preco_venda, Produto.estoque_atual, Produto.status, Produto.data_criacao
+)
+
+
+def popular(engine, total: int, lote: int = 50_000):
+    """Inserir N produtos pelo Core (mantém os defaults do modelo)"""
+    insert = Produto.__table__.insert()
+    with engine.begin() as conexao:
+        for inicio in range(0, total, lote):
+            conexao.execute(insert, [
+                {"codigo": f"P{n:08d}", "descricao": f"Placa de gesso {n} x 1,20 m",
+                 "categoria": "Forros", "preco_venda": Decimal("25.90")}
+                for n in range(inicio, min(total, inicio + lote))
+            ])
+
+
+def consumir(resposta) -> int:
+    """Percorrer o corpo da StreamingResponse como o servidor faria"""
+    async def _ler():
+        total = 0
+        async for pedaco in resposta.body_iterator:
+            total += len(pedaco)
+        return total
+    return asyncio.run(_ler())
+
+
+def medir(funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--maximo", type=int, default=1_000_000)
+    parser.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args()
+
+    tamanhos = [n for n in (1_000, 100_000, 1_000_000) if n <= args.maximo]
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, reader = create_sqlite_engines(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=writer)
+        popular(writer, max(tamanhos))
+        SessionLocal = sessionmaker(bind=reader)
+
+        print(f"{'modo':<18}{'linhas':>10}{'MB pico':>10}{'MB arquivo':>12}{'linhas/s':>11}")
+        for tamanho in tamanhos:
+            for formato in FORMATOS_EXPORTACAO:
+                sessao = SessionLocal()
+                query = sessao.query(Produto).filter(Produto.id <= tamanho).order_by(Produto.id)
+                gravados, segundos, pico = medir(
+                    lambda: consumir(exportar(query, COLUNAS, formato, "produtos", args.lote))
+                )
+                sessao.close()
+                print(f"{'fluxo ' + formato:<18}{tamanho:>10}{pico:>10.1f}"
+                      f"{gravados / 1024 / 1024:>12.1f}{tamanho / segundos:>11.0f}")
+
+            # Referência: lista completa em memória (limitada a 100 mil linhas)
+            if tamanho <= 100_000:
+                sessao = SessionLocal()
+
+                def lista_completa():
+                    produtos = sessao.query(Produto).filter(Produto.id <= tamanho).all()
+                    corpo = "\n".join(json.dumps({
+                        "id": p.id, "codigo": p.codigo, "descricao": p.descricao,
+                        "categoria": p.categoria, "preco_venda": float(p.preco_venda),
+                        "estoque_atual": p.estoque_atual, "status": p.status,
+                        "data_criacao": p.data_criacao.isoformat() if p.data_criacao else None
+                    }, default=str) for p in produtos).encode("utf-8")
+                    return len(corpo)
+
+                gravados, segundos, pico = medir(lista_completa)
+                sessao.close()
+                print(f"{'lista em memória':<18}{tamanho:>10}{pico:>10.1f}"
+                      f"{gravados / 1024 / 1024:>12.1f}{tamanho / segundos:>11.0f}")
+
+        writer.dispose()
+        reader.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+BENCHMARK - GROUP COMMIT
+========================
+
+Vazão de escritas pequenas (inserção de um cliente por unidade) com 1, 8
+e 32 escritores concorrentes, comparando:
+
+- commit individual: cada escritor usa sua sessão no engine de escrita
+  serializado (pool de 1 conexão) e faz o próprio commit
+- group commit: as unidades vão para o GroupCommitWriter, que grava um
+  lote por transação
+
+Uso:
+    python benchmarks/bench_group_commit.py [--unidades 2000]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.config import Base, create_sqlite_engines
+from backend.database.group_commit import GroupCommitWriter, create_group_commit_engine
+from backend.models import Cliente
+
+_sequencia = itertools.count(1)
+
+
+def unidade_cliente(sessao):
+    """Unidade de escrita equivalente ao corpo de criar_cliente"""
+    numero = next(_sequencia)
+    cliente = Cliente(
+        codigo=f"BEN{numero:07d}",
+        nome=f"Cliente {numero}",
+        tipo_pessoa="Física",
+        cpf_cnpj=f"{numero:011d}"
+    )
+    sessao.add(cliente)
+    sessao.flush()
+    return cliente.id
+
+
+def rodar(escritores: int, total: int, executar) -> float:
+    """Distribuir N unidades entre escritores e retornar unidades/s"""
+    por_escritor = total // escritores
+
+    def trabalho():
+        for _ in range(por_escritor):
+            executar(unidade_cliente)
+
+    threads = [threading.Thread(target=trabalho) for _ in range(escritores)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return por_escritor * escritores / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--unidades", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'escritores':<12}{'commit individual/s':>22}{'group commit/s':>18}{'lotes':>8}")
+    for escritores in (1, 8, 32):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            writer, reader = create_sqlite_engines(url)
+            Base.metadata.create_all(bind=writer)
+            SessionLocal = sessionmaker(bind=writer, autoflush=False)
+
+            def commit_individual(unidade):
+                sessao = SessionLocal()
+                try:
+                    unidade(sessao)
+                    sessao.commit()
+                finally:
+                    sessao.close()
+
+            individual = rodar(escritores, args.unidades, commit_individual)
+            writer.dispose()
+            reader.dispose()
+
+            engine_gc = create_group_commit_engine(url)
+            gc = GroupCommitWriter(
+                sessionmaker(bind=engine_gc, autoflush=False, expire_on_commit=False)
+            )
+            agrupado = rodar(escritores, args.unidades, gc.submit)
+            gc.parar()
+            engine_gc.dispose()
+
+            print(f"{escritores:<12}{individual:>22.0f}{agrupado:>18.0f}"
+                  f"{gc.estatisticas['lotes']:>8}")
+
+
+if __name__ == "__main__":
+    main()
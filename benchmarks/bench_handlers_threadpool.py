@@ -0,0 +1,118 @@
+"""
+BENCHMARK - HANDLERS SÍNCRONOS NO THREADPOOL
+============================================
+
+Compara a latência de requisições rápidas concorrentes quando uma query
+lenta roda em um handler "async def" (bloqueia o event loop) e em um
+handler "def" (executado no threadpool do Starlette), que é o modo
+adotado pelos routers em backend/api/routers.
+
+Uso:
+    python benchmarks/bench_handlers_threadpool.py [--rapidas 50] [--lentas 4]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+# Query propositalmente lenta (~centenas de ms no SQLite)
+QUERY_LENTA = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :limite) "
+    "SELECT SUM(x) FROM n"
+)
+
+
+def criar_app(db_path: str, limite: int) -> FastAPI:
+    """Criar app com o mesmo padrão de sessão de backend.database.config"""
+    engine = create_engine(
+        f"sqlite:///{db_path}", connect_args={"check_same_thread": False}
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/lento/async")
+    async def lento_async(db: Session = Depends(get_db)):
+        return {"soma": db.execute(QUERY_LENTA, {"limite": limite}).scalar()}
+
+    @app.get("/lento/sync")
+    def lento_sync(db: Session = Depends(get_db)):
+        return {"soma": db.execute(QUERY_LENTA, {"limite": limite}).scalar()}
+
+    @app.get("/rapido")
+    def rapido(db: Session = Depends(get_db)):
+        return {"ok": db.execute(text("SELECT 1")).scalar()}
+
+    return app
+
+
+async def medir(app: FastAPI, rota_lenta: str, rapidas: int, lentas: int) -> dict:
+    """Disparar requisições lentas e rápidas ao mesmo tempo"""
+    transport = httpx.ASGITransport(app=app)
+    latencias = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def chamada_rapida(agendada: float):
+            # Latência medida a partir do instante agendado: se o event loop
+            # estiver bloqueado, a espera também conta.
+            await asyncio.sleep(max(0.0, agendada - time.perf_counter()))
+            await client.get("/rapido")
+            latencias.append((time.perf_counter() - agendada) * 1000)
+
+        inicio = time.perf_counter()
+        tarefas = [client.get(rota_lenta) for _ in range(lentas)]
+        tarefas += [chamada_rapida(inicio + 0.01 * (i + 1)) for i in range(rapidas)]
+        await asyncio.gather(*tarefas)
+        total = (time.perf_counter() - inicio) * 1000
+
+    latencias.sort()
+    return {
+        "p50_ms": statistics.median(latencias),
+        "p95_ms": latencias[int(len(latencias) * 0.95) - 1],
+        "max_ms": latencias[-1],
+        "total_ms": total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rapidas", type=int, default=50)
+    parser.add_argument("--lentas", type=int, default=4)
+    parser.add_argument("--limite", type=int, default=300_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = criar_app(os.path.join(tmp, "bench.db"), args.limite)
+
+        print(f"{'modo':<28}{'p50 (ms)':>10}{'p95 (ms)':>10}{'max (ms)':>10}{'total (ms)':>12}")
+        for nome, rota in (
+            ("antes: async def + Session", "/lento/async"),
+            ("depois: def no threadpool", "/lento/sync"),
+        ):
+            r = asyncio.run(medir(app, rota, args.rapidas, args.lentas))
+            print(
+                f"{nome:<28}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                f"{r['max_ms']:>10.1f}{r['total_ms']:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
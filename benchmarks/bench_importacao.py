@@ -0,0 +1,109 @@
+"""
+BENCHMARK - IMPORTAÇÃO EM MASSA
+===============================
+
+Vazão (linhas/s) da importação de clientes, produtos e fornecedores a
+partir de um CSV gerado em memória, com as tabelas e triggers FTS5 de
+produção criados, comparada ao caminho antigo (um INSERT com commit por
+linha, como N chamadas a POST /clientes).
+
+Uso:
+    python benchmarks/bench_importacao.py [--linhas 20000] [--lote 1000]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.busca_fts import create_fts_tables
+from backend.database.config import Base, create_sqlite_engines
+from backend.database.importacao import importar, ler_csv
+from backend.models import Cliente
+
+
+def cpf(numero: int) -> str:
+    """CPF válido gerado a partir de 9 dígitos"""
+    digitos = [int(c) for c in f"{numero:09d}"]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, digitos))
+
+
+def cnpj(numero: int) -> str:
+    """CNPJ válido gerado a partir de 12 dígitos"""
+    digitos = [int(c) for c in f"{numero:08d}0001"]
+    for pesos in ([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, digitos))
+
+
+def arquivo_csv(entidade: str, linhas: int) -> str:
+    if entidade == "clientes":
+        cabecalho = "nome;cpf_cnpj;email_principal;endereco_cidade;telefone_celular"
+        corpo = (f"Cliente {i};{cpf(i + 1000)};c{i}@exemplo.com;São Paulo;1199{i:07d}"
+                 for i in range(linhas))
+    elif entidade == "produtos":
+        cabecalho = "descricao;categoria;preco_venda;codigo_barras"
+        corpo = (f"Placa de gesso {i};Forros;{i % 90 + 10},90;789{i:010d}" for i in range(linhas))
+    else:
+        cabecalho = "razao_social;cnpj_cpf;cidade;email"
+        corpo = (f"Fornecedor {i} Ltda;{cnpj(i + 1000)};Curitiba;f{i}@exemplo.com"
+                 for i in range(linhas))
+    return cabecalho + "\n" + "\n".join(corpo) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=20000)
+    parser.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'entidade':<14}{'linhas':>8}{'inseridos':>11}{'segundos':>10}{'linhas/s':>11}")
+    for entidade in ("clientes", "produtos", "fornecedores"):
+        conteudo = arquivo_csv(entidade, args.linhas)
+        with tempfile.TemporaryDirectory() as tmp:
+            writer, reader = create_sqlite_engines(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            Base.metadata.create_all(bind=writer)
+            create_fts_tables(writer)
+            sessao = sessionmaker(bind=writer)()
+            try:
+                relatorio = importar(sessao, entidade, ler_csv(io.StringIO(conteudo)),
+                                     tamanho_lote=args.lote)
+            finally:
+                sessao.close()
+                writer.dispose()
+                reader.dispose()
+        print(f"{entidade:<14}{relatorio.total_linhas:>8}{relatorio.inseridos:>11}"
+              f"{relatorio.segundos:>10.2f}{relatorio.linhas_por_segundo:>11.0f}")
+
+    # Referência: um commit por cliente (amostra menor, o caminho é lento)
+    amostra = min(args.linhas, 2000)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, reader = create_sqlite_engines(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=writer)
+        create_fts_tables(writer)
+        sessao = sessionmaker(bind=writer)()
+        inicio = time.perf_counter()
+        for i in range(amostra):
+            sessao.add(Cliente(codigo=f"CLI{i:05d}", nome=f"Cliente {i}",
+                               tipo_pessoa="Física", cpf_cnpj=cpf(i + 1000)))
+            sessao.commit()
+        segundos = time.perf_counter() - inicio
+        sessao.close()
+        writer.dispose()
+        reader.dispose()
+    print(f"{'1 commit/linha':<14}{amostra:>8}{amostra:>11}{segundos:>10.2f}"
+          f"{amostra / segundos:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
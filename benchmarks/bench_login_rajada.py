@@ -0,0 +1,118 @@
+"""
+BENCHMARK - RAJADA DE LOGINS
+============================
+
+Dispara uma rajada de verificações de senha a partir de tantas threads
+quanto o threadpool dos handlers (DB_THREADPOOL_SIZE), como acontece
+quando muitos usuários fazem login ao mesmo tempo, e mede ao mesmo
+tempo a latência de requisições curtas (trabalho Python pequeno em
+outras threads).
+
+Compara:
+- SHA-256 legado (antes da troca de KDF)
+- bcrypt sem limite (um hash por thread do threadpool)
+- bcrypt no pool limitado de backend.auth.hash_senhas
+
+Uso:
+    python benchmarks/bench_login_rajada.py [--logins 200] [--rounds 10]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.auth.hash_senhas import PASSWORD_HASH_WORKERS, ServicoHashSenhas, hash_legado
+from backend.database.config import DB_THREADPOOL_SIZE
+
+SENHA = "Senha@123"
+
+
+def requisicao_curta() -> None:
+    """Trabalho de uma requisição simples (serialização, validação)"""
+    sum(len(str(i)) for i in range(2000))
+
+
+def percentil(valores, p: float) -> float:
+    valores = sorted(valores)
+    return valores[max(0, int(len(valores) * p) - 1)]
+
+
+def medir(verificar, logins: int, threads: int) -> dict:
+    """Rajada de logins em `threads` threads e requisições curtas em paralelo"""
+    latencias_login = []
+    latencias_curtas = []
+    fim = threading.Event()
+
+    def login():
+        inicio = time.perf_counter()
+        assert verificar()
+        latencias_login.append((time.perf_counter() - inicio) * 1000)
+
+    def curtas():
+        while not fim.is_set():
+            inicio = time.perf_counter()
+            requisicao_curta()
+            latencias_curtas.append((time.perf_counter() - inicio) * 1000)
+            time.sleep(0.005)
+
+    observadores = [threading.Thread(target=curtas) for _ in range(4)]
+    for t in observadores:
+        t.start()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for futuro in [pool.submit(login) for _ in range(logins)]:
+            futuro.result()
+    total = time.perf_counter() - inicio
+
+    fim.set()
+    for t in observadores:
+        t.join()
+
+    return {
+        "logins_s": logins / total,
+        "login_p50": statistics.median(latencias_login),
+        "login_p95": percentil(latencias_login, 0.95),
+        "curta_p50": statistics.median(latencias_curtas),
+        "curta_p95": percentil(latencias_curtas, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=DB_THREADPOOL_SIZE)
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS)
+    args = parser.parse_args()
+
+    antigo = hash_legado(SENHA)
+    sem_limite = ServicoHashSenhas(workers=args.threads, rounds=args.rounds)
+    limitado = ServicoHashSenhas(workers=args.workers, rounds=args.rounds)
+    hash_bcrypt = limitado.hash(SENHA)
+
+    print(f"{args.logins} logins, {args.threads} threads de handler, "
+          f"bcrypt {args.rounds} rounds, pool limitado com {args.workers} threads")
+    print(f"{'modo':<26}{'logins/s':>10}{'login p50':>11}{'login p95':>11}"
+          f"{'curta p50':>11}{'curta p95':>11}")
+    for nome, verificar in (
+        ("SHA-256 legado", lambda: limitado.verificar(SENHA, antigo)),
+        ("bcrypt sem limite", lambda: sem_limite.verificar(SENHA, hash_bcrypt)),
+        ("bcrypt pool limitado", lambda: limitado.verificar(SENHA, hash_bcrypt)),
+    ):
+        r = medir(verificar, args.logins, args.threads)
+        print(f"{nome:<26}{r['logins_s']:>10.0f}{r['login_p50']:>9.1f}ms{r['login_p95']:>9.1f}ms"
+              f"{r['curta_p50']:>9.2f}ms{r['curta_p95']:>9.2f}ms")
+
+    sem_limite.encerrar()
+    limitado.encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+BENCHMARK - Custo por requisição dos middlewares de observabilidade
+===================================================================
+
+Mede, sobre uma aplicação ASGI vazia (sem rede, sem roteamento real),
+quanto cada middleware acrescenta a uma requisição:
+
+- MetricasMiddleware (contagem, erros e histograma de latência por rota)
+- InstrumentacaoSQLMiddleware (medição de consultas por requisição)
+- os dois juntos, na ordem usada em backend/api/main.py
+
+e o custo de renderizar /metrics com 50 rotas ativas.
+
+Uso:
+    python benchmarks/bench_metricas_http.py [--requisicoes 200000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.instrumentacao import InstrumentacaoSQLMiddleware
+from backend.api.metricas import MetricasHTTP, MetricasMiddleware, renderizar_metricas
+
+
+async def aplicacao_vazia(scope, receive, send):
+    scope["endpoint"] = aplicacao_vazia
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+class _App:
+    """Stand-in do FastAPI para rota_da_requisicao"""
+
+    class state:
+        _rotas_por_endpoint = {aplicacao_vazia: "/api/v1/clientes/{cliente_id}"}
+
+
+async def _receber():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _enviar(mensagem):
+    pass
+
+
+async def medir(app, requisicoes: int) -> float:
+    scope_base = {"type": "http", "method": "GET", "path": "/api/v1/clientes/1", "app": _App}
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await app(dict(scope_base), _receber, _enviar)
+    return (time.perf_counter() - inicio) / requisicoes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    cenarios = {
+        "sem middleware": aplicacao_vazia,
+        "MetricasMiddleware": MetricasMiddleware(aplicacao_vazia, MetricasHTTP()),
+        "InstrumentacaoSQLMiddleware": InstrumentacaoSQLMiddleware(aplicacao_vazia),
+        "os dois": MetricasMiddleware(InstrumentacaoSQLMiddleware(aplicacao_vazia), MetricasHTTP()),
+    }
+    base = None
+    print(f"{'cenário':<30}{'µs/req':>10}{'acréscimo µs':>14}")
+    for nome, app in cenarios.items():
+        custo = asyncio.run(medir(app, args.requisicoes))
+        base = custo if base is None else base
+        print(f"{nome:<30}{custo:>10.2f}{custo - base:>14.2f}")
+
+    metricas = MetricasHTTP()
+    for i in range(50):
+        for j in range(100):
+            metricas.observar("GET", f"/api/v1/rota{i}", 200 if j % 10 else 500, j / 1000)
+    inicio = time.perf_counter()
+    for _ in range(100):
+        texto = renderizar_metricas(metricas, engines={})
+    custo = (time.perf_counter() - inicio) / 100 * 1e3
+    print(f"\nrenderizar /metrics (50 rotas, {len(texto.splitlines())} linhas): {custo:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+BENCHMARK - CUSTO DO RATE LIMITING POR REQUISIÇÃO
+=================================================
+
+Mede o tempo acrescentado pelo RateLimitMiddleware chamando o ASGI
+diretamente (sem servidor nem cliente HTTP), com e sem o middleware
+em volta de uma aplicação vazia, para os backends memória e SQLite.
+
+Uso:
+    python benchmarks/bench_rate_limit.py [--requisicoes 200000] [--usuarios 500]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.rate_limit import BaldesMemoria, BaldesSQLite, GrupoLimite, RateLimitMiddleware
+from backend.auth.jwt_handler import generate_user_token
+
+GRUPOS = [GrupoLimite("api", ("/api/v1/",), capacidade=1e12, por_segundo=1e12)]
+
+
+async def app_vazia(scope, receive, send):
+    pass
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(mensagem):
+    pass
+
+
+def escopos(usuarios: int):
+    lista = []
+    for i in range(usuarios):
+        token = generate_user_token(i, f"u{i}", f"u{i}@primotex.com", "operador")
+        lista.append({
+            "type": "http", "path": "/api/v1/clientes/", "client": ("10.0.0.1", 50000),
+            "headers": [
+                (b"host", b"localhost"), (b"user-agent", b"bench"), (b"accept", b"*/*"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+        })
+    return lista
+
+
+async def medir(app, lista, requisicoes: int) -> float:
+    for scope in lista:  # aquece o mapa de tokens
+        await app(scope, receive, send)
+    n = len(lista)
+    inicio = time.perf_counter()
+    for i in range(requisicoes):
+        await app(lista[i % n], receive, send)
+    return (time.perf_counter() - inicio) / requisicoes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=200_000)
+    parser.add_argument("--usuarios", type=int, default=500)
+    args = parser.parse_args()
+
+    lista = escopos(args.usuarios)
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = BaldesSQLite(os.path.join(tmp, "baldes.db"))
+        base = asyncio.run(medir(app_vazia, lista, args.requisicoes))
+        print(f"{'modo':<22}{'µs/req':>10}{'acréscimo':>12}")
+        print(f"{'sem middleware':<22}{base:>10.2f}{'':>12}")
+        for nome, baldes in (("memória", BaldesMemoria()), ("sqlite", sqlite)):
+            app = RateLimitMiddleware(app_vazia, grupos=GRUPOS, baldes=baldes)
+            custo = asyncio.run(medir(app, lista, args.requisicoes))
+            print(f"{nome:<22}{custo:>10.2f}{custo - base:>10.2f}µs")
+        sqlite.fechar()
+
+
+if __name__ == "__main__":
+    main()
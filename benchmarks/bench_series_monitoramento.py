@@ -0,0 +1,106 @@
+"""
+BENCHMARK - Histórico do monitoramento (séries compactas x deques)
+==================================================================
+
+Compara, para as métricas de sistema do MetricsCollector:
+
+- memória: deque(maxlen=17280) de dataclasses com timestamp ISO (24 h a
+  cada 5 s, implementação anterior) x SerieMultiResolucao (5 s por 1 h,
+  1 min por 24 h, 1 h por 30 dias) depois de 24 h de amostras
+- consulta da última hora: filtro com datetime.fromisoformat em todas
+  as amostras x busca binária no nível de 5 s
+
+A implementação anterior é reproduzida em AmostraAnterior/historico_anterior.
+
+Uso:
+    python benchmarks/bench_series_monitoramento.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.series_temporais import SerieMultiResolucao
+
+AMOSTRAS_24H = 24 * 3600 // 5
+
+
+@dataclass
+class AmostraAnterior:
+    """Mesmos campos de shared.monitoring.SystemMetrics"""
+    timestamp: str
+    cpu_percent: float
+    memory_percent: float
+    memory_used_gb: float
+    memory_total_gb: float
+    disk_percent: float
+    disk_used_gb: float
+    disk_total_gb: float
+    network_sent_mb: float
+    network_recv_mb: float
+    processes_count: int
+    load_average: Optional[float] = None
+
+
+CAMPOS = [nome for nome in AmostraAnterior.__dataclass_fields__ if nome != "timestamp"]
+
+
+def valores(i: int):
+    return (i % 100 + 0.5, 40.25 + i % 7, 6.21, 15.5, 71.3, 180.2, 250.0,
+            0.12 * (i % 9), 0.34 * (i % 5), 250 + i % 30, 0.75 + (i % 4) / 10)
+
+
+def medir_memoria(construir):
+    tracemalloc.start()
+    objeto = construir()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objeto, memoria
+
+
+def historico_anterior(inicio: float):
+    historico = deque(maxlen=AMOSTRAS_24H)
+    for i in range(AMOSTRAS_24H):
+        historico.append(AmostraAnterior(datetime.fromtimestamp(inicio + i * 5).isoformat(), *valores(i)))
+    return historico
+
+
+def historico_novo(inicio: float):
+    serie = SerieMultiResolucao(CAMPOS)
+    for i in range(AMOSTRAS_24H):
+        serie.adicionar(inicio + i * 5, valores(i))
+    return serie
+
+
+def main():
+    inicio = time.time() - AMOSTRAS_24H * 5
+    anterior, memoria_anterior = medir_memoria(lambda: historico_anterior(inicio))
+    novo, memoria_nova = medir_memoria(lambda: historico_novo(inicio))
+
+    print(f"{'implementação':<32}{'memória KB':>12}{'última hora ms':>16}")
+
+    corte = datetime.now() - timedelta(hours=1)
+    t0 = time.perf_counter()
+    for _ in range(10):
+        recentes = [m for m in anterior if datetime.fromisoformat(m.timestamp) > corte]
+    custo_anterior = (time.perf_counter() - t0) / 10 * 1000
+    print(f"{'deque de dataclasses (24 h)':<32}{memoria_anterior / 1024:>12.0f}{custo_anterior:>16.2f}")
+
+    t0 = time.perf_counter()
+    for _ in range(10):
+        _passo, pontos = novo.intervalo(time.time() - 3600)
+    custo_novo = (time.perf_counter() - t0) / 10 * 1000
+    print(f"{'SerieMultiResolucao (30 dias)':<32}{memoria_nova / 1024:>12.0f}{custo_novo:>16.2f}")
+    print(f"\nredução de memória: {memoria_anterior / memoria_nova:.0f}x "
+          f"({len(recentes)} x {len(pontos)} pontos na última hora)")
+
+
+if __name__ == "__main__":
+    main()
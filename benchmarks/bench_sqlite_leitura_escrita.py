@@ -0,0 +1,125 @@
+"""
+BENCHMARK - LEITURA SOB CARGA DE ESCRITA NO SQLITE
+==================================================
+
+Mede a vazão de leituras (listagem paginada + contagem) com e sem um
+escritor concorrente, comparando:
+
+- antes: engine único padrão (journal DELETE, sem pragmas)
+- depois: create_sqlite_engines (WAL, escritor serializado, pool de leitores)
+
+Uso:
+    python benchmarks/bench_sqlite_leitura_escrita.py [--leitores 8] [--segundos 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from backend.database.config import create_sqlite_engines
+
+LINHAS_INICIAIS = 20_000
+
+
+def preparar_banco(engine):
+    """Criar tabela de teste com alguns milhares de linhas"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS itens ("
+            "id INTEGER PRIMARY KEY, nome TEXT, valor REAL, ativo INTEGER)"
+        ))
+        conn.execute(
+            text("INSERT INTO itens (nome, valor, ativo) VALUES (:n, :v, 1)"),
+            [{"n": f"item {i}", "v": i * 1.5} for i in range(LINHAS_INICIAIS)]
+        )
+
+
+def medir(writer, reader, leitores: int, segundos: float, com_escrita: bool) -> dict:
+    """Executar leitores (e opcionalmente um escritor) por N segundos"""
+    parar = threading.Event()
+    leituras = [0] * leitores
+    escritas = [0]
+    erros = [0]
+
+    def ler(indice: int):
+        while not parar.is_set():
+            try:
+                with reader.connect() as conn:
+                    conn.execute(text(
+                        "SELECT id, nome, valor FROM itens WHERE ativo = 1 "
+                        "ORDER BY id DESC LIMIT 50"
+                    )).fetchall()
+                    conn.execute(text("SELECT COUNT(*) FROM itens")).scalar()
+                leituras[indice] += 1
+            except Exception:
+                erros[0] += 1
+
+    def escrever():
+        while not parar.is_set():
+            try:
+                with writer.begin() as conn:
+                    conn.execute(
+                        text("INSERT INTO itens (nome, valor, ativo) VALUES ('novo', 1.0, 1)")
+                    )
+                    conn.execute(text("UPDATE itens SET valor = valor + 1 WHERE id = 1"))
+                escritas[0] += 1
+            except Exception:
+                erros[0] += 1
+
+    threads = [threading.Thread(target=ler, args=(i,)) for i in range(leitores)]
+    if com_escrita:
+        threads.append(threading.Thread(target=escrever))
+
+    for t in threads:
+        t.start()
+    time.sleep(segundos)
+    parar.set()
+    for t in threads:
+        t.join()
+
+    return {
+        "leituras_s": sum(leituras) / segundos,
+        "escritas_s": escritas[0] / segundos,
+        "erros": erros[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'perfil':<10}{'escritor':<10}{'leituras/s':>12}{'escritas/s':>12}{'erros':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Antes: engine único, sem pragmas
+        url = f"sqlite:///{os.path.join(tmp, 'antes.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        preparar_banco(engine)
+        for com_escrita in (False, True):
+            r = medir(engine, engine, args.leitores, args.segundos, com_escrita)
+            print(f"{'antes':<10}{'sim' if com_escrita else 'não':<10}"
+                  f"{r['leituras_s']:>12.0f}{r['escritas_s']:>12.0f}{r['erros']:>8}")
+        engine.dispose()
+
+        # Depois: WAL + escritor serializado + pool de leitores
+        url = f"sqlite:///{os.path.join(tmp, 'depois.db')}"
+        writer, reader = create_sqlite_engines(url, read_pool_size=args.leitores)
+        preparar_banco(writer)
+        for com_escrita in (False, True):
+            r = medir(writer, reader, args.leitores, args.segundos, com_escrita)
+            print(f"{'depois':<10}{'sim' if com_escrita else 'não':<10}"
+                  f"{r['leituras_s']:>12.0f}{r['escritas_s']:>12.0f}{r['erros']:>8}")
+        writer.dispose()
+        reader.dispose()
+
+
+if __name__ == "__main__":
+    main()
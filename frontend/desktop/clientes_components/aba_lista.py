@@ -23,6 +23,7 @@ import requests
 from threading import Thread
 
 from frontend.desktop.auth_middleware import create_auth_header
+from frontend.desktop.http_condicional import get_condicional
 
 
 class AbaLista:
@@ -300,7 +301,7 @@ class AbaLista:
                 url = f"{self.API_BASE}/clientes"
                 headers = create_auth_header()
                 
-                response = requests.get(url, headers=headers, timeout=10)
+                response = get_condicional(url, headers=headers, timeout=10)
                 
                 if response.status_code == 200:
                     self.clientes = response.json()
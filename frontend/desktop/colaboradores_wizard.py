@@ -41,6 +41,7 @@ from frontend.desktop.auth_middleware import (
     get_current_user_info
 )
 from frontend.desktop.foto_dialog import FotoDialog
+from frontend.desktop.http_condicional import get_condicional
 
 # Configuração da API
 API_BASE_URL = "http://127.0.0.1:8002"
@@ -1594,7 +1595,7 @@ class ColaboradoresWizard:
             # Carregar cargos
             # URL corrigida - router tem prefix="/colaboradores"
             # f"{API_BASE_URL}/cargos/",  # ANTIGA - causava 404
-            response_cargos = requests.get(
+            response_cargos = get_condicional(
                 f"{API_BASE_URL}/colaboradores/cargos/",  # CORRETA
                 headers=self.headers,
                 timeout=10
@@ -1607,7 +1608,7 @@ class ColaboradoresWizard:
             # Carregar departamentos
             # URL corrigida - router tem prefix="/colaboradores"
             # f"{API_BASE_URL}/departamentos/",  # ANTIGA - causava 404
-            response_dept = requests.get(
+            response_dept = get_condicional(
                 f"{API_BASE_URL}/colaboradores/departamentos/",  # CORRETA
                 headers=self.headers,
                 timeout=10
@@ -18,6 +18,8 @@ import re
 from datetime import datetime
 import json
 
+from frontend.desktop.exportacao_download import exportar_com_dialogo
+
 # =======================================
 # CONFIGURAÇÕES
 # =======================================
@@ -970,8 +972,8 @@ Total da semana: 130 mensagens""")
         self.carregar_historico()
 
     def exportar_historico(self):
-        """Exportar histórico"""
-        messagebox.showinfo("Info", "Histórico exportado para planilha Excel.")
+        """Exportar histórico em Excel, CSV ou NDJSON"""
+        exportar_com_dialogo(self.root, "/comunicacao/historico/exportar", "comunicacoes")
 
     def limpar_historico(self):
         """Limpar histórico"""
@@ -18,7 +18,6 @@ Data: 29/10/2025
 import tkinter as tk
 from tkinter import ttk, messagebox, Canvas
 import threading
-import requests
 from datetime import datetime, date, timedelta
 from typing import Dict, Any, Optional, List
 import json
@@ -29,6 +28,8 @@ import os
 # Adicionar diretório raiz ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from frontend.desktop.http_condicional import get_condicional
+
 # Constantes da UI centralizadas
 try:
     from ui_constants import (
@@ -944,19 +945,9 @@ class DashboardWindow:
         self.update_alerts()
 
     def fetch_clientes_metrics(self):
-        """Buscar métricas de clientes com cache"""
+        """Buscar métricas de clientes (GET condicional: 304 reaproveita a resposta)"""
         try:
-            # Tentar cache primeiro
-            cached_data = erp_cache.get_clientes()
-            if cached_data:
-                self.metrics_cache['clientes'] = {
-                    'total': str(len(cached_data)),
-                    'trend': '+2%'  # Simulado
-                }
-                return
-
-            # Buscar da API se não há cache
-            response = requests.get(
+            response = get_condicional(
                 f"{API_BASE_URL}/api/v1/clientes",
                 headers=self.headers,
                 timeout=API_TIMEOUT
@@ -965,9 +956,6 @@ class DashboardWindow:
                 data = response.json()
                 clientes = data.get('clientes', [])
 
-                # Armazenar no cache
-                erp_cache.set_clientes(clientes)
-
                 self.metrics_cache['clientes'] = {
                     'total': str(len(clientes)),
                     'trend': '+2%'  # Simulado
@@ -979,7 +967,7 @@ class DashboardWindow:
     def fetch_os_metrics(self):
         """Buscar métricas de Ordem de Serviço"""
         try:
-            response = requests.get(
+            response = get_condicional(
                 f"{API_BASE_URL}/api/v1/ordem-servico/dashboard/estatisticas",
                 headers=self.headers,
                 timeout=API_TIMEOUT
@@ -1003,7 +991,7 @@ class DashboardWindow:
     def fetch_agendamento_metrics(self):
         """Buscar métricas de Agendamento"""
         try:
-            response = requests.get(
+            response = get_condicional(
                 f"{API_BASE_URL}/api/v1/agendamento/estatisticas/",
                 headers=self.headers,
                 timeout=API_TIMEOUT
@@ -1027,7 +1015,7 @@ class DashboardWindow:
     def fetch_financeiro_metrics(self):
         """Buscar métricas Financeiras"""
         try:
-            response = requests.get(
+            response = get_condicional(
                 f"{API_BASE_URL}/api/v1/financeiro/dashboard/resumo",
                 headers=self.headers,
                 timeout=API_TIMEOUT
@@ -1054,7 +1042,7 @@ class DashboardWindow:
     def fetch_comunicacao_metrics(self):
         """Buscar métricas de Comunicação"""
         try:
-            response = requests.get(
+            response = get_condicional(
                 f"{API_BASE_URL}/api/v1/comunicacao/dashboard",
                 headers=self.headers,
                 timeout=API_TIMEOUT
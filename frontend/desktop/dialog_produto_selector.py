@@ -28,6 +28,7 @@ from frontend.desktop.auth_middleware import (
     get_token_for_api,
     create_auth_header
 )
+from frontend.desktop.http_condicional import get_condicional
 
 # Configuração API
 API_BASE_URL = "http://127.0.0.1:8002"
@@ -305,7 +306,7 @@ class DialogProdutoSelector:
         def task():
             try:
                 headers = create_auth_header()
-                response = requests.get(
+                response = get_condicional(
                     f"{API_BASE_URL}/api/v1/produtos",
                     headers=headers,
                     params={"limit": 1000},  # Pega todos para extrair categorias
@@ -23,6 +23,7 @@ from frontend.desktop.auth_middleware import (
     create_auth_header,
     get_current_user_info
 )
+from frontend.desktop.exportacao_download import exportar_com_dialogo
 
 # =======================================
 # CONFIGURAÇÕES
@@ -1028,11 +1029,8 @@ class EstoqueWindow:
             )
 
     def exportar_estoque(self):
-        """Exportar dados do estoque"""
-        messagebox.showinfo(
-            "Exportar",
-            "Funcionalidade de exportação será implementada!\n\nFormatos disponíveis:\n- Excel\n- PDF\n- CSV"
-        )
+        """Exportar dados do estoque (produtos) em Excel, CSV ou NDJSON"""
+        exportar_com_dialogo(self.root, "/produtos/exportar", "estoque")
 
     def novo_inventario(self):
         """Iniciar novo inventário completo"""
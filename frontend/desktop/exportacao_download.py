@@ -0,0 +1,80 @@
+"""
+SISTEMA ERP PRIMOTEX - DOWNLOAD DE EXPORTAÇÕES
+=============================================
+
+Baixa os endpoints /exportar da API direto para um arquivo, em pedaços,
+sem carregar a listagem inteira na janela (antes as telas paginavam o
+JSON ou usavam dados de exemplo).
+
+Autor: GitHub Copilot
+Data: 16/10/2026
+"""
+
+import threading
+from tkinter import filedialog, messagebox
+from typing import Dict, Optional
+
+import requests
+
+from frontend.desktop.auth_middleware import create_auth_header
+
+API_BASE_URL = "http://127.0.0.1:8002/api/v1"
+
+TIPOS_ARQUIVO = [
+    ("Planilha Excel", "*.xlsx"),
+    ("CSV", "*.csv"),
+    ("NDJSON", "*.ndjson"),
+]
+
+
+def baixar_exportacao(
+    caminho: str,
+    destino: str,
+    params: Optional[Dict] = None,
+    base_url: str = API_BASE_URL,
+    tamanho_pedaco: int = 64 * 1024
+) -> int:
+    """
+    Gravar a resposta em fluxo de um endpoint de exportação.
+
+    Args:
+        caminho: Caminho do endpoint (ex.: "/produtos/exportar")
+        destino: Arquivo de saída; a extensão define o formato
+        params: Filtros da listagem
+        base_url: URL base da API
+
+    Returns:
+        Número de bytes gravados
+    """
+    parametros = dict(params or {})
+    parametros["formato"] = destino.rsplit(".", 1)[-1].lower()
+    gravados = 0
+    with requests.get(f"{base_url}{caminho}", params=parametros, headers=create_auth_header(),
+                      stream=True, timeout=30) as resposta:
+        resposta.raise_for_status()
+        with open(destino, "wb") as arquivo:
+            for pedaco in resposta.iter_content(chunk_size=tamanho_pedaco):
+                arquivo.write(pedaco)
+                gravados += len(pedaco)
+    return gravados
+
+
+def exportar_com_dialogo(janela, caminho: str, nome_sugerido: str, params: Optional[Dict] = None):
+    """Perguntar o arquivo de destino e baixar a exportação em segundo plano"""
+    destino = filedialog.asksaveasfilename(
+        parent=janela, title="Exportar", initialfile=f"{nome_sugerido}.xlsx",
+        defaultextension=".xlsx", filetypes=TIPOS_ARQUIVO
+    )
+    if not destino:
+        return
+
+    def tarefa():
+        try:
+            baixar_exportacao(caminho, destino, params)
+            janela.after(0, lambda: messagebox.showinfo("Exportar", f"Arquivo salvo em:\n{destino}"))
+        except (requests.RequestException, OSError) as e:
+            # `e` deixa de existir ao fim do except; o callback roda depois
+            msg = str(e)
+            janela.after(0, lambda msg=msg: messagebox.showerror("Exportar", f"Falha na exportação:\n{msg}"))
+
+    threading.Thread(target=tarefa, daemon=True).start()
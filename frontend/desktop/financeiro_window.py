@@ -35,6 +35,7 @@ from frontend.desktop.auth_middleware import (
     create_auth_header,
     get_current_user_info
 )
+from frontend.desktop.exportacao_download import exportar_com_dialogo
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -935,8 +936,8 @@ class FinanceiroWindow:
         messagebox.showinfo("Movimentação", "Funcionalidade em desenvolvimento")
 
     def exportar_movimentacoes(self):
-        """Exportar movimentações"""
-        messagebox.showinfo("Exportar", "Funcionalidade em desenvolvimento")
+        """Exportar movimentações em Excel, CSV ou NDJSON"""
+        exportar_com_dialogo(self.window, "/financeiro/movimentacoes/exportar", "movimentacoes")
 
     def nova_categoria(self):
         """Nova categoria"""
@@ -0,0 +1,80 @@
+"""
+SISTEMA ERP PRIMOTEX - GET CONDICIONAL NO DESKTOP
+================================================
+
+Substituto de requests.get para listagens e dashboards que a API
+serve com ETag: guarda a última resposta 200 de cada URL (com os
+parâmetros e o token) e reenvia o ETag em If-None-Match. Quando a API
+responde 304 Not Modified, a resposta guardada é devolvida no lugar,
+então o chamador continua tratando só status 200.
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import requests
+
+# Respostas guardadas (as mais antigas saem primeiro)
+MAX_RESPOSTAS = 128
+
+_respostas: "OrderedDict[Tuple, Tuple[str, requests.Response]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _chave(url: str, params: Optional[Dict], headers: Dict) -> Tuple:
+    parametros = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    # O ETag depende do perfil: respostas de outro login não são reaproveitadas
+    return url, parametros, headers.get("Authorization", "")
+
+
+def get_condicional(
+    url: str,
+    headers: Optional[Dict] = None,
+    params: Optional[Dict] = None,
+    timeout: float = 10
+) -> requests.Response:
+    """
+    GET com If-None-Match a partir da última resposta da mesma URL.
+
+    Args:
+        url: URL completa do endpoint
+        headers: Cabeçalhos da requisição (ex.: create_auth_header())
+        params: Parâmetros de consulta
+        timeout: Timeout em segundos
+
+    Returns:
+        Resposta da API, ou a resposta guardada se a API respondeu 304
+    """
+    headers = dict(headers or {})
+    chave = _chave(url, params, headers)
+    with _lock:
+        guardada = _respostas.get(chave)
+    if guardada is not None:
+        headers["If-None-Match"] = guardada[0]
+
+    resposta = requests.get(url, headers=headers, params=params, timeout=timeout)
+
+    if resposta.status_code == 304 and guardada is not None:
+        with _lock:
+            if chave in _respostas:
+                _respostas.move_to_end(chave)
+        return guardada[1]
+
+    etag = resposta.headers.get("ETag")
+    if resposta.status_code == 200 and etag:
+        with _lock:
+            _respostas[chave] = (etag, resposta)
+            _respostas.move_to_end(chave)
+            while len(_respostas) > MAX_RESPOSTAS:
+                _respostas.popitem(last=False)
+    return resposta
+
+
+def limpar_respostas() -> None:
+    """Descartar as respostas guardadas (ex.: no logout)"""
+    with _lock:
+        _respostas.clear()
@@ -5,24 +5,42 @@ SISTEMA DE CACHE AVANÇADO - ERP PRIMOTEX
 
 Sistema de cache em memória para otimização de performance com:
 - Cache TTL (Time To Live) configurável
-- Invalidação automática e manual
+- Invalidação automática (commit das tabelas dependentes) e manual
 - Métricas de hit/miss
 - Compressão de dados grandes
 - Cache hierárquico por módulo
+- LRU O(1) limitado por bytes estimados e índice por namespace
+- Decorador @cached (sync e async) com single-flight e stale-while-revalidate
+- Segundo nível opcional em SQLite compartilhado pelos workers
 
 Autor: GitHub Copilot
 Data: 29/10/2025
 """
 
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import secrets
+import sqlite3
+import stat
+import sys
 import time
 import pickle
 import gzip
 import threading
-from typing import Any, Dict, Optional, Tuple, List
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple, List
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import json
 import hashlib
+import hmac
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -34,15 +52,18 @@ class CacheEntry:
     access_count: int = 0
     last_accessed: float = field(default_factory=time.time)
     compressed: bool = False
+    serialized: bool = True
+    size: int = 0
+    namespace: str = ""
 
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """Verificar se entrada expirou"""
-        return time.time() - self.created_at > self.ttl
+        return (now or time.time()) - self.created_at > self.ttl
 
-    def touch(self):
+    def touch(self, now: Optional[float] = None):
         """Marcar como acessado"""
         self.access_count += 1
-        self.last_accessed = time.time()
+        self.last_accessed = now or time.time()
 
 
 @dataclass
@@ -53,6 +74,7 @@ class CacheStats:
     evictions: int = 0
     entries: int = 0
     memory_usage: int = 0
+    l2_hits: int = 0
 
     @property
     def hit_ratio(self) -> float:
@@ -61,28 +83,352 @@ class CacheStats:
         return self.hits / total if total > 0 else 0.0
 
 
+# Tamanho considerado para objetos que não são contêineres conhecidos
+_TAMANHO_OBJETO = 64
+# Elementos medidos de listas longas (o restante é extrapolado)
+_AMOSTRA = 8
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estimar os bytes ocupados por um valor guardado por referência.
+
+    Percorre listas, tuplas, conjuntos e dicionários (até 4 níveis) e
+    soma sys.getsizeof dos elementos; listas longas são extrapoladas a
+    partir dos primeiros elementos. É uma aproximação barata, não o
+    tamanho exato em memória.
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if _depth >= 4:
+        return _TAMANHO_OBJETO
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        if len(value) > _AMOSTRA:
+            # Listas longas: média de uma amostra dos primeiros elementos
+            amostra = sum(estimate_size(v, _depth + 1) for v in value[:_AMOSTRA])
+            return sys.getsizeof(value) + amostra * len(value) // _AMOSTRA
+        return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    return sys.getsizeof(value, _TAMANHO_OBJETO)
+
+
+# ============================================================================
+# SEGUNDO NÍVEL COMPARTILHADO ENTRE PROCESSOS
+# ============================================================================
+
+# Arquivo do segundo nível (vazio = desativado) e intervalo de leitura
+# das invalidações feitas por outros processos. O arquivo deve ficar em
+# um diretório privado do usuário do serviço (nunca em /tmp).
+CACHE_L2_PATH = os.getenv("CACHE_L2_PATH", "")
+CACHE_L2_SYNC_SEGUNDOS = float(os.getenv("CACHE_L2_SYNC_SEGUNDOS", "1"))
+# Chave HMAC das entradas (vazio = chave gerada em <arquivo>.chave, 0600)
+CACHE_L2_CHAVE = os.getenv("CACHE_L2_CHAVE", "")
+
+_TAMANHO_ASSINATURA = hashlib.sha256().digest_size
+
+
+class SQLiteL2Cache:
+    """
+    Segundo nível do AdvancedCache em um arquivo SQLite compartilhado
+    pelos workers da máquina.
+
+    Guarda os bytes já serializados (pickle/gzip) de cada entrada com a
+    expiração absoluta. Cada invalidação apaga as entradas e é gravada
+    em um log (tabela invalidacoes); os outros processos leem o log a
+    cada sync_interval e removem as mesmas entradas do próprio L1.
+
+    Qualquer erro do SQLite (arquivo ausente, bloqueado, corrompido)
+    desativa o nível por retry_interval segundos: as operações viram
+    no-op e o AdvancedCache segue só com a memória do processo.
+
+    Como os dados voltam por pickle, o arquivo só é aberto em um diretório
+    do próprio usuário sem escrita para grupo/outros, e o arquivo (0600)
+    também precisa ser do usuário; caso contrário o nível fica desativado.
+    Cada entrada ainda leva um HMAC-SHA256 (chave, namespace, expiração e
+    dados) verificado antes de devolver os bytes: entrada sem assinatura
+    válida é apagada e tratada como falta.
+    """
+
+    def __init__(self, path: str = CACHE_L2_PATH,
+                 sync_interval: float = CACHE_L2_SYNC_SEGUNDOS,
+                 retry_interval: float = 5.0,
+                 busy_timeout: float = 0.2,
+                 chave: str = CACHE_L2_CHAVE):
+        self.path = path
+        self._chave = chave.encode() if chave else None
+        self.sync_interval = sync_interval
+        self.retry_interval = retry_interval
+        self.busy_timeout = busy_timeout
+        self._origem = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._indisponivel_ate = 0.0
+        self._ultimo_id: Optional[int] = None
+        self._proxima_limpeza = 0.0
+        self.errors = 0
+        self.rejeitadas = 0
+
+    @property
+    def available(self) -> bool:
+        """False enquanto o nível está desativado por erro"""
+        return time.time() >= self._indisponivel_ate
+
+    def _verificar_dono(self, caminho: str, diretorio: bool) -> None:
+        """Recusar (PermissionError) caminho de outro usuário ou aberto demais"""
+        info = os.lstat(caminho)
+        tipo_ok = stat.S_ISDIR(info.st_mode) if diretorio else stat.S_ISREG(info.st_mode)
+        if not tipo_ok:
+            raise PermissionError(f"{caminho} não é {'diretório' if diretorio else 'arquivo regular'}")
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"{caminho} pertence a outro usuário (uid {info.st_uid})")
+        if diretorio and info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise PermissionError(f"{caminho} tem escrita para grupo/outros")
+        if not diretorio and info.st_mode & 0o077:
+            os.chmod(caminho, 0o600)
+
+    def _criar_privado(self, caminho: str, conteudo: bytes = b"") -> None:
+        """Criar o arquivo com 0600 se ainda não existir (sem seguir symlink)"""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0)
+        try:
+            fd = os.open(caminho, flags, 0o600)
+        except FileExistsError:
+            return
+        with os.fdopen(fd, "wb") as arquivo:
+            arquivo.write(conteudo)
+
+    def _preparar_arquivo(self) -> None:
+        """Conferir diretório e arquivo antes de abrir (POSIX) e carregar a chave"""
+        if hasattr(os, "getuid"):
+            self._verificar_dono(os.path.dirname(os.path.abspath(self.path)), diretorio=True)
+            self._criar_privado(self.path)
+            self._verificar_dono(self.path, diretorio=False)
+        if self._chave is None:
+            arquivo_chave = f"{self.path}.chave"
+            # Escrito inteiro antes de aparecer com o nome final: outro
+            # worker nunca lê uma chave pela metade
+            temporario = f"{arquivo_chave}.{self._origem}"
+            self._criar_privado(temporario, secrets.token_bytes(32))
+            try:
+                os.link(temporario, arquivo_chave)
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(temporario)
+            if hasattr(os, "getuid"):
+                self._verificar_dono(arquivo_chave, diretorio=False)
+            with open(arquivo_chave, "rb") as arquivo:
+                chave = arquivo.read()
+            if len(chave) < 32:
+                raise PermissionError(f"{arquivo_chave} não contém uma chave válida")
+            self._chave = chave
+
+    def _assinar(self, cache_key: str, namespace: str, data: bytes,
+                 compressed: bool, expires_at: float) -> bytes:
+        cabecalho = f"{cache_key}\0{namespace}\0{int(compressed)}\0{expires_at!r}\0".encode()
+        return hmac.new(self._chave, cabecalho + data, hashlib.sha256).digest()
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._preparar_arquivo()
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entradas ("
+                    "chave TEXT PRIMARY KEY, namespace TEXT NOT NULL, dados BLOB NOT NULL, "
+                    "comprimido INTEGER NOT NULL, expira REAL NOT NULL) WITHOUT ROWID"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS ix_entradas_namespace ON entradas (namespace)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS invalidacoes ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, origem TEXT NOT NULL, "
+                    "namespace TEXT NOT NULL, chave TEXT, momento REAL NOT NULL)"
+                )
+                maximo = conn.execute("SELECT coalesce(max(id), 0) FROM invalidacoes").fetchone()[0]
+            except sqlite3.Error:
+                conn.close()
+                raise
+            # Na primeira conexão o L1 está vazio: só interessam invalidações
+            # novas. Se o arquivo foi recriado, o log recomeça do zero.
+            if self._ultimo_id is None or self._ultimo_id > maximo:
+                self._ultimo_id = maximo
+            self._conn = conn
+        return self._conn
+
+    def _executar(self, operacao, padrao=None):
+        """Executar operacao(conn) sob o lock, desativando o nível em caso de erro"""
+        if not self.available:
+            return padrao
+        with self._lock:
+            try:
+                return operacao(self._conectar())
+            except (sqlite3.Error, OSError) as e:
+                self.errors += 1
+                self._indisponivel_ate = time.time() + self.retry_interval
+                logger.warning(f"Cache L2 indisponível por {self.retry_interval:.0f}s ({self.path}): {e}")
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except sqlite3.Error:
+                        pass
+                    self._conn = None
+                return padrao
+
+    def get(self, cache_key: str) -> Optional[Tuple[bytes, bool, float]]:
+        """(dados, comprimido, expira) da entrada válida, ou None"""
+        def operacao(conn):
+            linha = conn.execute(
+                "SELECT namespace, dados, comprimido, expira FROM entradas WHERE chave = ? AND expira > ?",
+                (cache_key, time.time())
+            ).fetchone()
+            if linha is None:
+                return None
+            namespace, dados, comprimido, expira = linha[0], bytes(linha[1]), bool(linha[2]), linha[3]
+            assinatura, dados = dados[:_TAMANHO_ASSINATURA], dados[_TAMANHO_ASSINATURA:]
+            if not hmac.compare_digest(assinatura, self._assinar(cache_key, namespace, dados, comprimido, expira)):
+                # Nunca chega ao pickle.loads
+                self.rejeitadas += 1
+                logger.warning(f"Cache L2: entrada com assinatura inválida descartada ({self.path})")
+                conn.execute("DELETE FROM entradas WHERE chave = ?", (cache_key,))
+                return None
+            return dados, comprimido, expira
+        return self._executar(operacao)
+
+    def set(self, cache_key: str, namespace: str, data: bytes, compressed: bool, expires_at: float):
+        """Gravar (ou substituir) a entrada, assinada"""
+        self._executar(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO entradas (chave, namespace, dados, comprimido, expira) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (cache_key, namespace,
+             self._assinar(cache_key, namespace, data, compressed, expires_at) + data,
+             int(compressed), expires_at)
+        ))
+
+    def invalidate(self, targets: List[Tuple[str, Optional[str]]]):
+        """
+        Apagar as entradas e registrar a invalidação para os outros processos.
+
+        Args:
+            targets: (namespace, chave completa) ou (namespace, None) para
+                o namespace inteiro
+        """
+        if not targets:
+            return
+
+        def operacao(conn):
+            agora = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for namespace, cache_key in targets:
+                    if cache_key is None:
+                        conn.execute("DELETE FROM entradas WHERE namespace = ?", (namespace,))
+                    else:
+                        conn.execute("DELETE FROM entradas WHERE chave = ?", (cache_key,))
+                conn.executemany(
+                    "INSERT INTO invalidacoes (origem, namespace, chave, momento) VALUES (?, ?, ?, ?)",
+                    [(self._origem, namespace, cache_key, agora) for namespace, cache_key in targets]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._executar(operacao)
+
+    def poll_invalidations(self) -> List[Tuple[str, Optional[str]]]:
+        """Invalidações feitas por outros processos desde a última leitura"""
+        def operacao(conn):
+            linhas = conn.execute(
+                "SELECT id, origem, namespace, chave FROM invalidacoes WHERE id > ? ORDER BY id",
+                (self._ultimo_id,)
+            ).fetchall()
+            if linhas:
+                self._ultimo_id = linhas[-1][0]
+            agora = time.time()
+            if agora >= self._proxima_limpeza:
+                # Entradas expiradas e log antigo (nenhum processo fica
+                # mais de alguns sync_interval sem ler)
+                conn.execute("DELETE FROM entradas WHERE expira <= ?", (agora,))
+                conn.execute("DELETE FROM invalidacoes WHERE momento < ?", (agora - 600,))
+                self._proxima_limpeza = agora + 60
+            return [(ns, chave) for _id, origem, ns, chave in linhas if origem != self._origem]
+        return self._executar(operacao, padrao=[])
+
+    def clear(self):
+        """Apagar todas as entradas (registrado como invalidação de cada namespace)"""
+        namespaces = self._executar(
+            lambda conn: [linha[0] for linha in conn.execute("SELECT DISTINCT namespace FROM entradas")],
+            padrao=[]
+        )
+        self.invalidate([(namespace, None) for namespace in namespaces])
+
+    def close(self):
+        """Fechar a conexão"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 class AdvancedCache:
     """
     Sistema de cache avançado com TTL, compressão e métricas
+
+    As entradas ficam em um OrderedDict na ordem de uso: get, set e a
+    remoção da menos usada são O(1). Um índice namespace -> chaves
+    permite invalidar um namespace sem percorrer o cache inteiro.
+
+    O limite é o total estimado de bytes (max_bytes); max_size, se
+    informado, limita também a quantidade de entradas.
+
+    Por padrão os valores são serializados com pickle (e comprimidos
+    acima de compression_threshold), então quem lê recebe uma cópia.
+    Com serialize=False (no construtor ou no set) o valor é guardado
+    por referência e devolvido sem cópia: use só para valores que
+    ninguém altera depois de guardados.
+
+    Com l2 (SQLiteL2Cache), uma falta no L1 consulta o arquivo
+    compartilhado pelos workers antes de devolver None, os sets são
+    gravados nos dois níveis e as invalidações chegam aos outros
+    processos em até l2.sync_interval segundos.
     """
 
     def __init__(self, 
-                 max_size: int = 1000,
+                 max_size: Optional[int] = None,
                  default_ttl: float = 300,  # 5 minutos
                  cleanup_interval: float = 60,  # 1 minuto
-                 compression_threshold: int = 1024):  # 1KB
+                 compression_threshold: int = 1024,  # 1KB
+                 max_bytes: int = 64 * 1024 * 1024,  # 64MB
+                 serialize: bool = True,
+                 l2: Optional[SQLiteL2Cache] = None):
 
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.default_ttl = default_ttl
         self.compression_threshold = compression_threshold
-
-        self._cache: Dict[str, CacheEntry] = {}
+        self.serialize = serialize
+        self.l2 = l2
+        self._proxima_sync_l2 = 0.0
+
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._namespaces: Dict[str, Set[str]] = {}
+        # tabela -> (namespace, chave ou None para o namespace inteiro)
+        self._dependencias: Dict[str, Set[Tuple[str, Optional[str]]]] = {}
         self._lock = threading.RLock()
         self._stats = CacheStats()
+        _caches.add(self)
 
         # Thread de limpeza automática
         self._cleanup_timer = None
-        self._start_cleanup_timer(cleanup_interval)
+        if cleanup_interval:
+            self._start_cleanup_timer(cleanup_interval)
 
     def _start_cleanup_timer(self, interval: float):
         """Iniciar timer de limpeza automática"""
@@ -99,17 +445,17 @@ class AdvancedCache:
         base_key = f"{namespace}:{key}"
         if params:
             # Criar hash dos parâmetros para chave única
-            params_str = json.dumps(params, sort_keys=True)
+            params_str = json.dumps(params, sort_keys=True, default=str)
             params_hash = hashlib.md5(params_str.encode()).hexdigest()[:8]
             base_key += f":{params_hash}"
         return base_key
 
     def _compress_data(self, data: Any) -> Tuple[bytes, bool]:
         """Comprimir dados se necessário"""
-        serialized = pickle.dumps(data)
+        serialized = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
 
         if len(serialized) > self.compression_threshold:
-            compressed = gzip.compress(serialized)
+            compressed = gzip.compress(serialized, compresslevel=1)
             return compressed, True
 
         return serialized, False
@@ -125,91 +471,214 @@ class AdvancedCache:
     def get(self, namespace: str, key: str, params: Dict = None) -> Optional[Any]:
         """Obter valor do cache"""
         cache_key = self._generate_key(namespace, key, params)
+        now = time.time()
+        if self.l2 is not None:
+            self._sync_l2(now)
 
         with self._lock:
             entry = self._cache.get(cache_key)
 
-            if entry is None:
-                self._stats.misses += 1
-                return None
-
-            if entry.is_expired():
-                del self._cache[cache_key]
-                self._stats.misses += 1
+            if entry is not None and entry.is_expired(now):
+                self._remove(cache_key)
                 self._stats.evictions += 1
+                entry = None
+
+            if entry is not None:
+                # Cache hit
+                self._cache.move_to_end(cache_key)
+                entry.touch(now)
+                self._stats.hits += 1
+
+        if entry is None:
+            entry = self._get_l2(namespace, cache_key, now)
+            if entry is None:
+                with self._lock:
+                    self._stats.misses += 1
                 return None
 
-            # Cache hit
-            entry.touch()
+        if not entry.serialized:
+            return entry.data
+        return self._decompress_data(entry.data, entry.compressed)
+
+    def _get_l2(self, namespace: str, cache_key: str, now: float) -> Optional[CacheEntry]:
+        """Buscar no L2 e promover para o L1"""
+        if self.l2 is None:
+            return None
+        linha = self.l2.get(cache_key)
+        if linha is None:
+            return None
+        data, compressed, expires_at = linha
+        entry = CacheEntry(data=data, created_at=now, ttl=expires_at - now, last_accessed=now,
+                           compressed=compressed, size=len(data), namespace=namespace)
+        with self._lock:
+            self._store(cache_key, entry)
             self._stats.hits += 1
+            self._stats.l2_hits += 1
+        return entry
 
-            return self._decompress_data(entry.data, entry.compressed)
+    def _sync_l2(self, now: float):
+        """Aplicar no L1 as invalidações feitas por outros processos"""
+        if now < self._proxima_sync_l2:
+            return
+        self._proxima_sync_l2 = now + self.l2.sync_interval
+        alvos = self.l2.poll_invalidations()
+        if alvos:
+            with self._lock:
+                self._invalidate_local(alvos)
 
     def set(self, namespace: str, key: str, value: Any, 
-            ttl: Optional[float] = None, params: Dict = None):
-        """Armazenar valor no cache"""
+            ttl: Optional[float] = None, params: Dict = None,
+            serialize: Optional[bool] = None):
+        """
+        Armazenar valor no cache
+
+        Args:
+            serialize: False guarda o valor por referência (sem cópia);
+                None usa o padrão do cache
+        """
         cache_key = self._generate_key(namespace, key, params)
         ttl = ttl or self.default_ttl
+        serialize = self.serialize if serialize is None else serialize
+
+        if serialize:
+            # Comprimir se necessário
+            data, is_compressed = self._compress_data(value)
+            size = len(data)
+        else:
+            data, is_compressed = value, False
+            size = estimate_size(value)
+
+        if self.max_bytes and size > self.max_bytes:
+            # Não cabe nem sozinho: não guardar (e não esvaziar o cache)
+            self.invalidate(namespace, key, params)
+            return
 
-        # Comprimir se necessário
-        compressed_data, is_compressed = self._compress_data(value)
-
+        now = time.time()
         entry = CacheEntry(
-            data=compressed_data,
-            created_at=time.time(),
+            data=data,
+            created_at=now,
             ttl=ttl,
-            compressed=is_compressed
+            last_accessed=now,
+            compressed=is_compressed,
+            serialized=serialize,
+            size=size,
+            namespace=namespace
         )
 
         with self._lock:
-            # Remover entrada antiga se existir
-            if cache_key in self._cache:
-                del self._cache[cache_key]
-
-            # Verificar limite de tamanho
-            if len(self._cache) >= self.max_size:
-                self._evict_lru()
-
-            self._cache[cache_key] = entry
-            self._stats.entries = len(self._cache)
+            self._store(cache_key, entry)
+
+        if self.l2 is not None:
+            if not serialize:
+                try:
+                    data, is_compressed = self._compress_data(value)
+                except Exception:
+                    return  # valor sem pickle fica só no L1
+            self.l2.set(cache_key, namespace, data, is_compressed, now + ttl)
+
+    def _store(self, cache_key: str, entry: CacheEntry):
+        """Inserir no L1 respeitando os limites (com o lock adquirido)"""
+        # Remover entrada antiga se existir
+        self._remove(cache_key)
+
+        # Verificar limites de bytes e de entradas
+        while self._cache and (
+            (self.max_bytes and self._stats.memory_usage + entry.size > self.max_bytes)
+            or (self.max_size and len(self._cache) >= self.max_size)
+        ):
+            self._evict_lru()
+
+        self._cache[cache_key] = entry
+        self._namespaces.setdefault(entry.namespace, set()).add(cache_key)
+        self._stats.memory_usage += entry.size
+        self._stats.entries = len(self._cache)
+
+    def _remove(self, cache_key: str) -> bool:
+        """Remover uma entrada e atualizar o índice (com o lock adquirido)"""
+        entry = self._cache.pop(cache_key, None)
+        if entry is None:
+            return False
+        chaves = self._namespaces.get(entry.namespace)
+        if chaves is not None:
+            chaves.discard(cache_key)
+            if not chaves:
+                del self._namespaces[entry.namespace]
+        self._stats.memory_usage -= entry.size
+        self._stats.entries = len(self._cache)
+        return True
 
     def _evict_lru(self):
         """Remover entrada menos recentemente usada"""
         if not self._cache:
             return
 
-        # Encontrar entrada mais antiga
-        oldest_key = min(self._cache.keys(), 
-                        key=lambda k: self._cache[k].last_accessed)
-
-        del self._cache[oldest_key]
+        # A primeira entrada do OrderedDict é a usada há mais tempo
+        oldest_key = next(iter(self._cache))
+        self._remove(oldest_key)
         self._stats.evictions += 1
 
     def invalidate(self, namespace: str, key: str = None, params: Dict = None):
         """Invalidar cache"""
+        # Chave específica ou todo o namespace
+        alvos = [(namespace, self._generate_key(namespace, key, params) if key else None)]
+        with self._lock:
+            self._invalidate_local(alvos)
+        if self.l2 is not None:
+            self.l2.invalidate(alvos)
+
+    def _invalidate_local(self, alvos) -> int:
+        """Remover do L1 as chaves ou namespaces (com o lock adquirido)"""
+        removidas = 0
+        for namespace, cache_key in alvos:
+            if cache_key is not None:
+                removidas += self._remove(cache_key)
+                continue
+            # Todo o namespace pelo índice
+            for key_to_remove in list(self._namespaces.get(namespace, ())):
+                removidas += self._remove(key_to_remove)
+        return removidas
+
+    def add_dependency(self, namespace: str, tables, key: str = None, params: Dict = None):
+        """
+        Registrar que o namespace (ou só uma chave dele) depende das tabelas.
+
+        Um commit que escreve em uma dessas tabelas chama
+        invalidate_tables() e remove as entradas dependentes.
+        """
+        alvo = (namespace, self._generate_key(namespace, key, params) if key else None)
         with self._lock:
-            if key:
-                # Invalidar chave específica
-                cache_key = self._generate_key(namespace, key, params)
-                if cache_key in self._cache:
-                    del self._cache[cache_key]
-            else:
-                # Invalidar todo o namespace
-                keys_to_remove = [k for k in self._cache.keys() 
-                                if k.startswith(f"{namespace}:")]
-
-                for key_to_remove in keys_to_remove:
-                    del self._cache[key_to_remove]
+            for tabela in tables:
+                self._dependencias.setdefault(tabela, set()).add(alvo)
 
-            self._stats.entries = len(self._cache)
+    def invalidate_tables(self, tables) -> int:
+        """
+        Invalidar as entradas que dependem das tabelas alteradas.
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        with self._lock:
+            alvos = set()
+            for tabela in tables:
+                alvos.update(self._dependencias.get(tabela, ()))
+            removidas = self._invalidate_local(alvos)
+        if self.l2 is not None and alvos:
+            self.l2.invalidate(sorted(alvos, key=str))
+        return removidas
+
+    def namespaces(self) -> List[str]:
+        """Namespaces com ao menos uma entrada"""
+        with self._lock:
+            return list(self._namespaces)
 
     def cleanup_expired(self):
         """Limpar entradas expiradas"""
+        now = time.time()
         with self._lock:
-            expired_keys = [k for k, v in self._cache.items() if v.is_expired()]
+            expired_keys = [k for k, v in self._cache.items() if v.is_expired(now)]
 
             for key in expired_keys:
-                del self._cache[key]
+                self._remove(key)
                 self._stats.evictions += 1
 
             self._stats.entries = len(self._cache)
@@ -224,32 +693,85 @@ class AdvancedCache:
                 'entries': self._stats.entries,
                 'evictions': self._stats.evictions,
                 'max_size': self.max_size,
-                'memory_usage_mb': self._estimate_memory_usage() / (1024 * 1024)
+                'max_bytes': self.max_bytes,
+                'memory_usage_mb': self._estimate_memory_usage() / (1024 * 1024),
+                'l2_hits': self._stats.l2_hits,
+                'l2_available': self.l2.available if self.l2 is not None else None
             }
 
     def _estimate_memory_usage(self) -> int:
-        """Estimar uso de memória (aproximado)"""
-        total_size = 0
-        for entry in self._cache.values():
-            total_size += len(entry.data) if isinstance(entry.data, bytes) else 1024
-        return total_size
+        """Estimar uso de memória (aproximado, mantido a cada set/remoção)"""
+        return self._stats.memory_usage
 
     def clear(self):
         """Limpar todo o cache"""
         with self._lock:
             self._cache.clear()
+            self._namespaces.clear()
             self._stats = CacheStats()
+        if self.l2 is not None:
+            self.l2.clear()
 
     def shutdown(self):
         """Parar timer de limpeza"""
         if self._cleanup_timer:
             self._cleanup_timer.cancel()
+        if self.l2 is not None:
+            self.l2.close()
+
+
+# Caches do processo, para a invalidação por tabelas alteradas
+_caches: "weakref.WeakSet[AdvancedCache]" = weakref.WeakSet()
+
+
+def invalidate_tables(tables) -> int:
+    """
+    Invalidar, em todos os AdvancedCache do processo, as entradas que
+    dependem das tabelas (chamado no commit, ver
+    backend.database.invalidacao_cache).
+
+    Returns:
+        Quantidade de entradas removidas
+    """
+    tables = list(tables)
+    return sum(cache.invalidate_tables(tables) for cache in list(_caches))
 
 
 # ============================================================================
 # CACHE ESPECÍFICO PARA MÓDULOS DO ERP
 # ============================================================================
 
+# Tabelas lidas por cada namespace do ERPCache. As métricas do dashboard
+# (chave metrics_<modulo>) dependem das tabelas do módulo; relatórios
+# dependem de todas.
+TABELAS_POR_MODULO = {
+    'clientes': ('clientes',),
+    'produtos': ('produtos',),
+    'estoque': ('produtos',),
+    'ordem_servico': ('ordens_servico', 'fases_os', 'visitas_tecnicas', 'orcamentos'),
+    'agendamento': ('agendamentos', 'bloqueios_agenda', 'configuracoes_agenda',
+                    'disponibilidade_usuarios'),
+    'financeiro': ('contas_receber', 'contas_pagar', 'movimentacoes_financeiras',
+                   'fluxo_caixa', 'categorias_financeiras'),
+    'comunicacao': ('comunicacao_templates', 'comunicacao_historico', 'comunicacao_config',
+                    'comunicacao_fila', 'comunicacao_estatisticas'),
+    'colaboradores': ('colaboradores', 'departamentos', 'cargos'),
+    'fornecedores': ('fornecedores',),
+}
+
+# Nome do módulo nas chaves metrics_<modulo> do dashboard
+MODULOS_DASHBOARD = {
+    'clientes': 'clientes',
+    'produtos': 'produtos',
+    'estoque': 'estoque',
+    'os': 'ordem_servico',
+    'ordem_servico': 'ordem_servico',
+    'agendamento': 'agendamento',
+    'financeiro': 'financeiro',
+    'comunicacao': 'comunicacao',
+    'colaboradores': 'colaboradores',
+}
+
 class ERPCache:
     """Cache específico para módulos do ERP Primotex"""
 
@@ -259,10 +781,16 @@ class ERPCache:
             max_size=2000,
             default_ttl=600,  # 10 minutos para dados de ERP
             cleanup_interval=120,  # Limpeza a cada 2 minutos
-            compression_threshold=2048  # 2KB para dados maiores
+            compression_threshold=2048,  # 2KB para dados maiores
+            max_bytes=128 * 1024 * 1024,  # 128MB estimados
+            # Compartilhado pelos workers quando CACHE_L2_PATH é definido
+            l2=SQLiteL2Cache(CACHE_L2_PATH) if CACHE_L2_PATH else None
         )
 
-        # TTLs específicos por tipo de dado
+        # TTLs específicos por tipo de dado. No processo da API os commits
+        # invalidam as entradas dependentes (TABELAS_POR_MODULO); o TTL
+        # continua sendo o único limite em processos sem engine (ex.: o
+        # desktop) e para escritas feitas direto no banco.
         self.ttl_config = {
             'clientes': 900,      # 15 min - dados que mudam pouco
             'produtos': 900,      # 15 min
@@ -271,10 +799,20 @@ class ERPCache:
             'agendamento': 180,   # 3 min
             'financeiro': 120,    # 2 min - dados críticos
             'comunicacao': 300,   # 5 min
+            'colaboradores': 900,   # 15 min
+            'fornecedores': 900,    # 15 min
             'dashboard': 60,      # 1 min - métricas em tempo real
             'relatorios': 1800,   # 30 min - relatórios demoram para mudar
         }
 
+        todas = set()
+        for modulo, tabelas in TABELAS_POR_MODULO.items():
+            self.cache.add_dependency(modulo, tabelas)
+            todas.update(tabelas)
+        for nome, modulo in MODULOS_DASHBOARD.items():
+            self.cache.add_dependency('dashboard', TABELAS_POR_MODULO[modulo], key=f'metrics_{nome}')
+        self.cache.add_dependency('relatorios', todas)
+
     # Métodos específicos para cada módulo
     def get_clientes(self, filtros: Dict = None) -> Optional[List]:
         """Cache de clientes"""
@@ -307,6 +845,10 @@ class ERPCache:
         """Invalidar cache de um módulo específico"""
         self.cache.invalidate(modulo)
 
+    def invalidate_tables(self, tables) -> int:
+        """Invalidar as entradas que dependem das tabelas alteradas"""
+        return self.cache.invalidate_tables(tables)
+
     def get_cache_health(self) -> Dict[str, Any]:
         """Verificar saúde do cache"""
         stats = self.cache.get_stats()
@@ -315,7 +857,7 @@ class ERPCache:
         health = {
             **stats,
             'status': 'healthy' if stats['hit_ratio'] > 70 else 'degraded',
-            'modules_cached': len(set(k.split(':')[0] for k in self.cache._cache.keys())),
+            'modules_cached': len(self.cache.namespaces()),
             'ttl_config': self.ttl_config
         }
 
@@ -330,36 +872,179 @@ erp_cache = ERPCache()
 # DECORADOR PARA CACHE AUTOMÁTICO
 # ============================================================================
 
+class _Voo:
+    """Cálculo em andamento de uma chave (single-flight síncrono)"""
+
+    __slots__ = ("evento", "resultado", "erro")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro: Optional[BaseException] = None
+
+
+def _chave_chamada(func, assinatura: Optional[inspect.Signature], args, kwargs) -> str:
+    """Chave da chamada: nome qualificado + hash de todos os argumentos"""
+    if assinatura is not None:
+        try:
+            vinculados = assinatura.bind(*args, **kwargs)
+            vinculados.apply_defaults()
+            args, kwargs = (), vinculados.arguments
+        except TypeError:
+            pass  # a própria chamada vai falhar com a mensagem correta
+    texto = json.dumps([list(args), kwargs], sort_keys=True, default=repr)
+    return f"{func.__module__}.{func.__qualname__}:{hashlib.md5(texto.encode()).hexdigest()}"
+
+
 def cached(namespace: str, ttl: Optional[float] = None, 
-          key_func: Optional[callable] = None):
+          key_func: Optional[callable] = None,
+          stale_ttl: float = 0,
+          cache: Optional[AdvancedCache] = None,
+          tables: Tuple[str, ...] = ()):
     """
-    Decorador para cache automático de funções
+    Decorador para cache automático de funções (síncronas ou async)
+
+    A chave inclui todos os argumentos (posicionais e nomeados, com os
+    valores padrão aplicados). Chamadas concorrentes com a mesma chave
+    e sem valor no cache esperam um único cálculo (single-flight); se
+    ele falhar, a exceção é repassada a todas e nada é guardado.
+
+    Com stale_ttl > 0, depois do ttl o valor antigo continua sendo
+    devolvido por mais stale_ttl segundos enquanto um único recálculo
+    roda em segundo plano (stale-while-revalidate).
 
     Args:
         namespace: Namespace do cache
         ttl: Time to live específico
         key_func: Função para gerar chave personalizada
+        stale_ttl: Segundos em que o valor expirado ainda é servido
+        cache: AdvancedCache usado (padrão: erp_cache.cache)
+        tables: Tabelas lidas pela função; um commit que escreve em
+            alguma delas invalida o namespace
     """
     def decorator(func):
-        def wrapper(*args, **kwargs):
-            # Gerar chave do cache
+        alvo = cache if cache is not None else erp_cache.cache
+        validade = ttl or alvo.default_ttl
+        if tables:
+            alvo.add_dependency(namespace, tables)
+        try:
+            assinatura = inspect.signature(func)
+        except (TypeError, ValueError):
+            assinatura = None
+
+        def gerar_chave(args, kwargs) -> str:
             if key_func:
-                cache_key = key_func(*args, **kwargs)
-            else:
-                cache_key = func.__name__
-
-            # Tentar obter do cache
-            result = erp_cache.cache.get(namespace, cache_key, kwargs)
-
-            if result is not None:
-                return result
-
-            # Executar função e armazenar resultado
-            result = func(*args, **kwargs)
-            erp_cache.cache.set(namespace, cache_key, result, ttl, kwargs)
-
-            return result
-
+                return str(key_func(*args, **kwargs))
+            return _chave_chamada(func, assinatura, args, kwargs)
+
+        def ler(chave: str):
+            """(encontrado, fresco, valor)"""
+            guardado = alvo.get(namespace, chave)
+            if guardado is None:
+                return False, False, None
+            fresco_ate, valor = guardado
+            return True, time.time() < fresco_ate, valor
+
+        def guardar(chave: str, valor: Any):
+            alvo.set(namespace, chave, (time.time() + validade, valor), validade + stale_ttl)
+
+        if asyncio.iscoroutinefunction(func):
+            em_voo: Dict[str, "asyncio.Future"] = {}
+            tarefas: Set["asyncio.Task"] = set()
+
+            async def calcular(chave, args, kwargs):
+                futuro = em_voo.get(chave)
+                if futuro is not None:
+                    return await asyncio.shield(futuro)
+                futuro = asyncio.get_running_loop().create_future()
+                em_voo[chave] = futuro
+                try:
+                    valor = await func(*args, **kwargs)
+                    guardar(chave, valor)
+                    futuro.set_result(valor)
+                    return valor
+                except asyncio.CancelledError:
+                    futuro.cancel()
+                    raise
+                except BaseException as e:
+                    futuro.set_exception(e)
+                    futuro.exception()  # evita o aviso de exceção não lida
+                    raise
+                finally:
+                    del em_voo[chave]
+
+            async def revalidar_async(chave, args, kwargs):
+                try:
+                    await calcular(chave, args, kwargs)
+                except Exception as e:
+                    logger.warning(f"Falha ao recalcular {namespace}:{chave}: {e}")
+
+            @functools.wraps(func)
+            async def wrapper_async(*args, **kwargs):
+                chave = gerar_chave(args, kwargs)
+                encontrado, fresco, valor = ler(chave)
+                if fresco:
+                    return valor
+                if encontrado:
+                    if chave not in em_voo:
+                        # Referência forte até o fim (o loop só guarda referência fraca)
+                        tarefa = asyncio.get_running_loop().create_task(revalidar_async(chave, args, kwargs))
+                        tarefas.add(tarefa)
+                        tarefa.add_done_callback(tarefas.discard)
+                    return valor
+                return await calcular(chave, args, kwargs)
+
+            wrapper_async.cache_namespace = namespace
+            return wrapper_async
+
+        em_voo_sync: Dict[str, _Voo] = {}
+        lock = threading.Lock()
+
+        def calcular_sync(chave, args, kwargs):
+            with lock:
+                voo = em_voo_sync.get(chave)
+                lider = voo is None
+                if lider:
+                    voo = em_voo_sync[chave] = _Voo()
+            if not lider:
+                voo.evento.wait()
+                if voo.erro is not None:
+                    raise voo.erro
+                return voo.resultado
+            try:
+                voo.resultado = func(*args, **kwargs)
+                guardar(chave, voo.resultado)
+                return voo.resultado
+            except BaseException as e:
+                voo.erro = e
+                raise
+            finally:
+                with lock:
+                    del em_voo_sync[chave]
+                voo.evento.set()
+
+        def revalidar(chave, args, kwargs):
+            try:
+                calcular_sync(chave, args, kwargs)
+            except Exception as e:
+                logger.warning(f"Falha ao recalcular {namespace}:{chave}: {e}")
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            chave = gerar_chave(args, kwargs)
+            encontrado, fresco, valor = ler(chave)
+            if fresco:
+                return valor
+            if encontrado:
+                if chave not in em_voo_sync:
+                    threading.Thread(
+                        target=revalidar, args=(chave, args, kwargs),
+                        name=f"cache-{namespace}", daemon=True
+                    ).start()
+                return valor
+            return calcular_sync(chave, args, kwargs)
+
+        wrapper.cache_namespace = namespace
         return wrapper
     return decorator
 
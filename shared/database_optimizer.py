@@ -5,27 +5,43 @@ OTIMIZADOR DE QUERIES - ERP PRIMOTEX
 
 Sistema de otimização de consultas ao banco de dados com:
 - Pool de conexões otimizado
-- Cache de queries frequentes
+- Cache de queries frequentes (limitado, com invalidação por tabela)
 - Análise de performance
 - Batch operations
 - Índices automáticos
 
+O cache de resultados registra as tabelas lidas por cada consulta (a
+partir das instruções realmente executadas) e descarta exatamente as
+entradas dessas tabelas quando um commit em qualquer Engine do processo
+escreve nelas (ORM, Core ou SQL textual). As escritas vêm do rastreador
+único do Engine (backend.database.escritas) e a invalidação acontece
+depois do COMMIT do DBAPI.
+
 Autor: GitHub Copilot
 Data: 29/10/2025
 """
 
+import functools
+import re
 import time
 import threading
-from typing import Any, Dict, List, Optional, Tuple, Union
+import weakref
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import hashlib
 import json
 from sqlalchemy import create_engine, text, event
+from sqlalchemy.engine import Engine, Row
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 import logging
 
+from backend.database import escritas
+from shared.cache_system import estimate_size
+
 
 @dataclass
 class QueryStats:
@@ -49,33 +65,240 @@ class QueryStats:
         self.last_executed = time.time()
 
 
-class DatabaseOptimizer:
+# ============================================================================
+# CACHE DE RESULTADOS COM DEPENDÊNCIA DE TABELAS
+# ============================================================================
+
+_RE_LEITURA = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+
+# Tabelas lidas pelas instruções executadas no contexto atual (None = não coletar)
+_leituras: ContextVar[Optional[Set[str]]] = ContextVar("database_optimizer_leituras", default=None)
+
+
+def tables_read(sql: str) -> Set[str]:
+    """Tabelas citadas em FROM/JOIN de uma instrução SQL"""
+    return {nome.lower() for nome in _RE_LEITURA.findall(sql)}
+
+
+# Tabela alterada por um INSERT/UPDATE/DELETE, ou None
+table_written = escritas.tabela_escrita
+
+
+def _tamanho_resultado(resultado: Any) -> int:
+    """Estimativa em bytes de um resultado (lista de Row vira lista de tuplas)"""
+    if isinstance(resultado, list) and resultado and isinstance(resultado[0], Row):
+        amostra = [tuple(linha) for linha in resultado[:8]]
+        return estimate_size(amostra) * len(resultado) // len(amostra)
+    return estimate_size(resultado)
+
+
+class QueryResultCache:
     """
-    Otimizador de banco de dados com análise de performance
+    Cache LRU de resultados de consultas, thread-safe e limitado por
+    quantidade de entradas e bytes estimados.
+
+    Cada entrada guarda as tabelas que a consulta leu; invalidate_tables()
+    remove exatamente as entradas dessas tabelas. Um resultado calculado
+    enquanto uma das tabelas era alterada não é guardado (contador de
+    invalidação por tabela comparado com o do início do cálculo).
     """
 
-    def __init__(self, database_url: str, pool_size: int = 20, max_overflow: int = 30):
-        # Engine otimizada com pool de conexões
-        self.engine = create_engine(
-            database_url,
-            poolclass=QueuePool,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-            pool_pre_ping=True,  # Verificar conexões antes de usar
-            pool_recycle=3600,   # Reciclar conexões a cada hora
-            echo=False,          # Não logar SQL em produção
-            connect_args={
-                "check_same_thread": False,
-                "timeout": 30
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024,
+                 default_ttl: float = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # chave -> (resultado, expira_em, tabelas, bytes)
+        self._entradas: "OrderedDict[str, Tuple[Any, float, frozenset, int]]" = OrderedDict()
+        self._por_tabela: Dict[str, Set[str]] = {}
+        self._invalidada_em: Dict[str, int] = {}
+        self._contador = 0
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        _caches_resultado.add(self)
+
+    def snapshot(self) -> int:
+        """Marca do início de um cálculo (ver put)"""
+        with self._lock:
+            return self._contador
+
+    def get(self, chave: str) -> Tuple[bool, Any]:
+        """(encontrado, resultado)"""
+        agora = time.time()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[1] <= agora:
+                if entrada is not None:
+                    self._remover(chave)
+                self.misses += 1
+                return False, None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return True, entrada[0]
+
+    def put(self, chave: str, resultado: Any, tabelas: Iterable[str],
+            ttl: Optional[float] = None, desde: Optional[int] = None) -> bool:
+        """
+        Guardar o resultado dependente das tabelas.
+
+        Args:
+            desde: snapshot() tirado antes de executar a consulta; se
+                alguma tabela foi invalidada depois dele, nada é guardado
+
+        Returns:
+            True se o resultado foi guardado
+        """
+        tabelas = frozenset(tabelas)
+        tamanho = _tamanho_resultado(resultado)
+        if self.max_bytes and tamanho > self.max_bytes:
+            return False
+        expira_em = time.time() + (ttl or self.default_ttl)
+        with self._lock:
+            if desde is not None and any(self._invalidada_em.get(t, 0) > desde for t in tabelas):
+                return False
+            self._remover(chave)
+            while self._entradas and (
+                len(self._entradas) >= self.max_entries
+                or (self.max_bytes and self._bytes + tamanho > self.max_bytes)
+            ):
+                self._remover(next(iter(self._entradas)))
+            self._entradas[chave] = (resultado, expira_em, tabelas, tamanho)
+            self._bytes += tamanho
+            for tabela in tabelas:
+                self._por_tabela.setdefault(tabela, set()).add(chave)
+        return True
+
+    def _remover(self, chave: str) -> None:
+        entrada = self._entradas.pop(chave, None)
+        if entrada is None:
+            return
+        self._bytes -= entrada[3]
+        for tabela in entrada[2]:
+            chaves = self._por_tabela.get(tabela)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._por_tabela[tabela]
+
+    def invalidate_tables(self, tabelas: Iterable[str]) -> int:
+        """
+        Remover as entradas que leram alguma das tabelas.
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        removidas = 0
+        with self._lock:
+            self._contador += 1
+            for tabela in tabelas:
+                self._invalidada_em[tabela] = self._contador
+                for chave in list(self._por_tabela.get(tabela, ())):
+                    self._remover(chave)
+                    removidas += 1
+            self.invalidations += removidas
+        return removidas
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._por_tabela.clear()
+            self._bytes = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entradas),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hit_ratio, 4),
+                'invalidations': self.invalidations,
             }
-        )
 
-        # Session factory
+
+# Caches de resultados do processo (invalidados no commit de qualquer Engine)
+_caches_resultado: "weakref.WeakSet[QueryResultCache]" = weakref.WeakSet()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _observar_leitura(conn, cursor, statement, parameters, context, executemany):
+    coletor = _leituras.get()
+    if coletor is not None:
+        coletor.update(tables_read(statement))
+
+
+@escritas.apos_commit
+def _invalidar_apos_commit(tabelas: Set[str]) -> None:
+    # Depois do COMMIT do DBAPI: um leitor que tirou o snapshot() antes
+    # deste ponto tem o put() recusado, e quem lê depois já vê os dados novos
+    for cache in list(_caches_resultado):
+        cache.invalidate_tables(tabelas)
+
+
+@functools.lru_cache(maxsize=2048)
+def _normalizar_sql(sql: str) -> str:
+    """Normalização memorizada: o mesmo texto de instrução se repete muito"""
+    # Remover quebras de linha e espaços extras
+    normalized = ' '.join(sql.split())
+
+    # Remover valores literais
+    normalized = re.sub(r"'[^']*'", "'?'", normalized)
+    normalized = re.sub(r'\b\d+\b', '?', normalized)
+
+    return normalized
+
+
+class DatabaseOptimizer:
+    """
+    Otimizador de banco de dados com análise de performance
+
+    Usa o engine da aplicação quando informado (engine/read_engine);
+    database_url cria um engine próprio, como antes.
+    """
+
+    def __init__(self, database_url: Optional[str] = None, pool_size: int = 20, max_overflow: int = 30,
+                 engine: Optional[Engine] = None, read_engine: Optional[Engine] = None,
+                 cache_max_entries: int = 1000, cache_max_bytes: int = 32 * 1024 * 1024):
+        if engine is None:
+            # Engine otimizada com pool de conexões
+            engine = create_engine(
+                database_url,
+                poolclass=QueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=True,  # Verificar conexões antes de usar
+                pool_recycle=3600,   # Reciclar conexões a cada hora
+                echo=False,          # Não logar SQL em produção
+                connect_args={
+                    "check_same_thread": False,
+                    "timeout": 30
+                }
+            )
+        self.engine = engine
+        self.read_engine = read_engine or engine
+
+        # Session factory (escrita) e sessões de leitura das consultas em cache
         self.SessionLocal = sessionmaker(
             autocommit=False,
             autoflush=False,
             bind=self.engine
         )
+        self.ReadSessionLocal = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=self.read_engine
+        )
 
         # Estatísticas de queries
         self._query_stats: Dict[str, QueryStats] = {}
@@ -85,25 +308,29 @@ class DatabaseOptimizer:
         self._setup_event_listeners()
 
         # Cache de resultados de queries
-        self._query_cache: Dict[str, Tuple[Any, float]] = {}
         self._cache_ttl = 300  # 5 minutos
+        self.result_cache = QueryResultCache(
+            max_entries=cache_max_entries, max_bytes=cache_max_bytes, default_ttl=self._cache_ttl
+        )
 
-        # Queries lentas (> 1 segundo)
-        self._slow_queries: List[Dict] = []
+        # Queries lentas (> 1 segundo), as 100 mais recentes
+        self._slow_queries: Deque[Dict] = deque(maxlen=100)
         self._slow_query_threshold = 1.0
 
     def _setup_event_listeners(self):
         """Configurar listeners para monitoramento"""
 
-        @event.listens_for(self.engine, "before_cursor_execute")
         def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
             context._query_start_time = time.time()
 
-        @event.listens_for(self.engine, "after_cursor_execute")
         def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
             execution_time = time.time() - context._query_start_time
             self._record_query_stats(statement, execution_time)
 
+        for engine in {self.engine, self.read_engine}:
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
     def _record_query_stats(self, sql: str, execution_time: float):
         """Registrar estatísticas da query"""
         # Normalizar SQL para cache (remover parâmetros)
@@ -127,50 +354,41 @@ class DatabaseOptimizer:
                     'timestamp': datetime.now().isoformat()
                 })
 
-                # Manter apenas últimas 100 queries lentas
-                if len(self._slow_queries) > 100:
-                    self._slow_queries = self._slow_queries[-100:]
-
     def _normalize_sql(self, sql: str) -> str:
         """Normalizar SQL removendo parâmetros específicos"""
-        # Remover quebras de linha e espaços extras
-        normalized = ' '.join(sql.split())
-
-        # Substituir parâmetros por placeholders genéricos
-        # Isso é uma simplificação - em produção seria mais sofisticado
-        import re
-
-        # Remover valores literais
-        normalized = re.sub(r"'[^']*'", "'?'", normalized)
-        normalized = re.sub(r'\b\d+\b', '?', normalized)
-
-        return normalized
+        return _normalizar_sql(sql)
 
     def get_session(self) -> Session:
         """Obter sessão do banco de dados"""
         return self.SessionLocal()
 
     def execute_cached_query(self, sql: str, params: Dict = None, ttl: float = None) -> Any:
-        """Executar query com cache"""
+        """
+        Executar query com cache
+
+        O resultado fica guardado até o ttl ou até um commit escrever em
+        alguma das tabelas lidas.
+        """
         cache_key = self._generate_cache_key(sql, params)
-        current_time = time.time()
 
         # Verificar cache
-        if cache_key in self._query_cache:
-            result, cached_at = self._query_cache[cache_key]
-            cache_age = current_time - cached_at
-
-            if cache_age < (ttl or self._cache_ttl):
-                return result
+        encontrado, result = self.result_cache.get(cache_key)
+        if encontrado:
+            return result
 
-        # Executar query
-        with self.get_session() as session:
-            result = session.execute(text(sql), params or {}).fetchall()
+        # Executar query no engine de leitura, coletando as tabelas lidas
+        desde = self.result_cache.snapshot()
+        with collect_tables_read() as tabelas:
+            with self.ReadSessionLocal() as session:
+                result = session.execute(text(sql), params or {}).fetchall()
 
-            # Armazenar no cache
-            self._query_cache[cache_key] = (result, current_time)
+        # Armazenar no cache
+        self.result_cache.put(cache_key, result, tabelas, ttl, desde=desde)
+        return result
 
-            return result
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Descartar os resultados que dependem das tabelas"""
+        return self.result_cache.invalidate_tables(tables)
 
     def _generate_cache_key(self, sql: str, params: Dict = None) -> str:
         """Gerar chave única para cache"""
@@ -178,7 +396,7 @@ class DatabaseOptimizer:
             'sql': sql,
             'params': params or {}
         }
-        key_str = json.dumps(key_data, sort_keys=True)
+        key_str = json.dumps(key_data, sort_keys=True, default=str)
         return hashlib.md5(key_str.encode()).hexdigest()
 
     def bulk_insert(self, table_class, data: List[Dict], batch_size: int = 1000):
@@ -227,7 +445,8 @@ class DatabaseOptimizer:
                     'total_executions': total_queries,
                     'total_time_seconds': round(total_time, 2),
                     'average_time_per_query': round(total_time / total_queries, 4) if total_queries > 0 else 0,
-                    'cache_size': len(self._query_cache),
+                    'cache_size': len(self.result_cache),
+                    'cache_hit_ratio': round(self.result_cache.hit_ratio, 4),
                     'slow_queries_count': len(self._slow_queries)
                 },
                 'most_executed': [
@@ -246,7 +465,7 @@ class DatabaseOptimizer:
                     }
                     for stat in slowest_avg
                 ],
-                'recent_slow_queries': self._slow_queries[-10:]
+                'recent_slow_queries': list(self._slow_queries)[-10:]
             }
 
     def optimize_suggestions(self) -> List[str]:
@@ -287,16 +506,11 @@ class DatabaseOptimizer:
 
     def _calculate_cache_hit_ratio(self) -> float:
         """Calcular taxa de acerto do cache"""
-        # Implementação simplificada
-        # Em produção, isso seria mais sofisticado
-        if not self._query_cache:
-            return 0.0
-
-        return min(len(self._query_cache) / max(len(self._query_stats), 1), 1.0)
+        return self.result_cache.hit_ratio
 
     def clear_cache(self):
         """Limpar cache de queries"""
-        self._query_cache.clear()
+        self.result_cache.clear()
 
     def clear_stats(self):
         """Limpar estatísticas"""
@@ -337,40 +551,78 @@ class OptimizedTransaction:
 # INTEGRAÇÃO COM ERP PRIMOTEX
 # ============================================================================
 
-# Configuração padrão para SQLite do ERP
+# Configuração padrão para SQLite do ERP (só sem o backend instalado)
 DATABASE_URL = "sqlite:///./primotex_erp.db"
 
-# Instância global do otimizador
-db_optimizer = DatabaseOptimizer(
-    database_url=DATABASE_URL,
-    pool_size=15,
-    max_overflow=25
-)
+try:
+    from backend.database.config import engine as _engine_app, read_engine as _read_engine_app
+except ImportError:
+    _engine_app = _read_engine_app = None
+
+# Instância global do otimizador, no mesmo engine da API
+if _engine_app is not None:
+    db_optimizer = DatabaseOptimizer(engine=_engine_app, read_engine=_read_engine_app)
+else:
+    db_optimizer = DatabaseOptimizer(
+        database_url=DATABASE_URL,
+        pool_size=15,
+        max_overflow=25
+    )
 
 
 # ============================================================================
 # DECORADORES PARA OTIMIZAÇÃO
 # ============================================================================
 
-def cached_query(ttl: float = 300):
-    """Decorador para cache automático de queries"""
+class collect_tables_read:
+    """
+    Coletar as tabelas lidas pelas instruções executadas no bloco (em
+    qualquer Engine, no contexto atual).
+
+    Example:
+        with collect_tables_read() as tabelas:
+            db.query(Cliente).all()
+        # tabelas == {"clientes"}
+    """
+
+    def __enter__(self) -> Set[str]:
+        self._tabelas: Set[str] = set()
+        self._token = _leituras.set(self._tabelas)
+        return self._tabelas
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _leituras.reset(self._token)
+
+
+def cached_query(ttl: float = 300, optimizer: Optional[DatabaseOptimizer] = None):
+    """
+    Decorador para cache automático de queries
+
+    As tabelas lidas pela função são as das instruções executadas
+    durante a chamada; um commit que escreve nelas invalida o resultado.
+    """
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            cache = (optimizer or db_optimizer).result_cache
             # Gerar chave baseada na função e argumentos
-            cache_key = f"{func.__name__}:{hash(str(args) + str(kwargs))}"
+            cache_key = "{}.{}:{}".format(
+                func.__module__, func.__qualname__,
+                hashlib.md5(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+            )
 
             # Tentar cache primeiro
-            result = db_optimizer._query_cache.get(cache_key)
-            if result:
-                cached_result, cached_at = result
-                if time.time() - cached_at < ttl:
-                    return cached_result
+            encontrado, result = cache.get(cache_key)
+            if encontrado:
+                return result
 
             # Executar função
-            result = func(*args, **kwargs)
+            desde = cache.snapshot()
+            with collect_tables_read() as tabelas:
+                result = func(*args, **kwargs)
 
             # Armazenar no cache
-            db_optimizer._query_cache[cache_key] = (result, time.time())
+            cache.put(cache_key, result, tabelas, ttl, desde=desde)
 
             return result
 
@@ -322,6 +322,13 @@ User=www-data
 Group=www-data
 WorkingDirectory={self.project_root}
 Environment=PATH={self.project_root}/.venv/bin
+# Segundo nível do cache compartilhado pelos 4 workers, no diretório de
+# estado do serviço (/var/lib/primotex-erp, só www-data, 0700)
+StateDirectory=primotex-erp
+StateDirectoryMode=0700
+Environment=CACHE_L2_PATH=/var/lib/primotex-erp/cache_l2.db
+# /metrics devolve a soma dos 4 workers, qualquer que seja o que atende
+Environment=METRICAS_SQLITE_PATH=/var/lib/primotex-erp/metricas.db
 ExecStart={self.project_root}/.venv/bin/uvicorn backend.api.main:app --host 0.0.0.0 --port 8002 --workers 4
 Restart=always
 RestartSec=10
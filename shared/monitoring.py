@@ -21,13 +21,15 @@ import json
 import psutil
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import sqlite3
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from collections import deque, defaultdict
 import requests
 
+from shared.series_temporais import NIVEIS_PADRAO, SerieMultiResolucao
+
 try:
     from shared.config import config
     from shared.logging_system import get_logger
@@ -76,22 +78,67 @@ class Alert:
     details: Dict[str, Any]
     resolved: bool = False
 
+# API monitorada (métricas lidas de <url>/metrics, health check em <url>/health)
+MONITORING_API_URL = os.getenv("MONITORING_API_URL", "http://localhost:8002")
+MONITORING_METRICS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+
+def parse_prometheus_totals(texto: str) -> Dict[str, float]:
+    """
+    Somar as amostras de cada métrica do formato texto do Prometheus,
+    ignorando os rótulos (ex.: erp_http_requests_total de todas as rotas).
+    """
+    totais: Dict[str, float] = defaultdict(float)
+    for linha in texto.splitlines():
+        if not linha or linha.startswith('#'):
+            continue
+        nome, _, valor = linha.rpartition(' ')
+        nome = nome.split('{', 1)[0]
+        try:
+            totais[nome] += float(valor)
+        except ValueError:
+            continue
+    return dict(totais)
+
+
+def _campos_numericos(classe) -> List[Tuple[str, bool]]:
+    """(nome, é inteiro) dos campos de métrica de um dataclass, sem o timestamp"""
+    return [(campo.name, campo.type is int) for campo in fields(classe) if campo.name != 'timestamp']
+
+
+CAMPOS_SISTEMA = _campos_numericos(SystemMetrics)
+CAMPOS_APLICACAO = _campos_numericos(ApplicationMetrics)
+
+
 class MetricsCollector:
-    """Coletor de métricas do sistema"""
+    """
+    Coletor de métricas do sistema
 
-    def __init__(self):
+    O histórico fica em séries colunares com downsampling
+    (shared.series_temporais): 5 s por 1 h, 1 min por 24 h e 1 h por
+    30 dias, com instantes numéricos. Só a última amostra de cada tipo é
+    mantida como dataclass.
+    """
+
+    def __init__(self, api_url: str = MONITORING_API_URL):
         self.logger = get_logger("metrics")
         self.is_running = False
         self.collection_interval = 5  # segundos
+        self.api_url = api_url.rstrip('/')
 
-        # Armazenamento de métricas (últimas 24h)
-        self.system_metrics = deque(maxlen=17280)  # 24h * 60min * 60s / 5s
-        self.app_metrics = deque(maxlen=17280)
+        # Histórico de métricas (instantes numéricos, níveis de resolução)
+        self.system_history = SerieMultiResolucao([nome for nome, _ in CAMPOS_SISTEMA], NIVEIS_PADRAO)
+        self.app_history = SerieMultiResolucao([nome for nome, _ in CAMPOS_APLICACAO], NIVEIS_PADRAO)
+        self.latest_system: Optional[SystemMetrics] = None
+        self.latest_app: Optional[ApplicationMetrics] = None
 
         # Contadores de rede
         self.last_network_io = psutil.net_io_counters()
         self.last_check_time = time.time()
 
+        # Primeira leitura da CPU: as seguintes medem o uso desde a anterior
+        psutil.cpu_percent(interval=None)
+
         # Configurações de alertas
         self.alert_thresholds = {
             'cpu_critical': 90.0,
@@ -107,8 +154,8 @@ class MetricsCollector:
     def collect_system_metrics(self) -> SystemMetrics:
         """Coletar métricas do sistema"""
         try:
-            # CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU (sem bloquear: uso desde a coleta anterior)
+            cpu_percent = psutil.cpu_percent(interval=None)
 
             # Memória
             memory = psutil.virtual_memory()
@@ -158,26 +205,34 @@ class MetricsCollector:
             self.logger.error(f"Erro ao coletar métricas do sistema: {e}")
             return None
 
-    def collect_application_metrics(self) -> ApplicationMetrics:
-        """Coletar métricas da aplicação"""
+    def collect_application_metrics(self) -> Optional[ApplicationMetrics]:
+        """
+        Coletar métricas da aplicação a partir do /metrics da API
+        (backend.api.metricas); None se a API não respondeu. Com vários
+        workers, os totais só cobrem todos eles se a API usa
+        METRICAS_SQLITE_PATH; sem ele, cada coleta vê o worker que atendeu.
+        """
         try:
-            # Simular métricas da aplicação (em produção, integrar com FastAPI)
-            timestamp = datetime.now().isoformat()
-
-            # Métricas básicas (placeholder)
-            metrics = ApplicationMetrics(
-                timestamp=timestamp,
-                active_connections=0,
-                total_requests=0,
-                error_count=0,
-                avg_response_time=0.0,
-                database_connections=1,
-                cache_hit_rate=0.95,
-                uptime_seconds=int(time.time())
+            headers = {}
+            if MONITORING_METRICS_TOKEN:
+                headers['Authorization'] = f"Bearer {MONITORING_METRICS_TOKEN}"
+            response = requests.get(f"{self.api_url}/metrics", headers=headers, timeout=5)
+            response.raise_for_status()
+            totais = parse_prometheus_totals(response.text)
+
+            duracao_total = totais.get('erp_http_request_duration_seconds_sum', 0.0)
+            duracao_count = totais.get('erp_http_request_duration_seconds_count', 0.0)
+            return ApplicationMetrics(
+                timestamp=datetime.now().isoformat(),
+                active_connections=int(totais.get('erp_http_requests_in_flight', 0)),
+                total_requests=int(totais.get('erp_http_requests_total', 0)),
+                error_count=int(totais.get('erp_http_request_errors_total', 0)),
+                avg_response_time=round(duracao_total / duracao_count, 4) if duracao_count else 0.0,
+                database_connections=int(totais.get('erp_db_pool_checked_out', 0)),
+                cache_hit_rate=totais.get('erp_cache_hit_ratio', 0.0),
+                uptime_seconds=int(totais.get('erp_uptime_seconds', 0))
             )
 
-            return metrics
-
         except Exception as e:
             self.logger.error(f"Erro ao coletar métricas da aplicação: {e}")
             return None
@@ -192,12 +247,12 @@ class MetricsCollector:
                     # Coletar métricas do sistema
                     system_metrics = self.collect_system_metrics()
                     if system_metrics:
-                        self.system_metrics.append(system_metrics)
+                        self.record_system_metrics(system_metrics)
 
                     # Coletar métricas da aplicação
                     app_metrics = self.collect_application_metrics()
                     if app_metrics:
-                        self.app_metrics.append(app_metrics)
+                        self.record_application_metrics(app_metrics)
 
                     time.sleep(self.collection_interval)
 
@@ -214,36 +269,60 @@ class MetricsCollector:
         self.is_running = False
         self.logger.info("Coleta de métricas parada")
 
+    @staticmethod
+    def _valores(metrics, campos: List[Tuple[str, bool]]) -> List[Optional[float]]:
+        return [getattr(metrics, nome) for nome, _ in campos]
+
+    def record_system_metrics(self, metrics: SystemMetrics, instante: Optional[float] = None):
+        """Guardar uma amostra de sistema no histórico"""
+        self.latest_system = metrics
+        self.system_history.adicionar(instante or time.time(), self._valores(metrics, CAMPOS_SISTEMA))
+
+    def record_application_metrics(self, metrics: ApplicationMetrics, instante: Optional[float] = None):
+        """Guardar uma amostra da aplicação no histórico"""
+        self.latest_app = metrics
+        self.app_history.adicionar(instante or time.time(), self._valores(metrics, CAMPOS_APLICACAO))
+
     def get_latest_metrics(self) -> Dict[str, Any]:
         """Obter métricas mais recentes"""
         result = {}
 
-        if self.system_metrics:
-            result['system'] = asdict(self.system_metrics[-1])
+        if self.latest_system:
+            result['system'] = asdict(self.latest_system)
 
-        if self.app_metrics:
-            result['application'] = asdict(self.app_metrics[-1])
+        if self.latest_app:
+            result['application'] = asdict(self.latest_app)
 
         return result
 
-    def get_metrics_history(self, hours: int = 1) -> Dict[str, List[Dict]]:
-        """Obter histórico de métricas"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-
-        # Filtrar métricas por tempo
-        recent_system = [
-            asdict(m) for m in self.system_metrics 
-            if datetime.fromisoformat(m.timestamp) > cutoff_time
-        ]
-
-        recent_app = [
-            asdict(m) for m in self.app_metrics 
-            if datetime.fromisoformat(m.timestamp) > cutoff_time
-        ]
+    @staticmethod
+    def _pontos_como_dicts(pontos, campos: List[Tuple[str, bool]]) -> List[Dict]:
+        resultado = []
+        for instante, valores in pontos:
+            item = {'timestamp': datetime.fromtimestamp(instante).isoformat()}
+            for (nome, inteiro), valor in zip(campos, valores):
+                if valor != valor:  # NaN: valor ausente
+                    item[nome] = None
+                else:
+                    item[nome] = int(round(valor)) if inteiro else round(valor, 4)
+            resultado.append(item)
+        return resultado
+
+    def get_metrics_history(self, hours: float = 1) -> Dict[str, Any]:
+        """
+        Obter histórico de métricas
+
+        A resolução depende da janela: 5 s até 1 h, 1 min até 24 h e
+        1 h além disso (informada em 'resolution_seconds').
+        """
+        inicio = time.time() - hours * 3600
+        passo_sistema, pontos_sistema = self.system_history.intervalo(inicio)
+        passo_app, pontos_app = self.app_history.intervalo(inicio)
 
         return {
-            'system': recent_system,
-            'application': recent_app
+            'system': self._pontos_como_dicts(pontos_sistema, CAMPOS_SISTEMA),
+            'application': self._pontos_como_dicts(pontos_app, CAMPOS_APLICACAO),
+            'resolution_seconds': {'system': passo_sistema, 'application': passo_app}
         }
 
 class AlertManager:
@@ -430,7 +509,7 @@ class MonitoringDashboard:
         def api_check():
             """Check da API"""
             try:
-                response = requests.get("http://localhost:8002/health", timeout=5)
+                response = requests.get(f"{self.metrics_collector.api_url}/health", timeout=5)
                 return {"healthy": response.status_code == 200, "status_code": response.status_code}
             except Exception as e:
                 return {"healthy": False, "error": str(e)}
@@ -0,0 +1,185 @@
+"""
+SISTEMA ERP PRIMOTEX - SÉRIES TEMPORAIS COMPACTAS
+================================================
+
+Armazenamento das métricas do monitoramento em anéis colunares: um
+array('d') de instantes (segundos desde a época) e um array('d') por
+campo, com capacidade fixa alocada na criação. Cada ponto custa
+8 bytes por coluna, sem objetos Python por amostra.
+
+SerieMultiResolucao mantém níveis de resolução (padrão: 5 s por 1 h,
+1 min por 24 h, 1 h por 30 dias). A amostra bruta entra no primeiro
+nível; os demais acumulam somas por balde de tempo e gravam a média
+quando o balde fecha. Consultas por intervalo usam busca binária sobre
+os instantes (sempre crescentes) e escolhem o nível mais fino que
+ainda cobre o início pedido (ver nivel_para).
+
+Valores ausentes (ex.: load average no Windows) são gravados como NaN
+e ignorados nas médias.
+
+Para as 11 métricas de sistema, os três níveis ocupam ~540 KB (30 dias)
+contra ~6,8 MB do antigo deque de dataclasses com 24 h a cada 5 s (ver
+benchmarks/bench_series_monitoramento.py).
+
+Autor: GitHub Copilot
+Data: 17/10/2026
+"""
+
+import math
+from array import array
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# (passo em segundos, pontos mantidos) de cada nível, do mais fino ao mais grosso
+NIVEIS_PADRAO: Tuple[Tuple[int, int], ...] = (
+    (5, 720),      # 1 hora a cada 5 segundos
+    (60, 1440),    # 24 horas a cada minuto
+    (3600, 720),   # 30 dias a cada hora
+)
+
+Ponto = Tuple[float, Tuple[float, ...]]
+
+
+class AnelSerie:
+    """Ring buffer colunar de capacidade fixa"""
+
+    __slots__ = ("campos", "capacidade", "_instantes", "_colunas", "_inicio", "_tamanho")
+
+    def __init__(self, campos: Sequence[str], capacidade: int):
+        self.campos = tuple(campos)
+        self.capacidade = max(1, capacidade)
+        self._instantes = array("d", bytes(8 * self.capacidade))
+        self._colunas = [array("d", bytes(8 * self.capacidade)) for _ in self.campos]
+        self._inicio = 0
+        self._tamanho = 0
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def _posicao(self, indice: int) -> int:
+        return (self._inicio + indice) % self.capacidade
+
+    def instante(self, indice: int) -> float:
+        """Instante do ponto na posição lógica (0 = mais antigo, -1 = mais novo)"""
+        if indice < 0:
+            indice += self._tamanho
+        return self._instantes[self._posicao(indice)]
+
+    def adicionar(self, instante: float, valores: Sequence[float]) -> None:
+        """Gravar um ponto; com o anel cheio, sobrescreve o mais antigo"""
+        if self._tamanho and instante < self.instante(-1):
+            # Relógio voltou: mantém a ordem exigida pela busca binária
+            instante = self.instante(-1)
+        if self._tamanho < self.capacidade:
+            posicao = self._posicao(self._tamanho)
+            self._tamanho += 1
+        else:
+            posicao = self._inicio
+            self._inicio = (self._inicio + 1) % self.capacidade
+        self._instantes[posicao] = instante
+        for coluna, valor in zip(self._colunas, valores):
+            coluna[posicao] = valor
+
+    def _primeiro_a_partir(self, instante: float) -> int:
+        """Menor posição lógica com instante >= instante (busca binária)"""
+        baixo, alto = 0, self._tamanho
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._instantes[self._posicao(meio)] < instante:
+                baixo = meio + 1
+            else:
+                alto = meio
+        return baixo
+
+    def intervalo(self, inicio: float, fim: Optional[float] = None) -> Iterator[Ponto]:
+        """Pontos com inicio <= instante <= fim, do mais antigo ao mais novo"""
+        primeiro = self._primeiro_a_partir(inicio)
+        ultimo = self._tamanho if fim is None else self._primeiro_a_partir(math.nextafter(fim, math.inf))
+        for indice in range(primeiro, ultimo):
+            posicao = self._posicao(indice)
+            yield self._instantes[posicao], tuple(coluna[posicao] for coluna in self._colunas)
+
+    def ultimo(self) -> Optional[Ponto]:
+        if not self._tamanho:
+            return None
+        posicao = self._posicao(self._tamanho - 1)
+        return self._instantes[posicao], tuple(coluna[posicao] for coluna in self._colunas)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados pelas colunas"""
+        return (1 + len(self._colunas)) * self.capacidade * self._instantes.itemsize
+
+
+class _Acumulador:
+    """Somas do balde em aberto de um nível agregado"""
+
+    __slots__ = ("balde", "somas", "contagens")
+
+    def __init__(self, campos: int):
+        self.balde: Optional[int] = None
+        self.somas = array("d", bytes(8 * campos))
+        self.contagens = array("l", bytes(array("l").itemsize * campos))
+
+    def media(self) -> Tuple[float, ...]:
+        return tuple(
+            soma / contagem if contagem else math.nan
+            for soma, contagem in zip(self.somas, self.contagens)
+        )
+
+    def zerar(self, balde: int) -> None:
+        self.balde = balde
+        for i in range(len(self.somas)):
+            self.somas[i] = 0.0
+            self.contagens[i] = 0
+
+
+class SerieMultiResolucao:
+    """Série com níveis de resolução decrescente (downsampling por média)"""
+
+    def __init__(self, campos: Sequence[str], niveis: Sequence[Tuple[int, int]] = NIVEIS_PADRAO):
+        self.campos = tuple(campos)
+        self.niveis: List[Tuple[int, AnelSerie]] = [
+            (passo, AnelSerie(self.campos, pontos)) for passo, pontos in niveis
+        ]
+        self._acumuladores = [_Acumulador(len(self.campos)) for _ in self.niveis[1:]]
+
+    def adicionar(self, instante: float, valores: Sequence[Optional[float]]) -> None:
+        """Gravar uma amostra bruta (None vira NaN)"""
+        valores = tuple(math.nan if v is None else float(v) for v in valores)
+        self.niveis[0][1].adicionar(instante, valores)
+
+        for (passo, anel), acumulador in zip(self.niveis[1:], self._acumuladores):
+            balde = int(instante // passo)
+            if acumulador.balde is None:
+                acumulador.zerar(balde)
+            elif balde > acumulador.balde:
+                anel.adicionar(acumulador.balde * passo, acumulador.media())
+                acumulador.zerar(balde)
+            for i, valor in enumerate(valores):
+                if valor == valor:  # ignora NaN
+                    acumulador.somas[i] += valor
+                    acumulador.contagens[i] += 1
+
+    def nivel_para(self, inicio: float) -> Tuple[int, AnelSerie]:
+        """
+        Nível mais fino que cobre `inicio`: o ponto mais antigo já é
+        anterior a ele, ou o anel ainda não deu a volta (guarda tudo desde
+        a primeira amostra). Sem nenhum, o mais grosso; série vazia, o
+        mais fino.
+        """
+        for passo, anel in self.niveis:
+            if len(anel) and (anel.instante(0) <= inicio or len(anel) < anel.capacidade):
+                return passo, anel
+        return self.niveis[-1] if len(self.niveis[-1][1]) else self.niveis[0]
+
+    def intervalo(self, inicio: float, fim: Optional[float] = None) -> Tuple[int, List[Ponto]]:
+        """(passo do nível usado, pontos entre inicio e fim)"""
+        passo, anel = self.nivel_para(inicio)
+        return passo, list(anel.intervalo(inicio, fim))
+
+    def ultimo(self) -> Optional[Ponto]:
+        return self.niveis[0][1].ultimo()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(anel.nbytes for _passo, anel in self.niveis)
@@ -10,7 +10,7 @@ Data: 16/11/2025 - FASE 100
 """
 
 import re
-from typing import Tuple
+from typing import Iterable, List, Optional, Tuple
 
 # Constantes de mensagens de erro
 MENSAGEM_CPF_INVALIDO = "CPF inválido"
@@ -99,6 +99,54 @@ def validar_cnpj(cnpj: str) -> Tuple[bool, str]:
     return True, "CNPJ válido"
 
 
+# Pesos dos dígitos verificadores (pré-calculados para validação em lote)
+_PESOS_CPF = (tuple(range(10, 1, -1)), tuple(range(11, 1, -1)))
+_PESOS_CNPJ = ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+_NAO_DIGITOS = re.compile(r'\D')
+
+
+def _digito_verificador(digitos: List[int], pesos: Tuple[int, ...]) -> int:
+    resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+    return 0 if resto < 2 else 11 - resto
+
+
+def validar_documentos_em_lote(documentos: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """
+    Valida uma sequência de CPFs/CNPJs de uma vez (importação em massa).
+
+    O tipo é decidido pelo número de dígitos (11 = CPF, 14 = CNPJ). Evita
+    o custo de chamar validar_cpf/validar_cnpj linha a linha: a expressão
+    regular e os pesos são preparados uma única vez.
+
+    Args:
+        documentos: CPFs/CNPJs com ou sem formatação
+
+    Returns:
+        Para cada documento, None se válido ou a mensagem de erro
+    """
+    resultado: List[Optional[str]] = []
+    for documento in documentos:
+        numeros = _NAO_DIGITOS.sub('', documento or '')
+        tamanho = len(numeros)
+        if tamanho == 11:
+            pesos, mensagem = _PESOS_CPF, MENSAGEM_CPF_INVALIDO
+        elif tamanho == 14:
+            pesos, mensagem = _PESOS_CNPJ, MENSAGEM_CNPJ_INVALIDO
+        else:
+            resultado.append("CPF deve ter 11 dígitos ou CNPJ deve ter 14 dígitos")
+            continue
+
+        digitos = [ord(c) - 48 for c in numeros]
+        if numeros == numeros[0] * tamanho:
+            resultado.append(mensagem)
+        elif (digitos[-2] != _digito_verificador(digitos, pesos[0])
+              or digitos[-1] != _digito_verificador(digitos, pesos[1])):
+            resultado.append(mensagem)
+        else:
+            resultado.append(None)
+    return resultado
+
+
 def validar_email(email: str) -> Tuple[bool, str]:
     """
     Valida formato de email.